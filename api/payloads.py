@@ -0,0 +1,192 @@
+"""
+Payloads - Cached JSON response bodies with strong ETags and pre-compressed variants
+
+A read endpoint's body depends only on a record and the version of the data
+it came from, so each one is serialized once per data version and kept in a
+PayloadCache. Its ETag is derived from the data version and a hash of the
+body. Compressed variants are made the first time a client asks for them and
+kept alongside, so repeat reads cost neither serialization nor compression,
+and a conditional read with a matching If-None-Match costs a 304 and no body.
+
+gzip is always available; brotli is used when the optional `brotli` package
+is installed.
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+
+from services.metrics import count
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+JSON_CONTENT_TYPE = 'application/json'
+
+# Bodies shorter than this are sent uncompressed; compression would not pay off
+MIN_COMPRESS_BYTES = 256
+
+# Clients may keep a copy but must revalidate it with If-None-Match
+CACHE_CONTROL = 'no-cache'
+
+# Content codings in order of preference, with the suffix added to their ETag
+_ENCODERS = {'gzip': (lambda body: gzip.compress(body, compresslevel=9, mtime=0), 'gz')}
+if brotli is not None:
+    _ENCODERS = {'br': (lambda body: brotli.compress(body, quality=11), 'br'), **_ENCODERS}
+
+
+class Payload:
+    def __init__(self, value, version):
+        """
+        Serialize a value once
+        
+        Args:
+            value: JSON-serializable response value
+            version (str): Data version the value was read from
+        """
+        self.body = json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.version = version
+        self.etag = f'"{version}-{hashlib.sha256(self.body).hexdigest()[:16]}"'
+        self._variants = {None: (self.body, self.etag)}
+        self._lock = threading.Lock()
+    
+    def variant(self, encoding):
+        """
+        The body in a content coding, compressed on first use
+        
+        Args:
+            encoding (str): 'br', 'gzip' or None for the plain body
+        
+        Returns:
+            tuple: (body, ETag) of that variant
+        """
+        variant = self._variants.get(encoding)
+        if variant is None:
+            with self._lock:
+                variant = self._variants.get(encoding)
+                if variant is None:
+                    compress, suffix = _ENCODERS[encoding]
+                    variant = self._variants[encoding] = (compress(self.body), f'{self.etag[:-1]}-{suffix}"')
+        return variant
+    
+    def matches(self, if_none_match):
+        """
+        Whether an If-None-Match header names any variant of this payload
+        
+        Args:
+            if_none_match (str): Header value, e.g. '"abc-123", W/"abc-123-gz"'
+        
+        Returns:
+            bool: True if the client's copy is current
+        """
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == '*':
+            return True
+        # Weak comparison, as RFC 9110 requires for If-None-Match
+        base = self.etag[:-1]
+        for tag in if_none_match.split(','):
+            tag = tag.strip()
+            if tag.startswith('W/'):
+                tag = tag[2:]
+            if tag == self.etag or (tag.startswith(base) and tag[len(base):-1] in ('-gz', '-br')):
+                return True
+        return False
+
+
+def negotiate_encoding(accept_encoding, size):
+    """
+    Pick the content coding for a response
+    
+    Args:
+        accept_encoding (str): The request's Accept-Encoding header
+        size (int): Size of the plain body in bytes
+    
+    Returns:
+        str: 'br', 'gzip' or None for no compression
+    """
+    if not accept_encoding or size < MIN_COMPRESS_BYTES:
+        return None
+    accepted = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in _ENCODERS:
+        if accepted.get(encoding, accepted.get('*', 0.0)) > 0:
+            return encoding
+    return None
+
+
+class PayloadCache:
+    def __init__(self):
+        """An empty cache of payloads by request key"""
+        self._payloads = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key, version, load):
+        """
+        The payload for a request key, built on first use for a data version
+        
+        Args:
+            key (tuple): Identifies the record, e.g. ('culture', 'Japan')
+            version (str): Current data version of the record's source
+            load (callable): Returns the record, or None if it does not exist
+        
+        Returns:
+            Payload: Cached payload, or None for a missing record
+        """
+        payload = self._payloads.get(key)
+        if payload is not None and payload.version == version:
+            count('visaverse_cache_requests_total', cache='payload', result='hit')
+            return payload
+        count('visaverse_cache_requests_total', cache='payload', result='miss')
+        value = load()
+        if value is None:
+            return None
+        payload = Payload(value, version)
+        with self._lock:
+            self._payloads[key] = payload
+        return payload
+    
+    def clear(self):
+        """Drop every payload"""
+        with self._lock:
+            self._payloads.clear()
+
+
+def respond(payload, headers):
+    """
+    Response for a cached payload, honouring If-None-Match and Accept-Encoding
+    
+    Args:
+        payload (Payload): Payload for the requested record
+        headers: The request headers
+    
+    Returns:
+        tuple: (status, headers, body) as route handlers return
+    """
+    encoding = negotiate_encoding(headers.get('Accept-Encoding'), len(payload.body))
+    body, etag = payload.variant(encoding)
+    response_headers = {
+        'Content-Type': JSON_CONTENT_TYPE,
+        'ETag': etag,
+        'Cache-Control': CACHE_CONTROL,
+        'Vary': 'Accept-Encoding'
+    }
+    if payload.matches(headers.get('If-None-Match')):
+        count('visaverse_payload_responses_total', status='304', encoding=encoding or 'identity')
+        return 304, response_headers, b''
+    if encoding:
+        response_headers['Content-Encoding'] = encoding
+    count('visaverse_payload_responses_total', status='200', encoding=encoding or 'identity')
+    return 200, response_headers, body
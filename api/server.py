@@ -0,0 +1,272 @@
+"""
+Local HTTP endpoint for operational data and read-only lookups
+
+A small standard-library HTTP server that exposes the in-process metrics in
+Prometheus text format, the liveness and readiness probes and JSON reads of
+the visa and culture data. The Streamlit
+app starts it on a background thread when VISAVERSE_METRICS_PORT is set, and
+tools/serve.py starts it before the app; it can also run on its own:
+
+    VISAVERSE_METRICS=1 python -m api.server --port 9100
+
+/healthz answers 200 while the process serves requests. /readyz answers 200
+once the warm-up (services/warmup.py) is done and 503 until then; both
+report the warm-up progress as JSON. An unexpected error in a handler is
+logged and answered with 500 and a JSON error body.
+
+The /api/ reads carry a strong ETag from the data version and the record's
+hash, answer If-None-Match with 304 Not Modified and are gzip- or
+brotli-compressed when the client accepts it; bodies and their compressed
+variants are cached per record (see api/payloads.py).
+"""
+
+import argparse
+import json
+import logging
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+from api.payloads import JSON_CONTENT_TYPE, PayloadCache, respond
+from services.metrics import REGISTRY
+from services.profiling import profiled
+from services.warmup import WARMUP
+from utils.constants import METRICS_HOST
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+TEXT_CONTENT_TYPE = 'text/plain; charset=utf-8'
+
+ROUTES = {}
+
+# (compiled pattern, handler) for paths with {parameters}, in registration order
+PATTERN_ROUTES = []
+
+PAYLOADS = PayloadCache()
+
+logger = logging.getLogger(__name__)
+
+# Servers started in this process, by port
+_running = {}
+
+
+def route(path):
+    """
+    Register a GET handler; it receives the request handler and returns (status, headers, body)
+    
+    A {name} segment in the path matches one URL-encoded path segment, passed
+    decoded to the handler as a keyword argument.
+    """
+    def register(handler):
+        if '{' in path:
+            pattern = re.sub(r'\\{(\w+)\\}', r'(?P<\1>[^/]+)', re.escape(path))
+            PATTERN_ROUTES.append((re.compile(pattern + '$'), handler))
+        else:
+            ROUTES[path] = handler
+        return handler
+    return register
+
+
+def resolve(path):
+    """
+    Find the handler for a request path
+    
+    Args:
+        path (str): Request path without the query string
+    
+    Returns:
+        tuple: (handler, keyword arguments), or (None, None) if no route matches
+    """
+    handler = ROUTES.get(path)
+    if handler is not None:
+        return handler, {}
+    for pattern, handler in PATTERN_ROUTES:
+        match = pattern.match(path)
+        if match:
+            return handler, {name: unquote(value) for name, value in match.groupdict().items()}
+    return None, None
+
+
+@route('/metrics')
+def metrics(request):
+    body = REGISTRY.render_prometheus().encode('utf-8')
+    return 200, {'Content-Type': PROMETHEUS_CONTENT_TYPE}, body
+
+
+def _probe(status, report):
+    return status, {'Content-Type': JSON_CONTENT_TYPE, 'Cache-Control': 'no-store'}, json.dumps(report).encode('utf-8')
+
+
+@route('/healthz')
+def healthz(request):
+    # Alive even while warming up or after a failed warm-up: restarting would not help
+    return _probe(200, dict(WARMUP.status(), alive=True))
+
+
+@route('/readyz')
+def readyz(request):
+    status = WARMUP.status()
+    return _probe(200 if status['ready'] else 503, status)
+
+
+def _not_found(message='Not Found'):
+    return 404, {'Content-Type': TEXT_CONTENT_TYPE}, f"{message}\n".encode('utf-8')
+
+
+def _server_error():
+    body = json.dumps({'error': 'Internal Server Error', 'status': 500}).encode('utf-8')
+    return 500, {'Content-Type': JSON_CONTENT_TYPE, 'Cache-Control': 'no-store'}, body
+
+
+def _read(request, service_name, key, load):
+    """
+    Serve one lookup from the payload cache
+    
+    Args:
+        request: The request handler, for its headers
+        service_name (str): 'visa' or 'culture'; the service's data version
+            is part of the ETag and invalidates cached payloads
+        key (tuple): Identifies the record in the payload cache
+        load (callable): Takes the service and returns the record, or None
+            if it does not exist
+    
+    Returns:
+        tuple: (status, headers, body); 503 until the data is loaded or when
+            the data files are missing or invalid, 404 for a missing record
+    """
+    try:
+        loaded = WARMUP.wait('load_data', timeout=0)
+    except (FileNotFoundError, ValueError):
+        loaded = False
+    if not loaded:
+        return 503, {'Content-Type': TEXT_CONTENT_TYPE, 'Retry-After': '5'}, b'Data not loaded\n'
+    service = WARMUP.services()[service_name]
+    payload = PAYLOADS.get((service_name,) + key, service.data_version, lambda: load(service))
+    if payload is None:
+        return _not_found(f"No {key[0].replace('_', ' ')} for {key[-1]}")
+    return respond(payload, request.headers)
+
+
+@route('/api/visa/countries')
+def visa_countries(request):
+    return _read(request, 'visa', ('countries',), lambda visa: visa.get_all_countries())
+
+
+@route('/api/visa/countries/{country}')
+def visa_country_info(request, country):
+    return _read(request, 'visa', ('country_info', country), lambda visa: visa.get_country_info(country))
+
+
+@route('/api/visa/countries/{country}/visa-types')
+def visa_types_for_country(request, country):
+    def load(visa):
+        if visa.get_country_info(country) is None:
+            return None
+        return visa.get_visa_types_for_country(country)
+    return _read(request, 'visa', ('visa_types', country), load)
+
+
+@route('/api/visa/types/{visa_key}/requirements')
+def visa_requirements(request, visa_key):
+    def load(visa):
+        visa_type = visa.store.get_visa_type(visa_key)
+        return None if visa_type is None else visa_type.get('requirements', [])
+    return _read(request, 'visa', ('requirements', visa_key), load)
+
+
+@route('/api/culture/countries')
+def culture_countries(request):
+    return _read(request, 'culture', ('countries',), lambda culture: culture.get_available_countries())
+
+
+@route('/api/culture/countries/{country}')
+def country_culture(request, country):
+    return _read(request, 'culture', ('culture', country), lambda culture: culture.get_country_culture(country))
+
+
+@route('/api/culture/tips')
+def culture_tips(request):
+    def load(culture):
+        return {
+            'email_etiquette': culture.get_email_etiquette(),
+            'virtual_meeting_tips': culture.get_virtual_meeting_tips(),
+            'cultural_adaptation': culture.get_cultural_adaptation_tips()
+        }
+    return _read(request, 'culture', ('tips',), load)
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    server_version = 'VisaVerse'
+    
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        handler, params = resolve(path)
+        if handler is None:
+            self._send(*_not_found())
+            return
+        with profiled(f"api {handler.__name__}"):
+            try:
+                status, headers, body = handler(self, **params)
+            except Exception:
+                logger.exception("Error serving %s", path)
+                status, headers, body = _server_error()
+        self._send(status, headers, body)
+    
+    def _send(self, status, headers, body):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        # Scrapes arrive every few seconds; keep them out of the app's console
+        pass
+
+
+def create_server(host=METRICS_HOST, port=9100):
+    """Create the HTTP server without starting it"""
+    return ThreadingHTTPServer((host, port), RequestHandler)
+
+
+def start_in_background(host=METRICS_HOST, port=9100):
+    """
+    Start the server on a daemon thread, once per port
+    
+    Args:
+        host (str): Interface to bind
+        port (int): Port to bind
+    
+    Returns:
+        ThreadingHTTPServer: The running server, possibly started earlier
+            by tools/serve.py
+    """
+    server = _running.get(port)
+    if server is None:
+        server = _running[port] = create_server(host, port)
+        thread = threading.Thread(target=server.serve_forever, name='visaverse-api', daemon=True)
+        thread.start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve VisaVerse operational endpoints")
+    parser.add_argument('--host', default=METRICS_HOST)
+    parser.add_argument('--port', type=int, default=9100)
+    args = parser.parse_args(argv)
+    
+    server = create_server(args.host, args.port)
+    WARMUP.start()
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
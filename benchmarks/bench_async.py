@@ -0,0 +1,105 @@
+"""
+Async Benchmark - Lookup latency on one event loop while resumes are analyzed
+
+Simulates one asyncio process serving many users: a stream of cheap
+lookups (visa recommendations, culture guides) arrives while several large
+resume analyses are requested at once. Run twice, once with analyses
+offloaded through AsyncDocumentService and once with them called inline on
+the loop, it shows how long a lookup waits behind analysis work.
+
+Usage:
+    python -m benchmarks.bench_async
+    python -m benchmarks.bench_async --resume-kb 16000 --analyses 8 --lookups 400
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.load_test import percentile  # noqa: E402
+from services.async_services import AsyncVisaService, AsyncCultureService, AsyncDocumentService  # noqa: E402
+
+RESUME_LINE = "Work experience: 5 years in software at Example Corp, university degree, skills: python. "
+
+PROFILE = {
+    'citizenship': 'India',
+    'destination': 'Canada',
+    'purpose': 'Work/Employment',
+    'education': "Master's Degree",
+    'work_experience': 7
+}
+
+
+async def _lookups(visa, culture, count, interval, latencies):
+    """Issue count lookups, interval seconds apart, recording each one's latency from when it was due"""
+    start = time.perf_counter()
+    for i in range(count):
+        due = start + i * interval
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if i % 2:
+            await culture.get_country_culture('Germany')
+        else:
+            await visa.get_visa_recommendations(PROFILE)
+        latencies.append((time.perf_counter() - due) * 1000)
+
+
+async def _analyze_inline(documents, resume):
+    """Analysis on the event loop, as a synchronous service would do it"""
+    await asyncio.sleep(0)
+    return documents.service.analyze_resume(resume)
+
+
+async def run(offload, resume_kb, analyses, lookups, interval_ms):
+    """
+    Run one mixed workload
+    
+    Returns:
+        dict: Lookup latency percentiles in ms and total wall time in seconds
+    """
+    visa, culture, documents = await asyncio.gather(
+        AsyncVisaService.create(), AsyncCultureService.create(), AsyncDocumentService.create()
+    )
+    resume = RESUME_LINE * (resume_kb * 1024 // len(RESUME_LINE))
+    analyze = documents.analyze_resume if offload else (lambda text: _analyze_inline(documents, text))
+    latencies = []
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(
+            _lookups(visa, culture, lookups, interval_ms / 1000, latencies),
+            *(analyze(resume) for _ in range(analyses))
+        )
+    finally:
+        documents.close()
+    return {
+        'p50_ms': percentile(latencies, 50),
+        'p99_ms': percentile(latencies, 99),
+        'max_ms': max(latencies),
+        'wall_s': time.perf_counter() - start
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Event-loop lookup latency under document analysis load")
+    parser.add_argument('--resume-kb', type=int, default=8000, help="Size of each analyzed resume")
+    parser.add_argument('--analyses', type=int, default=6, help="Resume analyses requested at once")
+    parser.add_argument('--lookups', type=int, default=200, help="Lookups issued during the run")
+    parser.add_argument('--interval-ms', type=float, default=1.0, help="Time between lookups")
+    args = parser.parse_args(argv)
+    
+    print(f"{'mode':<10} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} {'wall s':>8}")
+    for offload in (False, True):
+        result = asyncio.run(run(offload, args.resume_kb, args.analyses, args.lookups, args.interval_ms))
+        mode = 'offloaded' if offload else 'inline'
+        print(f"{mode:<10} {result['p50_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+              f"{result['max_ms']:>9.2f} {result['wall_s']:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""
+Case Store Benchmark - Sustained checklist write throughput with many sessions
+
+Each simulated session is a thread that keeps toggling checklist items, as
+users ticking boxes would. The run is repeated twice on a fresh database:
+once with every toggle committed on the caller's thread, and once through
+CaseStore, which queues toggles and commits them in batches from its writer
+thread. It reports toggles per second, the latency a toggle adds to a page
+rerun, and how many rows and transactions reached the disk.
+
+Usage:
+    python -m benchmarks.bench_cases
+    python -m benchmarks.bench_cases --sessions 200 --seconds 10 --think-ms 5
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.load_test import percentile  # noqa: E402
+from services.case_store import SCHEMA, UPSERTS, CaseStore, new_case_id  # noqa: E402
+from services.document_service import DocumentService  # noqa: E402
+
+VISA_TYPE = 'Skilled Worker'
+
+
+class DirectWriter:
+    """Baseline: every toggle is its own transaction, committed on the caller's thread"""
+    
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        self.stats = {'rows_written': 0, 'batches': 0}
+        self._lock = threading.Lock()
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        conn.close()
+    
+    def set_checked(self, case_id, visa_type, document, checked):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.db_path)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+        with conn:
+            conn.execute(UPSERTS['check'], (case_id, visa_type, document, int(checked), time.time()))
+        with self._lock:
+            self.stats['rows_written'] += 1
+            self.stats['batches'] += 1
+    
+    def flush(self):
+        pass
+
+
+def _session(writer, documents, deadline, think, latencies, seed):
+    """One user toggling random documents until the deadline"""
+    rng = random.Random(seed)
+    case_id = new_case_id()
+    state = {}
+    local = []
+    # Each session checks the clock itself; with no think time, busy threads can starve a coordinating thread
+    while time.perf_counter() < deadline:
+        document = rng.choice(documents)
+        state[document] = not state.get(document, False)
+        start = time.perf_counter()
+        writer.set_checked(case_id, VISA_TYPE, document, state[document])
+        local.append((time.perf_counter() - start) * 1e6)
+        if think:
+            time.sleep(think)
+    latencies.extend(local)
+
+
+def run(mode, sessions, seconds, think_ms, flush_interval):
+    """
+    Run one write workload on a fresh database
+    
+    Returns:
+        dict: Toggles, throughput, toggle latency percentiles in
+            microseconds, rows and transactions written
+    """
+    requirements = DocumentService().get_required_documents(VISA_TYPE)
+    documents = requirements['essential'] + requirements['specific']
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, 'cases.db')
+        writer = (CaseStore(db_path, flush_interval=flush_interval) if mode == 'batched'
+                  else DirectWriter(db_path))
+        latencies = []
+        start = time.perf_counter()
+        threads = [
+            threading.Thread(target=_session, args=(writer, documents, start + seconds, think_ms / 1000, latencies, i))
+            for i in range(sessions)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        toggled = time.perf_counter() - start
+        writer.flush()
+        durable = time.perf_counter() - start
+        stats = dict(writer.stats)
+        if mode == 'batched':
+            writer.close()
+    return {
+        'toggles': len(latencies),
+        'toggles_per_s': len(latencies) / toggled,
+        'p50_us': percentile(latencies, 50),
+        'p99_us': percentile(latencies, 99),
+        'rows': stats['rows_written'],
+        'transactions': stats['batches'],
+        'durable_s': durable
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Case store write throughput with many concurrent sessions")
+    parser.add_argument('--sessions', type=int, default=64, help="Concurrent sessions toggling checkboxes")
+    parser.add_argument('--seconds', type=float, default=5.0, help="Length of each run")
+    parser.add_argument('--think-ms', type=float, default=2.0, help="Pause between one session's toggles")
+    parser.add_argument('--flush-interval', type=float, default=0.5, help="CaseStore batching interval")
+    args = parser.parse_args(argv)
+    
+    print(f"{'mode':<8} {'toggles/s':>10} {'p50 us':>9} {'p99 us':>10} {'rows':>9} {'commits':>8} {'durable s':>10}")
+    for mode in ('direct', 'batched'):
+        result = run(mode, args.sessions, args.seconds, args.think_ms, args.flush_interval)
+        print(f"{mode:<8} {result['toggles_per_s']:>10.0f} {result['p50_us']:>9.1f} {result['p99_us']:>10.1f} "
+              f"{result['rows']:>9} {result['transactions']:>8} {result['durable_s']:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
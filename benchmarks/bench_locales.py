@@ -0,0 +1,126 @@
+"""
+Locales Benchmark - Memory and hit rate of lazily loaded locale packs
+
+Writes locale packs for a synthetic culture dataset and serves a skewed
+stream of localized lookups (a few locales and countries get most of the
+traffic) with several LOCALE_CACHE_SIZE values, reporting the memory the
+loaded packs hold, the cache hit rate and the time per lookup. Loading every
+pack up front is shown for comparison.
+
+Usage:
+    python -m benchmarks.bench_locales
+    python -m benchmarks.bench_locales --scale 50 --cache-sizes 64,256,1024 --lookups 50000
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.synthetic import DEFAULT_SEED, LOCALES, write_locale_packs, write_synthetic_datasets  # noqa: E402
+from services.culture_service import CultureService  # noqa: E402
+from services.locales import LocalePacks  # noqa: E402
+
+DEFAULT_CACHE_SIZES = [64, 256, 1024]
+
+
+def skewed_lookups(rng, countries, count):
+    """(locale, country) pairs where the first locales and countries are the most asked for"""
+    locale_weights = [1 / (i + 1) for i in range(len(LOCALES))]
+    country_weights = [1 / (i + 1) for i in range(len(countries))]
+    return list(zip(rng.choices(LOCALES, locale_weights, k=count), rng.choices(countries, country_weights, k=count)))
+
+
+def bench_cache_size(culture_path, locales_dir, lookups, cache_size):
+    """
+    Serve the lookups with one cache size
+    
+    Returns:
+        dict: Packs held, KiB they hold, hit rate and microseconds per lookup
+    """
+    service = CultureService(data_path=culture_path, locales_dir=locales_dir)
+    service.locales = timed_packs = LocalePacks(locales_dir, cache_size)
+    start = time.perf_counter()
+    for locale, country in lookups:
+        service.get_country_culture(country, locale)
+    elapsed = time.perf_counter() - start
+    
+    # Again with fresh packs, for the memory they end up holding
+    service.locales = LocalePacks(locales_dir, cache_size)
+    gc.collect()
+    tracemalloc.start()
+    for locale, country in lookups:
+        service.get_country_culture(country, locale)
+    gc.collect()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    requests = timed_packs.hits + timed_packs.misses
+    return {
+        'cache_size': cache_size,
+        'packs': len(service.locales),
+        'held_kib': round(held / 1024, 1),
+        'hit_rate': round(timed_packs.hits / requests, 4),
+        'us_per_lookup': round(elapsed / len(lookups) * 1e6, 3)
+    }
+
+
+def bench_eager(culture_path, locales_dir):
+    """Memory for every pack loaded up front"""
+    countries = CultureService(data_path=culture_path).get_available_countries()
+    packs = LocalePacks(locales_dir, cache_size=len(LOCALES) * (len(countries) + 1))
+    gc.collect()
+    tracemalloc.start()
+    for locale in packs.locales():
+        for country in countries:
+            packs.pack(locale, country)
+    gc.collect()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'packs': len(packs), 'held_kib': round(held / 1024, 1)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark lazily loaded locale packs")
+    parser.add_argument('--scale', type=int, default=20, help="Synthetic dataset scale")
+    parser.add_argument('--cache-sizes', default=','.join(str(size) for size in DEFAULT_CACHE_SIZES),
+                        help="Comma-separated LOCALE_CACHE_SIZE values")
+    parser.add_argument('--lookups', type=int, default=20000, help="Localized lookups per cache size")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="Seed for the data and the lookups")
+    parser.add_argument('--output', help="Write the JSON results to this path")
+    args = parser.parse_args(argv)
+    
+    with tempfile.TemporaryDirectory(prefix='visaverse-locales-bench-') as workdir:
+        _, culture_path = write_synthetic_datasets(args.scale, workdir, args.seed)
+        locales_dir = write_locale_packs(culture_path, workdir, seed=args.seed)
+        countries = CultureService(data_path=culture_path).get_available_countries()
+        lookups = skewed_lookups(random.Random(args.seed), countries, args.lookups)
+        print(f"Scale {args.scale}: {len(countries)} countries in {len(LOCALES)} locales, "
+              f"{args.lookups} skewed lookups\n")
+        eager = bench_eager(culture_path, locales_dir)
+        print(f"{'cache size':>10s} {'packs':>7s} {'held KiB':>10s} {'hit rate':>9s} {'us/lookup':>10s}")
+        results = []
+        for cache_size in [int(size) for size in args.cache_sizes.split(',') if size.strip()]:
+            result = bench_cache_size(culture_path, locales_dir, lookups, cache_size)
+            results.append(result)
+            print(f"{cache_size:10d} {result['packs']:7d} {result['held_kib']:10.1f} {result['hit_rate']:9.1%} "
+                  f"{result['us_per_lookup']:10.3f}")
+        print(f"{'all':>10s} {eager['packs']:7d} {eager['held_kib']:10.1f}")
+    
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'scale': args.scale, 'lookups': args.lookups, 'results': results, 'eager': eager}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
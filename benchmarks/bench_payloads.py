@@ -0,0 +1,120 @@
+"""
+Payload Benchmark - Bytes sent and server CPU per read for the /api/ endpoints
+
+Calls the route handlers of api/server.py directly, without sockets, for
+every visa and culture read endpoint in four modes:
+
+    uncached     payload cache cleared before every read (serialize, hash
+                 and compress each time, as without api/payloads.py)
+    plain        cached payload, client does not accept compression
+    gzip         cached payload, client accepts gzip (and br when available)
+    conditional  client revalidates with the ETag it got before -> 304
+
+Usage:
+    python -m benchmarks.bench_payloads
+    python -m benchmarks.bench_payloads --passes 50 --output results/payloads.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from urllib.parse import quote
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from api.server import PAYLOADS, resolve  # noqa: E402
+from services.warmup import WARMUP  # noqa: E402
+
+ACCEPT_COMPRESSED = 'gzip, br'
+
+
+class Request:
+    """The part of a request handler the routes use"""
+    
+    def __init__(self, headers):
+        self.headers = headers
+
+
+def endpoint_paths():
+    """Every read endpoint path for the loaded data"""
+    services = WARMUP.services()
+    visa, culture = services['visa'], services['culture']
+    paths = ['/api/visa/countries', '/api/culture/countries', '/api/culture/tips']
+    for country in visa.get_all_countries():
+        paths.append(f'/api/visa/countries/{quote(country)}')
+        paths.append(f'/api/visa/countries/{quote(country)}/visa-types')
+    for visa_key in visa.store.visa_type_keys():
+        paths.append(f'/api/visa/types/{quote(visa_key)}/requirements')
+    for country in culture.get_available_countries():
+        paths.append(f'/api/culture/countries/{quote(country)}')
+    return paths
+
+
+def get(path, headers):
+    """Issue one read; returns (status, response headers, body)"""
+    handler, params = resolve(path)
+    return handler(Request(headers), **params)
+
+
+def run_mode(mode, paths, etags, passes):
+    """
+    Read every path `passes` times in one mode
+    
+    Returns:
+        dict: Requests, body bytes per request, CPU microseconds per request
+            and the share of 304 responses
+    """
+    headers = {} if mode in ('uncached', 'plain') else {'Accept-Encoding': ACCEPT_COMPRESSED}
+    sent = not_modified = 0
+    start = time.process_time()
+    for _ in range(passes):
+        for path in paths:
+            if mode == 'uncached':
+                PAYLOADS.clear()
+                headers = {'Accept-Encoding': ACCEPT_COMPRESSED}
+            elif mode == 'conditional':
+                headers = {'Accept-Encoding': ACCEPT_COMPRESSED, 'If-None-Match': etags[path]}
+            status, _, body = get(path, headers)
+            sent += len(body)
+            not_modified += status == 304
+    cpu = time.process_time() - start
+    requests = passes * len(paths)
+    return {
+        'mode': mode,
+        'requests': requests,
+        'bytes_per_request': round(sent / requests, 1),
+        'cpu_us_per_request': round(cpu / requests * 1e6, 2),
+        'not_modified_share': round(not_modified / requests, 4)
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark cached, compressed and conditional API reads")
+    parser.add_argument('--passes', type=int, default=20, help="Reads of every endpoint per mode")
+    parser.add_argument('--output', help="Write the JSON results to this path")
+    args = parser.parse_args(argv)
+    
+    paths = endpoint_paths()
+    etags = {path: get(path, {'Accept-Encoding': ACCEPT_COMPRESSED})[1]['ETag'] for path in paths}
+    print(f"{len(paths)} endpoints, {args.passes} passes per mode\n")
+    print(f"{'mode':12s} {'bytes/req':>10s} {'CPU us/req':>11s} {'304 share':>10s}")
+    results = []
+    for mode in ('uncached', 'plain', 'gzip', 'conditional'):
+        result = run_mode(mode, paths, etags, args.passes)
+        results.append(result)
+        print(f"{mode:12s} {result['bytes_per_request']:10.1f} {result['cpu_us_per_request']:11.2f} "
+              f"{result['not_modified_share']:10.1%}")
+    
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'endpoints': len(paths), 'passes': args.passes, 'results': results}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+Rule Versions Benchmark - Memory per rules version, layered versus full copies
+
+Builds histories of 1, 4, 16... quarterly versions over one synthetic
+dataset and measures, with tracemalloc, the memory held once every version
+has been evaluated for a profile. Layered versions (services/rule_versions.py)
+should cost memory in proportion to their changes; a full copy of the rules
+per version is shown for comparison.
+
+Usage:
+    python -m benchmarks.bench_rule_versions
+    python -m benchmarks.bench_rule_versions --versions 1,8,32 --scale 50 --changes 5
+"""
+
+import argparse
+import copy
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.synthetic import DEFAULT_SEED, write_rule_history, write_synthetic_datasets  # noqa: E402
+from services.visa_service import VisaService  # noqa: E402
+
+DEFAULT_VERSIONS = [1, 4, 16, 64]
+
+PROFILE = {
+    'citizenship': 'India',
+    'destination': 'Canada',
+    'purpose': 'Work/Employment',
+    'education': "Master's Degree",
+    'work_experience': 7,
+    'age': 31
+}
+
+
+def _held(build):
+    """Bytes still allocated after build() returns, and the result (kept alive until measured)"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return held, result
+
+
+def bench_versions(visa_path, versions, changes, seed, workdir):
+    """
+    Memory and time for one history length
+    
+    Returns:
+        dict: Bytes held by layered versions and by full copies, and the
+            seconds to evaluate the profile under every version
+    """
+    versions_path = write_rule_history(visa_path, os.path.join(workdir, f"v{versions}"), versions, changes, seed)
+    service = VisaService(data_path=visa_path, versions_path=versions_path)
+    service.get_visa_recommendations(PROFILE)
+    
+    def layered():
+        return service.evaluate_versions(PROFILE)
+    
+    layered_bytes, _ = _held(layered)
+    start = time.perf_counter()
+    service.evaluate_versions(PROFILE)
+    evaluate_s = time.perf_counter() - start
+    
+    def copies():
+        # What holding every version as its own full rules would cost
+        return [VisaService(store=copy.deepcopy(service.at_version(v['version']).store))
+                for v in service.rule_versions()[1:]]
+    
+    copied_bytes, _ = _held(copies)
+    return {
+        'versions': versions,
+        'layered_kib': round(layered_bytes / 1024, 1),
+        'full_copies_kib': round(copied_bytes / 1024, 1),
+        'evaluate_all_ms': round(evaluate_s * 1000, 3)
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark memory per visa rules version")
+    parser.add_argument('--versions', default=','.join(str(v) for v in DEFAULT_VERSIONS),
+                        help="Comma-separated history lengths")
+    parser.add_argument('--scale', type=int, default=20, help="Synthetic dataset scale")
+    parser.add_argument('--changes', type=int, default=3, help="Records each version changes")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="Seed for the dataset and history")
+    parser.add_argument('--output', help="Write the JSON results to this path")
+    args = parser.parse_args(argv)
+    
+    results = []
+    with tempfile.TemporaryDirectory(prefix='visaverse-versions-bench-') as workdir:
+        visa_path, _ = write_synthetic_datasets(args.scale, workdir, args.seed)
+        print(f"Scale {args.scale}, {args.changes} changed records per version\n")
+        print(f"{'versions':>8s} {'layered KiB':>12s} {'full copies KiB':>16s} {'evaluate all ms':>16s}")
+        for versions in [int(v) for v in args.versions.split(',') if v.strip()]:
+            result = bench_versions(visa_path, versions, args.changes, args.seed, workdir)
+            results.append(result)
+            print(f"{versions:8d} {result['layered_kib']:12.1f} {result['full_copies_kib']:16.1f} "
+                  f"{result['evaluate_all_ms']:16.3f}")
+    
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'scale': args.scale, 'changes': args.changes, 'results': results}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
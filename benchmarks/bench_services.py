@@ -0,0 +1,653 @@
+"""
+Service Benchmarks - Micro-benchmarks for every public service method and helper
+
+Every public method of VisaService, DocumentService and CultureService and
+every helper in utils/helpers.py has a benchmark. Each one runs against the
+shipped data and against synthetic datasets scaled 10x and 100x. Results are
+written as JSON and compared with a stored baseline by their median times.
+A benchmark slower than its regression threshold is measured again, and the
+run exits non-zero only if the slowdown reproduces, so one noisy sample on
+a shared machine does not fail it. Each benchmark runs the same number of
+loops per sample as its baseline entry; entries recorded with a different
+--repeat or loop count are not compared.
+
+Usage:
+    python -m benchmarks.bench_services
+    python -m benchmarks.bench_services --scales 1,10 --threshold "VisaService.*=0.5"
+    python -m benchmarks.bench_services --save-baseline
+"""
+
+import argparse
+import fnmatch
+import inspect
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.datasets import write_scaled_occupations  # noqa: E402
+from benchmarks.synthetic import write_locale_packs, write_rule_history, write_synthetic_datasets  # noqa: E402
+from services.visa_service import VisaService  # noqa: E402
+from services.document_service import DocumentService  # noqa: E402
+from services.culture_service import CultureService  # noqa: E402
+from services.occupations import MATCH_CACHE_SIZE  # noqa: E402
+from services.overlays import load_tenant_patch  # noqa: E402
+from utils import helpers  # noqa: E402
+
+BASELINE_PATH = os.path.join(ROOT_DIR, 'benchmarks', 'baseline.json')
+DEFAULT_OUTPUT = os.path.join(ROOT_DIR, 'results', 'benchmarks.json')
+DEFAULT_SCALES = [1, 10, 100]
+DEFAULT_THRESHOLD = 0.30
+DEFAULT_MIN_DELTA_US = 0.5
+DEFAULT_RERUNS = 1
+
+# Sample tenant patch shipped in data/tenants
+TENANT = 'example-corp'
+
+BENCHMARKS = {}
+
+RESUME_TEXT = (
+    "Jane Doe - jane.doe@example.com - +1 555 0100\n"
+    "Work history: Senior engineer at Example Corp (2015-2024), led platform work.\n"
+    "Education: MSc Computer Science, Example University, degree with honours.\n"
+    "Skills: Python, distributed systems, data engineering, mentoring.\n"
+)
+OFFER_TEXT = (
+    "Example Corp is pleased to offer you the position of Senior Engineer.\n"
+    "Your annual salary will be $150,000 with standard compensation benefits.\n"
+    "Your start date is 1 March. Please sign and return this letter.\n"
+)
+
+
+def benchmark(name):
+    """Register a benchmark; the function receives a context and returns a zero-argument callable"""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+class BenchContext:
+    def __init__(self, scale):
+        """
+        Services and representative inputs for one dataset scale
+        
+        Args:
+            scale (int): Dataset scale factor
+        """
+        self.scale = scale
+        visa_path, culture_path = write_synthetic_datasets(scale)
+        versions_path = write_rule_history(visa_path, tempfile.mkdtemp(prefix='visaverse-bench-versions-'))
+        self.visa = VisaService(data_path=visa_path, occupation_data_path=write_scaled_occupations(scale),
+                                versions_path=versions_path)
+        locales_dir = write_locale_packs(culture_path, tempfile.mkdtemp(prefix='visaverse-bench-locales-'))
+        self.culture = CultureService(data_path=culture_path, locales_dir=locales_dir)
+        self.documents = DocumentService()
+        self._scale_documents(scale)
+        
+        # Use the last entries so linear scans pay their worst case
+        self.destination = self.visa.get_all_countries()[-1]
+        self.culture_country = self.culture.get_available_countries()[-1]
+        self.visa_key = self.visa.store.visa_type_keys()[-1]
+        self.oldest_version = self.visa.rule_versions()[-1]['version']
+        self.visa_type = list(self.documents.document_requirements)[-1]
+        self.profile = {
+            'citizenship': 'India',
+            'destination': 'Canada',
+            'purpose': 'Work/Employment',
+            'education': "Master's Degree",
+            'work_experience': 7,
+            'age': 31,
+            'job_title': 'Software Engineer'
+        }
+        # A batch of varied profiles for scoring many at once
+        self.profiles = [
+            dict(self.profile, work_experience=i % 20, age=20 + i % 40) for i in range(100)
+        ]
+        requirements = self.documents.get_required_documents(self.visa_type)
+        all_docs = requirements['essential'] + requirements['specific']
+        self.checked = {doc: i % 2 == 0 for i, doc in enumerate(all_docs)}
+        self.tenant_patch = load_tenant_patch(TENANT)
+        self.resume = RESUME_TEXT * scale
+        self.offer = OFFER_TEXT * scale
+        self.items = [f"Requirement {i}" for i in range(10 * scale)]
+    
+    def _scale_documents(self, scale):
+        """Replicate the built-in document requirements to match the dataset scale"""
+        base = dict(self.documents.document_requirements)
+        for i in range(1, scale):
+            for visa_type, docs in base.items():
+                self.documents.document_requirements[f"{visa_type} {i}"] = {
+                    'essential': list(docs['essential']),
+                    'specific': [f"{doc} {j}" for doc in docs['specific'] for j in range(scale)]
+                }
+
+
+# VisaService
+
+@benchmark('VisaService.get_visa_recommendations')
+def _bench_visa_recommendations(ctx):
+    return lambda: ctx.visa.get_visa_recommendations(ctx.profile)
+
+
+@benchmark('VisaService.get_country_info')
+def _bench_visa_country_info(ctx):
+    return lambda: ctx.visa.get_country_info(ctx.destination)
+
+
+@benchmark('VisaService.get_all_countries')
+def _bench_visa_all_countries(ctx):
+    return ctx.visa.get_all_countries
+
+
+@benchmark('VisaService.get_visa_types_for_country')
+def _bench_visa_types_for_country(ctx):
+    return lambda: ctx.visa.get_visa_types_for_country(ctx.destination)
+
+
+@benchmark('VisaService.get_duration_ranges')
+def _bench_visa_duration_ranges(ctx):
+    return lambda: ctx.visa.get_duration_ranges(ctx.visa_key)
+
+
+@benchmark('VisaService.find_visa_options')
+def _bench_visa_find_options(ctx):
+    # 28 days keeps the quicker half of the work visa options at every scale
+    return lambda: ctx.visa.find_visa_options(ctx.profile, 28)
+
+
+@benchmark('VisaService.rank_destinations')
+def _bench_visa_rank_destinations(ctx):
+    return lambda: ctx.visa.rank_destinations(ctx.profile)
+
+
+@benchmark('VisaService.score_profiles')
+def _bench_visa_score_profiles(ctx):
+    return lambda: ctx.visa.score_profiles(ctx.profiles)
+
+
+@benchmark('VisaService.match_occupation')
+def _bench_visa_match_occupation(ctx):
+    # Misspelled titles go through the trigram index rather than the exact-title
+    # lookup, and cycling through more of them than the match cache holds keeps
+    # every call a cache miss
+    titles = itertools.cycle([f"Senior Sofware Enginer {i}" for i in range(MATCH_CACHE_SIZE + 1000)])
+    return lambda: ctx.visa.match_occupation(next(titles))
+
+
+@benchmark('VisaService.for_tenant')
+def _bench_visa_for_tenant(ctx):
+    # A fresh patch object each call, so every call resolves a new tenant view
+    patch = ctx.tenant_patch['visa_rules']
+    return lambda: ctx.visa.for_tenant(TENANT, dict(patch))
+
+
+@benchmark('VisaService.rule_versions')
+def _bench_visa_rule_versions(ctx):
+    return ctx.visa.rule_versions
+
+
+@benchmark('VisaService.at_version')
+def _bench_visa_at_version(ctx):
+    return lambda: ctx.visa.at_version(ctx.oldest_version)
+
+
+@benchmark('VisaService.evaluate_versions')
+def _bench_visa_evaluate_versions(ctx):
+    return lambda: ctx.visa.evaluate_versions(ctx.profile)
+
+
+@benchmark('VisaService.diff_versions')
+def _bench_visa_diff_versions(ctx):
+    return lambda: ctx.visa.diff_versions(ctx.oldest_version)
+
+
+@benchmark('VisaService.reload')
+def _bench_visa_reload(ctx):
+    return ctx.visa.reload
+
+
+# DocumentService
+
+@benchmark('DocumentService.for_tenant')
+def _bench_documents_for_tenant(ctx):
+    patch = ctx.tenant_patch['document_requirements']
+    return lambda: ctx.documents.for_tenant(TENANT, dict(patch))
+
+
+@benchmark('DocumentService.get_required_documents')
+def _bench_required_documents(ctx):
+    return lambda: ctx.documents.get_required_documents(ctx.visa_type)
+
+
+@benchmark('DocumentService.calculate_readiness_score')
+def _bench_readiness_score(ctx):
+    return lambda: ctx.documents.calculate_readiness_score(ctx.visa_type, ctx.checked)
+
+
+@benchmark('DocumentService.check_passport_validity')
+def _bench_passport_validity(ctx):
+    return lambda: ctx.documents.check_passport_validity(4)
+
+
+@benchmark('DocumentService.analyze_resume')
+def _bench_analyze_resume(ctx):
+    return lambda: ctx.documents.analyze_resume(ctx.resume)
+
+
+@benchmark('DocumentService.analyze_offer_letter')
+def _bench_analyze_offer(ctx):
+    return lambda: ctx.documents.analyze_offer_letter(ctx.offer)
+
+
+# CultureService
+
+@benchmark('CultureService.get_country_culture')
+def _bench_country_culture(ctx):
+    return lambda: ctx.culture.get_country_culture(ctx.culture_country)
+
+
+@benchmark('CultureService.get_country_culture:pt-BR')
+def _bench_country_culture_locale(ctx):
+    # pt-BR falls back to pt, then English, field by field
+    return lambda: ctx.culture.get_country_culture(ctx.culture_country, 'pt-BR')
+
+
+@benchmark('CultureService.get_workplace_culture')
+def _bench_workplace_culture(ctx):
+    return lambda: ctx.culture.get_workplace_culture(ctx.culture_country)
+
+
+@benchmark('CultureService.get_workplace_culture:pt-BR')
+def _bench_workplace_culture_locale(ctx):
+    return lambda: ctx.culture.get_workplace_culture(ctx.culture_country, 'pt-BR')
+
+
+@benchmark('CultureService.get_communication_style')
+def _bench_communication_style(ctx):
+    return lambda: ctx.culture.get_communication_style(ctx.culture_country)
+
+
+@benchmark('CultureService.get_business_etiquette')
+def _bench_business_etiquette(ctx):
+    return lambda: ctx.culture.get_business_etiquette(ctx.culture_country)
+
+
+@benchmark('CultureService.get_cultural_tips')
+def _bench_cultural_tips(ctx):
+    return lambda: ctx.culture.get_cultural_tips(ctx.culture_country)
+
+
+@benchmark('CultureService.get_time_zone_info')
+def _bench_time_zone_info(ctx):
+    return lambda: ctx.culture.get_time_zone_info(ctx.culture_country)
+
+
+@benchmark('CultureService.get_working_hours')
+def _bench_working_hours(ctx):
+    return lambda: ctx.culture.get_working_hours(ctx.culture_country)
+
+
+@benchmark('CultureService.get_holidays')
+def _bench_holidays(ctx):
+    return lambda: ctx.culture.get_holidays(ctx.culture_country)
+
+
+@benchmark('CultureService.get_email_etiquette')
+def _bench_email_etiquette(ctx):
+    return ctx.culture.get_email_etiquette
+
+
+@benchmark('CultureService.get_virtual_meeting_tips')
+def _bench_virtual_meeting_tips(ctx):
+    return ctx.culture.get_virtual_meeting_tips
+
+
+@benchmark('CultureService.get_cultural_adaptation_tips')
+def _bench_adaptation_tips(ctx):
+    return ctx.culture.get_cultural_adaptation_tips
+
+
+@benchmark('CultureService.get_available_countries')
+def _bench_available_countries(ctx):
+    return ctx.culture.get_available_countries
+
+
+@benchmark('CultureService.get_available_locales')
+def _bench_available_locales(ctx):
+    return ctx.culture.get_available_locales
+
+
+@benchmark('CultureService.compare_communication_styles')
+def _bench_compare_styles(ctx):
+    first = ctx.culture.get_available_countries()[0]
+    return lambda: ctx.culture.compare_communication_styles(first, ctx.culture_country)
+
+
+@benchmark('CultureService.reload')
+def _bench_culture_reload(ctx):
+    return ctx.culture.reload
+
+
+# utils/helpers.py
+
+@benchmark('helpers.format_requirements_list')
+def _bench_format_requirements(ctx):
+    return lambda: helpers.format_requirements_list(ctx.items)
+
+
+@benchmark('helpers.format_tips_list')
+def _bench_format_tips(ctx):
+    return lambda: helpers.format_tips_list(ctx.items)
+
+
+@benchmark('helpers.get_progress_color')
+def _bench_progress_color(ctx):
+    return lambda: helpers.get_progress_color(65)
+
+
+@benchmark('helpers.get_readiness_message')
+def _bench_readiness_message(ctx):
+    return lambda: helpers.get_readiness_message(65)
+
+
+@benchmark('helpers.get_success_rate_emoji')
+def _bench_success_rate_emoji(ctx):
+    return lambda: helpers.get_success_rate_emoji('Moderate')
+
+
+@benchmark('helpers.validate_text_input')
+def _bench_validate_text(ctx):
+    return lambda: helpers.validate_text_input(ctx.resume, min_length=100)
+
+
+@benchmark('helpers.truncate_text')
+def _bench_truncate_text(ctx):
+    return lambda: helpers.truncate_text(ctx.resume, max_length=200)
+
+
+@benchmark('helpers.safe_get')
+def _bench_safe_get(ctx):
+    keys = ['countries', ctx.culture_country, 'business_etiquette', 'dining']
+    return lambda: helpers.safe_get(ctx.culture.data, keys)
+
+
+@benchmark('helpers.format_percentage')
+def _bench_format_percentage(ctx):
+    return lambda: helpers.format_percentage(66.6667, 1)
+
+
+@benchmark('helpers.create_display_dict')
+def _bench_display_dict(ctx):
+    info = ctx.visa.get_country_info(ctx.destination)
+    labels = {'processing_authority': 'Authority', 'special_notes': 'Notes', 'missing': 'Missing'}
+    return lambda: helpers.create_display_dict(info, labels)
+
+
+def required_benchmarks():
+    """Names of every public service method and helper that must be benchmarked"""
+    names = []
+    for cls in (VisaService, DocumentService, CultureService):
+        for name, member in inspect.getmembers(cls, inspect.isfunction):
+            if not name.startswith('_'):
+                names.append(f"{cls.__name__}.{name}")
+    for name, member in inspect.getmembers(helpers, inspect.isfunction):
+        if member.__module__ == helpers.__name__ and not name.startswith('_'):
+            names.append(f"helpers.{name}")
+    return sorted(names)
+
+
+def measure(fn, repeat, min_time, loops=None):
+    """
+    Time a callable
+    
+    Args:
+        fn (callable): Zero-argument callable
+        repeat (int): Number of timed samples
+        min_time (float): Minimum seconds per sample, used to pick the loop count
+        loops (int): Calls per sample; picked from min_time when not given
+    
+    Returns:
+        dict: Per-call timings in microseconds
+    """
+    # Calibrating also warms up, so it runs even when the loop count is given
+    calibrated = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calibrated):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        calibrated = calibrated * 10 if elapsed < min_time / 10 else calibrated * 2
+    loops = loops or calibrated
+    
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        samples.append((time.perf_counter() - start) / loops * 1e6)
+    
+    return {
+        'median_us': round(statistics.median(samples), 4),
+        'min_us': round(min(samples), 4),
+        'stdev_us': round(statistics.stdev(samples), 4) if len(samples) > 1 else 0.0,
+        'loops': loops,
+        'repeat': repeat
+    }
+
+
+def _reference_workload():
+    """Fixed pure-Python workload used to normalize for machine speed"""
+    table = {i: str(i) for i in range(200)}
+    return sum(len(table[i % 200]) for i in range(2000))
+
+
+def run(scales, repeat, min_time, pattern='*', loops=None):
+    """
+    Run every registered benchmark at every scale
+    
+    Args:
+        loops (dict): Calls per sample by result key, e.g. the baseline's;
+            picked from min_time for keys not in it
+    
+    Returns:
+        tuple: (results keyed by 'name[xSCALE]', reference workload time in microseconds)
+    """
+    reference = [measure(_reference_workload, repeat, min_time)['min_us']]
+    results = {}
+    for scale in scales:
+        ctx = BenchContext(scale)
+        for name, setup in sorted(BENCHMARKS.items()):
+            if not fnmatch.fnmatch(name, pattern):
+                continue
+            key = f"{name}[x{scale}]"
+            results[key] = measure(setup(ctx), repeat, min_time, (loops or {}).get(key))
+            print(f"{key:60s} {results[key]['median_us']:12.3f} us")
+        reference.append(measure(_reference_workload, repeat, min_time)['min_us'])
+    return results, min(reference)
+
+
+def rerun(keys, repeat, min_time, loops=None):
+    """
+    Measure some results again, with fresh services
+    
+    Args:
+        keys (list): Result keys such as 'VisaService.get_country_info[x10]'
+        loops (dict): Calls per sample by result key
+    
+    Returns:
+        dict: New results for the keys
+    """
+    by_scale = {}
+    for key in keys:
+        name, _, scale = key.rpartition('[x')
+        by_scale.setdefault(int(scale.rstrip(']')), []).append(name)
+    results = {}
+    for scale, names in sorted(by_scale.items()):
+        ctx = BenchContext(scale)
+        for name in names:
+            key = f"{name}[x{scale}]"
+            results[key] = measure(BENCHMARKS[name](ctx), repeat, min_time, (loops or {}).get(key))
+    return results
+
+
+def parse_thresholds(specs, default):
+    """Parse 'PATTERN=FRACTION' overrides into an ordered list"""
+    thresholds = []
+    for spec in specs:
+        pattern, _, value = spec.partition('=')
+        if not value:
+            raise ValueError(f"Invalid threshold '{spec}', expected PATTERN=FRACTION")
+        thresholds.append((pattern, float(value)))
+    return thresholds, default
+
+
+def threshold_for(key, thresholds, default):
+    """The last matching override wins, otherwise the default applies"""
+    name = key.split('[')[0]
+    for pattern, value in reversed(thresholds):
+        if fnmatch.fnmatch(key, pattern) or fnmatch.fnmatch(name, pattern):
+            return value
+    return default
+
+
+def mismatched(results, baseline):
+    """Keys whose baseline entry was measured with a different repeat or loop count"""
+    return sorted(key for key, current in results.items()
+                  if key in baseline and (baseline[key].get('repeat'), baseline[key].get('loops'))
+                  != (current['repeat'], current['loops']))
+
+
+def compare(results, baseline, thresholds, default, min_delta_us, speed_ratio=1.0):
+    """
+    Compare median timings against a baseline
+    
+    Args:
+        results (dict): Current results
+        baseline (dict): Baseline results
+        thresholds (list): (pattern, fraction) overrides
+        default (float): Default allowed slowdown fraction
+        min_delta_us (float): Slowdowns below this are treated as noise
+        speed_ratio (float): Current reference time over baseline reference time;
+            baseline timings are scaled by it so a slower machine is not a regression
+    
+    Returns:
+        list: Regressions as dicts with key, baseline, current, ratio and threshold;
+            entries measured with a different repeat or loop count are skipped
+    """
+    skipped = set(mismatched(results, baseline))
+    regressions = []
+    for key, current in results.items():
+        reference = baseline.get(key)
+        if not reference or key in skipped:
+            continue
+        base_us, now_us = reference['median_us'] * speed_ratio, current['median_us']
+        limit = threshold_for(key, thresholds, default)
+        if now_us - base_us > min_delta_us and now_us > base_us * (1 + limit):
+            regressions.append({
+                'key': key,
+                'baseline_us': round(base_us, 4),
+                'current_us': now_us,
+                'ratio': round(now_us / base_us, 3) if base_us else None,
+                'threshold': limit
+            })
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the VisaVerse services")
+    parser.add_argument('--scales', default=','.join(str(s) for s in DEFAULT_SCALES),
+                        help="Comma-separated dataset scale factors")
+    parser.add_argument('--repeat', type=int, default=7, help="Timed samples per benchmark")
+    parser.add_argument('--min-time', type=float, default=0.02, help="Minimum seconds per sample")
+    parser.add_argument('--filter', default='*', help="Only run benchmarks matching this glob")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="Where to write the JSON results")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="Baseline JSON to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="Store this run as the new baseline")
+    parser.add_argument('--default-threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown as a fraction, e.g. 0.3 for 30%%")
+    parser.add_argument('--threshold', action='append', default=[],
+                        help="Per-benchmark override PATTERN=FRACTION, may be repeated")
+    parser.add_argument('--min-delta-us', type=float, default=DEFAULT_MIN_DELTA_US,
+                        help="Ignore slowdowns smaller than this many microseconds")
+    parser.add_argument('--reruns', type=int, default=DEFAULT_RERUNS,
+                        help="Times a regression is measured again before it fails the run")
+    args = parser.parse_args(argv)
+    
+    missing = sorted(set(required_benchmarks()) - set(BENCHMARKS))
+    if missing:
+        print("Missing benchmarks for: " + ", ".join(missing))
+        return 2
+    
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    # Same calls per sample as the baseline, so the timings are comparable
+    loops = {key: entry['loops'] for key, entry in baseline['results'].items()} if baseline else None
+    
+    scales = [int(s) for s in args.scales.split(',') if s.strip()]
+    results, reference_us = run(scales, args.repeat, args.min_time, args.filter, loops)
+    report = {
+        'reference_us': reference_us,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results
+    }
+    
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    
+    if baseline is None:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+    
+    speed_ratio = reference_us / baseline['reference_us'] if baseline.get('reference_us') else 1.0
+    print(f"\nMachine speed relative to baseline: x{speed_ratio:.2f} (reference workload)")
+    refused = mismatched(results, baseline['results'])
+    if refused:
+        print(f"\nNot compared, measured with a different --repeat or loop count than the baseline "
+              f"(run with --save-baseline to rebaseline):")
+        for key in refused:
+            print(f"  {key}")
+    thresholds, default = parse_thresholds(args.threshold, args.default_threshold)
+    regressions = compare(results, baseline['results'], thresholds, default, args.min_delta_us, speed_ratio)
+    for attempt in range(args.reruns):
+        if not regressions:
+            break
+        print(f"\n{len(regressions)} benchmark(s) over their threshold; measuring them again "
+              f"({attempt + 1}/{args.reruns})")
+        again = rerun([r['key'] for r in regressions], args.repeat, args.min_time, loops)
+        # A regression must show up in every rerun to count
+        regressions = compare(again, baseline['results'], thresholds, default, args.min_delta_us, speed_ratio)
+    
+    if regressions:
+        print(f"\nPERFORMANCE REGRESSION: {len(regressions)} benchmark(s) exceeded their threshold")
+        for r in regressions:
+            print(f"  {r['key']:60s} {r['baseline_us']:.3f} -> {r['current_us']:.3f} us "
+                  f"(x{r['ratio']}, allowed +{r['threshold']:.0%})")
+        return 1
+    
+    print("\nNo regressions against baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""
+Shard Benchmark - Cache hit rate, memory and throughput as shard workers are added
+
+Runs one skewed workload against ShardRouter with 1, 2, 4... workers on the
+same synthetic dataset. A few hot destinations get most requests (Zipf), as
+in production. Every worker keeps the same size of response cache, so the
+hit rate shows how much more of the hot set fits once it is spread over
+more workers; per-worker RSS shows how much data each worker holds.
+
+Usage:
+    python -m benchmarks.bench_shards
+    python -m benchmarks.bench_shards --workers 1,2,4,8 --scale 50 --cache-size 256
+    python -m benchmarks.bench_shards --output results/shards.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.synthetic import DEFAULT_SEED, write_synthetic_datasets  # noqa: E402
+from services.sharding import ShardRouter, ShardedVisaService, ShardedCultureService  # noqa: E402
+from utils.constants import TRAVEL_PURPOSES, EDUCATION_LEVELS  # noqa: E402
+
+DEFAULT_WORKERS = [1, 2, 4]
+
+# Zipf exponent of destination popularity
+DESTINATION_SKEW = 1.1
+
+
+def build_workload(countries, requests, seed):
+    """
+    A reproducible list of (kind, country, profile) requests
+    
+    Args:
+        countries (list): Destinations, most popular first
+        requests (int): Number of requests
+        seed (int): Random seed
+    
+    Returns:
+        list: Requests for run_workload
+    """
+    rng = random.Random(seed)
+    weights = [1 / (rank ** DESTINATION_SKEW) for rank in range(1, len(countries) + 1)]
+    destinations = rng.choices(countries, weights, k=requests)
+    purposes = [p for p in TRAVEL_PURPOSES if p != "Select..."]
+    education = [e for e in EDUCATION_LEVELS if e != "Select..."]
+    kinds = ['recommendations', 'recommendations', 'country_info', 'culture', 'workplace', 'visa_types']
+    workload = []
+    for destination in destinations:
+        profile = {
+            'citizenship': rng.choice(countries),
+            'destination': destination,
+            'purpose': rng.choice(purposes),
+            'education': rng.choice(education),
+            'work_experience': rng.choice([1, 4, 8, 12])
+        }
+        workload.append((rng.choice(kinds), destination, profile))
+    return workload
+
+
+def run_workload(visa, culture, workload):
+    """Issue every request; returns the elapsed seconds"""
+    calls = {
+        'recommendations': lambda country, profile: visa.get_visa_recommendations(profile),
+        'country_info': lambda country, profile: visa.get_country_info(country),
+        'visa_types': lambda country, profile: visa.get_visa_types_for_country(country),
+        'culture': lambda country, profile: culture.get_country_culture(country),
+        'workplace': lambda country, profile: culture.get_workplace_culture(country)
+    }
+    start = time.perf_counter()
+    for kind, country, profile in workload:
+        calls[kind](country, profile)
+    return time.perf_counter() - start
+
+
+def bench_workers(workers, visa_path, culture_path, workload, cache_size):
+    """
+    Start a router with a number of workers, run the workload and collect stats
+    
+    Returns:
+        dict: Startup time, throughput, cache hit rate and per-worker memory
+    """
+    start = time.perf_counter()
+    router = ShardRouter(workers, visa_path, culture_path, cache_size=cache_size)
+    try:
+        startup = time.perf_counter() - start
+        elapsed = run_workload(ShardedVisaService(router), ShardedCultureService(router), workload)
+        stats = router.stats()
+    finally:
+        router.close()
+    hits = sum(s['hits'] for s in stats)
+    lookups = hits + sum(s['misses'] for s in stats)
+    rss = [s['rss_mb'] for s in stats if s['rss_mb'] is not None]
+    return {
+        'workers': workers,
+        'startup_s': round(startup, 3),
+        'requests': len(workload),
+        'throughput_per_s': round(len(workload) / elapsed, 1),
+        'cache_hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+        'cache_entries': [s['entries'] for s in stats],
+        'requests_per_worker': [s['hits'] + s['misses'] for s in stats],
+        'worker_rss_mb': {
+            'mean': round(sum(rss) / len(rss), 1) if rss else None,
+            'max': round(max(rss), 1) if rss else None
+        }
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark destination-sharded service workers")
+    parser.add_argument('--workers', default=','.join(str(w) for w in DEFAULT_WORKERS),
+                        help="Comma-separated worker counts")
+    parser.add_argument('--scale', type=int, default=20, help="Synthetic dataset scale")
+    parser.add_argument('--requests', type=int, default=20000, help="Requests per run")
+    parser.add_argument('--cache-size', type=int, default=256, help="Cached responses per worker")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="Seed for the dataset and workload")
+    parser.add_argument('--output', help="Write the JSON results to this path")
+    args = parser.parse_args(argv)
+    
+    results = []
+    with tempfile.TemporaryDirectory(prefix='visaverse-shards-bench-') as workdir:
+        visa_path, culture_path = write_synthetic_datasets(args.scale, workdir, args.seed)
+        with open(culture_path, 'r', encoding='utf-8') as f:
+            countries = list(json.load(f)['countries'])
+        workload = build_workload(countries, args.requests, args.seed)
+        print(f"{len(countries)} destinations, {args.requests} requests, "
+              f"{args.cache_size} cached responses per worker\n")
+        print(f"{'workers':>7s} {'startup s':>10s} {'req/s':>10s} {'hit rate':>9s} "
+              f"{'RSS/worker MB':>14s} {'max RSS MB':>11s}")
+        for workers in [int(w) for w in args.workers.split(',') if w.strip()]:
+            result = bench_workers(workers, visa_path, culture_path, workload, args.cache_size)
+            results.append(result)
+            print(f"{workers:7d} {result['startup_s']:10.3f} {result['throughput_per_s']:10.1f} "
+                  f"{result['cache_hit_rate']:9.1%} {result['worker_rss_mb']['mean']:14.1f} "
+                  f"{result['worker_rss_mb']['max']:11.1f}")
+    
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'scale': args.scale, 'cache_size': args.cache_size, 'results': results}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
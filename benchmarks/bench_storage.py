@@ -0,0 +1,151 @@
+"""
+Storage Benchmark - JSON, SQLite and compiled backends for the visa and culture services
+
+For each dataset scale, builds every backend from the same scaled data and
+reports load time, per-lookup latency and the memory each backend keeps
+after loading.
+
+Usage:
+    python -m benchmarks.bench_storage
+    python -m benchmarks.bench_storage --scales 1,10,100 --output results/storage.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.bench_services import measure  # noqa: E402
+from benchmarks.synthetic import write_synthetic_datasets  # noqa: E402
+from services.compiled_store import CompiledVisaStore, CompiledCultureStore, build_artifact  # noqa: E402
+from services.culture_service import CultureService  # noqa: E402
+from services.sqlite_store import SqliteVisaStore, SqliteCultureStore, build_database  # noqa: E402
+from services.stores import JsonVisaStore, JsonCultureStore  # noqa: E402
+from services.visa_service import VisaService  # noqa: E402
+
+DEFAULT_OUTPUT = os.path.join(ROOT_DIR, 'results', 'storage.json')
+
+PROFILE = {
+    'citizenship': 'India',
+    'destination': 'Canada',
+    'purpose': 'Work/Employment',
+    'education': "Master's Degree",
+    'work_experience': 7
+}
+
+
+def lookups(visa, culture):
+    """Representative lookups, run against the last records so scans pay their worst case"""
+    destination = visa.get_all_countries()[-1]
+    country = culture.get_available_countries()[-1]
+    return {
+        'get_visa_recommendations': lambda: visa.get_visa_recommendations(PROFILE),
+        'get_country_info': lambda: visa.get_country_info(destination),
+        'get_visa_types_for_country': lambda: visa.get_visa_types_for_country(destination),
+        'get_country_culture': lambda: culture.get_country_culture(country),
+        'get_workplace_culture': lambda: culture.get_workplace_culture(country),
+        'get_time_zone_info': lambda: culture.get_time_zone_info(country),
+        'get_available_countries': lambda: culture.get_available_countries()
+    }
+
+
+def load_stores(open_stores):
+    """
+    Open a pair of stores, timing the load and measuring the memory it keeps
+    
+    Returns:
+        tuple: (stores, load seconds, retained bytes, peak bytes while loading)
+    """
+    gc.collect()
+    start = time.perf_counter()
+    stores = open_stores()
+    load_s = time.perf_counter() - start
+    
+    # Load again under tracemalloc, which would distort the timing above
+    del stores
+    gc.collect()
+    tracemalloc.start()
+    stores = open_stores()
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return stores, load_s, current, peak
+
+
+def run_scale(scale, repeat, min_time, workdir):
+    """Benchmark both backends on one dataset scale"""
+    visa_path, culture_path = write_synthetic_datasets(scale)
+    db_path = os.path.join(workdir, f'visaverse-x{scale}.db')
+    compiled_path = os.path.join(workdir, f'visaverse-x{scale}.compiled')
+    start = time.perf_counter()
+    build_database(db_path, visa_path, culture_path)
+    import_s = time.perf_counter() - start
+    build_artifact(compiled_path, visa_path, culture_path)
+    
+    backends = {
+        'json': lambda: (JsonVisaStore(visa_path), JsonCultureStore(culture_path)),
+        'sqlite': lambda: (SqliteVisaStore(db_path), SqliteCultureStore(db_path)),
+        'compiled': lambda: (CompiledVisaStore(compiled_path), CompiledCultureStore(compiled_path))
+    }
+    result = {'scale': scale, 'import_s': round(import_s, 4), 'database_bytes': os.path.getsize(db_path)}
+    for backend, open_stores in backends.items():
+        (visa_store, culture_store), load_s, retained, peak = load_stores(open_stores)
+        visa = VisaService(store=visa_store)
+        culture = CultureService(store=culture_store)
+        result[backend] = {
+            'load_ms': round(load_s * 1000, 3),
+            'retained_bytes': retained,
+            'peak_load_bytes': peak,
+            'lookups': {name: measure(fn, repeat, min_time) for name, fn in lookups(visa, culture).items()}
+        }
+    return result
+
+
+def print_scale(result):
+    backends = [name for name in ('json', 'sqlite', 'compiled') if name in result]
+    print(f"\n== Scale x{result['scale']} (database {result['database_bytes'] / 1024:.0f} KiB, "
+          f"import {result['import_s'] * 1000:.0f} ms) ==")
+    print(f"  {'':32s}" + "".join(f"{name:>16s}" for name in backends))
+    print(f"  {'load (ms)':32s}" + "".join(f"{result[name]['load_ms']:16.2f}" for name in backends))
+    print(f"  {'memory retained (KiB)':32s}"
+          + "".join(f"{result[name]['retained_bytes'] / 1024:16.1f}" for name in backends))
+    for lookup in result['json']['lookups']:
+        print(f"  {lookup + ' (us)':32s}"
+              + "".join(f"{result[name]['lookups'][lookup]['median_us']:16.2f}" for name in backends))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the storage backends")
+    parser.add_argument('--scales', default='1,10,100', help="Comma-separated dataset scale factors")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed samples per lookup")
+    parser.add_argument('--min-time', type=float, default=0.02, help="Minimum seconds per sample")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="Where to write the JSON results")
+    args = parser.parse_args(argv)
+    
+    workdir = tempfile.mkdtemp(prefix='visaverse-storage-')
+    try:
+        results = []
+        for scale in (int(s) for s in args.scales.split(',') if s.strip()):
+            result = run_scale(scale, args.repeat, args.min_time, workdir)
+            print_scale(result)
+            results.append(result)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'results': results}, f, indent=2)
+    print(f"\nResults written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""
+Scaled copies of the shipped occupation list for benchmarking
+
+The visa and culture data for larger scales are generated by
+benchmarks/synthetic.py; the occupation list is replicated by a scale factor.
+"""
+
+import copy
+import json
+import os
+import tempfile
+
+from services.occupations import OCCUPATION_DATA_PATH
+
+
+def _load(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _replicate(name, i):
+    """Name of the i-th replica of a record; replica 0 keeps the original name"""
+    return name if i == 0 else f"{name} {i}"
+
+
+def scale_occupations(data, factor):
+    """
+    Replicate every occupation and its titles
+    
+    Args:
+        data (dict): Parsed occupations.json
+        factor (int): Scale factor
+    
+    Returns:
+        dict: Scaled occupation list
+    """
+    occupations = []
+    for occupation in data['occupations']:
+        for i in range(factor):
+            replica = copy.deepcopy(occupation)
+            replica['title'] = _replicate(occupation['title'], i)
+            replica['alternative_titles'] = [_replicate(t, i) for t in occupation.get('alternative_titles', [])]
+            occupations.append(replica)
+    return {'occupations': occupations}
+
+
+def write_scaled_occupations(factor, directory=None):
+    """
+    Write a scaled occupation list
+    
+    Args:
+        factor (int): Scale factor (1 returns the shipped file)
+        directory (str): Output directory, a fresh temp dir by default
+    
+    Returns:
+        str: Occupation list path
+    """
+    if factor == 1:
+        return OCCUPATION_DATA_PATH
+    directory = directory or tempfile.mkdtemp(prefix=f'visaverse-x{factor}-')
+    path = os.path.join(directory, 'occupations.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(scale_occupations(_load(OCCUPATION_DATA_PATH), factor), f)
+    return path
@@ -0,0 +1,440 @@
+"""
+Load Test - Simulates concurrent user sessions against app.py
+
+Each virtual user drives a realistic flow through Streamlit's headless
+AppTest interface: submitting the visa form, toggling document checkboxes
+and switching culture guide countries. Concurrency is ramped in stages and
+every stage reports throughput, latency percentiles per page and per
+interaction, and memory. The capacity is the highest concurrency whose p95
+latency stays within the latency objective.
+
+AppTest drives Streamlit's process-wide runtime, which only one session
+can use at a time, so every virtual user runs in its own process. Before a
+stage starts, each process loads the app once, so the stage times sessions
+on a warm worker rather than imports and data loads. The sessions compete
+for the same CPUs as the sessions of one worker would, but each holds its
+own copy of the cached services, so memory is reported per session process.
+If any session fails to set up or breaks off during a stage, the run stops
+with an error and reports no capacity.
+
+With --scale N the app runs on a synthetic dataset N times the size of the
+shipped data (see benchmarks/synthetic.py), served from a compiled artifact.
+Saved cases go to a temporary database, never to data/cases.db.
+
+Usage:
+    python -m benchmarks.load_test --stages 1,2,4,8,16 --duration 20
+    python -m benchmarks.load_test --scale 30 --stages 1,4,16
+    python -m benchmarks.load_test --output results/load.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT_DIR, 'app.py')
+
+sys.path.insert(0, ROOT_DIR)
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+from benchmarks.synthetic import DEFAULT_SEED, write_synthetic_datasets  # noqa: E402
+from services.compiled_store import build_artifact  # noqa: E402
+from utils.constants import (  # noqa: E402
+    PAGE_HOME, PAGE_VISA, PAGE_DOCUMENTS, PAGE_CULTURE,
+    COUNTRIES, TRAVEL_PURPOSES, EDUCATION_LEVELS, VISA_TYPES,
+    STORAGE_ENV_VAR, COMPILED_PATH_ENV_VAR, CASES_PATH_ENV_VAR
+)
+
+DEFAULT_STAGES = [1, 2, 4, 8, 16]
+DEFAULT_SLO_MS = 250
+
+# Seconds a session process may take to start and import the app, on top of
+# the per-rerun timeout of its warm-up run
+STARTUP_S = 60
+
+
+class SetupError(RuntimeError):
+    """A virtual user's session could not be set up, so the stage cannot be measured"""
+
+
+def percentile(values, pct):
+    """
+    Nearest-rank percentile of a list of numbers
+    
+    Args:
+        values (list): Sample values
+        pct (float): Percentile between 0 and 100
+    
+    Returns:
+        float: The percentile value, or 0.0 for an empty list
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(round(pct / 100 * len(ordered))) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError):
+        # ru_maxrss is the peak, in KB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class VirtualUser:
+    def __init__(self, seed, timeout):
+        """
+        A single simulated browser session
+        
+        Args:
+            seed (int): Seed for this user's choices
+            timeout (float): Per-rerun timeout in seconds
+        """
+        self.rng = random.Random(seed)
+        self.app = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    
+    def _timed(self, samples, page, interaction, action):
+        """Run one interaction and record its latency"""
+        start = time.perf_counter()
+        action()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if self.app.exception:
+            raise RuntimeError(f"{page}/{interaction} raised: {self.app.exception[0].message}")
+        samples[(page, interaction)].append(elapsed_ms)
+    
+    def _navigate(self, samples, page):
+        """Switch pages the way the sidebar radio does"""
+        def action():
+            self.app.session_state['page'] = page
+            self.app.run()
+        self._timed(samples, page, 'navigate', action)
+    
+    def _choose(self, options):
+        """Pick any option except the 'Select...' placeholder"""
+        return self.rng.choice([o for o in options if o != "Select..."])
+    
+    def visa_flow(self, samples):
+        """Fill in and submit the visa recommendation form"""
+        self._navigate(samples, PAGE_VISA)
+        boxes = self.app.selectbox
+        boxes[0].set_value(self._choose(COUNTRIES))
+        boxes[1].set_value(self._choose(COUNTRIES))
+        boxes[2].set_value(self._choose(COUNTRIES))
+        boxes[3].set_value(self._choose(TRAVEL_PURPOSES))
+        boxes[4].set_value(self._choose(EDUCATION_LEVELS))
+        self.app.slider[0].set_value(self.rng.randint(0, 30))
+        self._timed(samples, PAGE_VISA, 'submit_form', lambda: self.app.button[0].click().run())
+    
+    def documents_flow(self, samples):
+        """Pick a visa type, tick a few documents and check readiness"""
+        self._navigate(samples, PAGE_DOCUMENTS)
+        visa_type = self._choose(VISA_TYPES)
+        self._timed(samples, PAGE_DOCUMENTS, 'select_visa_type',
+                    lambda: self.app.selectbox[0].set_value(visa_type).run())
+        checkboxes = list(self.app.checkbox)
+        for checkbox in self.rng.sample(checkboxes, k=min(3, len(checkboxes))):
+            key = checkbox.key
+            self._timed(samples, PAGE_DOCUMENTS, 'toggle_checkbox',
+                        lambda: self.app.checkbox(key=key).check().run())
+        if self.app.button:
+            self._timed(samples, PAGE_DOCUMENTS, 'check_readiness',
+                        lambda: self.app.button[0].click().run())
+    
+    def culture_flow(self, samples):
+        """Browse the culture guide for a couple of countries"""
+        self._navigate(samples, PAGE_CULTURE)
+        options = self.app.selectbox[0].options
+        for _ in range(2):
+            country = self._choose(options)
+            self._timed(samples, PAGE_CULTURE, 'switch_country',
+                        lambda: self.app.selectbox[0].set_value(country).run())
+    
+    def home_flow(self, samples):
+        """Land on the home page"""
+        self._navigate(samples, PAGE_HOME)
+    
+    def run(self, stop_event, samples, errors):
+        """Loop through randomly chosen flows until the stage ends"""
+        flows = [self.visa_flow, self.documents_flow, self.culture_flow, self.home_flow]
+        weights = [4, 3, 3, 1]
+        try:
+            self._timed(samples, PAGE_HOME, 'first_load', self.app.run)
+            while not stop_event.is_set():
+                self.rng.choices(flows, weights)[0](samples)
+        except Exception as e:
+            errors.append(str(e))
+
+
+def use_dataset(scale, seed, workdir):
+    """
+    Point the app at the data for a scale before its services are built
+    
+    Args:
+        scale (int): Synthetic dataset scale; 1 keeps the shipped data
+        seed (int): Seed for the synthetic dataset
+        workdir (str): Directory for the generated files and the case database
+    """
+    os.environ[CASES_PATH_ENV_VAR] = os.path.join(workdir, 'cases.db')
+    if scale == 1:
+        return
+    visa_path, culture_path = write_synthetic_datasets(scale, workdir, seed)
+    compiled_path = os.path.join(workdir, 'visaverse.compiled')
+    build_artifact(compiled_path, visa_path, culture_path)
+    os.environ[STORAGE_ENV_VAR] = 'compiled'
+    os.environ[COMPILED_PATH_ENV_VAR] = compiled_path
+
+
+def warm_up(timeout):
+    """
+    Open every page the flows visit once, in a throwaway session
+    
+    Imports, data loads and the cached services belong to the worker rather
+    than to any one session, so they are paid for before a stage starts.
+    
+    Args:
+        timeout (float): Per-rerun timeout in seconds
+    
+    Raises:
+        RuntimeError: If a page raises or shows an error, e.g. because its data cannot be loaded
+    """
+    app = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    app.run()
+    for page in (PAGE_HOME, PAGE_VISA, PAGE_DOCUMENTS, PAGE_CULTURE):
+        app.session_state['page'] = page
+        app.run()
+        if app.exception:
+            raise RuntimeError(f"{page} raised: {app.exception[0].message}")
+        if app.error:
+            raise RuntimeError(f"{page} shows an error: {app.error[0].value}")
+
+
+def _session(index, seed, timeout, start_event, stop_event, results):
+    """
+    Process body of one virtual user
+    
+    Reports ('ready', None) or ('failed', message) once set up, then waits
+    for the stage to start and reports ('done', (samples, errors, RSS in MB))
+    after it stops.
+    """
+    try:
+        warm_up(timeout)
+        user = VirtualUser(seed, timeout)
+    except Exception as e:
+        results.put((index, 'failed', f"{type(e).__name__}: {e}"))
+        return
+    results.put((index, 'ready', None))
+    start_event.wait()
+    samples = defaultdict(list)
+    errors = []
+    user.run(stop_event, samples, errors)
+    results.put((index, 'done', (dict(samples), errors, current_rss_mb())))
+
+
+def _collect(results, processes, expected, deadline):
+    """
+    Wait for one message from each of several session processes
+    
+    Args:
+        results (multiprocessing.Queue): Queue the sessions report on
+        processes (list): Session processes, by index
+        expected (iterable): Indexes to wait for
+        deadline (float): time.monotonic() value to give up at
+    
+    Returns:
+        dict: (status, payload) by index; a process that exits or runs out
+            of time without reporting is ('failed', reason)
+    """
+    received = {}
+    expected = set(expected)
+    while expected:
+        try:
+            index, status, payload = results.get(timeout=0.5)
+        except queue.Empty:
+            for index in sorted(expected):
+                if processes[index].exitcode is not None:
+                    received[index] = ('failed', f"process exited with code {processes[index].exitcode}")
+                elif time.monotonic() > deadline:
+                    received[index] = ('failed', "no answer in time")
+            expected -= set(received)
+            continue
+        received[index] = (status, payload)
+        expected.discard(index)
+    return received
+
+
+def run_stage(concurrency, duration, timeout, seed):
+    """
+    Run one concurrency stage
+    
+    Args:
+        concurrency (int): Number of simultaneous virtual users
+        duration (float): Stage length in seconds
+        timeout (float): Per-rerun timeout in seconds
+        seed (int): Base seed for the virtual users
+    
+    Returns:
+        dict: Stage results
+    
+    Raises:
+        SetupError: If a session could not be set up
+    """
+    context = multiprocessing.get_context('spawn')
+    start_event = context.Event()
+    stop_event = context.Event()
+    results = context.Queue()
+    processes = [
+        context.Process(target=_session, args=(i, seed + i, timeout, start_event, stop_event, results), daemon=True)
+        for i in range(concurrency)
+    ]
+    try:
+        for process in processes:
+            process.start()
+        setup = _collect(results, processes, range(concurrency), time.monotonic() + timeout + STARTUP_S)
+        failed = [f"session {i}: {payload}" for i, (status, payload) in sorted(setup.items()) if status != 'ready']
+        if failed:
+            raise SetupError(f"{len(failed)} of {concurrency} sessions failed to set up: " + "; ".join(failed))
+        
+        started = time.perf_counter()
+        start_event.set()
+        time.sleep(duration)
+        stop_event.set()
+        # Each session finishes the interaction it is in, which takes at most one rerun timeout
+        done = _collect(results, processes, range(concurrency), time.monotonic() + timeout + 5)
+        elapsed = time.perf_counter() - started
+    finally:
+        stop_event.set()
+        start_event.set()
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+    
+    samples = defaultdict(list)
+    errors = []
+    rss = []
+    for i, (status, payload) in sorted(done.items()):
+        if status != 'done':
+            errors.append(f"session {i}: {payload}")
+            continue
+        user_samples, user_errors, user_rss = payload
+        for key, values in user_samples.items():
+            samples[key].extend(values)
+        errors.extend(f"session {i}: {error}" for error in user_errors)
+        rss.append(user_rss)
+    
+    by_page = defaultdict(list)
+    for (page, _), values in samples.items():
+        by_page[page].extend(values)
+    all_values = [v for values in samples.values() for v in values]
+    
+    return {
+        'concurrency': concurrency,
+        'duration_s': round(elapsed, 2),
+        'interactions': len(all_values),
+        'throughput_per_s': round(len(all_values) / elapsed, 2),
+        'latency_ms': _summarize(all_values),
+        'pages': {page: _summarize(values) for page, values in sorted(by_page.items())},
+        'interactions_by_type': {
+            f"{page}/{interaction}": _summarize(values)
+            for (page, interaction), values in sorted(samples.items())
+        },
+        'session_rss_mb': {
+            'mean': round(statistics.fmean(rss), 1) if rss else 0.0,
+            'max': round(max(rss), 1) if rss else 0.0
+        },
+        'errors': errors
+    }
+
+
+def _summarize(values):
+    """Latency summary for a list of millisecond samples"""
+    return {
+        'count': len(values),
+        'p50': round(percentile(values, 50), 2),
+        'p95': round(percentile(values, 95), 2),
+        'p99': round(percentile(values, 99), 2),
+        'mean': round(statistics.fmean(values), 2) if values else 0.0
+    }
+
+
+def capacity(stages, slo_ms):
+    """Highest stage concurrency whose p95 latency meets the objective without errors"""
+    passing = [s['concurrency'] for s in stages if s['latency_ms']['p95'] <= slo_ms and not s['errors']]
+    return max(passing) if passing else 0
+
+
+def print_stage(stage):
+    """Print a one-stage summary table"""
+    latency = stage['latency_ms']
+    print(f"\n== {stage['concurrency']} sessions: {stage['throughput_per_s']} interactions/s, "
+          f"p50 {latency['p50']} ms, p95 {latency['p95']} ms, p99 {latency['p99']} ms, "
+          f"RSS per session up to {stage['session_rss_mb']['max']} MB")
+    for name, summary in stage['interactions_by_type'].items():
+        print(f"   {name:40s} n={summary['count']:<5d} p50 {summary['p50']:8.2f}  p95 {summary['p95']:8.2f}")
+    for error in stage['errors']:
+        print(f"   ERROR: {error}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for the VisaVerse app")
+    parser.add_argument('--stages', default=','.join(str(s) for s in DEFAULT_STAGES),
+                        help="Comma-separated concurrency levels to ramp through")
+    parser.add_argument('--duration', type=float, default=15.0, help="Seconds per stage")
+    parser.add_argument('--slo-ms', type=float, default=DEFAULT_SLO_MS,
+                        help="p95 latency objective used to compute capacity")
+    parser.add_argument('--timeout', type=float, default=30.0, help="Per-rerun timeout in seconds")
+    parser.add_argument('--seed', type=int, default=1234, help="Seed for virtual user choices")
+    parser.add_argument('--scale', type=int, default=1, help="Synthetic dataset scale (1: the shipped data)")
+    parser.add_argument('--dataset-seed', type=int, default=DEFAULT_SEED, help="Seed for the synthetic dataset")
+    parser.add_argument('--output', help="Write the JSON report to this path")
+    args = parser.parse_args(argv)
+    
+    stages = []
+    with tempfile.TemporaryDirectory(prefix='visaverse-load-') as workdir:
+        use_dataset(args.scale, args.dataset_seed, workdir)
+        for concurrency in [int(s) for s in args.stages.split(',') if s.strip()]:
+            try:
+                stage = run_stage(concurrency, args.duration, args.timeout, args.seed)
+            except SetupError as e:
+                print(f"Load test stopped at {concurrency} sessions: {e}", file=sys.stderr)
+                return 1
+            print_stage(stage)
+            if stage['errors']:
+                # Latency of sessions that broke off says nothing about capacity
+                print(f"Load test stopped at {concurrency} sessions: "
+                      f"{len(stage['errors'])} sessions failed", file=sys.stderr)
+                return 1
+            stages.append(stage)
+    
+    report = {
+        'dataset_scale': args.scale,
+        'slo_p95_ms': args.slo_ms,
+        'capacity_sessions': capacity(stages, args.slo_ms),
+        'stages': stages
+    }
+    print(f"\nCapacity: {report['capacity_sessions']} concurrent sessions "
+          f"at p95 <= {args.slo_ms} ms")
+    
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
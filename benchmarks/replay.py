@@ -0,0 +1,231 @@
+"""
+Replay - Re-issues captured traffic against the services of this checkout
+
+Reads a traffic log written with VISAVERSE_TRAFFIC_DIR (see
+services/traffic.py) and makes the same service calls again, either as
+fast as possible or paced like the original traffic. The report compares
+latency per method and overall throughput with the capture, and with an
+earlier replay report when one is given, so the same log run against two
+checkouts gives a reproducible before-and-after comparison.
+
+Usage:
+    VISAVERSE_TRAFFIC_DIR=traffic streamlit run app.py      # capture
+    python -m benchmarks.replay traffic                     # as fast as possible
+    python -m benchmarks.replay traffic --speed 1           # original pacing
+    python -m benchmarks.replay traffic --output results/before.json
+    python -m benchmarks.replay traffic --compare results/before.json
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.load_test import percentile  # noqa: E402
+from services.culture_service import CultureService  # noqa: E402
+from services.document_service import DocumentService  # noqa: E402
+from services.traffic import read_log  # noqa: E402
+from services.visa_service import VisaService  # noqa: E402
+
+
+def build_services(visa_path=None, culture_path=None):
+    """
+    Load the services calls are replayed against, by class name
+    
+    Args:
+        visa_path (str): Optional alternative visa_rules.json
+        culture_path (str): Optional alternative culture_data.json
+    
+    Returns:
+        dict: Class name -> service
+    """
+    return {
+        'VisaService': VisaService(data_path=visa_path),
+        'DocumentService': DocumentService(),
+        'CultureService': CultureService(data_path=culture_path)
+    }
+
+
+def replay(calls, services, speed=0.0):
+    """
+    Re-issue calls one after another
+    
+    Args:
+        calls (iterable): Calls in start order, as from read_log
+        services (dict): Class name -> service, as from build_services
+        speed (float): 0 issues calls back to back; otherwise the original
+            gaps between calls are divided by speed (1 is real time)
+    
+    Returns:
+        dict: 'results' with (method, recorded s, replayed s, recorded error,
+        replayed error) per call, 'elapsed_s', 'capture_span_s' and
+        'max_lag_s', how far paced calls fell behind schedule
+    """
+    results = []
+    first_start = last_start = None
+    max_lag = 0.0
+    started = time.perf_counter()
+    for call in calls:
+        class_name, _, method_name = call['method'].partition('.')
+        service = services.get(class_name)
+        if service is None:
+            continue
+        if first_start is None:
+            first_start = call['start']
+        last_start = call['start']
+        if speed:
+            due = started + (call['start'] - first_start) / speed
+            wait = due - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+            else:
+                max_lag = max(max_lag, -wait)
+        method = getattr(service, method_name)
+        error = False
+        call_start = time.perf_counter()
+        try:
+            method(*call['args'], **call['kwargs'])
+        except Exception:
+            error = True
+        results.append((call['method'], call['latency'], time.perf_counter() - call_start, call['error'], error))
+    return {
+        'results': results,
+        'elapsed_s': time.perf_counter() - started,
+        'capture_span_s': (last_start - first_start) if results else 0.0,
+        'max_lag_s': max_lag
+    }
+
+
+def _latency(values):
+    """Latency summary in milliseconds for a list of second samples"""
+    values = [v * 1000 for v in values]
+    return {
+        'p50': round(percentile(values, 50), 4),
+        'p95': round(percentile(values, 95), 4),
+        'p99': round(percentile(values, 99), 4)
+    }
+
+
+def _change(before, after):
+    """Relative change in percent, or None without a reference"""
+    return round((after - before) / before * 100, 1) if before else None
+
+
+def summarize(run, speed):
+    """
+    Build the report for one replay
+    
+    Args:
+        run (dict): Result of replay()
+        speed (float): Speed the replay ran at
+    
+    Returns:
+        dict: Totals and a per-method comparison with the capture
+    """
+    results = run['results']
+    by_method = defaultdict(list)
+    for result in results:
+        by_method[result[0]].append(result)
+    
+    methods = {}
+    for method, rows in sorted(by_method.items()):
+        recorded = _latency([row[1] for row in rows])
+        replayed = _latency([row[2] for row in rows])
+        methods[method] = {
+            'calls': len(rows),
+            'recorded_ms': recorded,
+            'replayed_ms': replayed,
+            'p50_change_pct': _change(recorded['p50'], replayed['p50']),
+            'recorded_errors': sum(row[3] for row in rows),
+            'replayed_errors': sum(row[4] for row in rows)
+        }
+    
+    span = run['capture_span_s']
+    return {
+        'speed': speed,
+        'calls': len(results),
+        'elapsed_s': round(run['elapsed_s'], 3),
+        'capture_span_s': round(span, 3),
+        'recorded_throughput_per_s': round(len(results) / span, 2) if span else None,
+        'replayed_throughput_per_s': round(len(results) / run['elapsed_s'], 2) if run['elapsed_s'] else None,
+        'max_lag_s': round(run['max_lag_s'], 4),
+        'recorded_service_s': round(sum(row[1] for row in results), 4),
+        'replayed_service_s': round(sum(row[2] for row in results), 4),
+        'methods': methods
+    }
+
+
+def print_report(report, previous=None):
+    """Print the totals and a per-method table, against a previous replay if given"""
+    print(f"Replayed {report['calls']} calls in {report['elapsed_s']}s "
+          f"(capture spanned {report['capture_span_s']}s, speed {report['speed'] or 'max'})")
+    print(f"  throughput: recorded {report['recorded_throughput_per_s']}/s, "
+          f"replayed {report['replayed_throughput_per_s']}/s")
+    print(f"  service time: recorded {report['recorded_service_s']}s, replayed {report['replayed_service_s']}s "
+          f"({_change(report['recorded_service_s'], report['replayed_service_s'])}%)")
+    if report['speed']:
+        print(f"  max lag behind schedule: {report['max_lag_s'] * 1000:.1f} ms")
+    
+    reference = 'previous' if previous else 'recorded'
+    print(f"\n{'method':45s} {'calls':>7s} {'recorded p50':>13s} {'replayed p50':>13s} "
+          f"{'p95':>9s} {'vs ' + reference:>12s}")
+    for method, row in report['methods'].items():
+        if previous:
+            before = previous['methods'].get(method, {}).get('replayed_ms', {}).get('p50')
+        else:
+            before = row['recorded_ms']['p50']
+        change = _change(before, row['replayed_ms']['p50'])
+        errors = row['replayed_errors'] - row['recorded_errors']
+        print(f"{method:45s} {row['calls']:7d} {row['recorded_ms']['p50']:13.4f} {row['replayed_ms']['p50']:13.4f} "
+              f"{row['replayed_ms']['p95']:9.4f} {'n/a' if change is None else f'{change:+.1f}%':>12s}"
+              + (f"  {errors:+d} errors" if errors else ""))
+    if previous:
+        per_call = [r['replayed_service_s'] / r['calls'] if r['calls'] else 0.0 for r in (previous, report)]
+        print(f"\nService time per call vs previous replay: {_change(*per_call)}%")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay captured VisaVerse service traffic")
+    parser.add_argument('log', help="Traffic log directory or segment file")
+    parser.add_argument('--speed', type=float, default=0.0,
+                        help="0 (default): as fast as possible; 1: original pacing; 2: twice as fast")
+    parser.add_argument('--limit', type=int, help="Replay only the first N calls")
+    parser.add_argument('--visa', help="visa_rules.json to replay against")
+    parser.add_argument('--culture', help="culture_data.json to replay against")
+    parser.add_argument('--compare', help="Earlier replay report to compare with")
+    parser.add_argument('--output', help="Write the JSON report to this path")
+    args = parser.parse_args(argv)
+    
+    try:
+        services = build_services(args.visa, args.culture)
+        calls = read_log(args.log)
+        if args.limit:
+            calls = itertools.islice(calls, args.limit)
+        run = replay(calls, services, args.speed)
+    except (FileNotFoundError, ValueError) as e:
+        print(e)
+        return 1
+    
+    report = summarize(run, args.speed)
+    previous = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+    print_report(report, previous)
+    
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,575 @@
+"""
+Synthetic Datasets - Seeded, schema-valid data at any size for capacity planning
+
+The shipped data has a handful of countries and visa types, too few to show
+how the services scale. This module generates visa_rules.json and
+culture_data.json of any size from a seed, along with applicant profiles (in
+the cohort format of services/reports.py), resume and offer letter texts and
+a CSV of past application outcomes for tools/calibrate.py, plus rule
+version histories and locale packs for the benchmarks that need them.
+The same seed and sizes always produce the same files.
+
+The shipped countries and the visa types used by PURPOSE_VISA_TYPES come
+first, so the app's forms and the benchmark inputs keep working against a
+generated dataset. Every generated file is checked against the schemas in
+services/compiled_store.py.
+
+Usage:
+    python -m benchmarks.synthetic --output /tmp/visaverse-synthetic
+    python -m benchmarks.synthetic --countries 250 --visa-types 60 --requirements 40 --profiles 10000
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from services.compiled_store import validate_culture_data, validate_visa_rules  # noqa: E402
+from services.locales import GENERAL_PACK, pack_name  # noqa: E402
+from services.occupations import OCCUPATION_DATA_PATH  # noqa: E402
+from services.stores import VISA_DATA_PATH, CULTURE_DATA_PATH  # noqa: E402
+from utils.constants import (  # noqa: E402
+    COUNTRIES, EDUCATION_LEVELS, TRAVEL_PURPOSES, EXPERIENCE_BUCKETS, AGE_BUCKETS,
+    PURPOSE_VISA_TYPES, DEFAULT_PURPOSE_VISA_TYPES, FACTOR_FEATURES
+)
+
+DEFAULT_SEED = 42
+
+# Sizes of the shipped data, multiplied by the scale factor in spec_for_scale
+BASE_SPEC = {
+    'countries': 8,
+    'visa_types': 5,
+    'requirements': 5,
+    'tips': 5,
+    'holidays': 5,
+    'profiles': 100,
+    'documents': 20,
+    'document_kb': 2,
+    'outcomes': 2000
+}
+
+SYLLABLES = ['ka', 'lo', 'mi', 'ra', 'ten', 'vo', 'su', 'dar', 'el', 'no', 'bri', 'ta', 'zen', 'qua', 'mor', 'li']
+
+WORDS = [
+    'clear', 'formal', 'direct', 'polite', 'punctual', 'relaxed', 'structured', 'flexible', 'respectful',
+    'meetings', 'colleagues', 'managers', 'agenda', 'feedback', 'consensus', 'hierarchy', 'titles',
+    'greetings', 'decisions', 'deadlines', 'lunch', 'email', 'weekends', 'holidays', 'teamwork',
+    'valued', 'expected', 'common', 'rare', 'important', 'appreciated', 'avoided', 'encouraged',
+    'quickly', 'carefully', 'openly', 'briefly', 'always', 'usually', 'seldom', 'early', 'late'
+]
+
+REQUIREMENT_SUBJECTS = [
+    'Valid passport', 'Proof of financial means', 'Job offer', 'Sponsorship certificate', 'Health insurance',
+    'Police clearance', 'Medical examination', 'Language test results', 'Educational credentials',
+    'Employment references', 'Accommodation proof', 'Return ticket', 'Biometrics appointment',
+    'Tax records', 'Bank statements', 'Invitation letter', 'Enrollment confirmation'
+]
+
+REQUIREMENT_QUALIFIERS = [
+    'issued within the last 6 months', 'certified by a notary', 'with an official translation',
+    'covering the full stay', 'from a licensed provider', 'signed by the employer', 'in original form'
+]
+
+FACTORS = sorted(FACTOR_FEATURES) + ['salary_level', 'english_proficiency', 'financial_means', 'travel_history']
+
+# Regional locales translate a few fields and fall back to their language
+LOCALES = ['de', 'es', 'es-MX', 'fr', 'fr-CA', 'hi', 'it', 'ja', 'ko', 'nl', 'pl', 'pt', 'pt-BR', 'ru', 'tr',
+           'zh', 'zh-Hant']
+
+SKILLS = ['python', 'java', 'sql', 'excel', 'project management', 'nursing', 'accounting', 'welding', 'design']
+
+
+def spec_for_scale(scale):
+    """
+    Dataset sizes for a scale factor, relative to the shipped data
+    
+    Args:
+        scale (int): Scale factor
+    
+    Returns:
+        dict: Sizes accepted by generate_visa_rules, generate_culture_data,
+            generate_profiles, generate_documents and generate_outcomes
+    """
+    spec = {key: value * scale for key, value in BASE_SPEC.items()}
+    spec['document_kb'] = BASE_SPEC['document_kb']
+    return spec
+
+
+def _sentence(rng, low=5, high=12):
+    words = rng.choices(WORDS, k=rng.randint(low, high))
+    return ' '.join(words).capitalize()
+
+
+def country_names(rng, count):
+    """The shipped countries first, then unique made-up names"""
+    names = [c for c in COUNTRIES if c not in ("Select...", "Other")][:count]
+    seen = set(names)
+    while len(names) < count:
+        name = ''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4))).capitalize()
+        if name not in seen:
+            seen.add(name)
+            names.append(name)
+    return names
+
+
+def _duration(rng):
+    unit = rng.choice(['weeks', 'months'])
+    low = rng.randint(1, 6)
+    return f"{low}-{low + rng.randint(1, 8)} {unit}"
+
+
+def _validity(rng):
+    if rng.random() < 0.5:
+        return f"Up to {rng.randint(1, 10)} years"
+    low = rng.randint(3, 12)
+    return f"{low} months to {rng.randint(1, 10)} years"
+
+
+def generate_visa_rules(rng, countries, visa_types, requirements):
+    """
+    Generate visa rules
+    
+    Args:
+        rng (random.Random): Seeded generator
+        countries (list): Country names
+        visa_types (int): Number of visa types, at least the ones PURPOSE_VISA_TYPES names
+        requirements (int): Requirements per visa type
+    
+    Returns:
+        dict: Data in the visa_rules.json format
+    """
+    keys = []
+    for purpose_keys in list(PURPOSE_VISA_TYPES.values()) + [DEFAULT_PURPOSE_VISA_TYPES]:
+        keys.extend(key for key in purpose_keys if key not in keys)
+    purpose_count = len(keys)
+    keys.extend(f"visa_type_{i:04d}" for i in range(purpose_count, visa_types))
+    
+    shipped = [c for c in countries if c in COUNTRIES]
+    others = countries[len(shipped):]
+    types = {}
+    for position, key in enumerate(keys):
+        # Tourist visas cover every country, so every country is served by at least one visa type;
+        # the purpose visa types cover every shipped country, so the app's forms find them
+        if key in DEFAULT_PURPOSE_VISA_TYPES:
+            served = list(countries)
+        elif position < purpose_count:
+            served = shipped + rng.sample(others, k=int(len(others) * rng.uniform(0.3, 0.8)))
+        else:
+            served = rng.sample(countries, k=max(1, int(len(countries) * rng.uniform(0.3, 0.8))))
+        factors = rng.sample(FACTORS, k=rng.randint(3, 6))
+        weights = [rng.uniform(0.05, 1.0) for _ in factors]
+        total = sum(weights)
+        types[key] = {
+            'name': f"{key.replace('_', ' ').title()} Visa",
+            'countries': served,
+            'processing_time': _duration(rng),
+            'validity': _validity(rng),
+            'requirements': [
+                f"{rng.choice(REQUIREMENT_SUBJECTS)} {rng.choice(REQUIREMENT_QUALIFIERS)}" for _ in range(requirements)
+            ],
+            'success_factors': {factor: round(weight / total, 3) for factor, weight in zip(factors, weights)}
+        }
+    
+    country_info = {}
+    names = [visa['name'] for visa in types.values()]
+    for country in countries:
+        country_info[country] = {
+            'common_visas': rng.sample(names, k=min(4, len(names))),
+            'processing_authority': f"{country} Immigration Service",
+            'average_approval_rate': round(rng.uniform(0.5, 0.95), 2),
+            'special_notes': _sentence(rng)
+        }
+    
+    return {
+        'visa_types': types,
+        'country_specific_info': country_info,
+        'eligibility_criteria': {
+            'education_points': {level: 10 * i for i, level in enumerate(EDUCATION_LEVELS[1:-1], 1)},
+            'experience_points': {bucket: 5 + 7 * i for i, (_, bucket) in enumerate(EXPERIENCE_BUCKETS)},
+            'age_points': {bucket: max(5, 35 - 6 * i) for i, (_, bucket) in enumerate(AGE_BUCKETS)}
+        }
+    }
+
+
+def _fields(rng, names):
+    return {name: _sentence(rng) for name in names}
+
+
+def generate_culture_data(rng, countries, tips, holidays):
+    """
+    Generate culture guides
+    
+    Args:
+        rng (random.Random): Seeded generator
+        countries (list): Country names
+        tips (int): Tips per country
+        holidays (int): Holidays per country
+    
+    Returns:
+        dict: Data in the culture_data.json format
+    """
+    guides = {}
+    for country in countries:
+        start = rng.randint(7, 10)
+        guides[country] = {
+            'workplace_culture': _fields(rng, ['work_style', 'hierarchy', 'meeting_culture',
+                                               'work_life_balance', 'decision_making']),
+            'communication_style': _fields(rng, ['directness', 'small_talk', 'feedback',
+                                                 'email_tone', 'conflict_resolution']),
+            'business_etiquette': _fields(rng, ['greetings', 'dress_code', 'punctuality',
+                                                'business_cards', 'dining']),
+            'tips': [_sentence(rng) for _ in range(tips)],
+            'time_zone': f"UTC{rng.randint(-11, 12):+d}",
+            'working_hours': f"{start} AM - {start - 4 + rng.randint(8, 9)} PM",
+            'holidays': [f"{_sentence(rng, 2, 3)} Day" for _ in range(holidays)]
+        }
+    return {
+        'countries': guides,
+        'general_tips': {
+            'email_etiquette': _fields(rng, ['subject_lines', 'greetings', 'body', 'tone', 'closing', 'response_time']),
+            'virtual_meeting_tips': [_sentence(rng) for _ in range(tips)],
+            'cultural_adaptation': [_sentence(rng) for _ in range(tips)]
+        }
+    }
+
+
+def _job_titles():
+    with open(OCCUPATION_DATA_PATH, 'r', encoding='utf-8') as f:
+        occupations = json.load(f)['occupations']
+    return [title for occupation in occupations for title in [occupation['title']] + occupation.get('alternative_titles', [])]
+
+
+def _misspell(rng, title):
+    """Swap two neighbouring letters, as a user typing fast would"""
+    if len(title) < 4:
+        return title
+    i = rng.randrange(1, len(title) - 2)
+    return title[:i] + title[i + 1] + title[i] + title[i + 2:]
+
+
+def generate_profiles(rng, countries, count, visa_rules):
+    """
+    Generate applicant records in the cohort format of services/reports.py
+    
+    Args:
+        rng (random.Random): Seeded generator
+        countries (list): Country names
+        count (int): Number of applicants
+        visa_rules (dict): Generated visa rules, for the requirement names
+    
+    Yields:
+        dict: Applicant record with 'id', 'name', 'profile' and 'checked_documents'
+    """
+    titles = _job_titles()
+    purposes = [p for p in TRAVEL_PURPOSES if p != "Select..."]
+    educations = [e for e in EDUCATION_LEVELS if e != "Select..."]
+    requirements = [r for visa in visa_rules['visa_types'].values() for r in visa['requirements'][:10]]
+    for i in range(count):
+        title = rng.choice(titles)
+        yield {
+            'id': f"applicant-{i:06d}",
+            'name': f"Applicant {i}",
+            'profile': {
+                'citizenship': rng.choice(countries),
+                'destination': rng.choice(countries),
+                'purpose': rng.choice(purposes),
+                'education': rng.choice(educations),
+                'work_experience': rng.randint(0, 30),
+                'age': rng.choice([None, rng.randint(18, 65)]),
+                'job_title': _misspell(rng, title) if rng.random() < 0.2 else title
+            },
+            'checked_documents': rng.sample(requirements, k=min(len(requirements), rng.randint(0, 5)))
+        }
+
+
+def generate_documents(rng, count, kb):
+    """
+    Generate resume and offer letter texts for DocumentService
+    
+    Args:
+        rng (random.Random): Seeded generator
+        count (int): Number of documents, alternating resumes and offer letters
+        kb (int): Approximate size of each text in KB
+    
+    Yields:
+        dict: Document with 'id', 'kind' ('resume' or 'offer_letter') and 'text'
+    """
+    for i in range(count):
+        kind = 'resume' if i % 2 == 0 else 'offer_letter'
+        if kind == 'resume':
+            line = (f"Work experience: {rng.randint(1, 25)} years at Example Corp {i}. "
+                    f"Education: university degree. Skills: {', '.join(rng.sample(SKILLS, k=3))}. ")
+        else:
+            line = (f"We are pleased to offer you the position. Salary: ${rng.randint(40, 200)},000 per year. "
+                    f"Start date: {rng.randint(1, 28)} March. Benefits include health insurance and relocation. ")
+        text = (line * (kb * 1024 // len(line) + 1))[:kb * 1024]
+        yield {'id': f"{kind}-{i:06d}", 'kind': kind, 'text': text}
+
+
+OUTCOME_COLUMNS = ['decided', 'citizenship', 'destination', 'visa_key', 'education', 'work_experience', 'age', 'outcome']
+
+
+def generate_outcomes(rng, countries, count, visa_rules):
+    """
+    Generate past applications and their outcomes
+    
+    An application's chance of approval is the destination's
+    average_approval_rate, raised or lowered by the applicant's education
+    and experience, so calibration has a real relationship to find.
+    
+    Args:
+        rng (random.Random): Seeded generator
+        countries (list): Country names
+        count (int): Number of applications
+        visa_rules (dict): Generated visa rules
+    
+    Yields:
+        dict: Row with the OUTCOME_COLUMNS
+    """
+    educations = [e for e in EDUCATION_LEVELS if e != "Select..."]
+    visa_types = list(visa_rules['visa_types'].items())
+    country_info = visa_rules['country_specific_info']
+    for i in range(count):
+        visa_key, visa = rng.choice(visa_types)
+        destination = rng.choice(visa['countries'])
+        education = rng.randrange(len(educations))
+        experience = rng.randint(0, 30)
+        quality = (education / (len(educations) - 1) + min(experience, 20) / 20) / 2
+        chance = min(0.98, max(0.02, country_info[destination]['average_approval_rate'] * (0.6 + 0.8 * quality)))
+        draw = rng.random()
+        yield {
+            'decided': f"20{20 + i * 6 // count:02d}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            'citizenship': rng.choice(countries),
+            'destination': destination,
+            'visa_key': visa_key,
+            'education': educations[education],
+            'work_experience': experience,
+            'age': rng.randint(18, 65),
+            'outcome': 'withdrawn' if draw > 0.97 else ('approved' if draw < chance * 0.97 else 'refused')
+        }
+
+
+def generate_dataset(directory, spec, seed=DEFAULT_SEED):
+    """
+    Write a complete synthetic dataset
+    
+    Args:
+        directory (str): Output directory, created if needed
+        spec (dict): Sizes, as returned by spec_for_scale
+        seed (int): Random seed
+    
+    Returns:
+        dict: Paths of 'visa_rules', 'culture_data', 'profiles', 'documents' and 'outcomes'
+    
+    Raises:
+        ValueError: If the generated data fails schema validation
+    """
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    countries = country_names(rng, spec['countries'])
+    visa_rules = generate_visa_rules(rng, countries, spec['visa_types'], spec['requirements'])
+    culture_data = generate_culture_data(rng, countries, spec['tips'], spec['holidays'])
+    errors = validate_visa_rules(visa_rules) + validate_culture_data(culture_data)
+    if errors:
+        raise ValueError("Generated data is invalid:\n  " + "\n  ".join(errors))
+    
+    paths = {name: os.path.join(directory, name + ext) for name, ext in (
+        ('visa_rules', '.json'), ('culture_data', '.json'), ('profiles', '.jsonl'), ('documents', '.jsonl'),
+        ('outcomes', '.csv'))}
+    with open(paths['visa_rules'], 'w', encoding='utf-8') as f:
+        json.dump(visa_rules, f)
+    with open(paths['culture_data'], 'w', encoding='utf-8') as f:
+        json.dump(culture_data, f)
+    with open(paths['profiles'], 'w', encoding='utf-8') as f:
+        for applicant in generate_profiles(rng, countries, spec['profiles'], visa_rules):
+            f.write(json.dumps(applicant) + '\n')
+    with open(paths['documents'], 'w', encoding='utf-8') as f:
+        for document in generate_documents(rng, spec['documents'], spec['document_kb']):
+            f.write(json.dumps(document) + '\n')
+    with open(paths['outcomes'], 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=OUTCOME_COLUMNS)
+        writer.writeheader()
+        writer.writerows(generate_outcomes(rng, countries, spec['outcomes'], visa_rules))
+    return paths
+
+
+def generate_rule_history(rng, visa_rules, versions, changes):
+    """
+    Generate earlier rule versions in the services/rule_versions.py format
+    
+    Versions are quarterly, newest first, and each changes a few visa types'
+    processing times or requirements and a few countries' approval rates.
+    
+    Args:
+        rng (random.Random): Seeded generator
+        visa_rules (dict): Current visa rules
+        versions (int): Number of earlier versions
+        changes (int): Records each version changes
+    
+    Returns:
+        dict: Rule version history with 'current_from' and 'versions'
+    """
+    visa_keys = list(visa_rules['visa_types'])
+    countries = list(visa_rules['country_specific_info'])
+    history = {'current_from': '2026-01-01', 'versions': {}}
+    for i in range(1, versions + 1):
+        year, quarter = divmod(2026 * 4 - i, 4)
+        patch = {'visa_types': {}, 'country_specific_info': {}}
+        for _ in range(changes):
+            if rng.random() < 0.5:
+                visa_key = rng.choice(visa_keys)
+                if rng.random() < 0.5:
+                    patch['visa_types'][visa_key] = {'processing_time': _duration(rng)}
+                else:
+                    requirements = visa_rules['visa_types'][visa_key]['requirements']
+                    patch['visa_types'][visa_key] = {'requirements': requirements[:-1]}
+            else:
+                patch['country_specific_info'][rng.choice(countries)] = {
+                    'average_approval_rate': round(rng.uniform(0.5, 0.95), 2)
+                }
+        history['versions'][f"{year}-{quarter * 3 + 1:02d}-01"] = patch
+    return history
+
+
+def _translated(rng, value, share):
+    """A pseudo-translation of a culture value; mappings translate about share of their fields"""
+    if isinstance(value, dict):
+        return {name: _translated(rng, item, 1.0) for name, item in value.items() if rng.random() < share}
+    if isinstance(value, list):
+        return [_sentence(rng) for _ in value]
+    return _sentence(rng, 2, 4)
+
+
+def generate_locale_packs(rng, culture_data, locales, coverage):
+    """
+    Generate locale packs in the services/locales.py format
+    
+    Language locales translate every field of the countries they cover;
+    regional locales (with a subtag) translate a few, leaving the rest to
+    their language.
+    
+    Args:
+        rng (random.Random): Seeded generator
+        culture_data (dict): English culture data
+        locales (list): Locale tags
+        coverage (float): Share of the countries each locale translates
+    
+    Returns:
+        dict: Per locale, the pack per country name and GENERAL_PACK
+    """
+    packs = {}
+    for locale in locales:
+        share = 0.3 if '-' in locale else 1.0
+        countries = [country for country in culture_data['countries'] if rng.random() < coverage]
+        packs[locale] = {
+            country: {field: _translated(rng, value, share)
+                      for field, value in culture_data['countries'][country].items() if rng.random() < share}
+            for country in countries
+        }
+        packs[locale][GENERAL_PACK] = _translated(rng, culture_data['general_tips'], share)
+    return packs
+
+
+def write_locale_packs(culture_path, directory, locales=None, coverage=1.0, seed=DEFAULT_SEED):
+    """
+    Write locale packs for a culture data file
+    
+    Args:
+        culture_path (str): English culture_data.json
+        directory (str): Output directory, created if needed
+        locales (list): Locale tags, LOCALES by default
+        coverage (float): Share of the countries each locale translates
+        seed (int): Random seed
+    
+    Returns:
+        str: The locales directory, for CultureService(locales_dir=...)
+    """
+    with open(culture_path, 'r', encoding='utf-8') as f:
+        culture_data = json.load(f)
+    packs = generate_locale_packs(random.Random(seed), culture_data, locales or LOCALES, coverage)
+    locales_dir = os.path.join(directory, 'locales')
+    for locale, countries in packs.items():
+        os.makedirs(os.path.join(locales_dir, locale), exist_ok=True)
+        for country, pack in countries.items():
+            name = country if country == GENERAL_PACK else pack_name(country)
+            with open(os.path.join(locales_dir, locale, f"{name}.json"), 'w', encoding='utf-8') as f:
+                json.dump(pack, f)
+    return locales_dir
+
+
+def write_rule_history(visa_path, directory, versions=4, changes=3, seed=DEFAULT_SEED):
+    """
+    Write a rule version history for a visa rules file
+    
+    Args:
+        visa_path (str): Current visa_rules.json
+        directory (str): Output directory, created if needed
+        versions (int): Number of earlier versions
+        changes (int): Records each version changes
+        seed (int): Random seed
+    
+    Returns:
+        str: Path of the written rule_versions.json
+    """
+    with open(visa_path, 'r', encoding='utf-8') as f:
+        visa_rules = json.load(f)
+    history = generate_rule_history(random.Random(seed), visa_rules, versions, changes)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, 'rule_versions.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(history, f)
+    return path
+
+
+def write_synthetic_datasets(scale, directory=None, seed=DEFAULT_SEED):
+    """
+    Write visa and culture files generated at a scale factor
+    
+    Args:
+        scale (int): Scale factor for spec_for_scale (1 returns the shipped files)
+        directory (str): Output directory, a fresh temp dir by default
+        seed (int): Random seed
+    
+    Returns:
+        tuple: (visa rules path, culture data path)
+    """
+    if scale == 1:
+        return VISA_DATA_PATH, CULTURE_DATA_PATH
+    directory = directory or tempfile.mkdtemp(prefix=f'visaverse-synthetic-x{scale}-')
+    paths = generate_dataset(directory, spec_for_scale(scale), seed)
+    return paths['visa_rules'], paths['culture_data']
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a seeded synthetic VisaVerse dataset")
+    parser.add_argument('--output', default=None, help="Output directory (default: a new temp dir)")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="Random seed")
+    parser.add_argument('--scale', type=int, default=1, help="Multiply every size of the shipped data")
+    for key in BASE_SPEC:
+        parser.add_argument(f"--{key.replace('_', '-')}", type=int, default=None, help=f"Override the {key} size")
+    args = parser.parse_args(argv)
+    
+    spec = spec_for_scale(args.scale)
+    for key in BASE_SPEC:
+        if getattr(args, key) is not None:
+            spec[key] = getattr(args, key)
+    directory = args.output or tempfile.mkdtemp(prefix='visaverse-synthetic-')
+    try:
+        paths = generate_dataset(directory, spec, args.seed)
+    except ValueError as e:
+        print(e)
+        return 1
+    print(f"Generated with seed {args.seed}: " + ", ".join(f"{key}={value}" for key, value in spec.items()))
+    for name, path in paths.items():
+        print(f"  {name:<13} {path} ({os.path.getsize(path) / 1024:.0f} KiB)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""
+Async Services - asyncio front ends for the visa, culture and document services
+
+Each async service wraps a synchronous one and keeps its method names.
+Loading data always happens on a worker thread, so creating a service never
+blocks the event loop:
+
+    visa = await AsyncVisaService.create()
+    recommendations = await visa.get_visa_recommendations(profile)
+
+Lookups on in-memory stores (JSON or compiled) take microseconds and run
+directly on the event loop; lookups on stores that query a database run on
+a worker thread. Document analysis is CPU-bound and always runs on an
+executor, with at most a fixed number of analyses in flight per service.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from services.culture_service import CultureService
+from services.document_service import DocumentService
+from services.visa_service import VisaService
+from utils.constants import ANALYSIS_MAX_CONCURRENCY
+
+
+def _lookup(name):
+    """Async version of a lookup, run on a worker thread only when the store reads block"""
+    async def method(self, *args, **kwargs):
+        func = getattr(self.service, name)
+        if self.blocking_reads:
+            return await asyncio.to_thread(func, *args, **kwargs)
+        return func(*args, **kwargs)
+    method.__name__ = name
+    method.__doc__ = f"Async version of {name}; takes the same arguments"
+    return method
+
+
+def _offloaded(name):
+    """Async version of a CPU-heavy method, always run on a worker thread"""
+    async def method(self, *args, **kwargs):
+        return await asyncio.to_thread(getattr(self.service, name), *args, **kwargs)
+    method.__name__ = name
+    method.__doc__ = f"Async version of {name}, run on a worker thread; takes the same arguments"
+    return method
+
+
+class AsyncVisaService:
+    def __init__(self, service):
+        """
+        Wrap a loaded VisaService; use AsyncVisaService.create() to load one
+        
+        Args:
+            service (VisaService): Service to wrap
+        """
+        self.service = service
+        self.blocking_reads = service.store.blocking_reads
+    
+    @classmethod
+    async def create(cls, data_path=None, store=None):
+        """
+        Load a VisaService on a worker thread
+        
+        Args:
+            data_path (str): Optional path to an alternative JSON data file
+            store: Optional store object, as for VisaService
+        
+        Returns:
+            AsyncVisaService: The loaded service
+        """
+        return cls(await asyncio.to_thread(VisaService, data_path, store))
+    
+    reload = _offloaded('reload')
+    get_visa_recommendations = _lookup('get_visa_recommendations')
+    rank_destinations = _lookup('rank_destinations')
+    score_profiles = _offloaded('score_profiles')
+    get_duration_ranges = _lookup('get_duration_ranges')
+    find_visa_options = _lookup('find_visa_options')
+    # The first call loads the occupation list
+    match_occupation = _offloaded('match_occupation')
+    get_country_info = _lookup('get_country_info')
+    get_all_countries = _lookup('get_all_countries')
+    get_visa_types_for_country = _lookup('get_visa_types_for_country')
+
+
+class AsyncCultureService:
+    def __init__(self, service):
+        """
+        Wrap a loaded CultureService; use AsyncCultureService.create() to load one
+        
+        Args:
+            service (CultureService): Service to wrap
+        """
+        self.service = service
+        self.blocking_reads = service.store.blocking_reads
+    
+    @classmethod
+    async def create(cls, data_path=None, store=None):
+        """
+        Load a CultureService on a worker thread
+        
+        Args:
+            data_path (str): Optional path to an alternative JSON data file
+            store: Optional store object, as for CultureService
+        
+        Returns:
+            AsyncCultureService: The loaded service
+        """
+        return cls(await asyncio.to_thread(CultureService, data_path, store))
+    
+    reload = _offloaded('reload')
+    get_country_culture = _lookup('get_country_culture')
+    get_workplace_culture = _lookup('get_workplace_culture')
+    get_communication_style = _lookup('get_communication_style')
+    get_business_etiquette = _lookup('get_business_etiquette')
+    get_cultural_tips = _lookup('get_cultural_tips')
+    get_time_zone_info = _lookup('get_time_zone_info')
+    get_working_hours = _lookup('get_working_hours')
+    get_holidays = _lookup('get_holidays')
+    get_email_etiquette = _lookup('get_email_etiquette')
+    get_virtual_meeting_tips = _lookup('get_virtual_meeting_tips')
+    get_cultural_adaptation_tips = _lookup('get_cultural_adaptation_tips')
+    get_available_countries = _lookup('get_available_countries')
+    get_available_locales = _lookup('get_available_locales')
+    compare_communication_styles = _lookup('compare_communication_styles')
+
+
+def _analysis(name):
+    """Async version of a document analysis, run on the executor under the concurrency limit"""
+    async def method(self, *args):
+        # Waiting here rather than in the executor queue means a cancelled
+        # request gives up its turn instead of leaving work behind
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, functools.partial(getattr(self.service, name), *args))
+    method.__name__ = name
+    method.__doc__ = f"Async version of {name}, run on the analysis executor; takes the same arguments"
+    return method
+
+
+class AsyncDocumentService:
+    def __init__(self, service=None, max_concurrency=ANALYSIS_MAX_CONCURRENCY, executor=None):
+        """
+        Wrap a DocumentService
+        
+        Args:
+            service (DocumentService): Service to wrap, a new one by default
+            max_concurrency (int): Most analyses running at once
+            executor: Executor for analyses; defaults to a thread pool of
+                max_concurrency workers owned by this service. Pass a
+                ProcessPoolExecutor to run analyses in parallel across cores.
+        """
+        self.service = service or DocumentService()
+        # Requirements are built in, so lookups never block
+        self.blocking_reads = False
+        self._owns_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix='visaverse-analysis'
+        )
+        self._slots = asyncio.Semaphore(max_concurrency)
+    
+    @classmethod
+    async def create(cls, max_concurrency=ANALYSIS_MAX_CONCURRENCY, executor=None):
+        """
+        Build a DocumentService on a worker thread
+        
+        Args:
+            max_concurrency (int): Most analyses running at once
+            executor: Executor for analyses, as for the constructor
+        
+        Returns:
+            AsyncDocumentService: The service
+        """
+        return cls(await asyncio.to_thread(DocumentService), max_concurrency, executor)
+    
+    def close(self):
+        """Shut down the analysis executor if this service created it"""
+        if self._owns_executor:
+            self.executor.shutdown(wait=False)
+    
+    get_required_documents = _lookup('get_required_documents')
+    calculate_readiness_score = _lookup('calculate_readiness_score')
+    check_passport_validity = _lookup('check_passport_validity')
+    analyze_resume = _analysis('analyze_resume')
+    analyze_offer_letter = _analysis('analyze_offer_letter')
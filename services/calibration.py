@@ -0,0 +1,482 @@
+"""
+Calibration - Eligibility scores turned into approval probabilities fitted on past outcomes
+
+Eligibility scores rank visa options but are not probabilities. The
+calibration job (tools/calibrate.py) streams a CSV of historical
+applications and their outcomes and counts applications and approvals per
+(destination, visa type, score). Those counts are all a fit needs, so they
+are kept in a state file and new outcomes are simply added to them.
+
+Each (destination, visa type) with enough applications gets its own curve;
+every visa type and the data as a whole get pooled curves that sparser
+groups fall back to. Curves are logistic in the score, fitted for every
+group at once with vectorized Newton steps, or isotonic (monotone, fitted
+with pool-adjacent-violators). The curves are written to a small JSON
+parameter file, which VisaService loads to report an approval probability
+next to each score.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+from services.stores import DATA_DIR
+from utils.constants import (
+    CALIBRATION_PATH_ENV_VAR, CALIBRATION_MIN_SAMPLES, CALIBRATION_RIDGE, CALIBRATION_CHUNK_ROWS
+)
+
+CALIBRATION_PATH = os.path.join(DATA_DIR, 'calibration.json')
+
+# Scores are integers from 0 to 100, one bin each
+SCORE_BINS = 101
+
+FORMAT_VERSION = 1
+METHODS = ('logistic', 'isotonic')
+
+# Group key of pooled curves
+ANY = '*'
+
+OUTCOMES = {
+    'approved': 1, 'granted': 1, 'issued': 1, 'accepted': 1, '1': 1, 'true': 1, 'yes': 1,
+    'refused': 0, 'rejected': 0, 'denied': 0, '0': 0, 'false': 0, 'no': 0
+}
+
+PROFILE_COLUMNS = ('citizenship', 'purpose', 'education', 'work_experience', 'age', 'job_title')
+
+# Newton iterations stop once no coefficient moves by more than this
+_TOLERANCE = 1e-9
+_MAX_ITERATIONS = 50
+
+# One parameter file per path and modification time, shared by every service and tenant view
+_shared = {}
+
+
+class CalibrationStats:
+    def __init__(self):
+        """Empty application and approval counts"""
+        self.groups = {}
+        self.applications = np.zeros((0, SCORE_BINS), dtype=np.int64)
+        self.approvals = np.zeros((0, SCORE_BINS), dtype=np.int64)
+        self.data_version = None
+    
+    @property
+    def rows(self):
+        """Number of outcomes counted"""
+        return int(self.applications.sum())
+    
+    def _group_rows(self, destinations, visa_keys):
+        """Row index per (destination, visa_key) pair, adding rows for new groups"""
+        rows = np.empty(len(destinations), dtype=np.int64)
+        for i, group in enumerate(zip(destinations, visa_keys)):
+            row = self.groups.get(group)
+            if row is None:
+                row = self.groups[group] = len(self.groups)
+            rows[i] = row
+        missing = len(self.groups) - len(self.applications)
+        if missing > 0:
+            grow = np.zeros((missing, SCORE_BINS), dtype=np.int64)
+            self.applications = np.vstack([self.applications, grow])
+            self.approvals = np.vstack([self.approvals, grow])
+        return rows
+    
+    def add(self, destinations, visa_keys, scores, outcomes):
+        """
+        Count a batch of outcomes
+        
+        Args:
+            destinations (list): Destination per application
+            visa_keys (list): Visa type key per application
+            scores (array-like): Eligibility score (0-100) per application
+            outcomes (array-like): 1 if approved, 0 if refused, per application
+        """
+        if not len(destinations):
+            return
+        rows = self._group_rows(destinations, visa_keys)
+        scores = np.clip(np.rint(np.asarray(scores, dtype=float)), 0, SCORE_BINS - 1).astype(np.int64)
+        np.add.at(self.applications, (rows, scores), 1)
+        np.add.at(self.approvals, (rows, scores), np.asarray(outcomes, dtype=np.int64))
+    
+    def save(self, path):
+        """Write the counts to an .npz state file"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        groups = sorted(self.groups, key=self.groups.get)
+        np.savez_compressed(
+            path,
+            destinations=np.array([g[0] for g in groups], dtype=str),
+            visa_keys=np.array([g[1] for g in groups], dtype=str),
+            applications=self.applications,
+            approvals=self.approvals,
+            data_version=np.array(self.data_version or '', dtype=str)
+        )
+    
+    @classmethod
+    def load(cls, path):
+        """
+        Read counts written by save()
+        
+        Args:
+            path (str): State file
+        
+        Returns:
+            CalibrationStats: The counts
+        
+        Raises:
+            FileNotFoundError: If the state file does not exist
+            ValueError: If it is not a calibration state file
+        """
+        stats = cls()
+        try:
+            with np.load(path) as state:
+                destinations, visa_keys = state['destinations'].tolist(), state['visa_keys'].tolist()
+                stats.applications = state['applications'].astype(np.int64)
+                stats.approvals = state['approvals'].astype(np.int64)
+                stats.data_version = str(state['data_version']) or None
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Calibration state not found at {path}")
+        except (KeyError, OSError) as e:
+            raise ValueError(f"Invalid calibration state file {path}: {e}")
+        if stats.applications.shape != (len(destinations), SCORE_BINS) or stats.approvals.shape != stats.applications.shape:
+            raise ValueError(f"Invalid calibration state file {path}: counts do not match the groups")
+        stats.groups = {group: i for i, group in enumerate(zip(destinations, visa_keys))}
+        return stats
+
+
+def _parse_outcome(value):
+    return OUTCOMES.get((value or '').strip().lower())
+
+
+def _profile(row):
+    profile = {column: row[column] for column in PROFILE_COLUMNS if row.get(column) not in (None, '')}
+    for column in ('work_experience', 'age'):
+        if column in profile:
+            profile[column] = int(float(profile[column]))
+    profile['destination'] = row['destination']
+    return profile
+
+
+def _chunks(reader, chunk_rows):
+    """(rows, rows passed over) for up to chunk_rows rows with a known outcome, destination and visa type"""
+    chunk, passed = [], 0
+    for row in reader:
+        outcome = _parse_outcome(row.get('outcome'))
+        if outcome is None or not row.get('destination') or not row.get('visa_key'):
+            passed += 1
+            continue
+        row['outcome'] = outcome
+        chunk.append(row)
+        if len(chunk) >= chunk_rows:
+            yield chunk, passed
+            chunk, passed = [], 0
+    if chunk or passed:
+        yield chunk, passed
+
+
+def _score(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return -1.0
+
+
+def _count_chunk(chunk, stats, visa_service):
+    """Add one chunk to the counts, scoring its profiles when a service is given; returns rows counted"""
+    if visa_service is None:
+        scores = [_score(row['eligibility_score']) for row in chunk]
+    else:
+        scored = visa_service.score_profiles([_profile(row) for row in chunk])
+        scores = [row_scores.get(row['visa_key'], -1.0) for row_scores, row in zip(scored, chunk)]
+    # Visa types the rules do not know, and unreadable scores, are left out
+    keep = [i for i, score in enumerate(scores) if score >= 0]
+    stats.add([chunk[i]['destination'] for i in keep], [chunk[i]['visa_key'] for i in keep],
+              [scores[i] for i in keep], [chunk[i]['outcome'] for i in keep])
+    return len(keep)
+
+
+def read_outcomes(csv_path, stats, visa_service=None, chunk_rows=CALIBRATION_CHUNK_ROWS):
+    """
+    Stream a CSV of historical applications into the counts, chunk by chunk
+    
+    The CSV needs 'destination', 'visa_key' and 'outcome' columns, and either
+    an 'eligibility_score' column or the profile columns (education,
+    work_experience, age, job_title...) to score each application with the
+    current rules. Rows with another outcome (pending, withdrawn) are skipped.
+    Profiles are only scored into counts that are empty or were scored with
+    the same rules, so one curve never mixes scores from two rule versions.
+    
+    Args:
+        csv_path (str): CSV file of past applications
+        stats (CalibrationStats): Counts to add to
+        visa_service: VisaService scoring the profiles; needed without an
+            eligibility_score column
+        chunk_rows (int): Rows held in memory at once
+    
+    Returns:
+        dict: 'counted' and 'skipped' rows
+    
+    Raises:
+        FileNotFoundError: If the CSV does not exist
+        ValueError: If required columns are missing, or the counts were
+            scored with other rules than the profiles would be
+    """
+    counted = skipped = 0
+    try:
+        f = open(csv_path, 'r', encoding='utf-8', newline='')
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Outcomes file not found at {csv_path}")
+    with f:
+        reader = csv.DictReader(f)
+        columns = set(reader.fieldnames or [])
+        missing = {'destination', 'visa_key', 'outcome'} - columns
+        if missing:
+            raise ValueError(f"{csv_path} is missing the columns: {', '.join(sorted(missing))}")
+        scored = 'eligibility_score' in columns
+        if not scored and visa_service is None:
+            raise ValueError(f"{csv_path} has no eligibility_score column and no service was given to score profiles")
+        if not scored:
+            if stats.rows and stats.data_version != visa_service.data_version:
+                earlier = stats.data_version or 'of unknown version'
+                raise ValueError(f"The saved counts were scored with rules {earlier}, not the current "
+                                 f"{visa_service.data_version}; calibrate again without --update to count "
+                                 f"every outcome with the current rules")
+            stats.data_version = visa_service.data_version
+        
+        for chunk, passed in _chunks(reader, chunk_rows):
+            kept = _count_chunk(chunk, stats, None if scored else visa_service) if chunk else 0
+            counted += kept
+            skipped += passed + len(chunk) - kept
+    return {'counted': counted, 'skipped': skipped}
+
+
+def fit_logistic(applications, approvals, ridge=CALIBRATION_RIDGE):
+    """
+    Fit P(approved) = 1 / (1 + exp(-(slope * score / 100 + intercept))) for every row at once
+    
+    Newton steps on the binned counts, with every group's 2x2 system solved
+    in closed form, so the cost does not depend on the number of outcomes.
+    
+    Args:
+        applications (numpy.ndarray): Applications per group and score bin
+        approvals (numpy.ndarray): Approvals per group and score bin
+        ridge (float): L2 penalty keeping groups with only approvals (or
+            only refusals) finite
+    
+    Returns:
+        numpy.ndarray: (slope, intercept) per row
+    """
+    n = applications.astype(float)
+    k = approvals.astype(float)
+    x = np.arange(SCORE_BINS) / 100.0
+    totals = n.sum(axis=1)
+    rate = (k.sum(axis=1) + 0.5) / (totals + 1.0)
+    slope = np.zeros(len(n))
+    intercept = np.log(rate / (1 - rate))
+    for _ in range(_MAX_ITERATIONS):
+        p = 1.0 / (1.0 + np.exp(-(slope[:, None] * x + intercept[:, None])))
+        residual = k - n * p
+        weight = n * p * (1 - p)
+        g_intercept = residual.sum(axis=1) - ridge * intercept
+        g_slope = residual @ x - ridge * slope
+        h_ii = weight.sum(axis=1) + ridge
+        h_is = weight @ x
+        h_ss = weight @ (x * x) + ridge
+        determinant = h_ii * h_ss - h_is * h_is
+        step_intercept = (h_ss * g_intercept - h_is * g_slope) / determinant
+        step_slope = (h_ii * g_slope - h_is * g_intercept) / determinant
+        intercept += step_intercept
+        slope += step_slope
+        if max(np.abs(step_intercept).max(), np.abs(step_slope).max()) < _TOLERANCE:
+            break
+    return np.column_stack([slope, intercept])
+
+
+def fit_isotonic(applications, approvals):
+    """
+    Fit a non-decreasing approval rate over the score with pool-adjacent-violators
+    
+    Args:
+        applications (numpy.ndarray): Applications per score bin for one group
+        approvals (numpy.ndarray): Approvals per score bin for one group
+    
+    Returns:
+        list: [scores, probabilities] knots, one per pooled block, at the
+            application-weighted mean score of the block
+    """
+    bins = np.flatnonzero(applications)
+    blocks = []
+    for score in bins:
+        n, k = float(applications[score]), float(approvals[score])
+        block = [n, k, n * score]
+        while blocks and blocks[-1][1] / blocks[-1][0] >= block[1] / block[0]:
+            previous = blocks.pop()
+            block = [previous[0] + block[0], previous[1] + block[1], previous[2] + block[2]]
+        blocks.append(block)
+    return [[round(b[2] / b[0], 2) for b in blocks], [round(b[1] / b[0], 4) for b in blocks]]
+
+
+def fit(stats, method='logistic', min_samples=CALIBRATION_MIN_SAMPLES):
+    """
+    Fit the curves for a set of counts
+    
+    Args:
+        stats (CalibrationStats): Application and approval counts
+        method (str): 'logistic' or 'isotonic'
+        min_samples (int): Fewest applications a group needs for its own curve
+    
+    Returns:
+        dict: Parameter file contents
+    
+    Raises:
+        ValueError: If the method is unknown
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown calibration method {method!r}; use one of {', '.join(METHODS)}")
+    groups = sorted(stats.groups, key=stats.groups.get)
+    applications, approvals = stats.applications, stats.approvals
+    
+    # Pooled rows: per visa type over every destination, then everything
+    visa_keys = sorted({visa_key for _, visa_key in groups})
+    keys = groups + [(ANY, visa_key) for visa_key in visa_keys] + [(ANY, ANY)]
+    if groups:
+        visa_rows = np.array([visa_keys.index(visa_key) for _, visa_key in groups])
+        pooled = np.zeros((len(visa_keys), SCORE_BINS), dtype=np.int64)
+        pooled_approvals = np.zeros_like(pooled)
+        np.add.at(pooled, visa_rows, applications)
+        np.add.at(pooled_approvals, visa_rows, approvals)
+        applications = np.vstack([applications, pooled, applications.sum(axis=0, keepdims=True)])
+        approvals = np.vstack([approvals, pooled_approvals, approvals.sum(axis=0, keepdims=True)])
+    
+    totals = applications.sum(axis=1) if len(keys) else np.zeros(0)
+    selected = np.flatnonzero(totals >= min_samples) if len(keys) else []
+    curves = {}
+    if len(selected):
+        if method == 'logistic':
+            parameters = fit_logistic(applications[selected], approvals[selected]).round(6).tolist()
+        else:
+            parameters = [fit_isotonic(applications[i], approvals[i]) for i in selected]
+        for row, params in zip(selected, parameters):
+            destination, visa_key = keys[row]
+            curves.setdefault(destination, {})[visa_key] = {'n': int(totals[row]), method: params}
+    return {
+        'format': FORMAT_VERSION,
+        'method': method,
+        'fitted': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'outcomes': stats.rows,
+        'min_samples': min_samples,
+        'data_version': stats.data_version,
+        'curves': curves
+    }
+
+
+def write_parameters(parameters, path):
+    """Write a parameter file atomically, so services never read half of one"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(parameters, f, separators=(',', ':'))
+    os.replace(temp_path, path)
+
+
+def _valid_curve(curve, method):
+    return isinstance(curve, dict) and isinstance(curve.get(method), list) and len(curve[method]) == 2
+
+
+class Calibration:
+    def __init__(self, parameters, version=None):
+        """
+        Curves from a parameter file
+        
+        Args:
+            parameters (dict): Parameter file contents, as written by fit()
+            version (str): Hash of the parameter file, identifying the curves
+        
+        Raises:
+            ValueError: If the parameters are not a calibration file this version reads
+        """
+        if (not isinstance(parameters, dict) or parameters.get('format') != FORMAT_VERSION
+                or parameters.get('method') not in METHODS):
+            raise ValueError("Unsupported calibration parameters: expected format "
+                             f"{FORMAT_VERSION} with a method of {', '.join(METHODS)}")
+        self.method = parameters['method']
+        self.version = version
+        self.data_version = parameters.get('data_version')
+        self.curves = parameters.get('curves', {})
+        if not isinstance(self.curves, dict) or not all(
+                isinstance(group, dict) and all(_valid_curve(curve, self.method) for curve in group.values())
+                for group in self.curves.values()):
+            raise ValueError(f"Invalid calibration curves: expected {{destination: {{visa type: "
+                             f"{{'{self.method}': [two lists or numbers]}}}}}}")
+        self._tables = {}
+    
+    def _table(self, destination, visa_key):
+        """Probability per score for the most specific curve covering a group, or None"""
+        for group in ((destination, visa_key), (ANY, visa_key), (ANY, ANY)):
+            curve = self.curves.get(group[0], {}).get(group[1])
+            if curve is not None:
+                break
+        else:
+            return None
+        x = np.arange(SCORE_BINS, dtype=float)
+        if self.method == 'logistic':
+            slope, intercept = curve['logistic']
+            probabilities = 1.0 / (1.0 + np.exp(-(slope * x / 100.0 + intercept)))
+        else:
+            knots, rates = curve['isotonic']
+            probabilities = np.interp(x, knots, rates)
+        return probabilities.round(4).tolist()
+    
+    def probability(self, destination, visa_key, score):
+        """
+        Calibrated approval probability of an application
+        
+        Args:
+            destination (str): Destination country
+            visa_key (str): Visa type key
+            score (int): Eligibility score (0-100)
+        
+        Returns:
+            float: Probability between 0 and 1, or None if no curve covers the visa type
+        """
+        group = (destination, visa_key)
+        table = self._tables.get(group)
+        if table is None:
+            table = self._tables[group] = self._table(destination, visa_key) or ()
+        if not table:
+            return None
+        return table[min(max(int(score), 0), SCORE_BINS - 1)]
+
+
+def load_calibration(path=None):
+    """
+    The shared Calibration for a parameter file, re-read when the file changes
+    
+    Args:
+        path (str): Parameter file; VISAVERSE_CALIBRATION_PATH or
+            data/calibration.json by default
+    
+    Returns:
+        Calibration: The curves, or None if there is no parameter file
+    
+    Raises:
+        ValueError: If the parameter file is invalid
+    """
+    path = path or os.environ.get(CALIBRATION_PATH_ENV_VAR) or CALIBRATION_PATH
+    try:
+        modified = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    cached = _shared.get(path)
+    if cached is not None and cached[0] == modified:
+        return cached[1]
+    try:
+        with open(path, 'rb') as f:
+            raw = f.read()
+        calibration = Calibration(json.loads(raw.decode('utf-8')), hashlib.sha256(raw).hexdigest()[:16])
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON in calibration file {path}: {e}")
+    _shared[path] = (modified, calibration)
+    return calibration
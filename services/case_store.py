@@ -0,0 +1,353 @@
+"""
+Case Store - Persistent applicant cases with batched background writes
+
+A case holds one applicant's profile, checklist progress and last visa
+recommendations, so a returning user picks up where they left off. Cases
+live in a SQLite database in WAL mode, so page reads never wait for a write.
+
+Writes never touch the disk on the caller's thread. They are coalesced by
+key (ten toggles of one checkbox are one row) and a background thread
+commits everything pending in one transaction at most CASE_FLUSH_INTERVAL
+seconds after the first unwritten change. Reads see pending writes
+immediately.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import re
+import secrets
+import sqlite3
+import threading
+import time
+
+from services.metrics import count, timer
+from services.stores import DATA_DIR
+from utils.constants import CASES_PATH_ENV_VAR, CASE_FLUSH_INTERVAL
+
+CASES_DB_PATH = os.path.join(DATA_DIR, 'cases.db')
+
+_CASE_ID = re.compile(r'^[A-Za-z0-9_-]{8,64}$')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cases (
+    case_id TEXT PRIMARY KEY,
+    profile TEXT NOT NULL,
+    updated REAL NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS checklist_items (
+    case_id TEXT NOT NULL,
+    visa_type TEXT NOT NULL,
+    document TEXT NOT NULL,
+    checked INTEGER NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (case_id, visa_type, document)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS recommendations (
+    case_id TEXT PRIMARY KEY,
+    profile_hash TEXT NOT NULL,
+    data_version TEXT NOT NULL,
+    value TEXT NOT NULL,
+    updated REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+UPSERTS = {
+    'case': "INSERT INTO cases (case_id, profile, updated) VALUES (?, ?, ?) "
+            "ON CONFLICT (case_id) DO UPDATE SET profile = excluded.profile, updated = excluded.updated",
+    'check': "INSERT INTO checklist_items (case_id, visa_type, document, checked, updated) VALUES (?, ?, ?, ?, ?) "
+             "ON CONFLICT (case_id, visa_type, document) DO UPDATE SET "
+             "checked = excluded.checked, updated = excluded.updated",
+    'recommendations': "INSERT INTO recommendations (case_id, profile_hash, data_version, value, updated) "
+                       "VALUES (?, ?, ?, ?, ?) ON CONFLICT (case_id) DO UPDATE SET "
+                       "profile_hash = excluded.profile_hash, data_version = excluded.data_version, "
+                       "value = excluded.value, updated = excluded.updated"
+}
+
+
+def new_case_id():
+    """A random, URL-safe case id"""
+    return secrets.token_urlsafe(12)
+
+
+def validate_case_id(case_id):
+    """
+    Check a case id taken from a URL or a caller
+    
+    Raises:
+        ValueError: If the id is not 8-64 URL-safe characters
+    """
+    if not isinstance(case_id, str) or not _CASE_ID.match(case_id):
+        raise ValueError(f"Invalid case id {case_id!r}")
+    return case_id
+
+
+def profile_hash(profile):
+    """Short hash of a profile, to tell whether cached recommendations still apply"""
+    return hashlib.sha256(json.dumps(profile, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:16]
+
+
+class CaseStore:
+    def __init__(self, db_path=None, flush_interval=CASE_FLUSH_INTERVAL):
+        """
+        Open or create the case database and start the writer thread
+        
+        Args:
+            db_path (str): Database file; VISAVERSE_CASES_PATH or data/cases.db by default
+            flush_interval (float): Longest time in seconds a change waits
+                before it is written
+        """
+        self.db_path = db_path or os.environ.get(CASES_PATH_ENV_VAR) or CASES_DB_PATH
+        self.flush_interval = flush_interval
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        
+        self._writer_conn = self._connect()
+        self._writer_conn.execute("PRAGMA journal_mode=WAL")
+        # A crash can lose the last commits but never corrupts the database
+        self._writer_conn.execute("PRAGMA synchronous=NORMAL")
+        self._writer_conn.executescript(SCHEMA)
+        
+        self._local = threading.local()
+        self._readers = []
+        self._changed = threading.Condition()
+        self._pending = {}
+        self._writing = {}
+        self._first_pending = None
+        self._flush_requested = False
+        self._closed = False
+        self.stats = {'changes': 0, 'rows_written': 0, 'batches': 0, 'errors': 0}
+        
+        self._writer = threading.Thread(target=self._run, name='visaverse-case-writer', daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+    
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=64)
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+    
+    def _reader(self):
+        """The calling thread's read connection, opened on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            with self._changed:
+                self._readers.append(conn)
+        return conn
+    
+    # Writes
+    
+    def _put(self, key, row):
+        with self._changed:
+            if self._closed:
+                raise ValueError("Case store is closed")
+            if not self._pending:
+                self._first_pending = time.monotonic()
+            # Grouped by case, so a read only looks at its own case's changes
+            self._pending.setdefault(key[1], {})[key] = row
+            self.stats['changes'] += 1
+            self._changed.notify_all()
+    
+    def save_profile(self, case_id, profile):
+        """
+        Save an applicant's profile, replacing the previous one
+        
+        Args:
+            case_id (str): Case id
+            profile (dict): Profile as passed to VisaService
+        """
+        validate_case_id(case_id)
+        self._put(('case', case_id), (case_id, json.dumps(profile, sort_keys=True), time.time()))
+    
+    def set_checked(self, case_id, visa_type, document, checked):
+        """
+        Record whether a checklist document is ready
+        
+        Args:
+            case_id (str): Case id
+            visa_type (str): Checklist the document belongs to
+            document (str): Document name
+            checked (bool): Whether the document is ready
+        """
+        validate_case_id(case_id)
+        self._put(('check', case_id, visa_type, document),
+                  (case_id, visa_type, document, int(bool(checked)), time.time()))
+    
+    def save_recommendations(self, case_id, profile, data_version, recommendations):
+        """
+        Cache the recommendations computed for a profile
+        
+        Args:
+            case_id (str): Case id
+            profile (dict): Profile the recommendations were computed for
+            data_version (str): VisaService.recommendations_version they were computed with
+            recommendations (list): Result of get_visa_recommendations
+        """
+        validate_case_id(case_id)
+        self._put(('recommendations', case_id),
+                  (case_id, profile_hash(profile), data_version, json.dumps(recommendations), time.time()))
+    
+    def flush(self, timeout=None):
+        """
+        Write every pending change now and wait until it is committed
+        
+        Args:
+            timeout (float): Longest time to wait in seconds, unbounded by default
+        
+        Returns:
+            bool: True if nothing is left unwritten
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._changed:
+            self._flush_requested = True
+            self._changed.notify_all()
+            while (self._pending or self._writing) and self._writer.is_alive():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._changed.wait(remaining)
+            return not (self._pending or self._writing)
+    
+    def close(self):
+        """Flush pending changes, stop the writer thread and close the connections"""
+        with self._changed:
+            if self._closed:
+                return
+        self.flush()
+        with self._changed:
+            self._closed = True
+            self._changed.notify_all()
+        self._writer.join()
+        for conn in self._readers:
+            conn.close()
+        self._writer_conn.close()
+        atexit.unregister(self.close)
+    
+    def _run(self):
+        """Writer thread: wait for changes, let them collect, then commit them as one batch"""
+        changed = self._changed
+        while True:
+            with changed:
+                while not self._pending and not self._closed:
+                    changed.wait()
+                if not self._pending:
+                    return
+                deadline = self._first_pending + self.flush_interval
+                while not (self._closed or self._flush_requested):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    changed.wait(remaining)
+                batch = self._writing = self._pending
+                self._pending = {}
+                self._flush_requested = False
+            
+            ok = self._write(batch)
+            with changed:
+                if not ok:
+                    # Retry after another interval; changes made meanwhile are newer and win
+                    for case_id, changes in batch.items():
+                        pending = self._pending.setdefault(case_id, {})
+                        for key, row in changes.items():
+                            pending.setdefault(key, row)
+                    self._first_pending = time.monotonic()
+                self._writing = {}
+                changed.notify_all()
+    
+    def _write(self, batch):
+        """Commit one batch; returns False if it has to be retried"""
+        rows = {kind: [] for kind in UPSERTS}
+        for changes in batch.values():
+            for key, row in changes.items():
+                rows[key[0]].append(row)
+        written = sum(len(kind_rows) for kind_rows in rows.values())
+        try:
+            with timer('visaverse_case_flush_seconds'):
+                with self._writer_conn:
+                    for kind, kind_rows in rows.items():
+                        if kind_rows:
+                            self._writer_conn.executemany(UPSERTS[kind], kind_rows)
+        except sqlite3.Error:
+            self.stats['errors'] += 1
+            count('visaverse_case_writes_total', written, result='error')
+            # Give up on a closing store rather than retrying forever
+            return self._closed
+        self.stats['rows_written'] += written
+        self.stats['batches'] += 1
+        count('visaverse_case_writes_total', written, result='written')
+        return True
+    
+    # Reads
+    
+    def _unwritten(self, kind, case_id):
+        """Pending and in-flight changes of one kind for a case, newest last"""
+        with self._changed:
+            layers = (self._writing.get(case_id, {}), self._pending.get(case_id, {}))
+            return [row for layer in layers for key, row in layer.items() if key[0] == kind]
+    
+    def get_profile(self, case_id):
+        """
+        Load a case's profile
+        
+        Args:
+            case_id (str): Case id
+        
+        Returns:
+            dict: Saved profile, or None for an unknown case
+        """
+        validate_case_id(case_id)
+        unwritten = self._unwritten('case', case_id)
+        if unwritten:
+            return json.loads(unwritten[-1][1])
+        row = self._reader().execute("SELECT profile FROM cases WHERE case_id = ?", (case_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def get_checklist(self, case_id, visa_type):
+        """
+        Load a case's progress on one checklist
+        
+        Args:
+            case_id (str): Case id
+            visa_type (str): Checklist name, as used by DocumentService
+        
+        Returns:
+            dict: Document name -> checked, for documents ever toggled
+        """
+        validate_case_id(case_id)
+        unwritten = self._unwritten('check', case_id)
+        checklist = {
+            document: bool(checked) for document, checked in self._reader().execute(
+                "SELECT document, checked FROM checklist_items WHERE case_id = ? AND visa_type = ?",
+                (case_id, visa_type))
+        }
+        for _, row_visa_type, document, checked, _ in unwritten:
+            if row_visa_type == visa_type:
+                checklist[document] = bool(checked)
+        return checklist
+    
+    def get_recommendations(self, case_id, profile, data_version):
+        """
+        Cached recommendations, if they were computed for this exact profile and data
+        
+        Args:
+            case_id (str): Case id
+            profile (dict): Current profile
+            data_version (str): Current VisaService.recommendations_version
+        
+        Returns:
+            list: Cached recommendations, or None if there are none or they are stale
+        """
+        validate_case_id(case_id)
+        unwritten = self._unwritten('recommendations', case_id)
+        if unwritten:
+            row = unwritten[-1][1:4]
+        else:
+            row = self._reader().execute(
+                "SELECT profile_hash, data_version, value FROM recommendations WHERE case_id = ?", (case_id,)
+            ).fetchone()
+        if row is None or row[0] != profile_hash(profile) or row[1] != data_version:
+            return None
+        return json.loads(row[2])
@@ -0,0 +1,355 @@
+"""
+Compiled Stores - Validated, pre-indexed data artifact for the services
+
+`python -m tools.compile_data` checks both JSON files against a schema,
+resolves the references between them, derives the fields and indexes the
+services would otherwise compute on every request, and pickles the result.
+With VISAVERSE_STORAGE=compiled the services load that artifact directly,
+so startup does no parsing, validation or derivation.
+
+The artifact is a pickle and must only be loaded from a trusted location.
+"""
+
+import gc
+import os
+import pickle
+
+from services.durations import parse_duration_range, parse_visa_durations
+from services.metrics import timer
+from services.stores import (
+    JsonVisaStore, JsonCultureStore,
+    VISA_DATA_PATH, CULTURE_DATA_PATH, DATA_DIR,
+    load_json_file
+)
+from utils.constants import PURPOSE_VISA_TYPES, DEFAULT_PURPOSE_VISA_TYPES, EXPERIENCE_BUCKETS, AGE_BUCKETS
+
+COMPILED_DATA_PATH = os.path.join(DATA_DIR, 'visaverse.compiled')
+ARTIFACT_FORMAT = 3
+
+# Key used in the purpose index for purposes without their own mapping
+DEFAULT_PURPOSE = '*'
+
+NUMBER = (int, float)
+
+# Schemas: a type (or tuple of types), [item schema], or a dict of fields.
+# A field name ending in '?' is optional; a '*' field matches any key.
+VISA_RULES_SCHEMA = {
+    'visa_types': {
+        '*': {
+            'name': str,
+            'countries': [str],
+            'processing_time': str,
+            'validity': str,
+            'requirements': [str],
+            'success_factors': {'*': NUMBER},
+            'base_score?': NUMBER
+        }
+    },
+    'country_specific_info': {
+        '*': {
+            'common_visas': [str],
+            'processing_authority': str,
+            'average_approval_rate': NUMBER,
+            'special_notes?': str
+        }
+    },
+    'eligibility_criteria': {
+        'education_points': {'*': NUMBER},
+        'experience_points': {'*': NUMBER},
+        'age_points?': {'*': NUMBER}
+    }
+}
+
+CULTURE_DATA_SCHEMA = {
+    'countries': {
+        '*': {
+            'workplace_culture': {'*': str},
+            'communication_style': {'*': str},
+            'business_etiquette': {'*': str},
+            'tips': [str],
+            'time_zone': str,
+            'working_hours': str,
+            'holidays': [str]
+        }
+    },
+    'general_tips': {
+        'email_etiquette': {'*': str},
+        'virtual_meeting_tips': [str],
+        'cultural_adaptation': [str]
+    }
+}
+
+def _type_name(expected):
+    if isinstance(expected, tuple):
+        return 'number'
+    return expected.__name__
+
+
+def check_schema(value, schema, path, errors):
+    """
+    Check a value against a schema, collecting every problem
+    
+    Args:
+        value: Value to check
+        schema: Expected type, [item schema] or dict of field schemas
+        path (str): Location of the value, used in messages
+        errors (list): Problems found are appended here
+    """
+    if isinstance(schema, list):
+        if not isinstance(value, list):
+            errors.append(f"{path}: expected a list")
+            return
+        for i, item in enumerate(value):
+            check_schema(item, schema[0], f"{path}[{i}]", errors)
+    elif isinstance(schema, dict):
+        if not isinstance(value, dict):
+            errors.append(f"{path}: expected an object")
+            return
+        if '*' in schema:
+            for key, item in value.items():
+                check_schema(item, schema['*'], f"{path}.{key}", errors)
+            return
+        fields = {name.rstrip('?'): name.endswith('?') for name in schema}
+        for name, optional in fields.items():
+            if name not in value:
+                if not optional:
+                    errors.append(f"{path}.{name}: missing")
+                continue
+            check_schema(value[name], schema[name + '?' if optional else name], f"{path}.{name}", errors)
+        for name in value:
+            if name not in fields:
+                errors.append(f"{path}.{name}: unknown field")
+    elif isinstance(value, bool) or not isinstance(value, schema):
+        # bool is an int subclass, but never a valid number or string here
+        errors.append(f"{path}: expected {_type_name(schema)}, got {type(value).__name__}")
+
+
+def validate_visa_rules(data):
+    """
+    Validate visa rules against the schema and check their references
+    
+    Returns:
+        list: Problems found, empty if the data is valid
+    """
+    errors = []
+    check_schema(data, VISA_RULES_SCHEMA, 'visa_rules', errors)
+    if errors:
+        return errors
+    
+    visa_types = data['visa_types']
+    served = set()
+    for key, visa in visa_types.items():
+        served.update(visa['countries'])
+        duplicates = sorted({c for c in visa['countries'] if visa['countries'].count(c) > 1})
+        if duplicates:
+            errors.append(f"visa_rules.visa_types.{key}.countries: duplicate {', '.join(duplicates)}")
+        for field in ('processing_time', 'validity'):
+            try:
+                parse_duration_range(visa[field])
+            except ValueError as e:
+                errors.append(f"visa_rules.visa_types.{key}.{field}: {e}")
+        for factor, weight in visa['success_factors'].items():
+            if not 0 <= weight <= 1:
+                errors.append(f"visa_rules.visa_types.{key}.success_factors.{factor}: weight must be between 0 and 1")
+        if sum(visa['success_factors'].values()) <= 0:
+            errors.append(f"visa_rules.visa_types.{key}.success_factors: weights must not all be zero")
+        if not 0 <= visa.get('base_score', 0) <= 100:
+            errors.append(f"visa_rules.visa_types.{key}.base_score: must be between 0 and 100")
+    
+    for country, info in data['country_specific_info'].items():
+        if country not in served:
+            errors.append(f"visa_rules.country_specific_info.{country}: no visa type lists this country")
+        if not 0 <= info['average_approval_rate'] <= 1:
+            errors.append(f"visa_rules.country_specific_info.{country}.average_approval_rate: must be between 0 and 1")
+    
+    for purpose, keys in list(PURPOSE_VISA_TYPES.items()) + [('default', DEFAULT_PURPOSE_VISA_TYPES)]:
+        for key in keys:
+            if key not in visa_types:
+                errors.append(f"PURPOSE_VISA_TYPES[{purpose!r}]: unknown visa type '{key}'")
+    
+    for table, buckets in (('experience_points', EXPERIENCE_BUCKETS), ('age_points', AGE_BUCKETS)):
+        points = data['eligibility_criteria'].get(table)
+        if points is None:
+            continue
+        missing = [bucket for _, bucket in buckets if bucket not in points]
+        if missing:
+            errors.append(f"visa_rules.eligibility_criteria.{table}: missing buckets {', '.join(missing)}")
+    return errors
+
+
+def validate_culture_data(data):
+    """
+    Validate culture data against the schema
+    
+    Returns:
+        list: Problems found, empty if the data is valid
+    """
+    errors = []
+    check_schema(data, CULTURE_DATA_SCHEMA, 'culture_data', errors)
+    return errors
+
+
+def derive_visa_index(data):
+    """
+    Precompute the derived fields and lookup indexes for validated visa rules
+    
+    Returns:
+        dict: Parsed 'durations' per visa type, plus 'keys_by_country' and
+            'keys_by_purpose' lookup tables
+    """
+    visa_types = data['visa_types']
+    keys_by_country = {}
+    for key, visa in visa_types.items():
+        for country in visa['countries']:
+            keys_by_country.setdefault(country, []).append(key)
+    
+    purposes = dict(PURPOSE_VISA_TYPES)
+    purposes[DEFAULT_PURPOSE] = DEFAULT_PURPOSE_VISA_TYPES
+    keys_by_purpose = {}
+    for purpose, keys in purposes.items():
+        by_country = keys_by_purpose[purpose] = {}
+        for key in keys:
+            for country in visa_types[key]['countries']:
+                by_country.setdefault(country, []).append(key)
+    
+    return {
+        'durations': parse_visa_durations(visa_types),
+        'keys_by_country': keys_by_country,
+        'keys_by_purpose': keys_by_purpose
+    }
+
+
+def load_and_validate(visa_path=None, culture_path=None):
+    """
+    Load both JSON data files and validate them
+    
+    Returns:
+        tuple: (visa data, visa version, culture data, culture version)
+    
+    Raises:
+        ValueError: If either file fails validation; the message lists every problem
+    """
+    visa_data, visa_version = load_json_file(visa_path or VISA_DATA_PATH, 'visa_rules', 'Visa')
+    culture_data, culture_version = load_json_file(culture_path or CULTURE_DATA_PATH, 'culture_data', 'Culture')
+    
+    errors = validate_visa_rules(visa_data) + validate_culture_data(culture_data)
+    if errors:
+        raise ValueError("Data validation failed:\n  " + "\n  ".join(errors))
+    return visa_data, visa_version, culture_data, culture_version
+
+
+def build_artifact(output_path=None, visa_path=None, culture_path=None):
+    """
+    Validate the JSON data files and write the compiled artifact
+    
+    The file is a small header followed by one pickled section per dataset,
+    so each store unpickles only the section it serves.
+    
+    Args:
+        output_path (str): Artifact to write
+        visa_path (str): visa_rules.json to compile
+        culture_path (str): culture_data.json to compile
+    
+    Returns:
+        dict: The compiled sections, keyed 'visa' and 'culture'
+    
+    Raises:
+        ValueError: If either file fails validation; the message lists every problem
+    """
+    visa_data, visa_version, culture_data, culture_version = load_and_validate(visa_path, culture_path)
+    sections = {
+        'visa': {'version': visa_version, 'visa_rules': visa_data, 'visa_index': derive_visa_index(visa_data)},
+        'culture': {'version': culture_version, 'culture_data': culture_data}
+    }
+    payloads = {name: pickle.dumps(section, protocol=pickle.HIGHEST_PROTOCOL) for name, section in sections.items()}
+    offsets = {}
+    position = 0
+    for name, payload in payloads.items():
+        offsets[name] = (position, len(payload))
+        position += len(payload)
+    header = {'format': ARTIFACT_FORMAT, 'sections': offsets}
+    
+    output_path = output_path or COMPILED_DATA_PATH
+    tmp_path = f"{output_path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+        for payload in payloads.values():
+            f.write(payload)
+    os.replace(tmp_path, output_path)
+    return sections
+
+
+def load_section(path, section):
+    """
+    Load one section of a compiled artifact
+    
+    Args:
+        path (str): Artifact path
+        section (str): 'visa' or 'culture'
+    
+    Returns:
+        dict: The section
+    """
+    dataset = 'visa_rules' if section == 'visa' else 'culture_data'
+    try:
+        with timer('visaverse_data_load_seconds', dataset=dataset), open(path, 'rb') as f:
+            header = pickle.load(f)
+            if not isinstance(header, dict) or header.get('format') != ARTIFACT_FORMAT:
+                raise ValueError(f"Compiled data at {path} is from another version; re-run tools/compile_data.py")
+            offset, length = header['sections'][section]
+            f.seek(f.tell() + offset)
+            payload = f.read(length)
+            # The section is one large tree of new objects; collecting during the load only costs time
+            gc_was_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                return pickle.loads(payload)
+            finally:
+                if gc_was_enabled:
+                    gc.enable()
+    except FileNotFoundError:
+        raise FileNotFoundError(
+            f"Compiled data not found at {path}. "
+            f"Run `python -m tools.compile_data` to create it."
+        )
+    except pickle.UnpicklingError as e:
+        raise ValueError(f"Invalid compiled data file: {e}")
+
+
+class CompiledVisaStore(JsonVisaStore):
+    """Visa rules served from a compiled artifact, with precomputed indexes"""
+    
+    def __init__(self, data_path=None):
+        super().__init__(data_path or COMPILED_DATA_PATH)
+    
+    def reload(self):
+        """Re-read the artifact"""
+        section = load_section(self.data_path, 'visa')
+        self.data = section['visa_rules']
+        self.data_version = section['version']
+        self.index = section['visa_index']
+        self.durations = self.index['durations']
+    
+    def visa_keys_for(self, purpose, destination):
+        """Keys of visa types matching a purpose that are available in a destination"""
+        keys_by_purpose = self.index['keys_by_purpose']
+        by_country = keys_by_purpose[purpose if purpose in keys_by_purpose else DEFAULT_PURPOSE]
+        return list(by_country.get(destination, ()))
+    
+    def visa_type_names_for_country(self, country):
+        """Names of every visa type available in a country"""
+        visa_types = self.data['visa_types']
+        return [visa_types[key]['name'] for key in self.index['keys_by_country'].get(country, ())]
+
+
+class CompiledCultureStore(JsonCultureStore):
+    """Culture data served from a compiled artifact"""
+    
+    def __init__(self, data_path=None):
+        super().__init__(data_path or COMPILED_DATA_PATH)
+    
+    def reload(self):
+        """Re-read the artifact"""
+        section = load_section(self.data_path, 'culture')
+        self.data = section['culture_data']
+        self.data_version = section['version']
@@ -2,172 +2,226 @@
 Culture Service - Handles cultural guidance and communication tips
 """
 
-import json
-import os
+from services.locales import GENERAL_PACK, LocalePacks, localize
+from services.metrics import timed
+from services.stores import CULTURE_DATA_PATH, open_culture_store  # noqa: F401 - CULTURE_DATA_PATH re-exported
+from utils.constants import DEFAULT_LOCALE
 
 
 class CultureService:
-    def __init__(self):
-        """Initialize the culture service with data from JSON file"""
-        self.data = self._load_culture_data()
-    
-    def _load_culture_data(self):
-        """Load culture data from JSON file"""
-        data_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'culture_data.json')
-        try:
-            with open(data_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            raise FileNotFoundError(f"Culture data file not found at {data_path}. Please ensure data/culture_data.json exists.")
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Invalid JSON in culture data file: {e}")
-    
-    def get_country_culture(self, country):
+    def __init__(self, data_path=None, store=None, locales_dir=None):
+        """
+        Initialize the culture service with data from JSON file or SQLite
+        
+        Args:
+            data_path (str): Optional path to an alternative JSON data file
+            store: Optional store object; defaults to the backend selected
+                by VISAVERSE_STORAGE (see services/stores.py)
+            locales_dir (str): Optional directory of locale packs (see
+                services/locales.py)
+        """
+        self.store = store or open_culture_store(data_path)
+        self.locales = LocalePacks(locales_dir)
+    
+    @property
+    def data(self):
+        """The full culture data as a dict (rebuilt on every access for SQLite)"""
+        return self.store.data
+    
+    @property
+    def data_version(self):
+        """Hash identifying the loaded data"""
+        return self.store.data_version
+    
+    @timed
+    def reload(self):
+        """Re-read the data, picking up a new data version if it changed, and drop the loaded locale packs"""
+        self.store.reload()
+        self.locales.clear()
+    
+    def _country_field(self, country, field, default, locale):
+        value = self.store.get_country_field(country, field, default)
+        # Translations only replace fields the English data has
+        if locale is None or value is default:
+            return value
+        return localize(value, [pack.get(field) for pack in self.locales.chain(locale, country)])
+    
+    def _general_tip(self, name, default, locale):
+        value = self.store.get_general_tip(name, default)
+        if locale is None or value is default:
+            return value
+        return localize(value, [pack.get(name) for pack in self.locales.chain(locale, GENERAL_PACK)])
+    
+    @timed
+    def get_available_locales(self):
+        """
+        Get the locales cultural information is available in
+        
+        Returns:
+            list: Locale tags, English first
+        """
+        return [DEFAULT_LOCALE] + [locale for locale in self.locales.locales() if locale != DEFAULT_LOCALE]
+    
+    @timed
+    def get_country_culture(self, country, locale=None):
         """
         Get comprehensive cultural information for a country
         
         Args:
             country (str): Country name
+            locale (str): Optional locale tag such as 'pt-BR'; untranslated
+                fields fall back to less specific locales, then English
         
         Returns:
-            dict: Cultural information including workplace, communication, etiquette
+            dict: Cultural information including workplace, communication,
+                etiquette (a read-only mapping when translated)
+        
+        Raises:
+            ValueError: If the locale tag is invalid
         """
-        if country in self.data['countries']:
-            return self.data['countries'][country]
-        return None
+        record = self.store.get_country(country)
+        if locale is None or record is None:
+            return record
+        return localize(record, [pack or None for pack in self.locales.chain(locale, country)])
     
-    def get_workplace_culture(self, country):
+    @timed
+    def get_workplace_culture(self, country, locale=None):
         """
         Get workplace culture information for a country
         
         Args:
             country (str): Country name
+            locale (str): Optional locale tag; English by default
         
         Returns:
             dict: Workplace culture details
         """
-        country_data = self.get_country_culture(country)
-        if country_data:
-            return country_data.get('workplace_culture', {})
-        return {}
+        return self._country_field(country, 'workplace_culture', {}, locale)
     
-    def get_communication_style(self, country):
+    @timed
+    def get_communication_style(self, country, locale=None):
         """
         Get communication style information for a country
         
         Args:
             country (str): Country name
+            locale (str): Optional locale tag; English by default
         
         Returns:
             dict: Communication style details
         """
-        country_data = self.get_country_culture(country)
-        if country_data:
-            return country_data.get('communication_style', {})
-        return {}
+        return self._country_field(country, 'communication_style', {}, locale)
     
-    def get_business_etiquette(self, country):
+    @timed
+    def get_business_etiquette(self, country, locale=None):
         """
         Get business etiquette information for a country
         
         Args:
             country (str): Country name
+            locale (str): Optional locale tag; English by default
         
         Returns:
             dict: Business etiquette details
         """
-        country_data = self.get_country_culture(country)
-        if country_data:
-            return country_data.get('business_etiquette', {})
-        return {}
+        return self._country_field(country, 'business_etiquette', {}, locale)
     
-    def get_cultural_tips(self, country):
+    @timed
+    def get_cultural_tips(self, country, locale=None):
         """
         Get cultural tips for a country
         
         Args:
             country (str): Country name
+            locale (str): Optional locale tag; English by default
         
         Returns:
             list: List of cultural tips
         """
-        country_data = self.get_country_culture(country)
-        if country_data:
-            return country_data.get('tips', [])
-        return []
+        return self._country_field(country, 'tips', [], locale)
     
-    def get_time_zone_info(self, country):
+    @timed
+    def get_time_zone_info(self, country, locale=None):
         """
         Get time zone information for a country
         
         Args:
             country (str): Country name
+            locale (str): Optional locale tag; English by default
         
         Returns:
             str: Time zone information
         """
-        country_data = self.get_country_culture(country)
-        if country_data:
-            return country_data.get('time_zone', 'Not available')
-        return 'Not available'
+        return self._country_field(country, 'time_zone', 'Not available', locale)
     
-    def get_working_hours(self, country):
+    @timed
+    def get_working_hours(self, country, locale=None):
         """
         Get typical working hours for a country
         
         Args:
             country (str): Country name
+            locale (str): Optional locale tag; English by default
         
         Returns:
             str: Working hours information
         """
-        country_data = self.get_country_culture(country)
-        if country_data:
-            return country_data.get('working_hours', 'Not available')
-        return 'Not available'
+        return self._country_field(country, 'working_hours', 'Not available', locale)
     
-    def get_holidays(self, country):
+    @timed
+    def get_holidays(self, country, locale=None):
         """
         Get major holidays for a country
         
         Args:
             country (str): Country name
+            locale (str): Optional locale tag; English by default
         
         Returns:
             list: List of major holidays
         """
-        country_data = self.get_country_culture(country)
-        if country_data:
-            return country_data.get('holidays', [])
-        return []
+        return self._country_field(country, 'holidays', [], locale)
     
-    def get_email_etiquette(self):
+    @timed
+    def get_email_etiquette(self, locale=None):
         """
         Get general email etiquette guidelines
         
+        Args:
+            locale (str): Optional locale tag; English by default
+        
         Returns:
             dict: Email etiquette guidelines
         """
-        return self.data.get('general_tips', {}).get('email_etiquette', {})
+        return self._general_tip('email_etiquette', {}, locale)
     
-    def get_virtual_meeting_tips(self):
+    @timed
+    def get_virtual_meeting_tips(self, locale=None):
         """
         Get virtual meeting tips
         
+        Args:
+            locale (str): Optional locale tag; English by default
+        
         Returns:
             list: List of virtual meeting tips
         """
-        return self.data.get('general_tips', {}).get('virtual_meeting_tips', [])
+        return self._general_tip('virtual_meeting_tips', [], locale)
     
-    def get_cultural_adaptation_tips(self):
+    @timed
+    def get_cultural_adaptation_tips(self, locale=None):
         """
         Get cultural adaptation tips
         
+        Args:
+            locale (str): Optional locale tag; English by default
+        
         Returns:
             list: List of cultural adaptation tips
         """
-        return self.data.get('general_tips', {}).get('cultural_adaptation', [])
+        return self._general_tip('cultural_adaptation', [], locale)
     
+    @timed
     def get_available_countries(self):
         """
         Get list of countries with cultural information
@@ -175,21 +229,23 @@ class CultureService:
         Returns:
             list: List of country names
         """
-        return list(self.data['countries'].keys())
+        return self.store.countries()
     
-    def compare_communication_styles(self, country1, country2):
+    @timed
+    def compare_communication_styles(self, country1, country2, locale=None):
         """
         Compare communication styles between two countries
         
         Args:
             country1 (str): First country name
             country2 (str): Second country name
+            locale (str): Optional locale tag; English by default
         
         Returns:
             dict: Comparison of communication styles
         """
-        style1 = self.get_communication_style(country1)
-        style2 = self.get_communication_style(country2)
+        style1 = self.get_communication_style(country1, locale)
+        style2 = self.get_communication_style(country2, locale)
         
         return {
             'country1': {
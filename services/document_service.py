@@ -2,13 +2,26 @@
 Document Service - Handles document checking and readiness validation
 """
 
+import os
+
+from services.metrics import timed
+from services.overlays import Overlay, load_tenant_patch, tenant_patch_path
 from utils.constants import MIN_RESUME_LENGTH, MIN_OFFER_LENGTH
 
 
 class DocumentService:
-    def __init__(self):
-        """Initialize the document service"""
-        self.document_requirements = self._load_document_requirements()
+    def __init__(self, document_requirements=None):
+        """
+        Initialize the document service
+        
+        Args:
+            document_requirements (dict): Optional requirements to serve
+                instead of the built-in ones
+        """
+        if document_requirements is None:
+            document_requirements = self._load_document_requirements()
+        self.document_requirements = document_requirements
+        self._tenants = {}
     
     def _load_document_requirements(self):
         """Load document requirements for different visa types"""
@@ -70,6 +83,43 @@ class DocumentService:
             }
         }
     
+    @timed
+    def for_tenant(self, tenant, patch=None):
+        """
+        Get the service for one tenant's document requirements
+        
+        The tenant's patch is layered over the built-in requirements without
+        copying them, and the view is cached until the patch file changes.
+        
+        Args:
+            tenant (str): Tenant id
+            patch (dict): document_requirements patch to use instead of the
+                one in data/tenants/<tenant>.json
+        
+        Returns:
+            DocumentService: Service answering with the tenant's requirements
+        
+        Raises:
+            FileNotFoundError: If no patch is given and the tenant has no patch file
+            ValueError: If the tenant id or patch file is invalid
+        """
+        cached = self._tenants.get(tenant)
+        modified = None
+        if patch is None:
+            try:
+                modified = os.stat(tenant_patch_path(tenant)).st_mtime_ns
+            except FileNotFoundError:
+                pass
+            if cached is not None and modified is not None and cached[0] == modified:
+                return cached[2]
+            patch = load_tenant_patch(tenant)['document_requirements']
+        elif cached is not None and cached[1] is patch:
+            return cached[2]
+        service = DocumentService(Overlay(self.document_requirements, patch))
+        self._tenants[tenant] = (modified, patch, service)
+        return service
+    
+    @timed
     def get_required_documents(self, visa_type):
         """
         Get list of required documents for a visa type
@@ -84,6 +134,7 @@ class DocumentService:
             return self.document_requirements[visa_type]
         return {'essential': [], 'specific': []}
     
+    @timed
     def calculate_readiness_score(self, visa_type, checked_documents):
         """
         Calculate document readiness score
@@ -120,6 +171,7 @@ class DocumentService:
             'missing': missing
         }
     
+    @timed
     def check_passport_validity(self, expiry_months):
         """
         Check if passport meets validity requirements
@@ -149,6 +201,7 @@ class DocumentService:
                 'recommendation': 'You must renew your passport before applying for a visa.'
             }
     
+    @timed
     def analyze_resume(self, resume_text):
         """
         Analyze resume/CV for completeness
@@ -206,6 +259,7 @@ class DocumentService:
             'suggestions': suggestions if suggestions else ['Resume looks good!']
         }
     
+    @timed
     def analyze_offer_letter(self, offer_text):
         """
         Analyze job offer letter for key information
@@ -0,0 +1,129 @@
+"""
+Durations - Parsed processing-time and validity ranges with a sorted index
+
+visa_rules.json describes durations as text ("3-6 weeks", "Up to 5 years").
+The stores parse them into (min days, max days) ranges when the data loads,
+with None for an open-ended maximum ("Duration of course + 4-6 months"),
+and DurationIndex keeps every visa option sorted by worst-case processing
+time so "everything processed within N days" is a binary search.
+"""
+
+import functools
+import re
+from bisect import bisect_right
+
+from utils.constants import PURPOSE_VISA_TYPES, DEFAULT_PURPOSE_VISA_TYPES
+
+DAYS_PER_UNIT = {'day': 1, 'week': 7, 'month': 30, 'year': 365}
+
+_DURATION_TOKEN = re.compile(r'(\d+(?:\.\d+)?)\+?(?:\s*(day|week|month|year)s?\b)?', re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_duration_range(text):
+    """
+    Parse a duration description into a day range
+    
+    Numbers without a unit take the next unit in the text, so '3-6 weeks'
+    is 21 to 42 days and '6 months to 10 years' is 180 to 3650 days.
+    'Up to ...' ranges start at 0. A '+' makes the range open-ended: a
+    duration added to something unquantified ('Duration of course + 4-6
+    months') or a bare minimum ('5+ years') has no known maximum. The same
+    few descriptions repeat across visa types, so results are cached.
+    
+    Args:
+        text (str): Duration such as '3-6 weeks' or 'Up to 5 years'
+    
+    Returns:
+        tuple: (min days, max days), max None when open-ended
+    
+    Raises:
+        ValueError: If the text contains no duration
+    """
+    values = []
+    pending = []
+    for number, unit in _DURATION_TOKEN.findall(text):
+        pending.append(float(number))
+        if unit:
+            values.extend(n * DAYS_PER_UNIT[unit.lower()] for n in pending)
+            pending = []
+    if not values:
+        raise ValueError(f"No duration found in {text!r}")
+    low = 0 if text.strip().lower().startswith('up to') else min(values)
+    if '+' in text:
+        return int(low), None
+    return int(low), int(max(values))
+
+
+def parse_visa_durations(visa_types):
+    """
+    Parse the processing time and validity of every visa type
+    
+    Args:
+        visa_types (dict): visa_types section of visa_rules.json
+    
+    Returns:
+        dict: visa_key -> {'processing_days': (min, max), 'validity_days': (min, max)};
+            max is None when open-ended
+    
+    Raises:
+        ValueError: If a duration cannot be parsed
+    """
+    durations = {}
+    for key, visa in visa_types.items():
+        try:
+            durations[key] = {
+                'processing_days': parse_duration_range(visa['processing_time']),
+                'validity_days': parse_duration_range(visa['validity'])
+            }
+        except ValueError as e:
+            raise ValueError(f"Invalid duration in visa type '{key}': {e}")
+    return durations
+
+
+class DurationIndex:
+    def __init__(self, store):
+        """
+        Index every (destination, visa type) option by worst-case processing time
+        
+        Options are grouped by the travel purposes they serve, and each group
+        is kept sorted by maximum processing days, then minimum days.
+        
+        Args:
+            store: Visa store providing visa_type_keys, get_visa_type and duration_ranges
+        """
+        self.data_version = store.data_version
+        durations = store.duration_ranges()
+        visa_types = {key: store.get_visa_type(key) for key in store.visa_type_keys()}
+        
+        purposes = dict(PURPOSE_VISA_TYPES)
+        purposes[None] = DEFAULT_PURPOSE_VISA_TYPES
+        self._groups = {}
+        for purpose, keys in purposes.items():
+            options = []
+            for key in keys:
+                visa = visa_types.get(key)
+                if visa is None:
+                    continue
+                low, high = durations[key]['processing_days']
+                if high is None:
+                    # No worst case, so never within a number of days
+                    continue
+                for destination in visa['countries']:
+                    options.append((high, low, destination, key))
+            options.sort()
+            self._groups[purpose] = (options, [option[0] for option in options])
+    
+    def within(self, purpose, max_days):
+        """
+        Options for a purpose whose worst-case processing time is at most max_days
+        
+        Args:
+            purpose (str): Travel purpose
+            max_days (int): Longest acceptable processing time in days
+        
+        Returns:
+            list: (max days, min days, destination, visa_key) tuples, quickest worst case first
+        """
+        options, highs = self._groups.get(purpose) or self._groups[None]
+        return options[:bisect_right(highs, max_days)]
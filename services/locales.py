@@ -0,0 +1,206 @@
+"""
+Locales - Culture content in other languages, loaded per locale and country on first use
+
+The English culture data stays in culture_data.json. A translation is a
+pack per locale and country holding only the fields it translates, in the
+shape of the country's culture record:
+
+    data/locales/pt-BR/brazil.json      {"workplace_culture": {"hierarchy": "..."}, "tips": [...]}
+    data/locales/pt/_general.json       {"virtual_meeting_tips": [...]}
+
+_general.json translates the general tips. A locale falls back subtag by
+subtag and then to English, field by field: for pt-BR a field comes from
+the pt-BR pack, else the pt pack, else the English data. The packs are
+layered over the English record as overlays (services/overlays.py), so
+untranslated fields are the English objects themselves, never copies.
+
+Packs are read when first asked for, and only the LOCALE_CACHE_SIZE most
+recently used (locale, country) packs are kept, so memory follows the hot
+pairs rather than the number of locales.
+"""
+
+import functools
+import os
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from services.metrics import count
+from services.overlays import Overlay
+from services.stores import DATA_DIR, load_json_file
+from utils.constants import DEFAULT_LOCALE, LOCALE_CACHE_SIZE, LOCALES_DIR_ENV_VAR
+
+LOCALES_DIR = os.path.join(DATA_DIR, 'locales')
+GENERAL_PACK = '_general'
+
+_LOCALE = re.compile(r'^[A-Za-z]{2,3}(?:[-_][A-Za-z0-9]{2,8})*$')
+_SLUG = re.compile(r'[^a-z0-9]+')
+
+
+def normalize_locale(locale):
+    """
+    Canonical form of a locale tag, e.g. 'pt_br' -> 'pt-BR', 'zh-hant' -> 'zh-Hant'
+    
+    Raises:
+        ValueError: If the tag is not a language tag
+    """
+    if not isinstance(locale, str) or not _LOCALE.match(locale):
+        raise ValueError(f"Invalid locale {locale!r}; use a tag like 'pt-BR'")
+    language, *subtags = locale.replace('_', '-').split('-')
+    parts = [language.lower()]
+    for subtag in subtags:
+        if len(subtag) == 2 or subtag.isdigit():
+            parts.append(subtag.upper())
+        elif len(subtag) == 4:
+            parts.append(subtag.title())
+        else:
+            parts.append(subtag.lower())
+    return '-'.join(parts)
+
+
+@functools.lru_cache(maxsize=256)
+def fallback_chain(locale):
+    """
+    Locales to look in, most specific first, before the English data
+    
+    Args:
+        locale (str): Locale tag, e.g. 'zh-Hant-TW'
+    
+    Returns:
+        tuple: e.g. ('zh-Hant-TW', 'zh-Hant', 'zh'); empty for English
+    
+    Raises:
+        ValueError: If the tag is not a language tag
+    """
+    parts = normalize_locale(locale).split('-')
+    chain = ['-'.join(parts[:end]) for end in range(len(parts), 0, -1)]
+    return tuple(tag for tag in chain if tag != DEFAULT_LOCALE)
+
+
+def pack_name(country):
+    """File name stem of a country's pack, e.g. 'United Kingdom' -> 'united-kingdom'"""
+    return _SLUG.sub('-', country.lower()).strip('-')
+
+
+def localize(value, patches):
+    """
+    Layer translated values over an English value
+    
+    Args:
+        value: English value (a record, a field or a general tip)
+        patches (list): Translated values, least specific locale first;
+            None where a locale does not translate the value
+    
+    Returns:
+        The value the most specific translation gives; mappings are merged
+        key by key as overlays, anything else is replaced
+    """
+    for patch in patches:
+        if patch is None:
+            continue
+        if isinstance(patch, dict) and isinstance(value, Mapping):
+            value = Overlay(value, patch)
+        else:
+            value = patch
+    return value
+
+
+class LocalePacks:
+    def __init__(self, locales_dir=None, cache_size=LOCALE_CACHE_SIZE):
+        """
+        Lazily loaded locale packs with a bounded cache
+        
+        Args:
+            locales_dir (str): Directory of locale packs; VISAVERSE_LOCALES_DIR
+                or data/locales by default
+            cache_size (int): Most (locale, country) packs kept in memory
+        """
+        self.locales_dir = locales_dir or os.environ.get(LOCALES_DIR_ENV_VAR) or LOCALES_DIR
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._packs = OrderedDict()
+        self._locales = None
+        self.hits = 0
+        self.misses = 0
+    
+    def locales(self):
+        """Locales with a pack directory, sorted; English is the culture data itself"""
+        locales = self._locales
+        if locales is None:
+            try:
+                names = os.listdir(self.locales_dir)
+            except FileNotFoundError:
+                names = []
+            locales = sorted(name for name in names
+                             if _LOCALE.match(name) and os.path.isdir(os.path.join(self.locales_dir, name)))
+            self._locales = locales
+        return locales
+    
+    def pack(self, locale, country):
+        """
+        One locale's translations for a country, loading them on first use
+        
+        Args:
+            locale (str): Normalized locale tag
+            country (str): Country name, or GENERAL_PACK for the general tips
+        
+        Returns:
+            dict: The pack, empty if the locale does not translate the country
+        
+        Raises:
+            ValueError: If the pack file is invalid
+        """
+        key = (locale, country)
+        with self._lock:
+            pack = self._packs.get(key)
+            if pack is not None:
+                self._packs.move_to_end(key)
+        if pack is not None:
+            self.hits += 1
+            count('visaverse_cache_requests_total', cache='locale_pack', result='hit')
+            return pack
+        self.misses += 1
+        count('visaverse_cache_requests_total', cache='locale_pack', result='miss')
+        pack = {}
+        if locale in self.locales():
+            name = country if country == GENERAL_PACK else pack_name(country)
+            path = os.path.join(self.locales_dir, locale, f"{name}.json")
+            if os.path.exists(path):
+                pack, _ = load_json_file(path, 'locale_pack', f"Locale {locale} {country}")
+                if not isinstance(pack, dict):
+                    raise ValueError(f"Locale pack {path} must be a JSON object")
+        # Missing packs are cached too, so untranslated countries are not looked up again
+        with self._lock:
+            self._packs[key] = pack
+            self._packs.move_to_end(key)
+            while len(self._packs) > self.cache_size:
+                self._packs.popitem(last=False)
+        return pack
+    
+    def chain(self, locale, country):
+        """
+        Packs for a country along a locale's fallback chain
+        
+        Args:
+            locale (str): Requested locale tag
+            country (str): Country name, or GENERAL_PACK
+        
+        Returns:
+            list: Packs least specific first, as localize() takes them;
+                locales without a pack directory are skipped
+        
+        Raises:
+            ValueError: If the locale tag or a pack file is invalid
+        """
+        available = self.locales()
+        return [self.pack(tag, country) for tag in reversed(fallback_chain(locale)) if tag in available]
+    
+    def __len__(self):
+        return len(self._packs)
+    
+    def clear(self):
+        """Drop every loaded pack and rescan the locale directories"""
+        with self._lock:
+            self._packs.clear()
+            self._locales = None
@@ -0,0 +1,282 @@
+"""
+Metrics - Lightweight in-process counters, gauges and histograms
+
+Metrics are switched on with the VISAVERSE_METRICS environment variable.
+When they are off, @timed returns the method unchanged and the other helpers
+return immediately, so instrumented code pays next to nothing.
+"""
+
+import functools
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from services.traffic import recorded
+from utils.constants import METRICS_ENV_VAR
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get(METRICS_ENV_VAR, '').lower() in ('1', 'true', 'yes', 'on')
+
+# Histogram bucket upper bounds in seconds
+DEFAULT_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+)
+
+HELP_TEXT = {
+    'visaverse_calls_total': 'Service method calls',
+    'visaverse_errors_total': 'Service method calls that raised',
+    'visaverse_call_duration_seconds': 'Service method latency',
+    'visaverse_data_load_seconds': 'Time spent loading a data file',
+    'visaverse_cache_requests_total': 'Cache lookups by result',
+    'visaverse_cache_entries': 'Entries held by a cache',
+    'visaverse_warmup_progress': 'Fraction of the warm-up steps done',
+    'visaverse_payload_responses_total': 'Read endpoint responses by status and content coding',
+    'visaverse_case_writes_total': 'Case store rows written by result',
+    'visaverse_case_flush_seconds': 'Time spent writing a batch of case rows',
+    'visaverse_shard_call_seconds': 'Latency of a call to a shard worker, including the round trip',
+    'visaverse_shard_errors_total': 'Calls a shard worker answered with an error',
+    'visaverse_shard_rss_bytes': 'Resident memory of a shard worker'
+}
+
+
+class MetricsRegistry:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        Initialize an empty registry
+        
+        Args:
+            buckets (tuple): Histogram bucket upper bounds in seconds
+        """
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        self._collectors = []
+    
+    def add_collector(self, collect):
+        """Run a callable before every snapshot, to copy in values kept elsewhere such as in worker processes"""
+        with self._lock:
+            self._collectors.append(collect)
+    
+    def remove_collector(self, collect):
+        """Stop running a collector added with add_collector"""
+        with self._lock:
+            if collect in self._collectors:
+                self._collectors.remove(collect)
+    
+    def inc(self, name, value=1, **labels):
+        """Increase a counter"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+    
+    def set_counter(self, name, value, **labels):
+        """Set a counter to a total counted elsewhere"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = value
+    
+    def set_gauge(self, name, value, **labels):
+        """Set a gauge to an absolute value"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._gauges[key] = value
+    
+    def observe(self, name, value, **labels):
+        """Record one observation in a histogram"""
+        key = (name, tuple(sorted(labels.items())))
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {
+                    'buckets': [0] * (len(self.buckets) + 1),
+                    'sum': 0.0,
+                    'count': 0,
+                    'max': 0.0
+                }
+            histogram['buckets'][index] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+            if value > histogram['max']:
+                histogram['max'] = value
+    
+    def reset(self):
+        """Drop every recorded value"""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+    
+    def snapshot(self):
+        """
+        Copy the current values
+        
+        Returns:
+            dict: 'counters', 'gauges' and 'histograms', each keyed by (name, labels)
+        """
+        with self._lock:
+            collectors = list(self._collectors)
+        for collect in collectors:
+            try:
+                collect()
+            except Exception:
+                # A failing collector must not take the other metrics down with it
+                logger.warning("Metrics collector %r failed", collect, exc_info=True)
+        with self._lock:
+            return {
+                'counters': dict(self._counters),
+                'gauges': dict(self._gauges),
+                'histograms': {
+                    key: dict(h, buckets=list(h['buckets'])) for key, h in self._histograms.items()
+                }
+            }
+    
+    def histogram_summary(self):
+        """
+        Summarize every histogram for display
+        
+        Returns:
+            list: Dicts with name, labels, count, mean and approximate p95 in seconds
+        """
+        rows = []
+        for (name, labels), h in sorted(self.snapshot()['histograms'].items()):
+            rows.append({
+                'name': name,
+                'labels': dict(labels),
+                'count': h['count'],
+                'mean': h['sum'] / h['count'] if h['count'] else 0.0,
+                'p95': self._bucket_quantile(h, 0.95),
+                'max': h['max']
+            })
+        return rows
+    
+    def _bucket_quantile(self, histogram, q):
+        """Upper bound of the bucket holding the q-th quantile"""
+        target = q * histogram['count']
+        running = 0
+        for bound, count in zip(self.buckets + (histogram['max'],), histogram['buckets']):
+            running += count
+            if running >= target:
+                return min(bound, histogram['max'])
+        return histogram['max']
+    
+    def render_prometheus(self):
+        """
+        Render every metric in the Prometheus text exposition format
+        
+        Returns:
+            str: Exposition text
+        """
+        snapshot = self.snapshot()
+        lines = []
+        typed = set()
+        
+        def header(name, kind):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# HELP {name} {HELP_TEXT.get(name, name)}")
+                lines.append(f"# TYPE {name} {kind}")
+        
+        for (name, labels), value in sorted(snapshot['counters'].items()):
+            header(name, 'counter')
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        
+        for (name, labels), value in sorted(snapshot['gauges'].items()):
+            header(name, 'gauge')
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        
+        for (name, labels), h in sorted(snapshot['histograms'].items()):
+            header(name, 'histogram')
+            cumulative = 0
+            for bound, count in zip(self.buckets, h['buckets']):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', repr(bound)),))} {cumulative}")
+            lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {h['count']}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(h['sum'])}")
+            lines.append(f"{name}_count{_format_labels(labels)} {h['count']}")
+        
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels):
+    """Render a label tuple as {key="value",...}"""
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape_label_value(value)}"' for key, value in labels) + '}'
+
+
+def _escape_label_value(value):
+    """Escape backslashes, newlines and quotes as the exposition format requires"""
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value):
+    """Render a sample value"""
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+REGISTRY = MetricsRegistry()
+
+
+def timed(fn):
+    """
+    Record call counts, errors and latency for a service method
+    
+    The metric label is the method's qualified name, e.g.
+    'VisaService.get_visa_recommendations'. With metrics disabled the method
+    is returned unchanged. Calls are also captured to the traffic log when
+    that is on (see services/traffic.py).
+    """
+    fn = recorded(fn)
+    if not ENABLED:
+        return fn
+    
+    method = fn.__qualname__
+    
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            REGISTRY.inc('visaverse_errors_total', method=method)
+            raise
+        finally:
+            REGISTRY.inc('visaverse_calls_total', method=method)
+            REGISTRY.observe('visaverse_call_duration_seconds', time.perf_counter() - start, method=method)
+    
+    return wrapper
+
+
+@contextmanager
+def timer(name, **labels):
+    """Record the duration of a block in a histogram"""
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        REGISTRY.observe(name, time.perf_counter() - start, **labels)
+
+
+def count(name, value=1, **labels):
+    """Increase a counter if metrics are enabled"""
+    if ENABLED:
+        REGISTRY.inc(name, value, **labels)
+
+
+def gauge(name, value, **labels):
+    """Set a gauge if metrics are enabled"""
+    if ENABLED:
+        REGISTRY.set_gauge(name, value, **labels)
@@ -0,0 +1,180 @@
+"""
+Occupations - Fuzzy job-title matching against the local occupation list
+
+data/occupations.json lists occupations with an ISCO-08 unit group code,
+alternative titles and the destinations that have them on a shortage list.
+Every title is broken into character trigrams and indexed, so a free-text
+job title is matched by counting shared trigrams over a few posting lists
+rather than comparing it with every title.
+"""
+
+import os
+import re
+
+import numpy as np
+
+from services.stores import DATA_DIR, load_json_file
+from utils.constants import MIN_OCCUPATION_SIMILARITY
+
+OCCUPATION_DATA_PATH = os.path.join(DATA_DIR, 'occupations.json')
+
+# Job titles repeat across requests; memoized matches are dropped in bulk past this size
+MATCH_CACHE_SIZE = 4096
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+# One index per data file, shared by every service and tenant view
+_shared_indexes = {}
+
+
+def normalize_title(text):
+    """Lowercase a title and reduce punctuation and spacing to single spaces"""
+    return _NON_ALNUM.sub(' ', text.lower()).strip()
+
+
+def trigrams(title):
+    """
+    Character trigrams of a normalized title
+    
+    Words are padded so prefixes and whole short words ('hr', 'qa') still
+    produce trigrams.
+    
+    Args:
+        title (str): Normalized title
+    
+    Returns:
+        set: Trigram strings
+    """
+    grams = set()
+    for word in title.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class OccupationIndex:
+    def __init__(self, data_path=None):
+        """
+        Load the occupation list and build the trigram index
+        
+        Args:
+            data_path (str): Optional path to an alternative occupation file
+        """
+        self.data_path = data_path or OCCUPATION_DATA_PATH
+        self.reload()
+    
+    def refresh(self):
+        """Rebuild the index only if the occupation file changed on disk"""
+        if self._file_signature() != self.file_signature:
+            self.reload()
+    
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.data_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def reload(self):
+        """Re-read the occupation file and rebuild the index"""
+        self.file_signature = self._file_signature()
+        data, self.data_version = load_json_file(self.data_path, 'occupations', 'Occupation')
+        self.occupations = data['occupations']
+        
+        # Each title, main or alternative, is one entry pointing at its occupation
+        self.exact = {}
+        owners = []
+        gram_counts = []
+        postings = {}
+        for position, occupation in enumerate(self.occupations):
+            for title in [occupation['title']] + occupation.get('alternative_titles', []):
+                normalized = normalize_title(title)
+                if not normalized or normalized in self.exact:
+                    continue
+                entry = len(owners)
+                self.exact[normalized] = entry
+                owners.append(position)
+                grams = trigrams(normalized)
+                gram_counts.append(len(grams))
+                for gram in grams:
+                    postings.setdefault(gram, []).append(entry)
+        
+        self.owners = owners
+        self.titles = list(self.exact)
+        self.gram_counts = np.array(gram_counts, dtype=np.int32)
+        self.postings = {gram: np.array(entries, dtype=np.int32) for gram, entries in postings.items()}
+        self._matches = {}
+    
+    def match(self, job_title, min_similarity=MIN_OCCUPATION_SIMILARITY):
+        """
+        Resolve a free-text job title to the closest occupation
+        
+        Similarity is the Dice coefficient of the two titles' trigram sets,
+        1.0 for an exact match after normalization. Results are memoized per
+        title, so treat them as read-only.
+        
+        Args:
+            job_title (str): Job title as typed by the user
+            min_similarity (float): Weakest similarity accepted as a match
+        
+        Returns:
+            dict: 'code', 'title', 'matched_title', 'similarity' and
+                'shortage' (destinations listing the occupation as in
+                shortage), or None if nothing is similar enough
+        """
+        key = (job_title, min_similarity)
+        try:
+            return self._matches[key]
+        except KeyError:
+            pass
+        result = self._match(job_title, min_similarity)
+        if len(self._matches) >= MATCH_CACHE_SIZE:
+            self._matches.clear()
+        self._matches[key] = result
+        return result
+    
+    def _match(self, job_title, min_similarity):
+        normalized = normalize_title(job_title or '')
+        if not normalized:
+            return None
+        entry = self.exact.get(normalized)
+        if entry is not None:
+            return self._result(entry, 1.0)
+        
+        grams = trigrams(normalized)
+        lists = [self.postings[gram] for gram in grams if gram in self.postings]
+        if not lists:
+            return None
+        shared = np.bincount(np.concatenate(lists), minlength=len(self.owners))
+        similarity = 2.0 * shared / (len(grams) + self.gram_counts)
+        entry = int(similarity.argmax())
+        if similarity[entry] < min_similarity:
+            return None
+        return self._result(entry, round(float(similarity[entry]), 3))
+    
+    def _result(self, entry, similarity):
+        occupation = self.occupations[self.owners[entry]]
+        return {
+            'code': occupation['code'],
+            'title': occupation['title'],
+            'matched_title': self.titles[entry],
+            'similarity': similarity,
+            'shortage': occupation.get('shortage', [])
+        }
+
+
+def shared_occupation_index(data_path=None):
+    """
+    The process-wide index for an occupation file, built on first use
+    
+    Args:
+        data_path (str): Optional path to an alternative occupation file
+    
+    Returns:
+        OccupationIndex: The shared index
+    """
+    path = data_path or OCCUPATION_DATA_PATH
+    index = _shared_indexes.get(path)
+    if index is None:
+        index = _shared_indexes[path] = OccupationIndex(path)
+    return index
@@ -0,0 +1,169 @@
+"""
+Overlays - Sparse per-tenant patches layered over the shared data
+
+A tenant (a client company) adjusts the base data with a small patch
+instead of a full copy. An Overlay resolves lookups through the patch first
+and the base data second; anything the patch does not touch is the base
+object itself, shared by every tenant, so each tenant costs memory in
+proportion to its patch.
+
+Patch rules, applied at any depth:
+    {"key": {...}}        merge into the base mapping
+    {"key": value}        replace the base value (lists are replaced whole)
+    {"key": null}         remove the key
+    {"key+": [...]}       append items to the base list
+
+Tenant patches live in data/tenants/<tenant>.json with an optional section
+per dataset:
+
+    {
+        "visa_rules": {"visa_types": {"skilled_worker": {"countries": ["Canada"]}}},
+        "document_requirements": {"Skilled Worker": {"specific+": ["Employer relocation agreement"]}}
+    }
+"""
+
+import hashlib
+import json
+import os
+import re
+from collections.abc import Mapping
+
+from services.durations import parse_visa_durations
+from services.stores import DATA_DIR, JsonVisaStore, load_json_file
+
+TENANTS_DIR = os.path.join(DATA_DIR, 'tenants')
+TENANT_SECTIONS = ('visa_rules', 'document_requirements')
+
+APPEND_SUFFIX = '+'
+
+_TENANT_ID = re.compile(r'^[a-z0-9][a-z0-9_-]{0,63}$')
+
+
+class Overlay(Mapping):
+    """Read-only mapping that resolves keys through a patch, then a base mapping"""
+    
+    __slots__ = ('base', 'patch', '_resolved')
+    
+    def __init__(self, base, patch):
+        self.base = base
+        self.patch = patch
+        # Only values the patch changes are built and kept here
+        self._resolved = {}
+    
+    def __getitem__(self, key):
+        resolved = self._resolved.get(key)
+        if resolved is not None:
+            return resolved
+        patch = self.patch
+        if key in patch:
+            value = patch[key]
+            if value is None:
+                raise KeyError(key)
+            if isinstance(value, dict):
+                below = self.base.get(key)
+                value = Overlay(below if isinstance(below, Mapping) else {}, value)
+        elif key + APPEND_SUFFIX in patch:
+            value = list(self.base.get(key, ())) + patch[key + APPEND_SUFFIX]
+        else:
+            return self.base[key]
+        self._resolved[key] = value
+        return value
+    
+    def __iter__(self):
+        patch = self.patch
+        for key in self.base:
+            if patch.get(key, key) is not None:
+                yield key
+        for key in patch:
+            name = key[:-len(APPEND_SUFFIX)] if key.endswith(APPEND_SUFFIX) else key
+            if name not in self.base and patch[key] is not None and not (name != key and name in patch):
+                yield name
+    
+    def __len__(self):
+        return sum(1 for _ in self)
+    
+    def __repr__(self):
+        return f"Overlay({dict(self)!r})"
+
+
+def patch_version(patch):
+    """Short hash identifying a patch's contents"""
+    return hashlib.sha256(json.dumps(patch, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def tenant_patch_path(tenant, tenants_dir=None):
+    """
+    Path of a tenant's patch file
+    
+    Raises:
+        ValueError: If the tenant id is invalid
+    """
+    if not isinstance(tenant, str) or not _TENANT_ID.match(tenant):
+        raise ValueError(f"Invalid tenant id {tenant!r}")
+    return os.path.join(tenants_dir or TENANTS_DIR, f"{tenant}.json")
+
+
+def load_tenant_patch(tenant, tenants_dir=None):
+    """
+    Load a tenant's patch file
+    
+    Args:
+        tenant (str): Tenant id: lowercase letters, digits, '-' and '_'
+        tenants_dir (str): Directory of patch files, data/tenants by default
+    
+    Returns:
+        dict: Patch per section; sections the file leaves out are empty
+    
+    Raises:
+        ValueError: If the tenant id or the file is invalid
+        FileNotFoundError: If the tenant has no patch file
+    """
+    path = tenant_patch_path(tenant, tenants_dir)
+    patch, _ = load_json_file(path, 'tenant_patch', f"Tenant '{tenant}'")
+    if not isinstance(patch, dict):
+        raise ValueError(f"Tenant '{tenant}' patch must be a JSON object")
+    unknown = sorted(set(patch) - set(TENANT_SECTIONS))
+    if unknown:
+        raise ValueError(f"Tenant '{tenant}' patch has unknown sections: {', '.join(unknown)}")
+    sections = {}
+    for section in TENANT_SECTIONS:
+        value = patch.get(section) or {}
+        if not isinstance(value, dict):
+            raise ValueError(f"Tenant '{tenant}' patch section '{section}' must be a JSON object")
+        sections[section] = value
+    return sections
+
+
+class TenantVisaStore(JsonVisaStore):
+    """Visa rules for one tenant: the base rules seen through the tenant's patch"""
+    
+    def __init__(self, base_data, base_version, base_durations, patch):
+        """
+        Layer a patch over a snapshot of the base visa rules
+        
+        Args:
+            base_data (dict): Base visa rules, shared and never modified
+            base_version (str): Data version of the base rules
+            base_durations (dict): Parsed duration ranges of the base rules
+            patch (dict): The tenant's visa_rules patch
+        """
+        self.data_path = None
+        self.base_data = base_data
+        self.base_version = base_version
+        self.base_durations = base_durations
+        self.patch = patch
+        self.reload()
+    
+    def reload(self):
+        """Resolve the patch again; only patched visa types have their durations re-parsed"""
+        self.data = Overlay(self.base_data, self.patch)
+        self.data_version = hashlib.sha256(
+            f"{self.base_version}:{patch_version(self.patch)}".encode('utf-8')
+        ).hexdigest()[:16]
+        visa_types = self.data['visa_types']
+        patched_keys = list(self.patch.get('visa_types', {}))
+        durations = parse_visa_durations({key: visa_types[key] for key in patched_keys if key in visa_types})
+        for key in patched_keys:
+            # Removed visa types are removed from the ranges too
+            durations.setdefault(key, None)
+        self.durations = Overlay(self.base_durations, durations)
@@ -0,0 +1,163 @@
+"""
+Profiling - Opt-in per-request cProfile and tracemalloc capture
+
+Set VISAVERSE_PROFILE_DIR to switch profiling on. A fraction of Streamlit
+reruns and API requests (VISAVERSE_PROFILE_SAMPLE_RATE, 0.1 by default) is
+then run under cProfile with tracemalloc tracing, and each sampled request
+writes a .pstats file and a .alloc tracemalloc snapshot to the directory.
+File names carry the page and the profile shape so dumps can be grouped
+later with `python -m tools.profile_summary`.
+
+When profiling is off, @profiled_rerun returns the function unchanged and
+profiled() yields straight away.
+"""
+
+import cProfile
+import functools
+import itertools
+import os
+import random
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from utils.constants import PROFILE_DIR_ENV_VAR, PROFILE_SAMPLE_RATE_ENV_VAR, PROFILE_FRAMES_ENV_VAR
+
+PROFILE_DIR = os.environ.get(PROFILE_DIR_ENV_VAR) or None
+SAMPLE_RATE = float(os.environ.get(PROFILE_SAMPLE_RATE_ENV_VAR, '0.1'))
+TRACE_FRAMES = int(os.environ.get(PROFILE_FRAMES_ENV_VAR, '5'))
+ENABLED = PROFILE_DIR is not None
+
+_local = threading.local()
+_sequence = itertools.count()
+
+# tracemalloc is process-wide, so it runs while at least one sampled request is active
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+
+
+def _slug(value):
+    """Make a value safe to use in a file name"""
+    return re.sub(r'[^A-Za-z0-9]+', '-', str(value)).strip('-').lower() or 'none'
+
+
+def profile_shape(profile):
+    """
+    Describe a visa profile coarsely enough to group similar requests
+    
+    Args:
+        profile (dict): User profile as passed to VisaService
+    
+    Returns:
+        str: Shape such as 'work-employment_canada_master-s-degree_exp6-10'
+    """
+    years = profile.get('work_experience', 0) or 0
+    bucket = '0-2' if years <= 2 else '3-5' if years <= 5 else '6-10' if years <= 10 else '11+'
+    return '_'.join([
+        _slug(profile.get('purpose', '')),
+        _slug(profile.get('destination', '')),
+        _slug(profile.get('education', '')),
+        f"exp{bucket}"
+    ])
+
+
+def set_shape(shape):
+    """Tag the request being profiled on this thread with a profile shape"""
+    active = getattr(_local, 'active', None)
+    if active is not None:
+        active['shape'] = shape
+
+
+def _start_tracing():
+    global _tracing_users
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+        _tracing_users += 1
+
+
+def _stop_tracing():
+    global _tracing_users
+    with _tracing_lock:
+        snapshot = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        _tracing_users -= 1
+        if _tracing_users == 0:
+            tracemalloc.stop()
+    return snapshot
+
+
+def _dump(active, profiler, snapshot):
+    """Write the profile and allocation snapshot for one request"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stem = '-'.join([
+        time.strftime('%Y%m%dT%H%M%S'),
+        str(os.getpid()),
+        str(next(_sequence)),
+    ]) + f"__{_slug(active['page'])}__{_slug(active['shape'] or 'none')}"
+    profiler.dump_stats(os.path.join(PROFILE_DIR, stem + '.pstats'))
+    if snapshot is not None:
+        snapshot = snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, cProfile.__file__)
+        ])
+        snapshot.dump(os.path.join(PROFILE_DIR, stem + '.alloc'))
+
+
+@contextmanager
+def profiled(page, shape=None):
+    """
+    Profile a block as one request, if profiling is on and the request is sampled
+    
+    Nested calls on the same thread are folded into the outer request.
+    Since Python 3.12 only one profiler can run at a time, so a request
+    sampled while another profiler is active (a request on another thread,
+    a debugger) runs unprofiled.
+    
+    Args:
+        page (str): Page name or API route
+        shape (str): Optional profile shape; can also be set later with set_shape()
+    """
+    if not ENABLED or getattr(_local, 'active', None) is not None or random.random() >= SAMPLE_RATE:
+        yield
+        return
+    
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # "Another profiling tool is already active"
+        profiler = None
+    if profiler is None:
+        yield
+        return
+    
+    active = {'page': page, 'shape': shape}
+    _local.active = active
+    tracing = False
+    try:
+        _start_tracing()
+        tracing = True
+        yield
+    finally:
+        profiler.disable()
+        snapshot = _stop_tracing() if tracing else None
+        _local.active = None
+        if tracing:
+            _dump(active, profiler, snapshot)
+
+
+def profiled_rerun(page):
+    """Decorator form of profiled() for fragment functions, which rerun on their own"""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+        
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with profiled(page):
+                return fn(*args, **kwargs)
+        
+        return wrapper
+    return decorate
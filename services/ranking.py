@@ -0,0 +1,115 @@
+"""
+Ranking - Destination x visa-type arrays for scoring every destination at once
+
+DestinationMatrix is built once per data version from visa_types and
+country_specific_info. Ranking a profile then needs one score per candidate
+visa type and a few array operations over all destinations, instead of one
+get_visa_recommendations call per country.
+"""
+
+import numpy as np
+
+from utils.constants import PURPOSE_VISA_TYPES, DEFAULT_PURPOSE_VISA_TYPES
+
+
+class DestinationMatrix:
+    def __init__(self, store):
+        """
+        Precompute the per-destination arrays
+        
+        Args:
+            store: Visa store providing visa_type_keys, get_visa_type,
+                countries and get_country_info
+        """
+        self.data_version = store.data_version
+        self.visa_keys = store.visa_type_keys()
+        visa_types = [store.get_visa_type(key) for key in self.visa_keys]
+        self.visa_names = [visa['name'] for visa in visa_types]
+        self.column = {key: i for i, key in enumerate(self.visa_keys)}
+        
+        destinations = {}
+        for visa in visa_types:
+            for country in visa['countries']:
+                destinations.setdefault(country, len(destinations))
+        self.destinations = list(destinations)
+        self.row = destinations
+        
+        # available[d, v] is True when visa type v is offered in destination d
+        self.available = np.zeros((len(self.destinations), len(self.visa_keys)), dtype=bool)
+        for v, visa in enumerate(visa_types):
+            self.available[[destinations[c] for c in visa['countries']], v] = True
+        
+        # Destinations without country_specific_info get the mean published approval rate
+        approval = np.full(len(self.destinations), np.nan)
+        for country in store.countries():
+            info = store.get_country_info(country) or {}
+            if country in destinations and 'average_approval_rate' in info:
+                approval[destinations[country]] = info['average_approval_rate']
+        self.has_approval_rate = ~np.isnan(approval)
+        fallback = approval[self.has_approval_rate].mean() if self.has_approval_rate.any() else 1.0
+        self.approval = np.where(self.has_approval_rate, approval, fallback)
+        self.approval_rates = self.approval.tolist()
+        self.published = self.has_approval_rate.tolist()
+        
+        purposes = dict(PURPOSE_VISA_TYPES)
+        purposes[None] = DEFAULT_PURPOSE_VISA_TYPES
+        self._groups = {purpose: self._group(keys) for purpose, keys in purposes.items()}
+    
+    def _group(self, keys):
+        """Slice the arrays down to one purpose's visa types and the destinations offering any of them"""
+        keys = [key for key in keys if key in self.column]
+        available = self.available[:, [self.column[key] for key in keys]]
+        rows = np.flatnonzero(available.any(axis=1))
+        approval = self.approval[rows]
+        return {
+            'keys': keys,
+            'rows': rows.tolist(),
+            'position': {self.destinations[row]: i for i, row in enumerate(rows.tolist())},
+            'available': available[rows].tolist(),
+            # Availability pre-multiplied by approval rate, so ranking is one product and one max
+            'weighted': available[rows] * approval[:, None],
+            'approval': approval
+        }
+    
+    def candidate_keys(self, purpose):
+        """Visa type keys considered for a travel purpose"""
+        return self._groups.get(purpose, self._groups[None])['keys']
+    
+    def rank(self, purpose, scores, exclude=None, top_k=None, overrides=None):
+        """
+        Rank destinations by their best visa score weighted by approval rate
+        
+        Args:
+            purpose (str): Travel purpose
+            scores (list): Eligibility score (0-100) for each of candidate_keys(purpose)
+            exclude (str): Destination to leave out, e.g. the citizenship country
+            top_k (int): Number of destinations to return, all by default
+            overrides (tuple): Optional (destinations, scores) pair giving those
+                destinations their own scores, e.g. where the profile's
+                occupation is in shortage
+        
+        Returns:
+            list: (destination row, ranking score, availability of each
+                candidate key) tuples, best first
+        """
+        group = self._groups.get(purpose, self._groups[None])
+        # max(available * approval * (score + 1)) - approval == approval * best score,
+        # and the +1 keeps a score of 0 above "not offered"
+        ranking = (group['weighted'] * (np.array(scores, dtype=float) + 1.0)).max(axis=1) - group['approval']
+        if overrides is not None:
+            destinations, override_scores = overrides
+            positions = [group['position'][d] for d in destinations if d in group['position']]
+            if positions:
+                ranking[positions] = (
+                    (group['weighted'][positions] * (np.array(override_scores, dtype=float) + 1.0)).max(axis=1)
+                    - group['approval'][positions]
+                )
+        order = np.argsort(-ranking, kind='stable').tolist()
+        excluded = group['position'].get(exclude)
+        if excluded is not None:
+            order.remove(excluded)
+        if top_k is not None:
+            order = order[:top_k]
+        ranking = ranking.tolist()
+        rows, available = group['rows'], group['available']
+        return [(rows[i], ranking[i], available[i]) for i in order]
@@ -0,0 +1,193 @@
+"""
+Render Service - Pre-renders and caches the markdown fragments shown by the pages
+
+The culture tabs, visa requirement lists and country key-information panels
+depend only on the data files, so they are rendered once per data version and
+served from a cache afterwards. Lookups of names outside the data are
+rendered on demand too, so the cache keeps only the RENDER_CACHE_SIZE most
+recently used fragments.
+"""
+
+import threading
+from collections import OrderedDict
+
+from services.metrics import count, gauge, timer
+from utils.constants import RENDER_CACHE_SIZE
+from utils.helpers import format_requirements_list
+
+# Fragments can be None (no country information), so misses are told apart with this
+_MISSING = object()
+
+
+class RenderService:
+    def __init__(self, visa_service, culture_service, cache_size=RENDER_CACHE_SIZE):
+        """
+        Initialize the render service and warm the cache
+        
+        Args:
+            visa_service (VisaService): Source of visa rules
+            culture_service (CultureService): Source of culture data
+            cache_size (int): Most fragments kept in memory
+        """
+        self.visa_service = visa_service
+        self.culture_service = culture_service
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._fragments = OrderedDict()
+        self._versions = None
+        self.warm()
+    
+    @property
+    def versions(self):
+        """Data versions of the services the cache was built from"""
+        return (self.visa_service.data_version, self.culture_service.data_version)
+    
+    def warm(self):
+        """Render every fragment for the current data version, up to the cache size"""
+        fragments = OrderedDict()
+        with timer('visaverse_data_load_seconds', dataset='render_cache'):
+            for country in self.culture_service.get_available_countries():
+                fragments[('culture', country)] = self._render_culture_sections(country)
+            for visa_key in self.visa_service.store.visa_type_keys():
+                fragments[('requirements', visa_key)] = self._render_requirements(visa_key)
+            for country in self.visa_service.get_all_countries():
+                fragments[('country_info', country)] = self._render_country_info(country)
+            fragments[('adaptation_tips',)] = self._render_adaptation_tips()
+        while len(fragments) > self.cache_size:
+            fragments.popitem(last=False)
+        
+        # Swap in one assignment so concurrent readers never see a partial cache
+        with self._lock:
+            self._fragments = fragments
+        self._versions = self.versions
+        gauge('visaverse_cache_entries', len(fragments), cache='render')
+    
+    def _lookup(self, key, render):
+        """Return a cached fragment, re-warming first if the data version changed"""
+        if self._versions != self.versions:
+            count('visaverse_cache_requests_total', cache='render', result='invalidated')
+            self.warm()
+        with self._lock:
+            fragment = self._fragments.get(key, _MISSING)
+            if fragment is not _MISSING:
+                self._fragments.move_to_end(key)
+        if fragment is not _MISSING:
+            count('visaverse_cache_requests_total', cache='render', result='hit')
+            return fragment
+        count('visaverse_cache_requests_total', cache='render', result='miss')
+        fragment = render()
+        with self._lock:
+            self._fragments[key] = fragment
+            while len(self._fragments) > self.cache_size:
+                self._fragments.popitem(last=False)
+        return fragment
+    
+    def get_culture_sections(self, country):
+        """
+        Get the rendered culture tabs for a country
+        
+        Args:
+            country (str): Country name
+        
+        Returns:
+            dict: Markdown for 'workplace', 'communication', 'etiquette' and
+                'tips', with None for sections that have no data
+        """
+        return self._lookup(('culture', country), lambda: self._render_culture_sections(country))
+    
+    def get_requirements(self, visa_key, visa_service=None):
+        """
+        Get the rendered requirements list for a visa type
+        
+        Args:
+            visa_key (str): Visa type key in visa_rules.json
+            visa_service (VisaService): Optional tenant view of the visa rules;
+                its fragments are rendered on demand rather than cached
+        
+        Returns:
+            str: Markdown bullet list
+        """
+        if visa_service is not None and visa_service is not self.visa_service:
+            return self._render_requirements(visa_key, visa_service)
+        return self._lookup(('requirements', visa_key), lambda: self._render_requirements(visa_key))
+    
+    def get_country_info(self, country, visa_service=None):
+        """
+        Get the rendered key-information panel for a destination
+        
+        Args:
+            country (str): Country name
+            visa_service (VisaService): Optional tenant view of the visa rules;
+                its fragments are rendered on demand rather than cached
+        
+        Returns:
+            str: Markdown panel, or None if there is no country information
+        """
+        if visa_service is not None and visa_service is not self.visa_service:
+            return self._render_country_info(country, visa_service)
+        return self._lookup(('country_info', country), lambda: self._render_country_info(country))
+    
+    def get_adaptation_tips(self):
+        """Get the rendered general cultural adaptation tips"""
+        return self._lookup(('adaptation_tips',), self._render_adaptation_tips)
+    
+    def _render_culture_sections(self, country):
+        """Render the four culture tabs for a country"""
+        workplace = self.culture_service.get_workplace_culture(country)
+        communication = self.culture_service.get_communication_style(country)
+        etiquette = self.culture_service.get_business_etiquette(country)
+        tips = self.culture_service.get_cultural_tips(country)
+        
+        sections = {'workplace': None, 'communication': None, 'etiquette': None, 'tips': None}
+        
+        if workplace:
+            sections['workplace'] = "\n".join([
+                f"- **Work Style:** {workplace.get('work_style', 'N/A')}",
+                f"- **Hierarchy:** {workplace.get('hierarchy', 'N/A')}",
+                f"- **Meetings:** {workplace.get('meeting_culture', 'N/A')}",
+                f"- **Work-Life Balance:** {workplace.get('work_life_balance', 'N/A')}",
+                f"- **Decision Making:** {workplace.get('decision_making', 'N/A')}"
+            ])
+        
+        if communication:
+            sections['communication'] = "\n".join([
+                f"- **Directness:** {communication.get('directness', 'N/A')}",
+                f"- **Small Talk:** {communication.get('small_talk', 'N/A')}",
+                f"- **Feedback:** {communication.get('feedback', 'N/A')}",
+                f"- **Email:** {communication.get('email_tone', 'N/A')}",
+                f"- **Conflict Resolution:** {communication.get('conflict_resolution', 'N/A')}"
+            ])
+        
+        if etiquette:
+            sections['etiquette'] = "\n\n".join([
+                f"**Greetings:**\n{etiquette.get('greetings', 'N/A')}",
+                f"**Dress Code:**\n{etiquette.get('dress_code', 'N/A')}",
+                f"**Punctuality:**\n{etiquette.get('punctuality', 'N/A')}",
+                f"**Business Cards:**\n{etiquette.get('business_cards', 'N/A')}",
+                f"**Dining:**\n{etiquette.get('dining', 'N/A')}"
+            ])
+        
+        if tips:
+            sections['tips'] = "**Do's and Don'ts:**\n\n" + format_requirements_list(tips)
+        
+        return sections
+    
+    def _render_requirements(self, visa_key, visa_service=None):
+        """Render the requirements list for a visa type"""
+        visa = (visa_service or self.visa_service).store.get_visa_type(visa_key) or {}
+        return format_requirements_list(visa.get('requirements', []))
+    
+    def _render_country_info(self, country, visa_service=None):
+        """Render the key-information panel for a destination"""
+        country_info = (visa_service or self.visa_service).get_country_info(country)
+        if not country_info:
+            return None
+        return "\n".join([
+            f"- **Processing Authority:** {country_info.get('processing_authority', 'N/A')}",
+            f"- **Common Visa Types:** {', '.join(country_info.get('common_visas', []))}",
+            f"- **Special Notes:** {country_info.get('special_notes', 'N/A')}"
+        ])
+    
+    def _render_adaptation_tips(self):
+        """Render the general adaptation tips, one per paragraph"""
+        return "\n\n".join(f"✓ {tip}" for tip in self.culture_service.get_cultural_adaptation_tips())
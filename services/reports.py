@@ -0,0 +1,347 @@
+"""
+Reports - Streamed applicant packets for single applicants and whole cohorts
+
+A packet is a markdown document with an applicant's visa recommendations,
+document checklist and readiness, and notes on the destination's key
+information and culture. The templates are parsed once at import, packets
+are written to a stream chunk by chunk rather than built as one string, and
+the destination sections are rendered once per destination and reused for
+every applicant going there.
+
+A cohort is an iterable of applicant records, typically read from a JSON
+Lines file:
+
+    {"id": "a-001", "name": "Priya Sharma",
+     "profile": {"citizenship": "India", "destination": "Canada", "purpose": "Work/Employment",
+                 "education": "Master's Degree", "work_experience": 7},
+     "checked_documents": ["Valid passport (minimum 6 months validity)"]}
+
+'visa_type' names the document checklist; without it the checklist is
+chosen from the travel purpose.
+"""
+
+import io
+import itertools
+import os
+import string
+from concurrent.futures import ProcessPoolExecutor
+
+from services.culture_service import CultureService
+from services.document_service import DocumentService
+from services.render_service import RenderService
+from services.static_export import CULTURE_TABS, slugify
+from services.visa_service import VisaService
+from utils.constants import DEFAULT_DOCUMENT_TYPE, PURPOSE_DOCUMENT_TYPES
+from utils.helpers import get_readiness_message
+
+# Applicants read from a cohort at a time, then grouped by destination
+COHORT_BATCH_SIZE = 2000
+
+# Applicants per pool task; a task's applicants share a destination
+COHORT_TASK_SIZE = 50
+
+# Services for writing packets inside a pool worker, built once per process
+_worker = {}
+
+
+class ReportTemplate:
+    """A str.format-style template parsed once and rendered as a stream of chunks"""
+    
+    def __init__(self, source):
+        """
+        Parse a template
+        
+        Args:
+            source (str): Template text with {field} placeholders
+        
+        Raises:
+            ValueError: If a placeholder uses a format spec or conversion
+        """
+        self.parts = []
+        for literal, field, spec, conversion in string.Formatter().parse(source):
+            if spec or conversion:
+                raise ValueError(f"Report template field '{field}' cannot use a format spec or conversion")
+            self.parts.append((literal, field))
+    
+    def chunks(self, context):
+        """
+        Yield the rendered template piece by piece
+        
+        Args:
+            context (dict): Value per field: a string, or an iterable of
+                strings such as another template's chunks()
+        
+        Yields:
+            str: Output chunks in order
+        """
+        for literal, field in self.parts:
+            if literal:
+                yield literal
+            if field is None:
+                continue
+            value = context[field]
+            if isinstance(value, str):
+                yield value
+            else:
+                yield from value
+    
+    def render(self, stream, context):
+        """Write the rendered template to a text stream"""
+        write = stream.write
+        for chunk in self.chunks(context):
+            write(chunk)
+
+
+PACKET_TEMPLATE = ReportTemplate("""# Applicant Packet: {name}
+
+- **Citizenship:** {citizenship}
+- **Destination:** {destination}
+- **Purpose:** {purpose}
+
+## 📋 Visa Recommendations
+
+{recommendations}
+## 📄 Document Checklist: {visa_type}
+
+{readiness}
+
+{checklist}
+{destination_sections}""")
+
+RECOMMENDATION_TEMPLATE = ReportTemplate("""### {rank}. {name}
+
+- **Processing Time:** {processing_time}
+- **Validity:** {validity}
+- **Eligibility Score:** {eligibility_score}/100
+- **Success Rate:** {success_rate}
+
+**Requirements:**
+
+{requirements}
+
+""")
+
+DESTINATION_TEMPLATE = ReportTemplate("""
+## 🌍 {destination} - Key Information
+
+{country_info}
+
+## 🤝 {destination} - Cultural Notes
+
+{culture}""")
+
+CULTURE_SECTION_TEMPLATE = ReportTemplate("""### {heading}
+
+{body}
+
+""")
+
+
+class ReportBuilder:
+    def __init__(self, visa_service, document_service, render_service):
+        """
+        Initialize the report builder
+        
+        Args:
+            visa_service (VisaService): Visa rules, possibly a tenant view
+            document_service (DocumentService): Checklists, possibly a tenant view
+            render_service (RenderService): Rendered culture and country fragments
+        """
+        self.visa_service = visa_service
+        self.document_service = document_service
+        self.render_service = render_service
+        self._destinations = {}
+        self._versions = None
+    
+    def write_packet(self, applicant, stream):
+        """
+        Write one applicant's packet to a text stream
+        
+        Args:
+            applicant (dict): Applicant record with 'profile' and optional
+                'name', 'visa_type' and 'checked_documents' (a list of
+                document names or a dict of name -> bool)
+            stream: Writable text stream
+        """
+        profile = applicant.get('profile', {})
+        destination = profile.get('destination', '')
+        visa_type = applicant.get('visa_type') or PURPOSE_DOCUMENT_TYPES.get(profile.get('purpose'), DEFAULT_DOCUMENT_TYPE)
+        checked = applicant.get('checked_documents') or {}
+        if not isinstance(checked, dict):
+            checked = dict.fromkeys(checked, True)
+        readiness = self.document_service.calculate_readiness_score(visa_type, checked)
+        
+        PACKET_TEMPLATE.render(stream, {
+            'name': applicant.get('name') or str(applicant.get('id', 'Applicant')),
+            'citizenship': profile.get('citizenship', 'N/A'),
+            'destination': destination or 'N/A',
+            'purpose': profile.get('purpose', 'N/A'),
+            'recommendations': self._recommendations(profile),
+            'visa_type': visa_type,
+            'readiness': self._readiness(visa_type, readiness),
+            'checklist': self._checklist(visa_type, checked),
+            'destination_sections': self._destination_sections(destination)
+        })
+    
+    def render_packet(self, applicant):
+        """
+        Render one applicant's packet to a string, e.g. for a download button
+        
+        Args:
+            applicant (dict): Applicant record, as for write_packet
+        
+        Returns:
+            str: Markdown packet
+        """
+        buffer = io.StringIO()
+        self.write_packet(applicant, buffer)
+        return buffer.getvalue()
+    
+    def _recommendations(self, profile):
+        recommendations = self.visa_service.get_visa_recommendations(profile)
+        if not recommendations:
+            yield "No specific visa recommendations available for this profile.\n\n"
+            return
+        for rank, rec in enumerate(recommendations, 1):
+            yield from RECOMMENDATION_TEMPLATE.chunks({
+                'rank': str(rank),
+                'name': rec['name'],
+                'processing_time': rec['processing_time'],
+                'validity': rec['validity'],
+                'eligibility_score': str(rec['eligibility_score']),
+                'success_rate': rec['success_rate'] if rec.get('approval_probability') is None
+                else f"{rec['success_rate']} ({rec['approval_probability']:.0%} of similar applications approved)",
+                'requirements': self.render_service.get_requirements(rec['visa_key'], self.visa_service)
+            })
+    
+    def _readiness(self, visa_type, readiness):
+        if not readiness['total']:
+            return f"No document checklist is available for {visa_type} applications."
+        return (f"**{readiness['score']}%** complete ({readiness['completed']}/{readiness['total']} documents). "
+                f"{get_readiness_message(readiness['percentage'])}")
+    
+    def _checklist(self, visa_type, checked):
+        requirements = self.document_service.get_required_documents(visa_type)
+        for doc in itertools.chain(requirements.get('essential', []), requirements.get('specific', [])):
+            yield f"- [{'x' if checked.get(doc, False) else ' '}] {doc}\n"
+    
+    def _destination_sections(self, destination):
+        """Key information and culture notes for a destination, rendered once per data version"""
+        versions = (self.visa_service.data_version, self.render_service.versions)
+        if versions != self._versions:
+            self._destinations = {}
+            self._versions = versions
+        sections = self._destinations.get(destination)
+        if sections is None:
+            buffer = io.StringIO()
+            DESTINATION_TEMPLATE.render(buffer, {
+                'destination': destination,
+                'country_info': (self.render_service.get_country_info(destination, self.visa_service)
+                                 or "No key information available for this country."),
+                'culture': self._culture(destination)
+            })
+            sections = self._destinations[destination] = buffer.getvalue()
+        return sections
+    
+    def _culture(self, destination):
+        if destination not in self.render_service.culture_service.get_available_countries():
+            yield "No cultural notes available for this country.\n"
+            return
+        sections = self.render_service.get_culture_sections(destination)
+        for key, heading, missing in CULTURE_TABS:
+            yield from CULTURE_SECTION_TEMPLATE.chunks({'heading': heading, 'body': sections[key] or missing})
+
+
+def build_report_builder(visa_path=None, culture_path=None, tenant=None):
+    """
+    Load the services and wrap them in a ReportBuilder
+    
+    Args:
+        visa_path (str): Optional alternative visa_rules.json
+        culture_path (str): Optional alternative culture_data.json
+        tenant (str): Optional tenant whose rules and checklists apply
+    
+    Returns:
+        ReportBuilder: Builder over freshly loaded services
+    """
+    visa_service = VisaService(data_path=visa_path)
+    document_service = DocumentService()
+    render_service = RenderService(visa_service, CultureService(data_path=culture_path))
+    if tenant:
+        visa_service = visa_service.for_tenant(tenant)
+        document_service = document_service.for_tenant(tenant)
+    return ReportBuilder(visa_service, document_service, render_service)
+
+
+def _packet_path(output_dir, applicant, index):
+    return os.path.join(output_dir, f"{slugify(str(applicant.get('id') or f'applicant-{index:06d}'))}.md")
+
+
+def _write_packets(builder, output_dir, indexed_applicants):
+    """Stream each packet to its file; returns the number written"""
+    for index, applicant in indexed_applicants:
+        path = _packet_path(output_dir, applicant, index)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            builder.write_packet(applicant, f)
+        os.replace(tmp_path, path)
+    return len(indexed_applicants)
+
+
+def _init_worker(visa_path, culture_path, tenant):
+    """Pool initializer: load the services once per worker process"""
+    _worker['builder'] = build_report_builder(visa_path, culture_path, tenant)
+
+
+def _write_task(task):
+    output_dir, indexed_applicants = task
+    return _write_packets(_worker['builder'], output_dir, indexed_applicants)
+
+
+def _destination_tasks(output_dir, batch):
+    """Split a batch into tasks whose applicants share a destination"""
+    batch.sort(key=lambda item: item[1].get('profile', {}).get('destination', ''))
+    for _, group in itertools.groupby(batch, key=lambda item: item[1].get('profile', {}).get('destination', '')):
+        group = list(group)
+        for start in range(0, len(group), COHORT_TASK_SIZE):
+            yield output_dir, group[start:start + COHORT_TASK_SIZE]
+
+
+def generate_cohort(applicants, output_dir, jobs=None, visa_path=None, culture_path=None, tenant=None):
+    """
+    Write one packet file per applicant
+    
+    Applicants are consumed in batches, so a cohort can be streamed from a
+    file of any size. Within a batch they are grouped by destination, so
+    each worker renders a destination's sections once for the whole group.
+    
+    Args:
+        applicants (iterable): Applicant records, as for write_packet; an
+            'id' names the packet file, otherwise its position does
+        output_dir (str): Directory for the <id>.md packets
+        jobs (int): Worker processes; 1 writes in this process. Defaults
+            to the CPU count
+        visa_path (str): Optional alternative visa_rules.json
+        culture_path (str): Optional alternative culture_data.json
+        tenant (str): Optional tenant whose rules and checklists apply
+    
+    Returns:
+        int: Number of packets written
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = jobs or os.cpu_count() or 1
+    numbered = enumerate(applicants)
+    written = 0
+    
+    if jobs == 1:
+        builder = build_report_builder(visa_path, culture_path, tenant)
+        while batch := list(itertools.islice(numbered, COHORT_BATCH_SIZE)):
+            for task in _destination_tasks(output_dir, batch):
+                written += _write_packets(builder, *task)
+        return written
+    
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(visa_path, culture_path, tenant)) as pool:
+        while batch := list(itertools.islice(numbered, COHORT_BATCH_SIZE)):
+            written += sum(pool.map(_write_task, _destination_tasks(output_dir, batch)))
+    return written
@@ -0,0 +1,247 @@
+"""
+Rule Versions - Dated versions of the visa rules, each layered over the next newer one
+
+data/visa_rules.json holds the rules in effect now. Every earlier version
+is kept in data/rule_versions.json as an overlay patch (the format of
+services/overlays.py) that turns the next newer version back into it:
+
+    {
+        "current_from": "2026-07-01",
+        "versions": {
+            "2026-04-01": {"visa_types": {"skilled_worker": {"processing_time": "3-8 weeks"}}},
+            "2026-01-01": {"eligibility_criteria": {"age_points": {"18-24": 20}}}
+        }
+    }
+
+Each version's store is a TenantVisaStore over the next newer version's
+data, so a visa type or country no patch touches is the same object in
+every version, and memory grows with the size of the changes rather than
+with the number of versions. A diff only needs to look at the records the
+patches in between touch.
+
+tools/rule_versions.py records a version when the rules are replaced.
+"""
+
+import datetime
+import json
+import os
+from collections.abc import Mapping
+
+from services.overlays import APPEND_SUFFIX, TenantVisaStore
+from services.stores import DATA_DIR, load_json_file
+
+RULE_VERSIONS_PATH = os.path.join(DATA_DIR, 'rule_versions.json')
+
+CURRENT = 'current'
+VERSIONED_SECTIONS = ('visa_types', 'country_specific_info', 'eligibility_criteria')
+
+
+def _date(value, what):
+    try:
+        return datetime.date.fromisoformat(value).isoformat()
+    except (TypeError, ValueError):
+        raise ValueError(f"Rule versions: {what} must be a YYYY-MM-DD date, got {value!r}")
+
+
+def load_rule_versions(path=None):
+    """
+    Load the rule version history, if there is one
+    
+    Args:
+        path (str): History file, data/rule_versions.json by default
+    
+    Returns:
+        dict: 'current_from' (date or None) and 'versions', a list of
+            (date, patch) newest first; no versions without a history file
+    
+    Raises:
+        ValueError: If the file is invalid
+    """
+    path = path or RULE_VERSIONS_PATH
+    if not os.path.exists(path):
+        return {'current_from': None, 'versions': []}
+    history, _ = load_json_file(path, 'rule_versions', 'Rule versions')
+    if not isinstance(history, dict) or not isinstance(history.get('versions', {}), dict):
+        raise ValueError(f"Rule versions file {path} must be an object with a 'versions' object")
+    current_from = history.get('current_from')
+    if current_from is not None:
+        current_from = _date(current_from, 'current_from')
+    versions = []
+    for date, patch in history.get('versions', {}).items():
+        date = _date(date, 'version dates')
+        if not isinstance(patch, dict):
+            raise ValueError(f"Rule versions: the patch for {date} must be a JSON object")
+        unknown = sorted(set(patch) - set(VERSIONED_SECTIONS))
+        if unknown:
+            raise ValueError(f"Rule versions: the patch for {date} has unknown sections: {', '.join(unknown)}")
+        if current_from is not None and date >= current_from:
+            raise ValueError(f"Rule versions: {date} is not before current_from {current_from}")
+        versions.append((date, patch))
+    if versions and current_from is None:
+        raise ValueError(f"Rule versions file {path} needs a 'current_from' date for the current rules")
+    versions.sort(reverse=True)
+    return {'current_from': current_from, 'versions': versions}
+
+
+def make_patch(base, target):
+    """
+    The smallest overlay patch that turns base into target
+    
+    Args:
+        base (Mapping): Rules (or part of them) the patch is applied to
+        target (Mapping): Rules the patch should produce
+    
+    Returns:
+        dict: Patch for Overlay(base, patch); only changed keys appear
+    """
+    patch = {key: None for key in base if key not in target}
+    for key, value in target.items():
+        if key not in base:
+            patch[key] = value
+            continue
+        old = base[key]
+        if old == value:
+            continue
+        if isinstance(old, Mapping) and isinstance(value, Mapping):
+            patch[key] = make_patch(old, value)
+        else:
+            patch[key] = value
+    return patch
+
+
+def _touched(patch, section):
+    """Record keys a patch sets, removes or appends to in one section"""
+    keys = set()
+    for key in patch.get(section) or {}:
+        keys.add(key[:-len(APPEND_SUFFIX)] if key.endswith(APPEND_SUFFIX) else key)
+    return keys
+
+
+class RuleVersions:
+    def __init__(self, current_data, current_version, current_durations, history):
+        """
+        Build every version's store over the current rules
+        
+        Args:
+            current_data (dict): Rules in effect now, shared and never modified
+            current_version (str): Data version of the current rules
+            current_durations (dict): Parsed duration ranges of the current rules
+            history (dict): As returned by load_rule_versions
+        """
+        self.current_from = history['current_from']
+        self.ids = [CURRENT]
+        self.data = {CURRENT: current_data}
+        self.data_versions = {CURRENT: current_version}
+        self.patches = {}
+        self.stores = {}
+        data, version, durations = current_data, current_version, current_durations
+        for date, patch in history['versions']:
+            store = TenantVisaStore(data, version, durations, patch)
+            self.ids.append(date)
+            self.patches[date] = patch
+            self.stores[date] = store
+            self.data[date] = store.data
+            self.data_versions[date] = store.data_version
+            data, version, durations = store.data, store.data_version, store.durations
+    
+    def effective_from(self, version):
+        """Date a version took effect (None for the current rules without a history date)"""
+        return self.current_from if version == CURRENT else version
+    
+    def effective_until(self, version):
+        """Date a version was replaced, or None for the current rules"""
+        position = self.ids.index(version)
+        return None if position == 0 else self.effective_from(self.ids[position - 1])
+    
+    def resolve(self, version):
+        """
+        The version id for a version id or a date
+        
+        Args:
+            version (str): 'current', a version's date, or any YYYY-MM-DD
+                date to get the version in effect on that day
+        
+        Returns:
+            str: Version id
+        
+        Raises:
+            ValueError: If no version was in effect on the date
+        """
+        if version in self.data:
+            return version
+        date = _date(version, "a version")
+        for candidate in self.ids:
+            effective_from = self.effective_from(candidate)
+            # Without a history the current rules have no start date
+            if effective_from is None or effective_from <= date:
+                return candidate
+        raise ValueError(f"No rules version was in effect on {date}")
+    
+    def describe(self):
+        """Every version newest first, as dicts with their dates and data version"""
+        return [
+            {
+                'version': version,
+                'effective_from': self.effective_from(version),
+                'effective_until': self.effective_until(version),
+                'data_version': self.data_versions[version]
+            }
+            for version in self.ids
+        ]
+    
+    def diff(self, old, new):
+        """
+        Records that differ between two versions
+        
+        Only records touched by the patches between the two versions are
+        compared; every other record is the same object in both.
+        
+        Args:
+            old (str): Version id to compare from
+            new (str): Version id to compare to
+        
+        Returns:
+            dict: Per section in VERSIONED_SECTIONS, the 'added' and
+                'removed' keys and the 'changed' records with the top-level
+                'fields' that differ
+        """
+        first, last = sorted((self.ids.index(old), self.ids.index(new)))
+        between = [self.patches[version] for version in self.ids[first + 1:last + 1]]
+        result = {'from': old, 'to': new}
+        for section in VERSIONED_SECTIONS:
+            before, after = self.data[old].get(section, {}), self.data[new].get(section, {})
+            added, removed, changed = [], [], []
+            for key in sorted(set().union(*(_touched(patch, section) for patch in between))):
+                if key not in before and key in after:
+                    added.append(key)
+                elif key in before and key not in after:
+                    removed.append(key)
+                elif key in before and before[key] != after[key]:
+                    old_record, new_record = before[key], after[key]
+                    if isinstance(old_record, Mapping) and isinstance(new_record, Mapping):
+                        fields = sorted(name for name in set(old_record) | set(new_record)
+                                        if old_record.get(name) != new_record.get(name))
+                    else:
+                        fields = []
+                    changed.append({'key': key, 'fields': fields})
+            result[section] = {'added': added, 'removed': removed, 'changed': changed}
+        return result
+
+
+def write_rule_versions(history, path=None):
+    """
+    Write a rule version history atomically
+    
+    Args:
+        history (dict): As returned by load_rule_versions
+        path (str): History file, data/rule_versions.json by default
+    """
+    path = path or RULE_VERSIONS_PATH
+    document = {
+        'current_from': history['current_from'],
+        'versions': {date: patch for date, patch in history['versions']}
+    }
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2)
+    os.replace(temp_path, path)
@@ -0,0 +1,143 @@
+"""
+Scoring - Success-factor scoring compiled into a weight matrix
+
+Each visa type's success_factors become one row of a weight matrix over a
+small set of profile features, and each profile becomes a feature vector
+in [0, 1]. A visa's eligibility score is 100 times their dot product, so
+scoring every candidate visa - or a batch of profiles - is a single
+matrix product.
+
+Features come from the eligibility_criteria points tables, normalized by
+the best entry in each table. Success factors the profile says nothing
+about score UNKNOWN_FACTOR_SCORE. A visa type none of whose factors the
+profile informs (tourist, business) scores its base_score from the visa
+rules instead, through a constant feature.
+"""
+
+import operator
+
+import numpy as np
+
+from utils.constants import (
+    AGE_BUCKETS, EXPERIENCE_BUCKETS, FACTOR_FEATURES, MIN_BUCKETED_AGE, UNKNOWN_FACTOR_SCORE
+)
+
+# Feature columns; 'unknown' collects every factor the profile cannot inform,
+# and 'constant' (always 1) carries base scores
+FEATURES = ['education', 'experience', 'age', 'occupation_demand', 'unknown', 'constant']
+
+
+def bucket_for(value, buckets):
+    """Label of the first (upper bound, label) bucket that holds value"""
+    for upper, label in buckets:
+        if upper is None or value <= upper:
+            return label
+    return buckets[-1][1]
+
+
+def _normalized(points):
+    """Scale a points table so its best entry is 1"""
+    best = max(points.values(), default=0)
+    return {key: value / best for key, value in points.items()} if best > 0 else {}
+
+
+class ScoringEngine:
+    def __init__(self, store):
+        """
+        Compile every visa type's success factors into a weight matrix
+        
+        Args:
+            store: Visa store providing visa_type_keys, get_visa_type and eligibility_criteria
+        """
+        self.data_version = store.data_version
+        self.visa_keys = store.visa_type_keys()
+        self.row = {key: i for i, key in enumerate(self.visa_keys)}
+        column = {feature: i for i, feature in enumerate(FEATURES)}
+        
+        weights = np.zeros((len(self.visa_keys), len(FEATURES)))
+        base_scores = {}
+        for i, key in enumerate(self.visa_keys):
+            visa = store.get_visa_type(key)
+            for factor, weight in visa.get('success_factors', {}).items():
+                weights[i, column[FACTOR_FEATURES.get(factor, 'unknown')]] += weight
+            if visa.get('base_score') is not None:
+                base_scores[i] = visa['base_score']
+        totals = weights.sum(axis=1, keepdims=True)
+        # Rows are normalized so every visa scores on the same 0-100 scale
+        self.weights = np.divide(weights, totals, out=np.zeros_like(weights), where=totals > 0)
+        informed = weights[:, :column['unknown']].any(axis=1)
+        for i, base_score in base_scores.items():
+            if not informed[i]:
+                self.weights[i] = 0.0
+                self.weights[i, column['constant']] = base_score / 100
+        self._rows = {}
+        
+        criteria = store.eligibility_criteria()
+        self.education_points = _normalized(criteria.get('education_points', {}))
+        self.experience_points = _normalized(criteria.get('experience_points', {}))
+        self.age_points = _normalized(criteria.get('age_points', {}))
+    
+    def features(self, profile, occupation_demand=None):
+        """
+        Build a profile's feature vector
+        
+        Args:
+            profile (dict): User profile; 'education', 'work_experience', 'age'
+                and 'occupation_demand' (0-1) are used when present
+            occupation_demand (float): Demand to use instead of the profile's
+        
+        Returns:
+            list: One value in [0, 1] per entry of FEATURES
+        """
+        education = self.education_points.get(profile.get('education'), UNKNOWN_FACTOR_SCORE)
+        experience = self.experience_points.get(
+            bucket_for(profile.get('work_experience') or 0, EXPERIENCE_BUCKETS), UNKNOWN_FACTOR_SCORE
+        )
+        age = profile.get('age')
+        if age is None:
+            age = UNKNOWN_FACTOR_SCORE
+        elif age < MIN_BUCKETED_AGE:
+            age = 0.0
+        else:
+            age = self.age_points.get(bucket_for(age, AGE_BUCKETS), UNKNOWN_FACTOR_SCORE)
+        if occupation_demand is None:
+            occupation_demand = profile.get('occupation_demand')
+        if occupation_demand is None:
+            occupation_demand = UNKNOWN_FACTOR_SCORE
+        return [education, experience, age, occupation_demand, UNKNOWN_FACTOR_SCORE, 1.0]
+    
+    def score(self, profile, visa_keys, occupation_demand=None):
+        """
+        Score one profile against several visa types
+        
+        Args:
+            profile (dict): User profile
+            visa_keys (list): Visa type keys to score
+            occupation_demand (float): Demand to use instead of the profile's
+        
+        Returns:
+            list: Eligibility score (0-100) per visa key
+        """
+        key = tuple(visa_keys)
+        rows = self._rows.get(key)
+        if rows is None:
+            # Recommendations ask for the same few key lists over and over
+            rows = self._rows[key] = self.weights[[self.row[visa_key] for visa_key in key]].tolist()
+        # A handful of rows is multiplied faster in Python than numpy can dispatch
+        features = self.features(profile, occupation_demand)
+        return [round(sum(map(operator.mul, row, features)) * 100) for row in rows]
+    
+    def score_batch(self, profiles, visa_keys=None):
+        """
+        Score many profiles against many visa types in one product
+        
+        Args:
+            profiles (list): User profiles
+            visa_keys (list): Visa type keys, all by default
+        
+        Returns:
+            numpy.ndarray: Integer scores, one row per profile and one column per visa key
+        """
+        rows = self.weights if visa_keys is None else self.weights[[self.row[key] for key in visa_keys]]
+        matrix = np.array([self.features(profile) for profile in profiles], dtype=float).reshape(-1, len(FEATURES))
+        return np.rint(matrix @ rows.T * 100).astype(int)
@@ -0,0 +1,592 @@
+"""
+Sharding - Destination-sharded visa and culture services in local worker processes
+
+With VISAVERSE_SHARDS=N the visa and culture lookups are answered by N
+worker processes instead of the app process. Destinations are assigned to
+workers by consistent hashing, and each worker loads only its own
+destinations: their country_specific_info and culture records, plus every
+visa type with its countries cut down to the worker's destinations. Visa
+type details, eligibility criteria and general tips are small and shared.
+
+Each worker keeps an LRU cache of its responses, already pickled. Requests
+for a destination always reach the same worker, so a worker's cache only
+holds its own hot destinations; adding workers raises the hit rate and
+lowers the memory of each one.
+
+ShardedVisaService and ShardedCultureService have the public methods of
+VisaService and CultureService and forward each call to the worker owning
+its destination. Lookups over every destination, such as rank_destinations,
+ask all workers and merge the answers. Destinations without a published
+approval rate are ranked with the mean rate of their own shard.
+
+The front ends are @timed under the unsharded class names, so metrics and
+traffic captures look the same as without sharding and every call is
+counted once, even when a worker answers it from its cache. Workers run
+with metrics and capture off; their cache figures are exported to the
+registry when it is scraped.
+"""
+
+import atexit
+import bisect
+import hashlib
+import json
+import multiprocessing
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+from services.metrics import REGISTRY, gauge, timed, timer
+from services.occupations import shared_occupation_index
+from services.stores import open_culture_store, open_visa_store
+from services.visa_service import VisaService
+from utils.constants import (
+    METRICS_ENV_VAR, SHARDS_ENV_VAR, SHARD_CACHE_SIZE, SHARD_VIRTUAL_NODES, TRAFFIC_DIR_ENV_VAR
+)
+
+SHARDS = int(os.environ.get(SHARDS_ENV_VAR) or 0)
+
+# Control messages; service calls are (service, method, args, kwargs)
+_STATS = ('stats',)
+_RELOAD = ('reload',)
+_STOP = ('stop',)
+
+# Settings the front ends handle, unset for the workers
+_FRONT_END_ONLY = (METRICS_ENV_VAR, TRAFFIC_DIR_ENV_VAR)
+
+# Class names the front ends are timed under, by service
+_CLASS_NAMES = {'visa': 'VisaService', 'culture': 'CultureService'}
+
+# Exceptions a worker can raise that are re-raised as themselves
+_ERRORS = {error.__name__: error for error in (FileNotFoundError, ValueError, KeyError, TypeError)}
+
+
+def _hash(key):
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class HashRing:
+    def __init__(self, shards, virtual_nodes=SHARD_VIRTUAL_NODES):
+        """
+        Consistent-hash ring over shards 0..shards-1
+        
+        Growing the ring from N to N+1 shards moves only the keys the new
+        shard takes over; no key moves between the existing shards.
+        
+        Args:
+            shards (int): Number of shards
+            virtual_nodes (int): Points per shard on the ring; more points
+                spread keys more evenly
+        """
+        if shards < 1:
+            raise ValueError("A hash ring needs at least one shard")
+        self.shards = shards
+        points = sorted((_hash(f"shard-{shard}#{i}"), shard) for shard in range(shards) for i in range(virtual_nodes))
+        self._points = [point for point, _ in points]
+        self._owners = [shard for _, shard in points]
+    
+    def shard_for(self, key):
+        """Shard owning a key such as a destination name"""
+        return self._owners[bisect.bisect(self._points, _hash(key)) % len(self._points)]
+
+
+def split_visa_rules(data, ring):
+    """
+    Cut visa rules into one dataset per shard
+    
+    Args:
+        data (dict): Full visa rules
+        ring (HashRing): Ring assigning destinations to shards
+    
+    Returns:
+        list: Visa rules per shard; every visa type appears in every shard,
+            listing only the shard's own countries
+    """
+    shards = [dict(data, visa_types={}, country_specific_info={}) for _ in range(ring.shards)]
+    for country, info in data['country_specific_info'].items():
+        shards[ring.shard_for(country)]['country_specific_info'][country] = info
+    for key, visa in data['visa_types'].items():
+        owned = [[] for _ in range(ring.shards)]
+        for country in visa['countries']:
+            owned[ring.shard_for(country)].append(country)
+        for shard, countries in zip(shards, owned):
+            shard['visa_types'][key] = dict(visa, countries=countries)
+    return shards
+
+
+def split_culture_data(data, ring):
+    """
+    Cut culture data into one dataset per shard
+    
+    Args:
+        data (dict): Full culture data
+        ring (HashRing): Ring assigning destinations to shards
+    
+    Returns:
+        list: Culture data per shard, each with the shared general tips
+    """
+    shards = [dict(data, countries={}) for _ in range(ring.shards)]
+    for country, record in data['countries'].items():
+        shards[ring.shard_for(country)]['countries'][country] = record
+    return shards
+
+
+def _rss_mb():
+    """Resident set size of this process in MB, or None where /proc is missing"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError):
+        return None
+
+
+def _load_shard(visa_path, culture_path):
+    from services.culture_service import CultureService
+    return {'visa': VisaService(data_path=visa_path), 'culture': CultureService(data_path=culture_path)}
+
+
+def _serve(conn, visa_path, culture_path, cache_size):
+    """Worker process: answer requests for one shard until told to stop"""
+    try:
+        services = _load_shard(visa_path, culture_path)
+    except Exception as e:
+        conn.send_bytes(pickle.dumps((False, type(e).__name__, str(e))))
+        return
+    conn.send_bytes(pickle.dumps((True, None)))
+    
+    cache = OrderedDict()
+    stats = {'hits': 0, 'misses': 0, 'errors': 0}
+    while True:
+        try:
+            request = conn.recv_bytes()
+        except EOFError:
+            return
+        message = pickle.loads(request)
+        if message == _STOP:
+            return
+        if message == _STATS:
+            conn.send_bytes(pickle.dumps((True, dict(stats, entries=len(cache), rss_mb=_rss_mb(), pid=os.getpid()))))
+            continue
+        if message == _RELOAD:
+            services = _load_shard(visa_path, culture_path)
+            cache.clear()
+            conn.send_bytes(pickle.dumps((True, None)))
+            continue
+        
+        # The request bytes are the cache key: equal calls pickle identically
+        response = cache.get(request)
+        if response is not None:
+            cache.move_to_end(request)
+            stats['hits'] += 1
+        else:
+            stats['misses'] += 1
+            service, method, args, kwargs = message
+            try:
+                if method.startswith('_'):
+                    raise ValueError(f"{method} is not a public service method")
+                result = getattr(services[service], method)(*args, **kwargs)
+                response = pickle.dumps((True, result), pickle.HIGHEST_PROTOCOL)
+            except Exception as e:
+                stats['errors'] += 1
+                response = pickle.dumps((False, type(e).__name__, str(e)))
+            else:
+                cache[request] = response
+                if len(cache) > cache_size:
+                    cache.popitem(last=False)
+        conn.send_bytes(response)
+
+
+def _unwrap(response):
+    """Result of a worker response, re-raising a worker's exception"""
+    response = pickle.loads(response)
+    if response[0]:
+        return response[1]
+    raise _ERRORS.get(response[1], RuntimeError)(response[2])
+
+
+class ShardRouter:
+    def __init__(self, shards, visa_path=None, culture_path=None, cache_size=SHARD_CACHE_SIZE,
+                 virtual_nodes=SHARD_VIRTUAL_NODES):
+        """
+        Split the data and start one worker process per shard
+        
+        The data is read once here, through the backend selected by
+        VISAVERSE_STORAGE, and each worker gets its shard as JSON files in a
+        temporary directory.
+        
+        Args:
+            shards (int): Number of worker processes
+            visa_path (str): Optional alternative visa_rules.json
+            culture_path (str): Optional alternative culture_data.json
+            cache_size (int): Responses each worker keeps in its LRU cache
+            virtual_nodes (int): Points per shard on the hash ring
+        
+        Raises:
+            FileNotFoundError: If a data file is missing
+            ValueError: If the data is invalid or shards is below 1
+            RuntimeError: If a worker exits before it has loaded its shard
+        """
+        self.ring = HashRing(shards, virtual_nodes)
+        self.visa_path = visa_path
+        self.culture_path = culture_path
+        self._workdir = tempfile.mkdtemp(prefix='visaverse-shards-')
+        self._locks = [threading.Lock() for _ in range(shards)]
+        self._conns = []
+        self._processes = []
+        try:
+            self._split()
+            context = multiprocessing.get_context('spawn')
+            # Spawned workers inherit the environment as it is when they start
+            saved = {name: os.environ.pop(name) for name in _FRONT_END_ONLY if name in os.environ}
+            try:
+                for shard in range(shards):
+                    conn, child_conn = context.Pipe()
+                    process = context.Process(
+                        target=_serve, name=f'visaverse-shard-{shard}', daemon=True,
+                        args=(child_conn, *self._shard_paths(shard), cache_size)
+                    )
+                    process.start()
+                    child_conn.close()
+                    self._conns.append(conn)
+                    self._processes.append(process)
+            finally:
+                os.environ.update(saved)
+            for shard in range(shards):
+                _unwrap(self._receive(shard))
+        except Exception:
+            self.close()
+            raise
+        REGISTRY.add_collector(self.export_stats)
+        atexit.register(self.close)
+    
+    def _shard_paths(self, shard):
+        return (os.path.join(self._workdir, f'visa_rules.{shard}.json'),
+                os.path.join(self._workdir, f'culture_data.{shard}.json'))
+    
+    def _split(self):
+        """Read the full data, keep the shared parts and write every shard's files"""
+        visa_store = open_visa_store(self.visa_path)
+        culture_store = open_culture_store(self.culture_path)
+        visa_data = visa_store.data
+        culture_data = culture_store.data
+        self.visa_version = visa_store.data_version
+        self.culture_version = culture_store.data_version
+        self.visa_types = visa_data['visa_types']
+        self.visa_countries = visa_store.countries()
+        self.culture_countries = culture_store.countries()
+        
+        shards = zip(split_visa_rules(visa_data, self.ring), split_culture_data(culture_data, self.ring))
+        for shard, datasets in enumerate(shards):
+            for path, data in zip(self._shard_paths(shard), datasets):
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, path)
+    
+    def _send(self, shard, request):
+        try:
+            self._conns[shard].send_bytes(request)
+        except OSError as e:
+            raise RuntimeError(f"Shard worker {shard} exited with code {self._processes[shard].exitcode}") from e
+    
+    def _receive(self, shard):
+        """
+        Next response from a worker
+        
+        Raises:
+            RuntimeError: If the worker has exited, naming the shard and its exit code
+        """
+        try:
+            return self._conns[shard].recv_bytes()
+        except (EOFError, OSError) as e:
+            process = self._processes[shard]
+            process.join(timeout=1)
+            raise RuntimeError(f"Shard worker {shard} exited with code {process.exitcode}") from e
+    
+    def shard_for(self, key):
+        """Shard owning a destination or other routing key"""
+        return self.ring.shard_for(key or '')
+    
+    def call(self, shard, service, method, *args, **kwargs):
+        """
+        Call a service method in one worker
+        
+        Args:
+            shard (int): Worker to ask
+            service (str): 'visa' or 'culture'
+            method (str): Public method name
+        
+        Returns:
+            The method's result
+        
+        Raises:
+            RuntimeError: If the worker has exited
+        """
+        request = pickle.dumps((service, method, args, kwargs), pickle.HIGHEST_PROTOCOL)
+        with timer('visaverse_shard_call_seconds', shard=str(shard)):
+            with self._locks[shard]:
+                self._send(shard, request)
+                response = self._receive(shard)
+        return _unwrap(response)
+    
+    def call_all(self, service, method, *args, **kwargs):
+        """
+        Call a service method in every worker at once
+        
+        Returns:
+            list: Each worker's result, in shard order
+        """
+        return self._broadcast((service, method, args, kwargs))
+    
+    def _broadcast(self, message):
+        request = pickle.dumps(message, pickle.HIGHEST_PROTOCOL)
+        # Locks are always taken in shard order, so concurrent broadcasts cannot deadlock
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            for shard in range(len(self._conns)):
+                self._send(shard, request)
+            responses = [self._receive(shard) for shard in range(len(self._conns))]
+        finally:
+            for lock in self._locks:
+                lock.release()
+        return [_unwrap(response) for response in responses]
+    
+    def stats(self):
+        """
+        Cache and memory figures of every worker
+        
+        Returns:
+            list: Per shard: 'hits', 'misses', 'errors', 'entries', 'rss_mb' and 'pid'
+        """
+        return self._broadcast(_STATS)
+    
+    def export_stats(self):
+        """Copy every worker's cache figures into the metrics registry"""
+        for shard, stats in enumerate(self.stats()):
+            shard = str(shard)
+            REGISTRY.set_counter('visaverse_cache_requests_total', stats['hits'],
+                                 cache='shard', shard=shard, result='hit')
+            REGISTRY.set_counter('visaverse_cache_requests_total', stats['misses'],
+                                 cache='shard', shard=shard, result='miss')
+            REGISTRY.set_counter('visaverse_shard_errors_total', stats['errors'], shard=shard)
+            gauge('visaverse_cache_entries', stats['entries'], cache='shard', shard=shard)
+            if stats['rss_mb'] is not None:
+                gauge('visaverse_shard_rss_bytes', int(stats['rss_mb'] * 1024 * 1024), shard=shard)
+    
+    def reload(self):
+        """Re-read and re-split the data, then reload every worker and clear its cache"""
+        self._split()
+        self._broadcast(_RELOAD)
+    
+    def close(self):
+        """Stop the workers and remove the shard files"""
+        for conn, process in zip(self._conns, self._processes):
+            try:
+                conn.send_bytes(pickle.dumps(_STOP))
+            except OSError:
+                pass
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+            conn.close()
+        self._conns = []
+        self._processes = []
+        shutil.rmtree(self._workdir, ignore_errors=True)
+        REGISTRY.remove_collector(self.export_stats)
+        atexit.unregister(self.close)
+
+
+class RoutedVisaStore:
+    """The shared visa type details a router keeps, for callers that read the store directly"""
+    
+    # Lookups on the services cross a process boundary
+    blocking_reads = True
+    
+    def __init__(self, router):
+        self.router = router
+    
+    @property
+    def data_version(self):
+        return self.router.visa_version
+    
+    def get_visa_type(self, visa_key):
+        """Visa type record, or None"""
+        return self.router.visa_types.get(visa_key)
+    
+    def visa_type_keys(self):
+        """All visa type keys in file order"""
+        return list(self.router.visa_types)
+    
+    def countries(self):
+        """Countries with country-specific visa information"""
+        return list(self.router.visa_countries)
+
+
+def _timed_as(service):
+    """@timed under the unsharded class's name, e.g. 'VisaService.get_country_info'"""
+    def decorate(method):
+        method.__qualname__ = f"{_CLASS_NAMES[service]}.{method.__name__}"
+        return timed(method)
+    return decorate
+
+
+def _routed(service, name):
+    """Method forwarded to the worker owning its first argument, a country"""
+    def method(self, country, *args, **kwargs):
+        return self.router.call(self.router.shard_for(country), service, name, country, *args, **kwargs)
+    method.__name__ = name
+    method.__doc__ = f"{name}, answered by the worker owning the country; takes the same arguments"
+    return _timed_as(service)(method)
+
+
+def _any_shard(service, name):
+    """Method whose answer does not depend on the shard, spread over the workers by name"""
+    def method(self, *args, **kwargs):
+        return self.router.call(self.router.shard_for(name), service, name, *args, **kwargs)
+    method.__name__ = name
+    method.__doc__ = f"{name}, answered by any worker; takes the same arguments"
+    return _timed_as(service)(method)
+
+
+def _unavailable(service, name, message):
+    """Method that is not available while the services are sharded"""
+    def method(self, *args, **kwargs):
+        raise ValueError(message)
+    method.__name__ = name
+    method.__doc__ = f"{name} is not available while the services are sharded; always raises ValueError"
+    return _timed_as(service)(method)
+
+
+_NO_VERSIONS = "Rule versions are not available while the services are sharded"
+
+
+class ShardedVisaService:
+    def __init__(self, router):
+        """
+        VisaService front end for a ShardRouter
+        
+        Args:
+            router (ShardRouter): Running shard workers
+        """
+        self.router = router
+        self.store = RoutedVisaStore(router)
+        # Reads the occupation list and calibration the way the workers do,
+        # over the full rules, for recommendations_version
+        self._front = VisaService(store=self.store)
+    
+    @property
+    def data_version(self):
+        """Hash identifying the loaded data"""
+        return self.router.visa_version
+    
+    @property
+    def recommendations_version(self):
+        """Hash identifying everything recommendations are computed from"""
+        return self._front.recommendations_version
+    
+    @_timed_as('visa')
+    def reload(self):
+        """Re-read the data in every worker"""
+        self.router.reload()
+        shared_occupation_index().refresh()
+        self._front = VisaService(store=self.store)
+    
+    for_tenant = _unavailable('visa', 'for_tenant', "Tenant rules are not available while the services are sharded")
+    rule_versions = _unavailable('visa', 'rule_versions', _NO_VERSIONS)
+    at_version = _unavailable('visa', 'at_version', _NO_VERSIONS)
+    evaluate_versions = _unavailable('visa', 'evaluate_versions', _NO_VERSIONS)
+    diff_versions = _unavailable('visa', 'diff_versions', _NO_VERSIONS)
+    
+    @_timed_as('visa')
+    def get_visa_recommendations(self, profile):
+        """get_visa_recommendations, answered by the worker owning the destination"""
+        shard = self.router.shard_for(profile.get('destination', ''))
+        return self.router.call(shard, 'visa', 'get_visa_recommendations', profile)
+    
+    @_timed_as('visa')
+    def rank_destinations(self, profile, top_k=5):
+        """rank_destinations over every worker's destinations, best first"""
+        ranked = [row for rows in self.router.call_all('visa', 'rank_destinations', profile, top_k) for row in rows]
+        ranked.sort(key=lambda row: -row['ranking_score'])
+        return ranked if top_k is None else ranked[:top_k]
+    
+    @_timed_as('visa')
+    def score_profiles(self, profiles, visa_keys=None):
+        """score_profiles, each profile scored by the worker owning its destination"""
+        by_shard = {}
+        for i, profile in enumerate(profiles):
+            by_shard.setdefault(self.router.shard_for(profile.get('destination', '')), []).append(i)
+        results = [None] * len(profiles)
+        for shard, indexes in by_shard.items():
+            scores = self.router.call(shard, 'visa', 'score_profiles', [profiles[i] for i in indexes], visa_keys)
+            for i, row in zip(indexes, scores):
+                results[i] = row
+        return results
+    
+    @_timed_as('visa')
+    def find_visa_options(self, profile, max_processing_days):
+        """find_visa_options over every worker's destinations, quickest first"""
+        options = [row for rows in self.router.call_all('visa', 'find_visa_options', profile, max_processing_days)
+                   for row in rows]
+        options.sort(key=lambda o: (o['processing_days'][1], o['processing_days'][0], o['destination'], o['visa_key']))
+        return options
+    
+    @_timed_as('visa')
+    def get_all_countries(self):
+        """Get list of all countries with visa information"""
+        return list(self.router.visa_countries)
+    
+    match_occupation = _any_shard('visa', 'match_occupation')
+    get_duration_ranges = _any_shard('visa', 'get_duration_ranges')
+    get_country_info = _routed('visa', 'get_country_info')
+    get_visa_types_for_country = _routed('visa', 'get_visa_types_for_country')
+
+
+class ShardedCultureService:
+    def __init__(self, router):
+        """
+        CultureService front end for a ShardRouter
+        
+        Args:
+            router (ShardRouter): Running shard workers
+        """
+        self.router = router
+    
+    @property
+    def data_version(self):
+        """Hash identifying the loaded data"""
+        return self.router.culture_version
+    
+    @_timed_as('culture')
+    def reload(self):
+        """Re-read the data in every worker"""
+        self.router.reload()
+    
+    @_timed_as('culture')
+    def get_available_countries(self):
+        """Get list of countries with cultural data"""
+        return list(self.router.culture_countries)
+    
+    @_timed_as('culture')
+    def compare_communication_styles(self, country1, country2, locale=None):
+        """compare_communication_styles, asking the worker owning each country"""
+        return {
+            'country1': {'name': country1, 'style': self.get_communication_style(country1, locale)},
+            'country2': {'name': country2, 'style': self.get_communication_style(country2, locale)}
+        }
+    
+    get_country_culture = _routed('culture', 'get_country_culture')
+    get_workplace_culture = _routed('culture', 'get_workplace_culture')
+    get_communication_style = _routed('culture', 'get_communication_style')
+    get_business_etiquette = _routed('culture', 'get_business_etiquette')
+    get_cultural_tips = _routed('culture', 'get_cultural_tips')
+    get_time_zone_info = _routed('culture', 'get_time_zone_info')
+    get_working_hours = _routed('culture', 'get_working_hours')
+    get_holidays = _routed('culture', 'get_holidays')
+    get_email_etiquette = _any_shard('culture', 'get_email_etiquette')
+    get_virtual_meeting_tips = _any_shard('culture', 'get_virtual_meeting_tips')
+    get_cultural_adaptation_tips = _any_shard('culture', 'get_cultural_adaptation_tips')
+    get_available_locales = _any_shard('culture', 'get_available_locales')
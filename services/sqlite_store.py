@@ -0,0 +1,558 @@
+"""
+SQLite Stores - Database-backed alternatives to the JSON stores
+
+The visa rules and culture data are imported into normalized tables so a
+lookup only reads the rows it needs instead of holding every file in memory.
+Each thread gets its own read-only connection from a small pool, and every
+query is a fixed SQL string so sqlite3's statement cache reuses the prepared
+statement on every call.
+
+Create or refresh the database with `python -m tools.import_sqlite`, then
+run the app with VISAVERSE_STORAGE=sqlite.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+
+from services.durations import parse_visa_durations
+from services.metrics import timer
+from services.stores import (
+    VISA_DATA_PATH, CULTURE_DATA_PATH, SQLITE_DATA_PATH,
+    load_json_file
+)
+from utils.constants import PURPOSE_VISA_TYPES, DEFAULT_PURPOSE_VISA_TYPES
+
+SCHEMA_VERSION = '4'
+
+# visa_purposes row used when a purpose has no rows of its own
+DEFAULT_PURPOSE = '*'
+
+VISA_TYPE_FIELDS = (
+    'name', 'countries', 'processing_time', 'validity', 'requirements', 'success_factors', 'base_score'
+)
+
+SCHEMA = """
+CREATE TABLE meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE visa_types (
+    visa_key TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    processing_time TEXT,
+    validity TEXT,
+    processing_min_days INTEGER NOT NULL,
+    processing_max_days INTEGER,
+    validity_min_days INTEGER NOT NULL,
+    validity_max_days INTEGER,
+    base_score
+) WITHOUT ROWID;
+CREATE INDEX visa_types_by_position ON visa_types (position, visa_key, name);
+
+CREATE TABLE visa_requirements (
+    visa_key TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    requirement TEXT NOT NULL,
+    PRIMARY KEY (visa_key, position)
+) WITHOUT ROWID;
+
+CREATE TABLE visa_success_factors (
+    visa_key TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    factor TEXT NOT NULL,
+    weight NOT NULL,
+    PRIMARY KEY (visa_key, position)
+) WITHOUT ROWID;
+
+CREATE TABLE visa_countries (
+    country TEXT NOT NULL,
+    visa_key TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (country, visa_key)
+) WITHOUT ROWID;
+CREATE INDEX visa_countries_by_type ON visa_countries (visa_key, position, country);
+
+CREATE TABLE visa_purposes (
+    purpose TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    visa_key TEXT NOT NULL,
+    PRIMARY KEY (purpose, position)
+) WITHOUT ROWID;
+
+CREATE TABLE eligibility_points (
+    category TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    category_position INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    points NOT NULL,
+    PRIMARY KEY (category, bucket)
+) WITHOUT ROWID;
+
+CREATE TABLE country_info (
+    country TEXT PRIMARY KEY,
+    position INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX country_info_by_position ON country_info (position, country);
+
+CREATE TABLE culture_countries (
+    country TEXT PRIMARY KEY,
+    position INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX culture_countries_by_position ON culture_countries (position, country);
+"""
+
+# Free-form records (country info, culture, general tips) share one layout:
+# one row per top-level field, plus one row per item of list and dict fields
+RECORD_TABLES = ('country_info', 'culture', 'general_tip')
+
+RECORD_SCHEMA = """
+CREATE TABLE {prefix}_fields (
+    owner TEXT NOT NULL,
+    field TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    value,
+    PRIMARY KEY (owner, field)
+) WITHOUT ROWID;
+
+CREATE TABLE {prefix}_entries (
+    owner TEXT NOT NULL,
+    field TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT,
+    value,
+    PRIMARY KEY (owner, field, position)
+) WITHOUT ROWID;
+"""
+
+SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
+class ConnectionPool:
+    def __init__(self, db_path):
+        """
+        Hand out one read-only connection per thread
+        
+        Args:
+            db_path (str): Path to the SQLite database
+        """
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(
+                f"SQLite database not found at {db_path}. "
+                f"Run `python -m tools.import_sqlite` to create it."
+            )
+        self.db_path = db_path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self._generation = 0
+    
+    def connection(self):
+        """The calling thread's connection, opened on first use"""
+        local = self._local
+        if getattr(local, 'generation', None) != self._generation:
+            stale = getattr(local, 'conn', None)
+            if stale is not None:
+                self._discard(stale)
+            conn = sqlite3.connect(
+                f"file:{self.db_path}?mode=ro",
+                uri=True,
+                check_same_thread=False,
+                cached_statements=256
+            )
+            with self._lock:
+                self._connections.append(conn)
+            local.conn = conn
+            local.generation = self._generation
+        return local.conn
+    
+    def reset(self):
+        """Make every thread reopen its connection on its next query"""
+        with self._lock:
+            self._generation += 1
+    
+    def close(self):
+        """Close every connection"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._generation += 1
+        for conn in connections:
+            conn.close()
+    
+    def _discard(self, conn):
+        # Each thread closes its own stale connection, so none is closed mid-query
+        with self._lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        conn.close()
+
+
+def _read_record(conn, prefix, owner):
+    """Rebuild a free-form record from its field and entry rows in one query"""
+    record = {}
+    for field, kind, value, name, item in conn.execute(
+            f"SELECT f.field, f.kind, f.value, e.name, e.value FROM {prefix}_fields f "
+            f"LEFT JOIN {prefix}_entries e ON e.owner = f.owner AND e.field = f.field "
+            f"WHERE f.owner = ? ORDER BY f.position, e.position", (owner,)):
+        if kind == 'scalar':
+            record[field] = value
+            continue
+        container = record.get(field)
+        if container is None:
+            container = record[field] = [] if kind == 'list' else {}
+        # For lists and dicts the field row's value is the entry count
+        if not value:
+            continue
+        if kind == 'list':
+            container.append(item)
+        else:
+            container[name] = item
+    return record
+
+
+def _read_field(conn, prefix, owner, field, default):
+    """Read one field of a free-form record, or default if it is missing"""
+    row = conn.execute(
+        f"SELECT kind, value FROM {prefix}_fields WHERE owner = ? AND field = ?", (owner, field)
+    ).fetchone()
+    if row is None:
+        return default
+    kind, value = row
+    if kind == 'scalar':
+        return value
+    if not value:
+        return [] if kind == 'list' else {}
+    entries = conn.execute(
+        f"SELECT name, value FROM {prefix}_entries WHERE owner = ? AND field = ? ORDER BY position",
+        (owner, field)
+    )
+    if kind == 'list':
+        return [value for _, value in entries]
+    return {name: value for name, value in entries}
+
+
+class SqliteVisaStore:
+    # Lookups query the database, so async callers run them on a worker thread
+    blocking_reads = True
+    
+    def __init__(self, db_path=None):
+        """
+        Serve visa rules from a SQLite database
+        
+        Args:
+            db_path (str): Path to the database created by tools/import_sqlite.py
+        """
+        self.data_path = db_path or SQLITE_DATA_PATH
+        self.pool = ConnectionPool(self.data_path)
+        self.reload()
+    
+    def reload(self):
+        """Reopen pooled connections and re-read the data version"""
+        self.pool.reset()
+        with timer('visaverse_data_load_seconds', dataset='visa_rules'):
+            conn = self.pool.connection()
+            _check_schema_version(conn, self.data_path)
+            self.data_version = _read_meta(conn, 'visa_version')
+            # A handful of rows read on every eligibility score, so keep them in memory
+            criteria = {}
+            for category, bucket, points in conn.execute(
+                    "SELECT category, bucket, points FROM eligibility_points ORDER BY category_position, position"):
+                criteria.setdefault(category, {})[bucket] = points
+            self._eligibility_criteria = criteria
+    
+    @property
+    def data(self):
+        """Materialize the full visa rules in the JSON layout"""
+        return {
+            'visa_types': {key: self.get_visa_type(key) for key in self.visa_type_keys()},
+            'country_specific_info': {country: self.get_country_info(country) for country in self.countries()},
+            'eligibility_criteria': self.eligibility_criteria()
+        }
+    
+    def get_visa_type(self, visa_key):
+        """Visa type record, or None"""
+        row = self.pool.connection().execute(
+            "SELECT name, processing_time, validity, "
+            "(SELECT json_group_array(country) FROM "
+            "(SELECT country FROM visa_countries WHERE visa_key = t.visa_key ORDER BY position)), "
+            "(SELECT json_group_array(requirement) FROM "
+            "(SELECT requirement FROM visa_requirements WHERE visa_key = t.visa_key ORDER BY position)), "
+            "(SELECT json_group_array(json_array(factor, weight)) FROM "
+            "(SELECT factor, weight FROM visa_success_factors WHERE visa_key = t.visa_key ORDER BY position)), "
+            "base_score "
+            "FROM visa_types t WHERE visa_key = ?",
+            (visa_key,)
+        ).fetchone()
+        if row is None:
+            return None
+        visa = {
+            'name': row[0],
+            'countries': json.loads(row[3]),
+            'processing_time': row[1],
+            'validity': row[2],
+            'requirements': json.loads(row[4]),
+            'success_factors': dict(json.loads(row[5]))
+        }
+        if row[6] is not None:
+            visa['base_score'] = row[6]
+        return visa
+    
+    def visa_type_keys(self):
+        """All visa type keys in import order"""
+        return [key for (key,) in self.pool.connection().execute(
+            "SELECT visa_key FROM visa_types ORDER BY position")]
+    
+    def visa_keys_for(self, purpose, destination):
+        """Keys of visa types matching a purpose that are available in a destination"""
+        return [key for (key,) in self.pool.connection().execute(
+            "SELECT p.visa_key FROM visa_purposes p "
+            "JOIN visa_countries c ON c.country = ? AND c.visa_key = p.visa_key "
+            "WHERE p.purpose = COALESCE((SELECT purpose FROM visa_purposes WHERE purpose = ? LIMIT 1), ?) "
+            "ORDER BY p.position",
+            (destination, purpose, DEFAULT_PURPOSE)
+        )]
+    
+    def visa_type_names_for_country(self, country):
+        """Names of every visa type available in a country"""
+        return [name for (name,) in self.pool.connection().execute(
+            "SELECT t.name FROM visa_countries c JOIN visa_types t ON t.visa_key = c.visa_key "
+            "WHERE c.country = ? ORDER BY t.position",
+            (country,)
+        )]
+    
+    def get_country_info(self, country):
+        """Country-specific visa information, or None"""
+        conn = self.pool.connection()
+        record = _read_record(conn, 'country_info', country)
+        if not record and conn.execute("SELECT 1 FROM country_info WHERE country = ?", (country,)).fetchone() is None:
+            return None
+        return record
+    
+    def countries(self):
+        """Countries with country-specific visa information"""
+        return [country for (country,) in self.pool.connection().execute(
+            "SELECT country FROM country_info ORDER BY position")]
+    
+    def eligibility_criteria(self):
+        """Points tables for eligibility scoring"""
+        return self._eligibility_criteria
+    
+    def duration_ranges(self):
+        """Parsed processing and validity day ranges per visa type"""
+        return {
+            key: {'processing_days': (p_min, p_max), 'validity_days': (v_min, v_max)}
+            for key, p_min, p_max, v_min, v_max in self.pool.connection().execute(
+                "SELECT visa_key, processing_min_days, processing_max_days, validity_min_days, validity_max_days "
+                "FROM visa_types ORDER BY position")
+        }
+
+
+class SqliteCultureStore:
+    # Lookups query the database, so async callers run them on a worker thread
+    blocking_reads = True
+    
+    def __init__(self, db_path=None):
+        """
+        Serve culture data from a SQLite database
+        
+        Args:
+            db_path (str): Path to the database created by tools/import_sqlite.py
+        """
+        self.data_path = db_path or SQLITE_DATA_PATH
+        self.pool = ConnectionPool(self.data_path)
+        self.reload()
+    
+    def reload(self):
+        """Reopen pooled connections and re-read the data version"""
+        self.pool.reset()
+        with timer('visaverse_data_load_seconds', dataset='culture_data'):
+            conn = self.pool.connection()
+            _check_schema_version(conn, self.data_path)
+            self.data_version = _read_meta(conn, 'culture_version')
+    
+    @property
+    def data(self):
+        """Materialize the full culture data in the JSON layout"""
+        conn = self.pool.connection()
+        fields = [field for (field,) in conn.execute(
+            "SELECT field FROM general_tip_fields WHERE owner = '' ORDER BY position")]
+        return {
+            'countries': {country: self.get_country(country) for country in self.countries()},
+            'general_tips': {field: self.get_general_tip(field, None) for field in fields}
+        }
+    
+    def get_country(self, country):
+        """Full culture record for a country, or None"""
+        conn = self.pool.connection()
+        record = _read_record(conn, 'culture', country)
+        if not record and conn.execute("SELECT 1 FROM culture_countries WHERE country = ?", (country,)).fetchone() is None:
+            return None
+        return record
+    
+    def get_country_field(self, country, field, default):
+        """One field of a country's culture record, or default if the country or field is missing"""
+        return _read_field(self.pool.connection(), 'culture', country, field, default)
+    
+    def countries(self):
+        """Countries with culture data"""
+        return [country for (country,) in self.pool.connection().execute(
+            "SELECT country FROM culture_countries ORDER BY position")]
+    
+    def get_general_tip(self, name, default):
+        """A general tips section such as 'email_etiquette'"""
+        return _read_field(self.pool.connection(), 'general_tip', '', name, default)
+
+
+def _read_meta(conn, key):
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    if row is None:
+        raise ValueError(f"SQLite database is missing '{key}'; re-run tools/import_sqlite.py")
+    return row[0]
+
+
+def _check_schema_version(conn, db_path):
+    if _read_meta(conn, 'schema_version') != SCHEMA_VERSION:
+        raise ValueError(f"SQLite database at {db_path} uses an older schema; re-run tools/import_sqlite.py")
+
+
+def _record_rows(owner, record, where):
+    """
+    Flatten a free-form record into field and entry rows
+    
+    Args:
+        owner (str): Record owner, e.g. a country name
+        record (dict): Record to flatten
+        where (str): Location used in error messages
+    
+    Returns:
+        tuple: (field rows, entry rows)
+    """
+    fields = []
+    entries = []
+    for position, (field, value) in enumerate(record.items()):
+        if isinstance(value, dict):
+            fields.append((owner, field, position, 'dict', len(value)))
+            items = list(value.items())
+        elif isinstance(value, list):
+            fields.append((owner, field, position, 'list', len(value)))
+            items = [(None, item) for item in value]
+        elif isinstance(value, SCALAR_TYPES):
+            fields.append((owner, field, position, 'scalar', value))
+            continue
+        else:
+            raise ValueError(f"Unsupported value at {where}.{field}")
+        for i, (name, item) in enumerate(items):
+            if not isinstance(item, SCALAR_TYPES):
+                raise ValueError(f"Nested value at {where}.{field} cannot be stored")
+            entries.append((owner, field, i, name, item))
+    return fields, entries
+
+
+def _insert_record(conn, prefix, owner, record, where):
+    fields, entries = _record_rows(owner, record, where)
+    conn.executemany(f"INSERT INTO {prefix}_fields VALUES (?, ?, ?, ?, ?)", fields)
+    conn.executemany(f"INSERT INTO {prefix}_entries VALUES (?, ?, ?, ?, ?)", entries)
+
+
+def _import_visa_rules(conn, data):
+    durations = parse_visa_durations(data['visa_types'])
+    for position, (visa_key, visa) in enumerate(data['visa_types'].items()):
+        unknown = set(visa) - set(VISA_TYPE_FIELDS)
+        if unknown:
+            raise ValueError(f"Unsupported fields in visa type '{visa_key}': {', '.join(sorted(unknown))}")
+        conn.execute(
+            "INSERT INTO visa_types VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (visa_key, position, visa['name'], visa.get('processing_time'), visa.get('validity'))
+            + durations[visa_key]['processing_days'] + durations[visa_key]['validity_days']
+            + (visa.get('base_score'),)
+        )
+        conn.executemany(
+            "INSERT INTO visa_countries VALUES (?, ?, ?)",
+            [(country, visa_key, i) for i, country in enumerate(visa.get('countries', []))]
+        )
+        conn.executemany(
+            "INSERT INTO visa_requirements VALUES (?, ?, ?)",
+            [(visa_key, i, req) for i, req in enumerate(visa.get('requirements', []))]
+        )
+        conn.executemany(
+            "INSERT INTO visa_success_factors VALUES (?, ?, ?, ?)",
+            [(visa_key, i, factor, weight) for i, (factor, weight) in enumerate(visa.get('success_factors', {}).items())]
+        )
+    
+    purposes = dict(PURPOSE_VISA_TYPES)
+    purposes[DEFAULT_PURPOSE] = DEFAULT_PURPOSE_VISA_TYPES
+    conn.executemany(
+        "INSERT INTO visa_purposes VALUES (?, ?, ?)",
+        [(purpose, i, key) for purpose, keys in purposes.items() for i, key in enumerate(keys)]
+    )
+    
+    for position, (country, info) in enumerate(data['country_specific_info'].items()):
+        conn.execute("INSERT INTO country_info VALUES (?, ?)", (country, position))
+        _insert_record(conn, 'country_info', country, info, f"country_specific_info.{country}")
+    
+    conn.executemany(
+        "INSERT INTO eligibility_points VALUES (?, ?, ?, ?, ?)",
+        [
+            (category, bucket, c, i, points)
+            for c, (category, table) in enumerate(data['eligibility_criteria'].items())
+            for i, (bucket, points) in enumerate(table.items())
+        ]
+    )
+
+
+def _import_culture_data(conn, data):
+    for position, (country, info) in enumerate(data['countries'].items()):
+        conn.execute("INSERT INTO culture_countries VALUES (?, ?)", (country, position))
+        _insert_record(conn, 'culture', country, info, f"countries.{country}")
+    _insert_record(conn, 'general_tip', '', data.get('general_tips', {}), 'general_tips')
+
+
+def build_database(db_path=None, visa_path=None, culture_path=None):
+    """
+    Import the JSON data files into a fresh SQLite database
+    
+    The database is written next to the target and moved into place at the
+    end, so running stores never see a half-written file.
+    
+    Args:
+        db_path (str): Output database path
+        visa_path (str): visa_rules.json to import
+        culture_path (str): culture_data.json to import
+    
+    Returns:
+        dict: Row counts per table
+    """
+    db_path = db_path or SQLITE_DATA_PATH
+    visa_data, visa_version = load_json_file(visa_path or VISA_DATA_PATH, 'visa_rules', 'Visa')
+    culture_data, culture_version = load_json_file(culture_path or CULTURE_DATA_PATH, 'culture_data', 'Culture')
+    
+    tmp_path = f"{db_path}.tmp-{os.getpid()}"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(SCHEMA + ''.join(RECORD_SCHEMA.format(prefix=p) for p in RECORD_TABLES))
+        with conn:
+            conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+                ('schema_version', SCHEMA_VERSION),
+                ('visa_version', visa_version),
+                ('culture_version', culture_version)
+            ])
+            _import_visa_rules(conn, visa_data)
+            _import_culture_data(conn, culture_data)
+        conn.execute("ANALYZE")
+        tables = [name for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name")]
+        counts = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in tables}
+        conn.execute("VACUUM")
+    except Exception:
+        conn.close()
+        os.remove(tmp_path)
+        raise
+    conn.close()
+    os.replace(tmp_path, db_path)
+    return counts
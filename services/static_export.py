@@ -0,0 +1,270 @@
+"""
+Static Export - Pre-renders the culture guides and country panels to static HTML
+
+The culture tabs and the destination key-information panels depend only on
+the data files, so they can be served by a CDN instead of the app. Every
+page is written under a content-hashed filename, so it can be cached
+forever; index.html and manifest.json are the only files whose content
+changes under a fixed name.
+
+Builds are incremental: the manifest records a hash of each page's source
+data, and only pages whose source changed are rendered again. Rendering
+runs in a process pool.
+"""
+
+import hashlib
+import html
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from services.culture_service import CultureService
+from services.render_service import RenderService
+from services.visa_service import VisaService
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STYLESHEET_PATH = os.path.join(ROOT_DIR, 'assets', 'style.css')
+DEFAULT_SITE_DIR = os.path.join(ROOT_DIR, 'site')
+MANIFEST_NAME = 'manifest.json'
+
+# Bump when the page templates change, so every page is rebuilt
+TEMPLATE_VERSION = 1
+
+_SLUG = re.compile(r'[^a-z0-9]+')
+_BOLD = re.compile(r'\*\*(.+?)\*\*')
+
+CULTURE_TABS = [
+    ('workplace', "Workplace Culture", "Workplace culture information not available for this country."),
+    ('communication', "Communication Style", "Communication style information not available for this country."),
+    ('etiquette', "Business Etiquette", "Business etiquette information not available for this country."),
+    ('tips', "Quick Tips", "Cultural tips not available for this country.")
+]
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title} - VisaVerse Copilot</title>
+<link rel="stylesheet" href="{stylesheet}">
+</head>
+<body>
+<main class="block-container">
+{body}
+</main>
+</body>
+</html>
+"""
+
+# Services for rendering inside a pool worker, built once per process
+_worker = {}
+
+
+def slugify(name):
+    """URL-safe lowercase name, e.g. 'United Kingdom' -> 'united-kingdom'"""
+    return _SLUG.sub('-', name.lower()).strip('-')
+
+
+def _hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def markdown_to_html(text):
+    """
+    Convert the markdown subset used by the rendered fragments to HTML
+    
+    Handles '- ' bullet lists, **bold**, blank-line paragraphs and line
+    breaks; everything else is escaped text.
+    
+    Args:
+        text (str): Markdown fragment
+    
+    Returns:
+        str: HTML
+    """
+    blocks = []
+    for block in re.split(r'\n\s*\n', text.strip()):
+        lines = [_BOLD.sub(r'<strong>\1</strong>', html.escape(line.strip())) for line in block.splitlines()]
+        if all(line.startswith('- ') for line in lines):
+            blocks.append("<ul>\n" + "\n".join(f"<li>{line[2:]}</li>" for line in lines) + "\n</ul>")
+        else:
+            blocks.append("<p>" + "<br>\n".join(lines) + "</p>")
+    return "\n".join(blocks)
+
+
+def render_culture_page(render_service, country, stylesheet):
+    """
+    Render one country's culture guide, with every tab as a section
+    
+    Args:
+        render_service (RenderService): Source of the rendered fragments
+        country (str): Country with culture data
+        stylesheet (str): Stylesheet URL relative to the page
+    
+    Returns:
+        str: HTML page
+    """
+    sections = render_service.get_culture_sections(country)
+    body = [f"<h1>{html.escape(country)} - Cultural Insights</h1>"]
+    for key, heading, missing in CULTURE_TABS:
+        body.append(f'<section id="{key}">\n<h2>{heading}</h2>')
+        body.append(markdown_to_html(sections[key]) if sections[key] else f"<p>{missing}</p>")
+        if key == 'tips':
+            body.append("<h3>General Adaptation Tips</h3>")
+            body.append(markdown_to_html(render_service.get_adaptation_tips()))
+        body.append("</section>")
+    return PAGE_TEMPLATE.format(title=html.escape(country), stylesheet=stylesheet, body="\n".join(body))
+
+
+def render_country_page(render_service, country, stylesheet):
+    """
+    Render one destination's key-information panel
+    
+    Args:
+        render_service (RenderService): Source of the rendered fragments
+        country (str): Destination with country-specific visa information
+        stylesheet (str): Stylesheet URL relative to the page
+    
+    Returns:
+        str: HTML page
+    """
+    panel = render_service.get_country_info(country) or "No key information available for this country."
+    body = f"<h1>{html.escape(country)} - Key Information</h1>\n{markdown_to_html(panel)}"
+    return PAGE_TEMPLATE.format(title=html.escape(country), stylesheet=stylesheet, body=body)
+
+
+def _init_worker(visa_path, culture_path):
+    """Pool initializer: load the services once per worker process"""
+    visa_service = VisaService(data_path=visa_path)
+    culture_service = CultureService(data_path=culture_path)
+    _worker['render'] = RenderService(visa_service, culture_service)
+
+
+def _render_task(task):
+    """Render one (kind, country, stylesheet) page in a pool worker"""
+    kind, country, stylesheet = task
+    render = render_culture_page if kind == 'culture' else render_country_page
+    return render(_worker['render'], country, stylesheet)
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _source_hash(*parts):
+    """Hash of the data a page is rendered from, plus the template version"""
+    return _hash(json.dumps([TEMPLATE_VERSION] + list(parts), sort_keys=True, default=str).encode('utf-8'))[:16]
+
+
+def _read_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return manifest if manifest.get('template_version') == TEMPLATE_VERSION else {}
+
+
+def _render_index(pages, stylesheet):
+    """Index page linking every exported page"""
+    body = ["<h1>VisaVerse Copilot</h1>"]
+    for kind, heading in (('culture', "Cultural Guides"), ('countries', "Destination Key Information")):
+        links = sorted((entry['country'], entry['file']) for entry in pages.values() if entry['kind'] == kind)
+        body.append(f"<h2>{heading}</h2>\n<ul>")
+        body.extend(f'<li><a href="{html.escape(file)}">{html.escape(country)}</a></li>' for country, file in links)
+        body.append("</ul>")
+    return PAGE_TEMPLATE.format(title="Guides", stylesheet=stylesheet, body="\n".join(body))
+
+
+def build_site(output_dir=None, jobs=None, force=False, visa_path=None, culture_path=None):
+    """
+    Export every culture guide and destination panel as static HTML
+    
+    Args:
+        output_dir (str): Site directory, site/ by default
+        jobs (int): Worker processes; 1 renders in this process. Defaults
+            to the CPU count
+        force (bool): Render every page even if its source is unchanged
+        visa_path (str): Optional alternative visa_rules.json
+        culture_path (str): Optional alternative culture_data.json
+    
+    Returns:
+        dict: Counts of 'rendered', 'unchanged' and 'removed' pages
+    """
+    output_dir = output_dir or DEFAULT_SITE_DIR
+    visa_service = VisaService(data_path=visa_path)
+    culture_service = CultureService(data_path=culture_path)
+    
+    with open(STYLESHEET_PATH, 'rb') as f:
+        css = f.read()
+    stylesheet = f"assets/style.{_hash(css)[:12]}.css"
+    if not os.path.exists(os.path.join(output_dir, stylesheet)):
+        _write_atomic(os.path.join(output_dir, stylesheet), css)
+    
+    adaptation_tips = culture_service.get_cultural_adaptation_tips()
+    sources = {}
+    for country in culture_service.get_available_countries():
+        sources[f"culture/{slugify(country)}"] = (
+            'culture', country,
+            _source_hash(culture_service.get_country_culture(country), adaptation_tips, stylesheet)
+        )
+    for country in visa_service.get_all_countries():
+        sources[f"countries/{slugify(country)}"] = (
+            'countries', country,
+            _source_hash(visa_service.get_country_info(country), stylesheet)
+        )
+    
+    previous = _read_manifest(output_dir).get('pages', {})
+    pages = {}
+    todo = []
+    for name, (kind, country, source_hash) in sources.items():
+        entry = previous.get(name)
+        if (not force and entry and entry['source_hash'] == source_hash
+                and os.path.exists(os.path.join(output_dir, entry['file']))):
+            pages[name] = entry
+        else:
+            todo.append(name)
+    
+    # Pages sit one directory down, so they reach the stylesheet through '..'
+    tasks = [(sources[name][0], sources[name][1], f"../{stylesheet}") for name in todo]
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(tasks)), initializer=_init_worker,
+                                 initargs=(visa_path, culture_path)) as pool:
+            rendered = list(pool.map(_render_task, tasks, chunksize=max(1, len(tasks) // (jobs * 4))))
+    else:
+        render_service = RenderService(visa_service, culture_service)
+        rendered = [
+            (render_culture_page if kind == 'culture' else render_country_page)(render_service, country, css_url)
+            for kind, country, css_url in tasks
+        ]
+    
+    for name, page in zip(todo, rendered):
+        data = page.encode('utf-8')
+        kind, country, source_hash = sources[name]
+        file = f"{name}.{_hash(data)[:12]}.html"
+        path = os.path.join(output_dir, file)
+        if not os.path.exists(path):
+            _write_atomic(path, data)
+        pages[name] = {'kind': kind, 'country': country, 'file': file, 'source_hash': source_hash}
+    
+    # Old page versions are removed only after the new ones are in place
+    keep = {entry['file'] for entry in pages.values()}
+    removed = 0
+    for entry in previous.values():
+        if entry['file'] not in keep:
+            try:
+                os.remove(os.path.join(output_dir, entry['file']))
+                removed += 1
+            except FileNotFoundError:
+                pass
+    
+    _write_atomic(os.path.join(output_dir, 'index.html'), _render_index(pages, stylesheet).encode('utf-8'))
+    manifest = {'template_version': TEMPLATE_VERSION, 'stylesheet': stylesheet, 'pages': pages}
+    _write_atomic(os.path.join(output_dir, MANIFEST_NAME), json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+    return {'rendered': len(todo), 'unchanged': len(pages) - len(todo), 'removed': removed}
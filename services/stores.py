@@ -0,0 +1,189 @@
+"""
+Data Stores - JSON-file storage behind VisaService and CultureService
+
+A store owns the loaded data and answers the lookups the services need.
+The JSON stores keep the whole file in memory; services/sqlite_store.py
+and services/compiled_store.py provide drop-in equivalents backed by a
+SQLite database and a validated, pre-indexed artifact.
+"""
+
+import hashlib
+import json
+import os
+
+from services.durations import parse_visa_durations
+from services.metrics import timer
+from utils.constants import (
+    PURPOSE_VISA_TYPES, DEFAULT_PURPOSE_VISA_TYPES,
+    STORAGE_ENV_VAR, SQLITE_PATH_ENV_VAR, COMPILED_PATH_ENV_VAR
+)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+VISA_DATA_PATH = os.path.join(DATA_DIR, 'visa_rules.json')
+CULTURE_DATA_PATH = os.path.join(DATA_DIR, 'culture_data.json')
+SQLITE_DATA_PATH = os.path.join(DATA_DIR, 'visaverse.db')
+
+
+def load_json_file(data_path, dataset, label):
+    """
+    Load a JSON data file and hash its contents
+    
+    Args:
+        data_path (str): Path to the file
+        dataset (str): Dataset name for metrics, e.g. 'visa_rules'
+        label (str): Human-readable name for error messages, e.g. 'Visa'
+    
+    Returns:
+        tuple: (parsed data, data version hash of the file contents)
+    """
+    try:
+        with timer('visaverse_data_load_seconds', dataset=dataset):
+            with open(data_path, 'rb') as f:
+                raw = f.read()
+            return json.loads(raw.decode('utf-8')), hashlib.sha256(raw).hexdigest()[:16]
+    except FileNotFoundError:
+        raise FileNotFoundError(
+            f"{label} data file not found at {data_path}. "
+            f"Please ensure data/{os.path.basename(data_path)} exists."
+        )
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON in {label.lower()} data file: {e}")
+
+
+def visa_keys_for_purpose(purpose):
+    """Visa type keys to consider for a travel purpose, in recommendation order"""
+    return PURPOSE_VISA_TYPES.get(purpose, DEFAULT_PURPOSE_VISA_TYPES)
+
+
+class JsonVisaStore:
+    # Lookups are served from memory, so async callers need not leave the event loop
+    blocking_reads = False
+    
+    def __init__(self, data_path=None):
+        """
+        Load visa rules from a JSON file
+        
+        Args:
+            data_path (str): Optional path to an alternative data file
+        """
+        self.data_path = data_path or VISA_DATA_PATH
+        self.reload()
+    
+    def reload(self):
+        """Re-read the data file and parse the duration ranges"""
+        self.data, self.data_version = load_json_file(self.data_path, 'visa_rules', 'Visa')
+        self.durations = parse_visa_durations(self.data['visa_types'])
+    
+    def get_visa_type(self, visa_key):
+        """Visa type record, or None"""
+        return self.data['visa_types'].get(visa_key)
+    
+    def visa_type_keys(self):
+        """All visa type keys in file order"""
+        return list(self.data['visa_types'])
+    
+    def visa_keys_for(self, purpose, destination):
+        """Keys of visa types matching a purpose that are available in a destination"""
+        visa_types = self.data['visa_types']
+        return [
+            key for key in visa_keys_for_purpose(purpose)
+            if key in visa_types and destination in visa_types[key]['countries']
+        ]
+    
+    def visa_type_names_for_country(self, country):
+        """Names of every visa type available in a country"""
+        return [visa['name'] for visa in self.data['visa_types'].values() if country in visa['countries']]
+    
+    def get_country_info(self, country):
+        """Country-specific visa information, or None"""
+        return self.data['country_specific_info'].get(country)
+    
+    def countries(self):
+        """Countries with country-specific visa information"""
+        return list(self.data['country_specific_info'])
+    
+    def eligibility_criteria(self):
+        """Points tables for eligibility scoring"""
+        return self.data['eligibility_criteria']
+    
+    def duration_ranges(self):
+        """Parsed processing and validity day ranges per visa type"""
+        return self.durations
+
+
+class JsonCultureStore:
+    # Lookups are served from memory, so async callers need not leave the event loop
+    blocking_reads = False
+    
+    def __init__(self, data_path=None):
+        """
+        Load culture data from a JSON file
+        
+        Args:
+            data_path (str): Optional path to an alternative data file
+        """
+        self.data_path = data_path or CULTURE_DATA_PATH
+        self.reload()
+    
+    def reload(self):
+        """Re-read the data file"""
+        self.data, self.data_version = load_json_file(self.data_path, 'culture_data', 'Culture')
+    
+    def get_country(self, country):
+        """Full culture record for a country, or None"""
+        return self.data['countries'].get(country)
+    
+    def get_country_field(self, country, field, default):
+        """One field of a country's culture record, or default if the country or field is missing"""
+        country_data = self.data['countries'].get(country)
+        if country_data:
+            return country_data.get(field, default)
+        return default
+    
+    def countries(self):
+        """Countries with culture data"""
+        return list(self.data['countries'])
+    
+    def get_general_tip(self, name, default):
+        """A general tips section such as 'email_etiquette'"""
+        return self.data.get('general_tips', {}).get(name, default)
+
+
+def open_visa_store(data_path=None):
+    """
+    Open the visa rules store selected by VISAVERSE_STORAGE ('json', 'sqlite' or 'compiled')
+    
+    Args:
+        data_path (str): Optional JSON file path; an explicit path always uses JSON
+    
+    Returns:
+        JsonVisaStore, SqliteVisaStore or CompiledVisaStore
+    """
+    backend = os.environ.get(STORAGE_ENV_VAR, 'json') if data_path is None else 'json'
+    if backend == 'sqlite':
+        from services.sqlite_store import SqliteVisaStore
+        return SqliteVisaStore(os.environ.get(SQLITE_PATH_ENV_VAR) or SQLITE_DATA_PATH)
+    if backend == 'compiled':
+        from services.compiled_store import CompiledVisaStore
+        return CompiledVisaStore(os.environ.get(COMPILED_PATH_ENV_VAR))
+    return JsonVisaStore(data_path)
+
+
+def open_culture_store(data_path=None):
+    """
+    Open the culture store selected by VISAVERSE_STORAGE ('json', 'sqlite' or 'compiled')
+    
+    Args:
+        data_path (str): Optional JSON file path; an explicit path always uses JSON
+    
+    Returns:
+        JsonCultureStore, SqliteCultureStore or CompiledCultureStore
+    """
+    backend = os.environ.get(STORAGE_ENV_VAR, 'json') if data_path is None else 'json'
+    if backend == 'sqlite':
+        from services.sqlite_store import SqliteCultureStore
+        return SqliteCultureStore(os.environ.get(SQLITE_PATH_ENV_VAR) or SQLITE_DATA_PATH)
+    if backend == 'compiled':
+        from services.compiled_store import CompiledCultureStore
+        return CompiledCultureStore(os.environ.get(COMPILED_PATH_ENV_VAR))
+    return JsonCultureStore(data_path)
@@ -0,0 +1,351 @@
+"""
+Traffic - Opt-in capture of service calls to a compact binary log
+
+Set VISAVERSE_TRAFFIC_DIR to switch capture on. Every top-level call to a
+@timed service method is then appended to a log in that directory: method,
+anonymized arguments, start time, latency and whether it raised. Calls a
+service makes to itself are not recorded, so replaying a log issues exactly
+the calls the app made. benchmarks/replay.py re-issues a log against the
+services of any checkout.
+
+A log is a series of segment files, traffic-<start>-<pid>.vvt. A segment is
+rotated once it reaches VISAVERSE_TRAFFIC_SEGMENT_MB and only the newest
+VISAVERSE_TRAFFIC_SEGMENTS are kept. Each segment stands alone:
+
+    header   MAGIC, format version (B)
+    method   KIND_METHOD (B), id (H), name length (H), name
+    call     KIND_CALL or KIND_ERROR (B), method id (H), start time (d),
+             latency in seconds (f), payload length (I), payload
+
+The payload is the call's [args, kwargs] as compact JSON, without self.
+Free text such as a pasted resume is masked: words that the document
+analyzers look for are kept and every other letter and digit is replaced,
+so a replayed analysis does the same work on text of the same length.
+
+When capture is off, recorded() returns the method unchanged.
+"""
+
+import atexit
+import functools
+import glob
+import heapq
+import json
+import logging
+import os
+import re
+import struct
+import threading
+import time
+
+from utils.constants import TRAFFIC_DIR_ENV_VAR, TRAFFIC_SEGMENT_MB_ENV_VAR, TRAFFIC_SEGMENTS_ENV_VAR
+
+TRAFFIC_DIR = os.environ.get(TRAFFIC_DIR_ENV_VAR) or None
+SEGMENT_BYTES = int(float(os.environ.get(TRAFFIC_SEGMENT_MB_ENV_VAR, '64')) * 1024 * 1024)
+MAX_SEGMENTS = int(os.environ.get(TRAFFIC_SEGMENTS_ENV_VAR, '8'))
+ENABLED = TRAFFIC_DIR is not None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'VVTRAFFIC'
+FORMAT_VERSION = 1
+SEGMENT_GLOB = 'traffic-*.vvt'
+
+KIND_METHOD = 0
+KIND_CALL = 1
+KIND_ERROR = 2
+
+_HEADER = struct.Struct('<B')
+_METHOD = struct.Struct('<BHH')
+_CALL = struct.Struct('<BHdfI')
+
+# Buffered bytes written to the segment at once
+FLUSH_BYTES = 64 * 1024
+
+# Methods that change or wrap a service rather than serve a request
+SKIPPED_METHODS = ('reload', 'for_tenant')
+
+# Strings at least this long, or holding an email address, are treated as
+# free text and masked
+TEXT_MIN_LENGTH = 40
+
+# Words kept in masked text: what DocumentService.analyze_resume and
+# analyze_offer_letter search for
+TEXT_KEYWORDS = (
+    'experience', 'work', 'history', 'education', 'university', 'degree', 'skill',
+    'salary', 'compensation', 'position', 'title', 'role', 'start', 'date',
+    'company', 'organization', 'sign'
+)
+
+# Profile and record fields that name a person
+REDACTED_KEYS = ('name', 'email', 'phone', 'address')
+
+_WORD = re.compile(r'\w+')
+_LETTER = re.compile(r'[^\W\d_]')
+_DIGIT = re.compile(r'\d')
+
+_local = threading.local()
+
+
+def mask_text(text):
+    """
+    Mask free text while keeping its length and the analyzer keywords
+    
+    Args:
+        text (str): Text such as a resume or offer letter
+    
+    Returns:
+        str: Text with every word that holds no keyword masked as x's and 0's
+    """
+    def mask(match):
+        word = match.group(0)
+        if any(keyword in word.lower() for keyword in TEXT_KEYWORDS):
+            return word
+        return _DIGIT.sub('0', _LETTER.sub('x', word))
+    return _WORD.sub(mask, text)
+
+
+def anonymize(value):
+    """
+    Copy a call argument with free text masked and personal fields redacted
+    
+    Args:
+        value: Argument as passed to a service method
+    
+    Returns:
+        A JSON-serializable copy
+    """
+    if isinstance(value, str):
+        return mask_text(value) if len(value) >= TEXT_MIN_LENGTH or '@' in value else value
+    if isinstance(value, dict):
+        return {
+            str(key): (mask_text(str(item)) if key in REDACTED_KEYS else anonymize(item))
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [anonymize(item) for item in value]
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    return str(value)
+
+
+class TrafficRecorder:
+    def __init__(self, directory, segment_bytes=SEGMENT_BYTES, max_segments=MAX_SEGMENTS):
+        """
+        Start a log in a directory; nothing is written before the first call
+        
+        Args:
+            directory (str): Directory for the segment files
+            segment_bytes (int): Size at which a segment is rotated
+            max_segments (int): Segments kept, oldest removed first
+        """
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_segments = max_segments
+        self._lock = threading.Lock()
+        self._file = None
+        self._size = 0
+        self._methods = {}
+        self._buffer = bytearray()
+        self.stats = {'calls': 0, 'bytes': 0, 'segments': 0, 'dropped': 0}
+        atexit.register(self.close)
+    
+    def record(self, method, start, latency, error, args, kwargs):
+        """
+        Append one call
+        
+        Args:
+            method (str): Qualified method name, e.g. 'VisaService.get_country_info'
+            start (float): Wall-clock start time in seconds
+            latency (float): Duration in seconds
+            error (bool): Whether the call raised
+            args (tuple): Positional arguments without self
+            kwargs (dict): Keyword arguments
+        """
+        try:
+            payload = json.dumps([anonymize(args), anonymize(kwargs)], separators=(',', ':')).encode('utf-8')
+        except (TypeError, ValueError):
+            self.stats['dropped'] += 1
+            return
+        with self._lock:
+            if self._file is None or self._size >= self.segment_bytes:
+                self._rotate()
+            method_id = self._methods.get(method)
+            if method_id is None:
+                method_id = self._methods[method] = len(self._methods)
+                name = method.encode('utf-8')
+                self._append(_METHOD.pack(KIND_METHOD, method_id, len(name)) + name)
+            self._append(_CALL.pack(KIND_ERROR if error else KIND_CALL, method_id, start, latency, len(payload)))
+            self._append(payload)
+            self.stats['calls'] += 1
+            if len(self._buffer) >= FLUSH_BYTES:
+                self._flush()
+    
+    def flush(self):
+        """Write buffered calls to the current segment"""
+        with self._lock:
+            self._flush()
+    
+    def close(self):
+        """Flush and close the current segment"""
+        with self._lock:
+            if self._file is not None:
+                self._flush()
+                self._file.close()
+                self._file = None
+    
+    def _append(self, data):
+        self._buffer += data
+        self._size += len(data)
+    
+    def _flush(self):
+        if self._buffer and self._file is not None:
+            self._file.write(self._buffer)
+            self._file.flush()
+            self.stats['bytes'] += len(self._buffer)
+            self._buffer.clear()
+    
+    def _rotate(self):
+        """Close the current segment, start a new one and prune the oldest"""
+        if self._file is not None:
+            self._flush()
+            self._file.close()
+            self._file = None
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"traffic-{time.time_ns() // 1000:016d}-{os.getpid()}.vvt")
+        self._file = open(path, 'ab')
+        self._size = 0
+        self._methods = {}
+        self._append(MAGIC + _HEADER.pack(FORMAT_VERSION))
+        self.stats['segments'] += 1
+        for old in segment_paths(self.directory)[:-self.max_segments]:
+            try:
+                os.remove(old)
+            except FileNotFoundError:
+                pass
+
+
+RECORDER = TrafficRecorder(TRAFFIC_DIR) if ENABLED else None
+
+
+def recorded(fn):
+    """
+    Capture calls to a service method, if capture is on
+    
+    Used by metrics.timed, so every timed method is captured. Only the
+    outermost service call on a thread is recorded. A call that cannot be
+    written, e.g. because the disk is full, is counted as dropped and the
+    method's own result or exception is passed on unchanged.
+    """
+    if not ENABLED or fn.__name__ in SKIPPED_METHODS:
+        return fn
+    
+    method = fn.__qualname__
+    
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        if getattr(_local, 'depth', 0):
+            return fn(self, *args, **kwargs)
+        _local.depth = 1
+        error = False
+        wall = time.time()
+        start = time.perf_counter()
+        try:
+            return fn(self, *args, **kwargs)
+        except Exception:
+            error = True
+            raise
+        finally:
+            latency = time.perf_counter() - start
+            _local.depth = 0
+            try:
+                RECORDER.record(method, wall, latency, error, args, kwargs)
+            except Exception:
+                RECORDER.stats['dropped'] += 1
+                logger.warning("Could not record a call to %s", method, exc_info=True)
+    
+    return wrapper
+
+
+def segment_paths(path):
+    """
+    Segment files of a log, oldest first
+    
+    Args:
+        path (str): Log directory or a single segment file
+    
+    Returns:
+        list: Segment paths
+    """
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, SEGMENT_GLOB)))
+    if os.path.exists(path):
+        return [path]
+    raise FileNotFoundError(f"Traffic log not found: {path}")
+
+
+def read_segment(path):
+    """
+    Read the calls in one segment
+    
+    A segment cut short, e.g. by a crash, is read up to its last whole call.
+    
+    Args:
+        path (str): Segment file
+    
+    Yields:
+        dict: method, start, latency, error, args and kwargs of each call
+    
+    Raises:
+        ValueError: If the file is not a traffic segment of a known version
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    header = MAGIC + _HEADER.pack(FORMAT_VERSION)
+    if not data.startswith(header):
+        raise ValueError(f"{path} is not a version {FORMAT_VERSION} traffic segment")
+    methods = {}
+    offset = len(header)
+    end = len(data)
+    while offset < end:
+        kind = data[offset]
+        if kind == KIND_METHOD:
+            if offset + _METHOD.size > end:
+                return
+            _, method_id, length = _METHOD.unpack_from(data, offset)
+            offset += _METHOD.size
+            if offset + length > end:
+                return
+            methods[method_id] = data[offset:offset + length].decode('utf-8')
+            offset += length
+        elif kind in (KIND_CALL, KIND_ERROR):
+            if offset + _CALL.size > end:
+                return
+            _, method_id, start, latency, length = _CALL.unpack_from(data, offset)
+            offset += _CALL.size
+            if offset + length > end:
+                return
+            args, kwargs = json.loads(data[offset:offset + length])
+            offset += length
+            yield {
+                'method': methods[method_id],
+                'start': start,
+                'latency': latency,
+                'error': kind == KIND_ERROR,
+                'args': args,
+                'kwargs': kwargs
+            }
+        else:
+            raise ValueError(f"{path}: unknown record kind {kind} at byte {offset}")
+
+
+def read_log(path):
+    """
+    Read every call of a log in start-time order, across processes
+    
+    Args:
+        path (str): Log directory or a single segment file
+    
+    Yields:
+        dict: Calls as from read_segment
+    """
+    return heapq.merge(*(read_segment(p) for p in segment_paths(path)), key=lambda call: call['start'])
@@ -2,26 +2,250 @@
 Visa Service - Handles all visa-related logic and recommendations
 """
 
-import json
+import hashlib
+import logging
 import os
 
+from services.calibration import load_calibration
+from services.durations import DurationIndex
+from services.metrics import timed
+from services.occupations import shared_occupation_index
+from services.overlays import TenantVisaStore, load_tenant_patch, tenant_patch_path
+from services.ranking import DestinationMatrix
+from services.rule_versions import CURRENT, RuleVersions, load_rule_versions
+from services.scoring import ScoringEngine
+from services.stores import VISA_DATA_PATH, open_visa_store  # noqa: F401 - VISA_DATA_PATH re-exported
+from utils.constants import (
+    SHORTAGE_OCCUPATION_DEMAND, OTHER_OCCUPATION_DEMAND, VERY_HIGH_PROBABILITY, HIGH_PROBABILITY, MODERATE_PROBABILITY
+)
+
+logger = logging.getLogger(__name__)
+
 
 class VisaService:
-    def __init__(self):
-        """Initialize the visa service with data from JSON file"""
-        self.data = self._load_visa_data()
-    
-    def _load_visa_data(self):
-        """Load visa rules from JSON file"""
-        data_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'visa_rules.json')
-        try:
-            with open(data_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            raise FileNotFoundError(f"Visa data file not found at {data_path}. Please ensure data/visa_rules.json exists.")
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Invalid JSON in visa data file: {e}")
+    def __init__(self, data_path=None, store=None, occupation_data_path=None, calibration_path=None,
+                 versions_path=None):
+        """
+        Initialize the visa service with data from JSON file or SQLite
+        
+        Args:
+            data_path (str): Optional path to an alternative JSON data file
+            store: Optional store object; defaults to the backend selected
+                by VISAVERSE_STORAGE (see services/stores.py)
+            occupation_data_path (str): Optional path to an alternative
+                occupation list; it is loaded on the first job title lookup
+            calibration_path (str): Optional path to an alternative
+                calibration parameter file (see services/calibration.py)
+            versions_path (str): Optional path to an alternative rule
+                version history (see services/rule_versions.py)
+        """
+        self.store = store or open_visa_store(data_path)
+        self.occupation_data_path = occupation_data_path
+        self.calibration_path = calibration_path
+        self._calibration = False
+        self.versions_path = versions_path
+        self._rule_versions = None
+        self._occupation_index = None
+        self._duration_index = None
+        self._destination_matrix = None
+        self._scoring_engine = None
+        self._tenants = {}
+        self._base_snapshot = None
+    
+    @property
+    def data(self):
+        """The full visa rules as a dict (rebuilt on every access for SQLite)"""
+        return self.store.data
+    
+    @property
+    def data_version(self):
+        """Hash identifying the loaded data"""
+        return self.store.data_version
+    
+    @property
+    def recommendations_version(self):
+        """
+        Hash identifying everything recommendations are computed from
+        
+        Besides the visa rules, scores depend on the occupation list and
+        approval probabilities on the calibration parameters, so a cached
+        recommendation is stale once any of the three changes.
+        """
+        calibration = self._calibrated()
+        parts = (self.store.data_version, self._occupations().data_version, calibration and calibration.version)
+        return hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()[:16]
+    
+    @timed
+    def reload(self):
+        """Re-read the data, picking up a new data version if it changed"""
+        self.store.reload()
+        if self._occupation_index is not None:
+            self._occupation_index.refresh()
+        # Picks up calibration parameters written since
+        self._calibration = False
+        # Tenant views re-read their patches on next use, and versions their history
+        self._tenants = {}
+        self._rule_versions = None
+    
+    @timed
+    def for_tenant(self, tenant, patch=None):
+        """
+        Get the service for one tenant's view of the visa rules
+        
+        The tenant's patch is layered over this service's data without
+        copying it, and the view is cached until the data or the patch
+        file changes.
+        
+        Args:
+            tenant (str): Tenant id
+            patch (dict): visa_rules patch to use instead of the one in
+                data/tenants/<tenant>.json
+        
+        Returns:
+            VisaService: Service answering with the tenant's rules
+        
+        Raises:
+            FileNotFoundError: If no patch is given and the tenant has no patch file
+            ValueError: If the tenant id or patch file is invalid
+        """
+        version = self.store.data_version
+        cached = self._tenants.get(tenant)
+        modified = None
+        if patch is None:
+            try:
+                modified = os.stat(tenant_patch_path(tenant)).st_mtime_ns
+            except FileNotFoundError:
+                pass
+            if cached is not None and modified is not None and cached[0] == (version, modified):
+                return cached[2]
+            patch = load_tenant_patch(tenant)['visa_rules']
+        elif cached is not None and cached[0][0] == version and cached[1] is patch:
+            return cached[2]
+        snapshot = self._snapshot()
+        service = VisaService(
+            store=TenantVisaStore(snapshot[1], version, snapshot[2], patch),
+            occupation_data_path=self.occupation_data_path,
+            calibration_path=self.calibration_path,
+            versions_path=self.versions_path
+        )
+        self._tenants[tenant] = ((version, modified), patch, service)
+        return service
+    
+    def _snapshot(self):
+        """(data version, rules, duration ranges) of the loaded data"""
+        # One snapshot of the base data is shared by every tenant and rules
+        # version; for SQLite this is the only time the full rules are materialized
+        version = self.store.data_version
+        snapshot = self._base_snapshot
+        if snapshot is None or snapshot[0] != version:
+            snapshot = self._base_snapshot = (version, self.store.data, self.store.duration_ranges())
+        return snapshot
+    
+    def _versions(self):
+        """Rule versions over the loaded data, with the services built for them so far"""
+        versions = self._rule_versions
+        if versions is None or versions[0].data_versions[CURRENT] != self.store.data_version:
+            snapshot = self._snapshot()
+            history = load_rule_versions(self.versions_path)
+            versions = self._rule_versions = (RuleVersions(snapshot[1], snapshot[0], snapshot[2], history), {})
+        return versions
+    
+    @timed
+    def rule_versions(self):
+        """
+        List the dated rule versions this service can evaluate against
+        
+        Returns:
+            list: Newest first, each with its 'version' id ('current' for
+                the loaded rules), 'effective_from', 'effective_until' and
+                'data_version'
+        
+        Raises:
+            ValueError: If the rule version history is invalid
+        """
+        return self._versions()[0].describe()
+    
+    @timed
+    def at_version(self, version):
+        """
+        Get the service for the rules of an earlier version
+        
+        Every version is layered over the next newer one, so the records no
+        change touched are shared with the current rules rather than copied.
+        
+        Args:
+            version (str): 'current', a version id from rule_versions(), or
+                any YYYY-MM-DD date for the rules in effect on that day
+        
+        Returns:
+            VisaService: Service answering with that version's rules
+        
+        Raises:
+            ValueError: If the version is unknown or no rules were in effect on the date
+        """
+        versions, services = self._versions()
+        version = versions.resolve(version)
+        if version == CURRENT:
+            return self
+        service = services.get(version)
+        if service is None:
+            service = services[version] = VisaService(
+                store=versions.stores[version],
+                occupation_data_path=self.occupation_data_path,
+                calibration_path=self.calibration_path
+            )
+        return service
+    
+    @timed
+    def evaluate_versions(self, profile, versions=None):
+        """
+        Get a profile's visa recommendations under several rule versions
+        
+        Args:
+            profile (dict): User profile as for get_visa_recommendations
+            versions (list): Versions or dates as for at_version, every
+                version by default
+        
+        Returns:
+            list: One dict per version, in the order asked for (newest first
+                by default), with 'version', 'effective_from' and 'recommendations'
+        
+        Raises:
+            ValueError: If a version is unknown
+        """
+        rule_versions = self._versions()[0]
+        results = []
+        for version in rule_versions.ids if versions is None else versions:
+            version = rule_versions.resolve(version)
+            results.append({
+                'version': version,
+                'effective_from': rule_versions.effective_from(version),
+                'recommendations': self.at_version(version).get_visa_recommendations(profile)
+            })
+        return results
+    
+    @timed
+    def diff_versions(self, old, new=CURRENT):
+        """
+        List the visa types, countries and eligibility tables that changed between two versions
+        
+        Args:
+            old (str): Version or date to compare from
+            new (str): Version or date to compare to, the current rules by default
+        
+        Returns:
+            dict: 'from' and 'to' version ids, then per section
+                ('visa_types', 'country_specific_info', 'eligibility_criteria')
+                the 'added' and 'removed' keys and the 'changed' records with
+                the fields that differ
+        
+        Raises:
+            ValueError: If a version is unknown
+        """
+        versions = self._versions()[0]
+        return versions.diff(versions.resolve(old), versions.resolve(new))
     
+    @timed
     def get_visa_recommendations(self, profile):
         """
         Get visa recommendations based on user profile
@@ -33,128 +257,229 @@ class VisaService:
                 - purpose: str (Work/Employment, Study, Tourism, Business, etc.)
                 - education: str
                 - work_experience: int (years)
-                - job_title: str (optional)
+                - job_title: str (optional); matched to an occupation whose
+                  shortage-list status in the destination feeds the score
         
         Returns:
-            list: List of recommended visa options with details
+            list: List of recommended visa options with details, each tagged
+                with the 'visa_key' it came from in visa_rules.json; with a
+                calibration file, 'approval_probability' is the calibrated
+                chance of approval (otherwise None)
         """
         purpose = profile.get('purpose', '')
         destination = profile.get('destination', '')
-        education = profile.get('education', '')
-        work_experience = profile.get('work_experience', 0)
         
         recommendations = []
         
-        # Map purpose to visa types
-        if purpose == 'Work/Employment':
-            # Skilled worker visa
-            if 'skilled_worker' in self.data['visa_types']:
-                visa = self.data['visa_types']['skilled_worker']
-                if destination in visa['countries']:
-                    score = self._calculate_eligibility_score(profile, visa)
-                    recommendations.append({
-                        'name': visa['name'],
-                        'processing_time': visa['processing_time'],
-                        'validity': visa['validity'],
-                        'requirements': visa['requirements'],
-                        'eligibility_score': score,
-                        'success_rate': self._get_success_rate(score)
-                    })
-            
-            # Intra-company transfer
-            if 'intra_company_transfer' in self.data['visa_types']:
-                visa = self.data['visa_types']['intra_company_transfer']
-                if destination in visa['countries']:
-                    recommendations.append({
-                        'name': visa['name'],
-                        'processing_time': visa['processing_time'],
-                        'validity': visa['validity'],
-                        'requirements': visa['requirements'],
-                        'eligibility_score': 85,
-                        'success_rate': 'Very High'
-                    })
-        
-        elif purpose == 'Study':
-            if 'student' in self.data['visa_types']:
-                visa = self.data['visa_types']['student']
-                if destination in visa['countries']:
-                    score = self._calculate_eligibility_score(profile, visa)
-                    recommendations.append({
-                        'name': visa['name'],
-                        'processing_time': visa['processing_time'],
-                        'validity': visa['validity'],
-                        'requirements': visa['requirements'],
-                        'eligibility_score': score,
-                        'success_rate': self._get_success_rate(score)
-                    })
-        
-        elif purpose == 'Business':
-            if 'business' in self.data['visa_types']:
-                visa = self.data['visa_types']['business']
-                if destination in visa['countries']:
-                    recommendations.append({
-                        'name': visa['name'],
-                        'processing_time': visa['processing_time'],
-                        'validity': visa['validity'],
-                        'requirements': visa['requirements'],
-                        'eligibility_score': 80,
-                        'success_rate': 'High'
-                    })
-        
-        else:  # Tourism, Family, Other
-            if 'tourist' in self.data['visa_types']:
-                visa = self.data['visa_types']['tourist']
-                if destination in visa['countries']:
-                    recommendations.append({
-                        'name': visa['name'],
-                        'processing_time': visa['processing_time'],
-                        'validity': visa['validity'],
-                        'requirements': visa['requirements'],
-                        'eligibility_score': 75,
-                        'success_rate': 'High'
-                    })
+        # Map purpose to the visa types available in the destination
+        visa_keys = self.store.visa_keys_for(purpose, destination)
+        scores = self._scoring().score(profile, visa_keys, self._occupation_demand(profile)) if visa_keys else []
+        for visa_key, score in zip(visa_keys, scores):
+            visa = self.store.get_visa_type(visa_key)
+            recommendations.append({
+                'visa_key': visa_key,
+                'name': visa['name'],
+                'processing_time': visa['processing_time'],
+                'validity': visa['validity'],
+                'requirements': visa['requirements'],
+                'eligibility_score': score,
+                **self._success(destination, visa_key, score)
+            })
         
         return recommendations
     
-    def _calculate_eligibility_score(self, profile, visa_type):
+    @timed
+    def rank_destinations(self, profile, top_k=5):
         """
-        Calculate eligibility score based on profile and visa requirements
+        Rank every destination for a profile in one pass
+        
+        Each candidate visa type for the profile's purpose is scored once,
+        then all destinations are scored together: a destination's ranking
+        score is its best visa score weighted by its average approval rate.
         
         Args:
-            profile (dict): User profile
-            visa_type (dict): Visa type information
+            profile (dict): User profile as for get_visa_recommendations; the
+                destination is ignored and the citizenship country left out
+            top_k (int): Number of destinations to return, or None for all
         
         Returns:
-            int: Eligibility score (0-100)
-        """
-        score = 50  # Base score
-        
-        # Education points
-        education = profile.get('education', '')
-        if education in self.data['eligibility_criteria']['education_points']:
-            score += self.data['eligibility_criteria']['education_points'][education] * 0.5
-        
-        # Experience points
-        work_experience = profile.get('work_experience', 0)
-        exp_category = self._categorize_experience(work_experience)
-        if exp_category in self.data['eligibility_criteria']['experience_points']:
-            score += self.data['eligibility_criteria']['experience_points'][exp_category] * 0.5
-        
-        # Cap at 100
-        return min(int(score), 100)
-    
-    def _categorize_experience(self, years):
-        """Categorize work experience into ranges"""
-        if years <= 2:
-            return '0-2'
-        elif years <= 5:
-            return '3-5'
-        elif years <= 10:
-            return '6-10'
-        elif years <= 15:
-            return '11-15'
+            list: Destinations best first, each with its ranking score,
+                approval rate and the scored visa options available there
+        """
+        matrix = self._destination_matrix
+        if matrix is None or matrix.data_version != self.store.data_version:
+            matrix = self._destination_matrix = DestinationMatrix(self.store)
+        
+        purpose = profile.get('purpose', '')
+        keys = matrix.candidate_keys(purpose)
+        if not keys:
+            return []
+        engine = self._scoring()
+        occupation = self._match_for_scoring(profile)
+        if occupation is None:
+            scores = engine.score(profile, keys)
+            shortage, shortage_scores = (), scores
         else:
-            return '16+'
+            # The occupation's demand depends on the destination, so destinations
+            # listing it as in shortage are ranked with their own scores
+            scores = engine.score(dict(profile, occupation_demand=OTHER_OCCUPATION_DEMAND), keys)
+            shortage = occupation['shortage']
+            shortage_scores = engine.score(dict(profile, occupation_demand=SHORTAGE_OCCUPATION_DEMAND), keys)
+        
+        ranked = matrix.rank(
+            purpose, scores, exclude=profile.get('citizenship'), top_k=top_k,
+            overrides=(shortage, shortage_scores) if shortage else None
+        )
+        
+        options = {False: self._scored_visas(matrix, keys, scores)}
+        if shortage:
+            options[True] = self._scored_visas(matrix, keys, shortage_scores)
+        
+        results = []
+        for row, ranking_score, offered in ranked:
+            destination = matrix.destinations[row]
+            visas, by_score = options[bool(shortage) and destination in shortage]
+            results.append({
+                'destination': destination,
+                'ranking_score': round(ranking_score, 1),
+                'approval_rate': matrix.approval_rates[row],
+                'approval_rate_published': matrix.published[row],
+                'visas': [
+                    dict(visas[i], **self._success(destination, visas[i]['visa_key'], visas[i]['eligibility_score']))
+                    for i in by_score if offered[i]
+                ]
+            })
+        return results
+    
+    def _scored_visas(self, matrix, keys, scores):
+        """Visa option dicts for ranked destinations, and their order best first"""
+        visas = [
+            {
+                'visa_key': visa_key,
+                'name': matrix.visa_names[matrix.column[visa_key]],
+                'eligibility_score': score
+            }
+            for visa_key, score in zip(keys, scores)
+        ]
+        return visas, sorted(range(len(keys)), key=lambda i: -scores[i])
+    
+    @timed
+    def score_profiles(self, profiles, visa_keys=None):
+        """
+        Score a batch of profiles against visa types in one matrix product
+        
+        Args:
+            profiles (list): User profiles as for get_visa_recommendations
+            visa_keys (list): Visa type keys to score, all by default
+        
+        Returns:
+            list: One dict per profile mapping visa_key to eligibility score (0-100)
+        """
+        engine = self._scoring()
+        visa_keys = engine.visa_keys if visa_keys is None else list(visa_keys)
+        if not profiles or not visa_keys:
+            return [{} for _ in profiles]
+        scores = engine.score_batch([self._with_occupation_demand(p) for p in profiles], visa_keys).tolist()
+        return [dict(zip(visa_keys, row)) for row in scores]
+    
+    @timed
+    def match_occupation(self, job_title):
+        """
+        Resolve a free-text job title to an occupation from the occupation list
+        
+        Args:
+            job_title (str): Job title as typed by the user
+        
+        Returns:
+            dict: 'code', 'title', 'matched_title', 'similarity' and the
+                'shortage' destinations, or None if no occupation is close enough
+        """
+        return self._occupations().match(job_title)
+    
+    def _occupations(self):
+        """Occupation index, loaded on first use and shared across services"""
+        if self._occupation_index is None:
+            self._occupation_index = shared_occupation_index(self.occupation_data_path)
+        return self._occupation_index
+    
+    def _match_for_scoring(self, profile):
+        """Occupation matched from the profile's job title, unless the profile sets occupation_demand itself"""
+        if profile.get('occupation_demand') is not None or not profile.get('job_title'):
+            return None
+        return self._occupations().match(profile['job_title'])
+    
+    def _occupation_demand(self, profile):
+        """occupation_demand from the profile's job title and destination, or None to use the profile's own"""
+        occupation = self._match_for_scoring(profile)
+        if occupation is None:
+            return None
+        in_shortage = profile.get('destination') in occupation['shortage']
+        return SHORTAGE_OCCUPATION_DEMAND if in_shortage else OTHER_OCCUPATION_DEMAND
+    
+    def _with_occupation_demand(self, profile):
+        """The profile with occupation_demand set from its job title and destination"""
+        demand = self._occupation_demand(profile)
+        return profile if demand is None else dict(profile, occupation_demand=demand)
+    
+    def _scoring(self):
+        """Scoring engine for the loaded data, rebuilt when the data version changes"""
+        engine = self._scoring_engine
+        if engine is None or engine.data_version != self.store.data_version:
+            engine = self._scoring_engine = ScoringEngine(self.store)
+        return engine
+    
+    def _calibrated(self):
+        """
+        Calibration curves, loaded on first use
+        
+        Curves fitted on scores from other rules do not describe this
+        service's scores, so they are ignored. That includes tenant views
+        and rule versions, whose rules differ from the data the curves were
+        fitted on. Curves fitted on scores given in the outcomes file carry
+        no data version and always apply.
+        
+        An invalid parameter file, for example one being written by hand, is
+        logged and ignored too, so recommendations fall back to uncalibrated
+        success rates rather than failing.
+        
+        Returns:
+            Calibration: The curves, or None without a valid parameter file
+                or when it was fitted for another data version
+        """
+        if self._calibration is False:
+            try:
+                calibration = load_calibration(self.calibration_path)
+            except (OSError, ValueError) as e:
+                logger.warning("Ignoring calibration parameters: %s", e)
+                calibration = None
+            if calibration is not None and calibration.data_version not in (None, self.store.data_version):
+                logger.warning("Ignoring calibration fitted for data version %s; the rules are at %s",
+                               calibration.data_version, self.store.data_version)
+                calibration = None
+            self._calibration = calibration
+        return self._calibration
+    
+    def _success(self, destination, visa_key, score):
+        """
+        Success rate label and calibrated approval probability for a scored visa
+        
+        Returns:
+            dict: 'success_rate', from the calibrated probability when there is
+                one and from the score otherwise, and 'approval_probability'
+        """
+        calibration = self._calibrated()
+        probability = calibration.probability(destination, visa_key, score) if calibration else None
+        if probability is None:
+            return {'success_rate': self._get_success_rate(score), 'approval_probability': None}
+        if probability >= VERY_HIGH_PROBABILITY:
+            label = 'Very High'
+        elif probability >= HIGH_PROBABILITY:
+            label = 'High'
+        elif probability >= MODERATE_PROBABILITY:
+            label = 'Moderate'
+        else:
+            label = 'Low'
+        return {'success_rate': label, 'approval_probability': probability}
     
     def _get_success_rate(self, score):
         """Convert eligibility score to success rate description"""
@@ -167,6 +492,61 @@ class VisaService:
         else:
             return 'Low'
     
+    @timed
+    def get_duration_ranges(self, visa_key):
+        """
+        Get the parsed processing time and validity of a visa type
+        
+        Args:
+            visa_key (str): Visa type key in visa_rules.json
+        
+        Returns:
+            dict: 'processing_days' and 'validity_days' as (min, max) day
+                ranges, max None when open-ended, or None for an unknown visa type
+        """
+        return self.store.duration_ranges().get(visa_key)
+    
+    @timed
+    def find_visa_options(self, profile, max_processing_days):
+        """
+        Find every visa option for a profile's purpose, across all destinations,
+        whose worst-case processing time is within a limit
+        
+        Args:
+            profile (dict): User profile; 'purpose' selects the visa types and
+                the 'citizenship' country is left out
+            max_processing_days (int): Longest acceptable processing time in days
+        
+        Returns:
+            list: Options sorted by worst-case processing time, quickest first,
+                each with destination, visa_key, name and the parsed day ranges
+        """
+        index = self._duration_index
+        if index is None or index.data_version != self.store.data_version:
+            index = self._duration_index = DurationIndex(self.store)
+        
+        citizenship = profile.get('citizenship')
+        durations = self.store.duration_ranges()
+        visas = {}
+        options = []
+        for high, low, destination, visa_key in index.within(profile.get('purpose', ''), max_processing_days):
+            if destination == citizenship:
+                continue
+            visa = visas.get(visa_key)
+            if visa is None:
+                visa = visas[visa_key] = self.store.get_visa_type(visa_key)
+            options.append({
+                'destination': destination,
+                'visa_key': visa_key,
+                'name': visa['name'],
+                'processing_time': visa['processing_time'],
+                'processing_days': (low, high),
+                'validity': visa['validity'],
+                'validity_days': durations[visa_key]['validity_days']
+            })
+        return options
+    
+    @timed
     def get_country_info(self, country):
         """
         Get country-specific visa information
@@ -177,18 +557,14 @@ class VisaService:
         Returns:
             dict: Country-specific visa information
         """
-        if country in self.data['country_specific_info']:
-            return self.data['country_specific_info'][country]
-        return None
+        return self.store.get_country_info(country)
     
+    @timed
     def get_all_countries(self):
         """Get list of all countries with visa information"""
-        return list(self.data['country_specific_info'].keys())
+        return self.store.countries()
     
+    @timed
     def get_visa_types_for_country(self, country):
         """Get available visa types for a specific country"""
-        visa_types = []
-        for visa_key, visa_data in self.data['visa_types'].items():
-            if country in visa_data['countries']:
-                visa_types.append(visa_data['name'])
-        return visa_types
+        return self.store.visa_type_names_for_country(country)
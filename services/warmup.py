@@ -0,0 +1,196 @@
+"""
+Warm-up - Builds the services and fills their caches on a background thread
+
+Without a warm-up, the first session after a deploy pays for loading the
+data, building the scoring, ranking, duration and occupation indexes and
+rendering every fragment. WARMUP does all of that in STEPS order on a
+daemon thread as soon as it is started, and the page getters in
+views/shared.py take their services from it, waiting only for the step they
+need. tools/serve.py starts it before Streamlit accepts a session.
+
+status() reports progress for the /readyz and /healthz probes in
+api/server.py, so an orchestrator only sends traffic to warm replicas.
+"""
+
+import threading
+import time
+
+from services.culture_service import CultureService
+from services.document_service import DocumentService
+from services.metrics import gauge
+from services.render_service import RenderService
+from services.sharding import SHARDS, ShardRouter, ShardedVisaService, ShardedCultureService
+from services.visa_service import VisaService
+from utils.constants import TRAVEL_PURPOSES, EDUCATION_LEVELS, WARMUP_MAX_PROCESSING_DAYS
+
+STEPS = ('load_data', 'build_indexes', 'render_fragments', 'precompute_recommendations')
+
+# Profile the indexes are built with; only its purpose and destination vary
+SAMPLE_PROFILE = {
+    'citizenship': '',
+    'destination': '',
+    'purpose': TRAVEL_PURPOSES[1],
+    'education': EDUCATION_LEVELS[2],
+    'work_experience': 5,
+    'job_title': 'Software Engineer'
+}
+
+
+def build_services():
+    """
+    Load the visa, culture and document services, sharded when VISAVERSE_SHARDS is set
+    
+    Returns:
+        dict: 'visa', 'culture' and 'document' services
+    
+    Raises:
+        FileNotFoundError: If a data file is missing
+        ValueError: If a data file is invalid
+        RuntimeError: If a shard worker exits while loading its shard; it
+            names the shard and the worker's exit code
+    """
+    if SHARDS:
+        router = ShardRouter(SHARDS)
+        visa_service, culture_service = ShardedVisaService(router), ShardedCultureService(router)
+    else:
+        visa_service, culture_service = VisaService(), CultureService()
+    return {'visa': visa_service, 'culture': culture_service, 'document': DocumentService()}
+
+
+class WarmUp:
+    def __init__(self, build=build_services):
+        """
+        Prepare a warm-up; nothing runs until start()
+        
+        Args:
+            build (callable): Returns the services dict, as build_services does
+        """
+        self._build = build
+        self._changed = threading.Condition()
+        self._thread = None
+        self._services = None
+        self._render_service = None
+        self.state = 'idle'
+        self.error = None
+        self.started = None
+        self.finished = None
+        self.steps = {name: {'state': 'pending', 'seconds': None} for name in STEPS}
+    
+    def start(self):
+        """Start warming up on a daemon thread; later calls do nothing"""
+        with self._changed:
+            if self._thread is not None:
+                return
+            self.state = 'warming'
+            self.started = time.time()
+            self._thread = threading.Thread(target=self._run, name='visaverse-warmup', daemon=True)
+            self._thread.start()
+    
+    def wait(self, step=STEPS[-1], timeout=None):
+        """
+        Block until a step is done, starting the warm-up if needed
+        
+        Args:
+            step (str): Step to wait for, the last one by default
+            timeout (float): Longest wait in seconds, unbounded by default
+        
+        Returns:
+            bool: False if the timeout passed first
+        
+        Raises:
+            Exception: The error that failed the warm-up, if it failed
+                before the step was done
+        """
+        self.start()
+        with self._changed:
+            finished = self._changed.wait_for(
+                lambda: self.steps[step]['state'] == 'done' or self.state == 'failed', timeout
+            )
+            if self.steps[step]['state'] == 'done':
+                return True
+            if self.state == 'failed':
+                raise self.error
+            return finished
+    
+    def services(self):
+        """The loaded 'visa', 'culture' and 'document' services, once loading is done"""
+        self.wait('load_data')
+        return self._services
+    
+    def render_service(self):
+        """The RenderService with every fragment rendered"""
+        self.wait('render_fragments')
+        return self._render_service
+    
+    def status(self):
+        """
+        Progress for the probes
+        
+        Returns:
+            dict: 'state' ('idle', 'warming', 'ready' or 'failed'), 'ready',
+                'progress' between 0 and 1, per-step 'steps', 'error' and
+                'uptime_s'
+        """
+        with self._changed:
+            done = sum(1 for step in self.steps.values() if step['state'] == 'done')
+            return {
+                'state': self.state,
+                'ready': self.state == 'ready',
+                'progress': round(done / len(STEPS), 2),
+                'steps': {name: dict(step) for name, step in self.steps.items()},
+                'error': None if self.error is None else f"{type(self.error).__name__}: {self.error}",
+                'uptime_s': round(time.time() - self.started, 1) if self.started else 0.0
+            }
+    
+    def _run(self):
+        for name in STEPS:
+            with self._changed:
+                self.steps[name]['state'] = 'running'
+            start = time.perf_counter()
+            try:
+                getattr(self, f'_{name}')()
+            except Exception as e:
+                with self._changed:
+                    self.steps[name]['state'] = 'failed'
+                    self.state = 'failed'
+                    self.error = e
+                    self._changed.notify_all()
+                return
+            with self._changed:
+                self.steps[name].update(state='done', seconds=round(time.perf_counter() - start, 3))
+                if name == STEPS[-1]:
+                    self.state = 'ready'
+                    self.finished = time.time()
+                self._changed.notify_all()
+            gauge('visaverse_warmup_progress', (STEPS.index(name) + 1) / len(STEPS))
+    
+    def _load_data(self):
+        self._services = self._build()
+    
+    def _build_indexes(self):
+        """Run one call through each lazily built index so none is built inside a request"""
+        visa_service = self._services['visa']
+        profile = dict(SAMPLE_PROFILE, destination=(visa_service.get_all_countries() or [''])[0])
+        visa_service.score_profiles([profile])
+        visa_service.rank_destinations(profile)
+        visa_service.find_visa_options(profile, WARMUP_MAX_PROCESSING_DAYS)
+        visa_service.match_occupation(SAMPLE_PROFILE['job_title'])
+    
+    def _render_fragments(self):
+        self._render_service = RenderService(self._services['visa'], self._services['culture'])
+    
+    def _precompute_recommendations(self):
+        """Recommend and rank once per purpose and destination, so every destination's path has run"""
+        visa_service = self._services['visa']
+        destinations = visa_service.get_all_countries()
+        step = self.steps['precompute_recommendations']
+        step['items'] = 0
+        for purpose in TRAVEL_PURPOSES[1:]:
+            profile = dict(SAMPLE_PROFILE, purpose=purpose)
+            visa_service.rank_destinations(profile)
+            for destination in destinations:
+                visa_service.get_visa_recommendations(dict(profile, destination=destination))
+                step['items'] += 1
+
+
+WARMUP = WarmUp()
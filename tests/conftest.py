@@ -0,0 +1,9 @@
+"""
+Test configuration - Makes the project modules importable from the tests
+"""
+
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
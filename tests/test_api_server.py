@@ -0,0 +1,88 @@
+"""
+API server tests - Status codes for missing data, missing records and unexpected errors
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from api import server
+
+
+class FakeWarmup:
+    def __init__(self, error=None, services=None):
+        self.error = error
+        self._services = services or {}
+    
+    def wait(self, step, timeout=None):
+        if self.error is not None:
+            raise self.error
+        return True
+    
+    def services(self):
+        return self._services
+
+
+class BrokenVisaService:
+    data_version = 'v1'
+    
+    def get_all_countries(self):
+        raise KeyError('countries')
+    
+    def get_country_info(self, country):
+        return None
+
+
+@pytest.fixture
+def base_url():
+    httpd = server.create_server('127.0.0.1', 0)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture(autouse=True)
+def fresh_payloads(monkeypatch):
+    monkeypatch.setattr(server, 'PAYLOADS', server.PayloadCache())
+
+
+def get(url):
+    try:
+        with urllib.request.urlopen(url) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+
+def test_missing_data_answers_503(base_url, monkeypatch):
+    monkeypatch.setattr(server, 'WARMUP', FakeWarmup(error=FileNotFoundError('visa_rules.json')))
+    status, headers, _ = get(base_url + '/api/visa/countries')
+    assert status == 503
+    assert headers['Retry-After'] == '5'
+
+
+def test_missing_record_answers_404(base_url, monkeypatch):
+    monkeypatch.setattr(server, 'WARMUP', FakeWarmup(services={'visa': BrokenVisaService()}))
+    status, _, _ = get(base_url + '/api/visa/countries/Atlantis')
+    assert status == 404
+
+
+@pytest.mark.parametrize('warmup, path', [
+    (FakeWarmup(error=sqlite3.OperationalError('database is locked')), '/api/visa/countries'),
+    (FakeWarmup(services={'visa': BrokenVisaService()}), '/api/visa/countries')
+])
+def test_unexpected_errors_answer_500_json_and_are_logged(base_url, monkeypatch, caplog, warmup, path):
+    monkeypatch.setattr(server, 'WARMUP', warmup)
+    with caplog.at_level(logging.ERROR, logger='api.server'):
+        status, headers, body = get(base_url + path)
+    assert status == 500
+    assert headers['Content-Type'].startswith('application/json')
+    assert json.loads(body) == {'error': 'Internal Server Error', 'status': 500}
+    assert f"Error serving {path}" in caplog.text
@@ -0,0 +1,132 @@
+"""
+Calibration tests - Approval probabilities only from curves fitted on the same rules
+"""
+
+import csv
+import json
+import logging
+
+import pytest
+
+from services.calibration import ANY, FORMAT_VERSION, CalibrationStats, read_outcomes
+from services.stores import VISA_DATA_PATH
+from services.visa_service import VisaService
+from tools import calibrate
+
+PROFILE = {
+    'citizenship': 'India',
+    'destination': 'Canada',
+    'purpose': 'Work/Employment',
+    'education': "Master's Degree",
+    'work_experience': 7,
+    'age': 31
+}
+
+
+def write_calibration(path, data_version):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'format': FORMAT_VERSION,
+            'method': 'logistic',
+            'data_version': data_version,
+            'curves': {ANY: {ANY: {'logistic': [4.0, -2.0]}}}
+        }, f)
+    return str(path)
+
+
+@pytest.fixture
+def base():
+    return VisaService()
+
+
+def probabilities(service):
+    return [r['approval_probability'] for r in service.get_visa_recommendations(PROFILE)]
+
+
+def test_curves_for_the_loaded_rules_apply(tmp_path, base):
+    path = write_calibration(tmp_path / 'calibration.json', base.data_version)
+    service = VisaService(store=base.store, calibration_path=path)
+    assert all(p is not None for p in probabilities(service))
+
+
+def test_curves_without_a_data_version_apply(tmp_path, base):
+    path = write_calibration(tmp_path / 'calibration.json', None)
+    service = VisaService(store=base.store, calibration_path=path)
+    assert all(p is not None for p in probabilities(service))
+
+
+def test_curves_for_other_rules_are_ignored(tmp_path, base, caplog):
+    path = write_calibration(tmp_path / 'calibration.json', 'other-rules')
+    service = VisaService(store=base.store, calibration_path=path)
+    with caplog.at_level(logging.WARNING, logger='services.visa_service'):
+        recommendations = service.get_visa_recommendations(PROFILE)
+    assert recommendations
+    for r in recommendations:
+        assert r['approval_probability'] is None
+        assert r['success_rate'] == service._get_success_rate(r['eligibility_score'])
+    assert 'other-rules' in caplog.text
+
+
+def test_tenant_views_ignore_curves_for_the_base_rules(tmp_path, base):
+    path = write_calibration(tmp_path / 'calibration.json', base.data_version)
+    service = VisaService(store=base.store, calibration_path=path)
+    tenant = service.for_tenant('acme', patch={})
+    assert tenant.data_version != base.data_version
+    assert all(p is None for p in probabilities(tenant))
+    assert all(p is not None for p in probabilities(service))
+
+
+@pytest.mark.parametrize('contents', ['{"format": 1, "method": "logis', '[]', '{"format": 1, "method": "logistic", '
+                                      '"curves": {"*": {"*": {"isotonic": [1, 2]}}}}'])
+def test_invalid_parameter_file_falls_back_to_uncalibrated_scores(tmp_path, base, caplog, contents):
+    path = tmp_path / 'calibration.json'
+    path.write_text(contents, encoding='utf-8')
+    service = VisaService(store=base.store, calibration_path=str(path))
+    with caplog.at_level(logging.WARNING, logger='services.visa_service'):
+        recommendations = service.get_visa_recommendations(PROFILE)
+    assert recommendations
+    assert all(r['approval_probability'] is None for r in recommendations)
+    assert 'Ignoring calibration parameters' in caplog.text
+
+
+def write_outcomes(path, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['destination', 'visa_key', 'outcome', 'purpose', 'education', 'work_experience', 'age'])
+        for i in range(rows):
+            writer.writerow(['Canada', 'skilled_worker', 'approved' if i % 3 else 'refused',
+                             'Work/Employment', "Master's Degree", i % 15, 25 + i % 20])
+    return str(path)
+
+
+def changed_rules(tmp_path):
+    with open(VISA_DATA_PATH, 'r', encoding='utf-8') as f:
+        rules = json.load(f)
+    rules['visa_types']['skilled_worker']['success_factors']['years_experience'] = 0.5
+    path = tmp_path / 'visa_rules.json'
+    path.write_text(json.dumps(rules), encoding='utf-8')
+    return str(path)
+
+
+def test_counts_are_not_mixed_across_rule_versions(tmp_path, base):
+    outcomes = write_outcomes(tmp_path / 'outcomes.csv', 30)
+    stats = CalibrationStats()
+    read_outcomes(outcomes, stats, base)
+    assert stats.data_version == base.data_version
+    changed = VisaService(data_path=changed_rules(tmp_path))
+    with pytest.raises(ValueError, match='without --update'):
+        read_outcomes(outcomes, stats, changed)
+    assert stats.data_version == base.data_version
+    assert stats.rows == 30
+
+
+def test_update_is_refused_after_the_rules_change(tmp_path, capsys):
+    outcomes = write_outcomes(tmp_path / 'outcomes.csv', 30)
+    output = str(tmp_path / 'calibration.json')
+    assert calibrate.main([outcomes, '--output', output, '--min-samples', '10']) == 0
+    written = open(output, encoding='utf-8').read()
+    args = [outcomes, '--output', output, '--min-samples', '10', '--update']
+    assert calibrate.main(args + ['--visa', changed_rules(tmp_path)]) == 1
+    assert 'without --update' in capsys.readouterr().out
+    assert open(output, encoding='utf-8').read() == written
+    assert calibrate.main(args) == 0
@@ -0,0 +1,73 @@
+"""
+Case store tests - Cached recommendations go stale with the data they came from
+"""
+
+import json
+import shutil
+
+import pytest
+
+from services.calibration import ANY, FORMAT_VERSION
+from services.case_store import CaseStore
+from services.occupations import OCCUPATION_DATA_PATH
+from services.visa_service import VisaService
+
+CASE_ID = 'case-0001'
+
+PROFILE = {
+    'citizenship': 'India',
+    'destination': 'Canada',
+    'purpose': 'Work/Employment',
+    'education': "Master's Degree",
+    'work_experience': 7,
+    'age': 31,
+    'job_title': 'Software Developer'
+}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CaseStore(str(tmp_path / 'cases.db'))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def service(tmp_path):
+    occupations = tmp_path / 'occupations.json'
+    shutil.copy(OCCUPATION_DATA_PATH, occupations)
+    return VisaService(occupation_data_path=str(occupations), calibration_path=str(tmp_path / 'calibration.json'))
+
+
+def cache(store, service):
+    version = service.recommendations_version
+    store.save_recommendations(CASE_ID, PROFILE, version, service.get_visa_recommendations(PROFILE))
+    assert store.get_recommendations(CASE_ID, PROFILE, service.recommendations_version) is not None
+
+
+def test_recommendations_are_reused_while_nothing_changes(store, service):
+    cache(store, service)
+    service.reload()
+    assert store.get_recommendations(CASE_ID, PROFILE, service.recommendations_version) is not None
+
+
+def test_new_calibration_parameters_make_recommendations_stale(store, service, tmp_path):
+    cache(store, service)
+    with open(tmp_path / 'calibration.json', 'w', encoding='utf-8') as f:
+        json.dump({
+            'format': FORMAT_VERSION,
+            'method': 'logistic',
+            'curves': {ANY: {ANY: {'logistic': [4.0, -2.0]}}}
+        }, f)
+    service.reload()
+    assert store.get_recommendations(CASE_ID, PROFILE, service.recommendations_version) is None
+
+
+def test_a_changed_occupation_list_makes_recommendations_stale(store, service, tmp_path):
+    cache(store, service)
+    path = tmp_path / 'occupations.json'
+    data = json.loads(path.read_text(encoding='utf-8'))
+    data['occupations'].append({'code': '9999', 'title': 'Lighthouse Keeper', 'alternative_titles': [], 'shortage': []})
+    path.write_text(json.dumps(data), encoding='utf-8')
+    service.reload()
+    assert store.get_recommendations(CASE_ID, PROFILE, service.recommendations_version) is None
@@ -0,0 +1,56 @@
+"""
+Document service tests - Tenant views follow their patch files
+"""
+
+import json
+import os
+
+import pytest
+
+from services import overlays
+from services.document_service import DocumentService
+
+
+@pytest.fixture
+def tenants_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(overlays, 'TENANTS_DIR', str(tmp_path))
+    return tmp_path
+
+
+def write_patch(tenants_dir, tenant, documents, modified):
+    path = tenants_dir / f"{tenant}.json"
+    path.write_text(json.dumps({'document_requirements': {'Student': {'specific': documents}}}), encoding='utf-8')
+    os.utime(path, ns=(modified, modified))
+
+
+def test_tenant_view_is_cached_while_the_patch_file_is_unchanged(tenants_dir):
+    write_patch(tenants_dir, 'acme', ['Enrollment letter'], 1_000_000_000)
+    service = DocumentService()
+    assert service.for_tenant('acme') is service.for_tenant('acme')
+
+
+def test_tenant_view_follows_an_edited_patch_file(tenants_dir):
+    write_patch(tenants_dir, 'acme', ['Enrollment letter'], 1_000_000_000)
+    service = DocumentService()
+    assert service.for_tenant('acme').get_required_documents('Student')['specific'] == ['Enrollment letter']
+    write_patch(tenants_dir, 'acme', ['Enrollment letter', 'Housing contract'], 2_000_000_000)
+    assert service.for_tenant('acme').get_required_documents('Student')['specific'] == [
+        'Enrollment letter', 'Housing contract'
+    ]
+
+
+def test_removed_patch_file_is_reported(tenants_dir):
+    write_patch(tenants_dir, 'acme', ['Enrollment letter'], 1_000_000_000)
+    service = DocumentService()
+    service.for_tenant('acme')
+    os.remove(tenants_dir / 'acme.json')
+    with pytest.raises(FileNotFoundError):
+        service.for_tenant('acme')
+
+
+def test_given_patch_is_cached_by_identity(tenants_dir):
+    service = DocumentService()
+    patch = {'Student': {'specific': ['Enrollment letter']}}
+    view = service.for_tenant('acme', patch=patch)
+    assert service.for_tenant('acme', patch=patch) is view
+    assert service.for_tenant('acme', patch=dict(patch)) is not view
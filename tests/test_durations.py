@@ -0,0 +1,48 @@
+"""
+Duration tests - Day ranges parsed from visa duration descriptions
+"""
+
+import pytest
+
+from services.compiled_store import CompiledVisaStore, build_artifact
+from services.durations import parse_duration_range
+from services.sqlite_store import SqliteVisaStore, build_database
+from services.stores import JsonVisaStore
+from services.visa_service import VisaService
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('3-6 weeks', (21, 42)),
+    ('Up to 5 years', (0, 1825)),
+    ('6 months to 10 years (multiple entry)', (180, 3650)),
+    ('Duration of course + 4-6 months', (120, None)),
+    ('5+ years', (1825, None))
+])
+def test_parse_duration_range(text, expected):
+    assert parse_duration_range(text) == expected
+
+
+def test_text_without_a_duration_is_rejected():
+    with pytest.raises(ValueError):
+        parse_duration_range('Duration of course')
+
+
+def test_every_store_keeps_the_open_ended_maximum(tmp_path):
+    build_artifact(str(tmp_path / 'visaverse.compiled'))
+    build_database(str(tmp_path / 'visaverse.db'))
+    stores = [
+        JsonVisaStore(),
+        CompiledVisaStore(str(tmp_path / 'visaverse.compiled')),
+        SqliteVisaStore(str(tmp_path / 'visaverse.db'))
+    ]
+    for store in stores:
+        assert store.duration_ranges()['student']['validity_days'] == (120, None)
+
+
+def test_open_ended_processing_is_never_within_a_deadline():
+    base = VisaService()
+    service = base.for_tenant('slow', patch={'visa_types': {'tourist': {'processing_time': '2+ weeks'}}})
+    assert service.get_duration_ranges('tourist')['processing_days'] == (14, None)
+    profile = {'purpose': 'Tourism'}
+    assert base.find_visa_options(profile, 10000)
+    assert service.find_visa_options(profile, 10000) == []
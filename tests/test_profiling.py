@@ -0,0 +1,74 @@
+"""
+Profiling tests - Sampled requests leave no profiler or tracing behind
+"""
+
+import os
+import sys
+import tracemalloc
+
+import pytest
+
+from services import profiling
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, 'ENABLED', True)
+    monkeypatch.setattr(profiling, 'PROFILE_DIR', str(tmp_path))
+    monkeypatch.setattr(profiling, 'SAMPLE_RATE', 1.0)
+    return tmp_path
+
+
+def dumps(directory):
+    return sorted(os.path.splitext(name)[1] for name in os.listdir(directory))
+
+
+def test_sampled_request_writes_a_profile_and_allocations(profile_dir):
+    with profiling.profiled('visa', shape='work'):
+        sum(range(100))
+    assert dumps(profile_dir) == ['.alloc', '.pstats']
+    assert not tracemalloc.is_tracing()
+    assert profiling._local.active is None
+
+
+def test_failing_request_is_dumped_and_cleaned_up(profile_dir):
+    with pytest.raises(RuntimeError):
+        with profiling.profiled('visa'):
+            raise RuntimeError("page failed")
+    assert dumps(profile_dir) == ['.alloc', '.pstats']
+    assert not tracemalloc.is_tracing()
+    assert profiling._tracing_users == 0
+    assert profiling._local.active is None
+
+
+def test_request_runs_unprofiled_while_another_profiler_is_active(profile_dir, monkeypatch):
+    class BusyProfile:
+        def enable(self):
+            raise ValueError("Another profiling tool is already active")
+    
+    monkeypatch.setattr(profiling.cProfile, 'Profile', BusyProfile)
+    ran = []
+    with profiling.profiled('visa'):
+        ran.append(True)
+    assert ran == [True]
+    assert dumps(profile_dir) == []
+    assert not tracemalloc.is_tracing()
+    assert profiling._tracing_users == 0
+    assert profiling._local.active is None
+
+
+def test_tracing_failure_disables_the_profiler(profile_dir, monkeypatch):
+    def fail(frames):
+        raise MemoryError
+    
+    monkeypatch.setattr(profiling.tracemalloc, 'start', fail)
+    with pytest.raises(MemoryError):
+        with profiling.profiled('visa'):
+            pass
+    assert profiling._tracing_users == 0
+    assert profiling._local.active is None
+    # The request's profiler was disabled, so a new one can start
+    profiler = profiling.cProfile.Profile()
+    profiler.enable()
+    profiler.disable()
+    assert sys.getprofile() is None
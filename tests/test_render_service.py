@@ -0,0 +1,48 @@
+"""
+Render service tests - The fragment cache stays within its size
+"""
+
+from services.culture_service import CultureService
+from services.render_service import RenderService
+from services.visa_service import VisaService
+
+
+def render_service(cache_size):
+    return RenderService(VisaService(), CultureService(), cache_size=cache_size)
+
+
+def test_lookups_outside_the_data_do_not_grow_the_cache():
+    service = render_service(cache_size=8)
+    assert len(service._fragments) == 8
+    for i in range(100):
+        assert service.get_country_info(f"Nowhere {i}") is None
+    assert len(service._fragments) == 8
+
+
+def test_recently_used_fragments_stay_cached():
+    service = render_service(cache_size=8)
+    hot = service.get_adaptation_tips()
+    for i in range(20):
+        service.get_country_info(f"Nowhere {i}")
+        assert service.get_adaptation_tips() is hot
+    assert ('adaptation_tips',) in service._fragments
+
+
+def test_missing_fragments_are_cached_too():
+    service = render_service(cache_size=8)
+    renders = []
+    
+    def render():
+        renders.append(True)
+        return None
+    
+    assert service._lookup(('country_info', 'Nowhere'), render) is None
+    assert service._lookup(('country_info', 'Nowhere'), render) is None
+    assert renders == [True]
+
+
+def test_default_size_holds_every_fragment_of_the_data():
+    service = RenderService(VisaService(), CultureService())
+    culture = CultureService().get_available_countries()
+    assert service.get_culture_sections(culture[0]) is service.get_culture_sections(culture[0])
+    assert len(service._fragments) < service.cache_size
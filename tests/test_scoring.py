@@ -0,0 +1,78 @@
+"""
+Scoring tests - Base scores for uninformed visa types and age buckets
+"""
+
+import json
+
+import pytest
+
+from services.scoring import ScoringEngine
+from services.stores import VISA_DATA_PATH
+from services.visa_service import VisaService
+from utils.constants import UNKNOWN_FACTOR_SCORE
+
+
+@pytest.fixture
+def rules():
+    with open(VISA_DATA_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def engine_for(rules, tmp_path):
+    path = tmp_path / 'visa_rules.json'
+    path.write_text(json.dumps(rules), encoding='utf-8')
+    return ScoringEngine(VisaService(data_path=str(path)).store)
+
+
+@pytest.mark.parametrize('purpose, visa_key', [('Tourism', 'tourist'), ('Business', 'business')])
+def test_visas_the_profile_cannot_inform_score_their_base_score(rules, purpose, visa_key):
+    base_score = rules['visa_types'][visa_key]['base_score']
+    service = VisaService()
+    for profile in ({}, {'education': "Master's Degree", 'work_experience': 12, 'age': 30}):
+        recommendations = service.get_visa_recommendations(dict(profile, destination='Canada', purpose=purpose))
+        assert [r['eligibility_score'] for r in recommendations] == [base_score]
+    assert service.score_profiles([{}], [visa_key]) == [{visa_key: base_score}]
+
+
+def test_base_scores_come_from_the_visa_rules(rules, tmp_path):
+    rules['visa_types']['tourist']['base_score'] = 60
+    engine = engine_for(rules, tmp_path)
+    assert engine.score({}, ['tourist']) == [60]
+    assert engine.score_batch([{}, {'age': 30}], ['tourist']).tolist() == [[60], [60]]
+
+
+def test_base_scores_do_not_apply_to_informed_visas(rules, tmp_path):
+    rules['visa_types']['skilled_worker']['base_score'] = 10
+    engine = engine_for(rules, tmp_path)
+    assert engine.score({'work_experience': 12}, ['skilled_worker']) > [10]
+
+
+def test_uninformed_visas_without_a_base_score_score_the_unknown_prior(rules, tmp_path):
+    transit = dict(rules['visa_types']['tourist'], name='Transit Visa')
+    del transit['base_score']
+    rules['visa_types']['transit'] = transit
+    engine = engine_for(rules, tmp_path)
+    assert engine.score({}, ['transit']) == [round(UNKNOWN_FACTOR_SCORE * 100)]
+
+
+def test_informed_visas_are_scored_from_their_factors():
+    engine = ScoringEngine(VisaService().store)
+    assert engine.score({'work_experience': 0}, ['skilled_worker']) < engine.score({'work_experience': 12}, ['skilled_worker'])
+
+
+def test_ages_under_18_earn_no_age_points(rules, tmp_path):
+    rules['visa_types']['skilled_worker']['success_factors'] = {'age': 1.0}
+    engine = engine_for(rules, tmp_path)
+    assert engine.score({'age': 17}, ['skilled_worker']) == [0]
+    assert engine.score({'age': 16}, ['skilled_worker']) == [0]
+    assert engine.score({'age': 18}, ['skilled_worker']) == engine.score({'age': 25}, ['skilled_worker'])
+    assert engine.score({'age': 18}, ['skilled_worker']) > [0]
+
+
+def test_age_counts_only_for_visas_that_weight_it(rules, tmp_path):
+    rules['visa_types']['student']['success_factors']['age'] = 0.5
+    engine = engine_for(rules, tmp_path)
+    points = rules['eligibility_criteria']['age_points']
+    assert points['26-30'] > points['46+']
+    assert engine.score({'age': 28}, ['student']) > engine.score({'age': 50}, ['student'])
+    assert engine.score({'age': 28}, ['skilled_worker']) == engine.score({'age': 50}, ['skilled_worker'])
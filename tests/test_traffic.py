@@ -0,0 +1,57 @@
+"""
+Traffic tests - A failing log never changes the outcome of a service call
+"""
+
+import pytest
+
+from services import traffic
+
+
+class Service:
+    def answer(self):
+        return 42
+    
+    def fail(self):
+        raise KeyError('missing')
+
+
+@pytest.fixture
+def broken_recorder(tmp_path, monkeypatch):
+    # A regular file where the log directory should be, so every segment
+    # fails to open
+    blocker = tmp_path / 'blocker'
+    blocker.write_text('')
+    recorder = traffic.TrafficRecorder(str(blocker / 'traffic'))
+    monkeypatch.setattr(traffic, 'ENABLED', True)
+    monkeypatch.setattr(traffic, 'RECORDER', recorder)
+    return recorder
+
+
+def test_a_call_returns_its_result_when_it_cannot_be_recorded(broken_recorder):
+    answer = traffic.recorded(Service.answer)
+    
+    assert answer(Service()) == 42
+    assert answer(Service()) == 42
+    assert broken_recorder.stats['dropped'] == 2
+    assert broken_recorder.stats['calls'] == 0
+
+
+def test_a_call_raises_its_own_error_when_it_cannot_be_recorded(broken_recorder):
+    fail = traffic.recorded(Service.fail)
+    
+    with pytest.raises(KeyError):
+        fail(Service())
+    assert broken_recorder.stats['dropped'] == 1
+
+
+def test_recording_resumes_once_the_directory_can_be_written(broken_recorder, tmp_path):
+    answer = traffic.recorded(Service.answer)
+    answer(Service())
+    
+    broken_recorder.directory = str(tmp_path / 'traffic')
+    answer(Service())
+    broken_recorder.close()
+    
+    calls = list(traffic.read_segment(traffic.segment_paths(broken_recorder.directory)[0]))
+    assert [call['method'] for call in calls] == ['Service.answer']
+    assert broken_recorder.stats['dropped'] == 1
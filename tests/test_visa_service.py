@@ -0,0 +1,58 @@
+"""
+Visa service tests - Tenant views follow their patch files
+"""
+
+import json
+import os
+
+import pytest
+
+from services import overlays
+from services.visa_service import VisaService
+
+
+@pytest.fixture
+def tenants_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(overlays, 'TENANTS_DIR', str(tmp_path))
+    return tmp_path
+
+
+def write_patch(tenants_dir, tenant, name, modified):
+    path = tenants_dir / f"{tenant}.json"
+    path.write_text(json.dumps({'visa_rules': {'visa_types': {'tourist': {'name': name}}}}), encoding='utf-8')
+    os.utime(path, ns=(modified, modified))
+
+
+def tourist_name(service):
+    return service.store.get_visa_type('tourist')['name']
+
+
+def test_tenant_view_is_cached_while_the_patch_file_is_unchanged(tenants_dir):
+    write_patch(tenants_dir, 'acme', 'A', 1_000_000_000)
+    service = VisaService()
+    assert service.for_tenant('acme') is service.for_tenant('acme')
+
+
+def test_tenant_view_follows_an_edited_patch_file(tenants_dir):
+    write_patch(tenants_dir, 'acme', 'A', 1_000_000_000)
+    service = VisaService()
+    assert tourist_name(service.for_tenant('acme')) == 'A'
+    write_patch(tenants_dir, 'acme', 'B', 2_000_000_000)
+    assert tourist_name(service.for_tenant('acme')) == 'B'
+
+
+def test_removed_patch_file_is_reported(tenants_dir):
+    write_patch(tenants_dir, 'acme', 'A', 1_000_000_000)
+    service = VisaService()
+    service.for_tenant('acme')
+    os.remove(tenants_dir / 'acme.json')
+    with pytest.raises(FileNotFoundError):
+        service.for_tenant('acme')
+
+
+def test_given_patch_is_cached_by_identity(tenants_dir):
+    service = VisaService()
+    patch = {'visa_types': {'tourist': {'name': 'A'}}}
+    view = service.for_tenant('acme', patch=patch)
+    assert service.for_tenant('acme', patch=patch) is view
+    assert service.for_tenant('acme', patch=dict(patch)) is not view
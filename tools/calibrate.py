@@ -0,0 +1,82 @@
+"""
+Calibrate - Fits approval probability curves from a CSV of past applications
+
+Streams the outcomes CSV into per-(destination, visa type, score) counts,
+fits a curve per group and writes the parameter file VisaService loads
+(data/calibration.json by default). The counts are kept in a state file, so
+later runs with --update only read the outcomes that arrived since.
+
+The CSV needs 'destination', 'visa_key' and 'outcome' (approved/refused)
+columns, and either 'eligibility_score' or the applicant's profile columns
+(education, work_experience, age, job_title...), which are scored with the
+current rules.
+
+Usage:
+    python -m tools.calibrate outcomes.csv
+    python -m tools.calibrate outcomes.csv --method isotonic --min-samples 200
+    python -m tools.calibrate new_outcomes.csv --update
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from services.calibration import (  # noqa: E402
+    CALIBRATION_PATH, METHODS, CalibrationStats, fit, read_outcomes, write_parameters
+)
+from services.visa_service import VisaService  # noqa: E402
+from utils.constants import CALIBRATION_MIN_SAMPLES, CALIBRATION_CHUNK_ROWS  # noqa: E402
+
+
+def state_path_for(output):
+    """Default state file next to a parameter file"""
+    return os.path.splitext(output)[0] + '_state.npz'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fit VisaVerse approval probability curves from past outcomes")
+    parser.add_argument('outcomes', nargs='*', help="CSV files of past applications and outcomes")
+    parser.add_argument('--output', default=CALIBRATION_PATH, help="Parameter file to write")
+    parser.add_argument('--state', help="Counts file (default: next to the output)")
+    parser.add_argument('--update', action='store_true',
+                        help="Add the outcomes to the counts from earlier runs instead of starting over")
+    parser.add_argument('--method', choices=METHODS, default='logistic', help="Curve to fit")
+    parser.add_argument('--min-samples', type=int, default=CALIBRATION_MIN_SAMPLES,
+                        help="Fewest outcomes a destination and visa type need for their own curve")
+    parser.add_argument('--visa', help="visa_rules.json to score profiles with")
+    parser.add_argument('--chunk-rows', type=int, default=CALIBRATION_CHUNK_ROWS, help="CSV rows read at once")
+    args = parser.parse_args(argv)
+    
+    state_path = args.state or state_path_for(args.output)
+    try:
+        stats = CalibrationStats.load(state_path) if args.update else CalibrationStats()
+        # read_outcomes refuses to add profiles scored with other rules than the saved counts
+        visa_service = VisaService(data_path=args.visa)
+        start = time.perf_counter()
+        for path in args.outcomes:
+            result = read_outcomes(path, stats, visa_service, args.chunk_rows)
+            elapsed = time.perf_counter() - start
+            print(f"{path}: {result['counted']} outcomes counted, {result['skipped']} skipped "
+                  f"({(result['counted'] + result['skipped']) / max(elapsed, 1e-9):,.0f} rows/s)")
+            start = time.perf_counter()
+        parameters = fit(stats, args.method, args.min_samples)
+    except (FileNotFoundError, ValueError) as e:
+        print(e)
+        return 1
+    
+    stats.save(state_path)
+    write_parameters(parameters, args.output)
+    curves = parameters['curves']
+    groups = sum(len(visas) for destination, visas in curves.items() if destination != '*')
+    print(f"Wrote {args.output} ({os.path.getsize(args.output) / 1024:.1f} KiB): {args.method} curves for "
+          f"{groups} destination/visa pairs and {len(curves.get('*', {}))} pooled, from {parameters['outcomes']} outcomes")
+    print(f"Counts saved to {state_path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
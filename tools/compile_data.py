@@ -0,0 +1,52 @@
+"""
+Compile Data - Validates the JSON data files and builds the compiled artifact
+
+Checks data/visa_rules.json and data/culture_data.json against their
+schemas and cross-references, then writes data/visaverse.compiled for
+VISAVERSE_STORAGE=compiled. Exits non-zero and lists every problem if the
+data is invalid.
+
+Usage:
+    python -m tools.compile_data
+    python -m tools.compile_data --check        # validate only
+"""
+
+import argparse
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from services.compiled_store import COMPILED_DATA_PATH, build_artifact, load_and_validate  # noqa: E402
+from services.stores import VISA_DATA_PATH, CULTURE_DATA_PATH  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate and compile the VisaVerse data files")
+    parser.add_argument('--output', default=COMPILED_DATA_PATH, help="Artifact to write")
+    parser.add_argument('--visa', default=VISA_DATA_PATH, help="visa_rules.json to compile")
+    parser.add_argument('--culture', default=CULTURE_DATA_PATH, help="culture_data.json to compile")
+    parser.add_argument('--check', action='store_true', help="Validate only, do not write the artifact")
+    args = parser.parse_args(argv)
+    
+    try:
+        if args.check:
+            load_and_validate(args.visa, args.culture)
+            print("Data is valid")
+            return 0
+        sections = build_artifact(args.output, args.visa, args.culture)
+    except (FileNotFoundError, ValueError) as e:
+        print(e)
+        return 1
+    
+    visa = sections['visa']
+    print(f"Wrote {args.output}")
+    print(f"  {len(visa['visa_rules']['visa_types'])} visa types, "
+          f"{len(visa['visa_index']['keys_by_country'])} destinations, "
+          f"{len(sections['culture']['culture_data']['countries'])} culture guides")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""
+Export Static - Pre-renders the culture guides and country panels for a CDN
+
+Writes one HTML page per culture guide and per destination key-information
+panel, with content-hashed filenames, plus index.html and manifest.json.
+Re-running only renders pages whose source data changed.
+
+Usage:
+    python -m tools.export_static
+    python -m tools.export_static --output /srv/cdn/guides --jobs 4
+    python -m tools.export_static --force        # render every page
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from services.static_export import DEFAULT_SITE_DIR, build_site  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the VisaVerse culture guides and country panels as static HTML")
+    parser.add_argument('--output', default=DEFAULT_SITE_DIR, help="Site directory to write")
+    parser.add_argument('--jobs', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--force', action='store_true', help="Render every page, even if unchanged")
+    parser.add_argument('--visa', help="visa_rules.json to export from")
+    parser.add_argument('--culture', help="culture_data.json to export from")
+    args = parser.parse_args(argv)
+    
+    start = time.perf_counter()
+    try:
+        stats = build_site(args.output, jobs=args.jobs, force=args.force, visa_path=args.visa, culture_path=args.culture)
+    except (FileNotFoundError, ValueError) as e:
+        print(e)
+        return 1
+    print(f"Exported to {args.output} in {time.perf_counter() - start:.2f}s: "
+          f"{stats['rendered']} rendered, {stats['unchanged']} unchanged, {stats['removed']} removed")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
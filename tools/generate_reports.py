@@ -0,0 +1,72 @@
+"""
+Generate Reports - Writes an applicant packet for every applicant in a cohort
+
+Reads applicants from a JSON Lines file, one record per line (see
+services/reports.py for the fields), and writes <id>.md per applicant. The
+file is streamed, so cohorts of any size can be processed.
+
+Usage:
+    python -m tools.generate_reports --cohort cohort.jsonl
+    python -m tools.generate_reports --cohort cohort.jsonl --output packets/ --jobs 4
+    python -m tools.generate_reports --cohort cohort.jsonl --tenant example-corp
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from services.reports import generate_cohort  # noqa: E402
+
+DEFAULT_REPORTS_DIR = os.path.join(ROOT_DIR, 'reports')
+
+
+def read_cohort(path):
+    """
+    Yield applicant records from a JSON Lines file
+    
+    Raises:
+        ValueError: If a line is not a JSON object
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                applicant = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_number}: invalid JSON: {e}")
+            if not isinstance(applicant, dict):
+                raise ValueError(f"{path}:{line_number}: applicant must be a JSON object")
+            yield applicant
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate VisaVerse applicant packets for a cohort")
+    parser.add_argument('--cohort', required=True, help="JSON Lines file with one applicant per line")
+    parser.add_argument('--output', default=DEFAULT_REPORTS_DIR, help="Directory for the packets")
+    parser.add_argument('--jobs', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--tenant', help="Apply a tenant's rules and checklists")
+    parser.add_argument('--visa', help="visa_rules.json to report from")
+    parser.add_argument('--culture', help="culture_data.json to report from")
+    args = parser.parse_args(argv)
+    
+    start = time.perf_counter()
+    try:
+        written = generate_cohort(read_cohort(args.cohort), args.output, jobs=args.jobs,
+                                  visa_path=args.visa, culture_path=args.culture, tenant=args.tenant)
+    except (FileNotFoundError, ValueError) as e:
+        print(e)
+        return 1
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {written} packets to {args.output} in {elapsed:.2f}s "
+          f"({written / elapsed if elapsed else 0:.0f} packets/s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""
+Import SQLite - Builds the SQLite database used by VISAVERSE_STORAGE=sqlite
+
+Loads data/visa_rules.json and data/culture_data.json into normalized
+tables, then checks that the database serves back exactly the JSON data.
+
+Usage:
+    python -m tools.import_sqlite
+    python -m tools.import_sqlite --output /tmp/visaverse.db --visa other_rules.json
+"""
+
+import argparse
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from services.sqlite_store import SqliteVisaStore, SqliteCultureStore, build_database  # noqa: E402
+from services.stores import (  # noqa: E402
+    JsonVisaStore, JsonCultureStore,
+    VISA_DATA_PATH, CULTURE_DATA_PATH, SQLITE_DATA_PATH
+)
+
+
+def verify(db_path, visa_path, culture_path):
+    """
+    Compare the database with the JSON files it was built from
+    
+    Returns:
+        list: Names of the datasets that differ
+    """
+    mismatches = []
+    if SqliteVisaStore(db_path).data != JsonVisaStore(visa_path).data:
+        mismatches.append('visa_rules')
+    if SqliteCultureStore(db_path).data != JsonCultureStore(culture_path).data:
+        mismatches.append('culture_data')
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import the VisaVerse JSON data into SQLite")
+    parser.add_argument('--output', default=SQLITE_DATA_PATH, help="Database to write")
+    parser.add_argument('--visa', default=VISA_DATA_PATH, help="visa_rules.json to import")
+    parser.add_argument('--culture', default=CULTURE_DATA_PATH, help="culture_data.json to import")
+    parser.add_argument('--no-verify', action='store_true', help="Skip the round-trip check")
+    args = parser.parse_args(argv)
+    
+    counts = build_database(args.output, args.visa, args.culture)
+    print(f"Wrote {args.output}")
+    for table, rows in counts.items():
+        print(f"  {table:24s} {rows:8d} rows")
+    
+    if not args.no_verify:
+        mismatches = verify(args.output, args.visa, args.culture)
+        if mismatches:
+            print(f"Round-trip check FAILED for: {', '.join(mismatches)}")
+            return 1
+        print("Round-trip check passed")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
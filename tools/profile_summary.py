@@ -0,0 +1,131 @@
+"""
+Profile Summary - Aggregates the dumps written by the profiling mode
+
+Combines every .pstats file into one cProfile report sorted by cumulative
+time, and sums the .alloc tracemalloc snapshots into the top allocation
+sites. Dumps can be narrowed to one page or profile shape.
+
+Usage:
+    python -m tools.profile_summary profiles/
+    python -m tools.profile_summary profiles/ --page visa-assistant --top 30
+"""
+
+import argparse
+import glob
+import io
+import os
+import pstats
+import sys
+import tracemalloc
+from collections import defaultdict
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from utils.constants import PROFILE_DIR_ENV_VAR  # noqa: E402
+
+
+def parse_dump_name(path):
+    """
+    Split a dump file name into its tags
+    
+    Args:
+        path (str): Path to a .pstats or .alloc file
+    
+    Returns:
+        dict: 'stem', 'page' and 'shape'
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    parts = stem.split('__')
+    return {
+        'stem': stem,
+        'page': parts[1] if len(parts) > 1 else 'unknown',
+        'shape': parts[2] if len(parts) > 2 else 'none'
+    }
+
+
+def find_dumps(directory, extension, page=None, shape=None):
+    """List dump files, optionally filtered by page and shape slug"""
+    paths = []
+    for path in sorted(glob.glob(os.path.join(directory, f'*{extension}'))):
+        tags = parse_dump_name(path)
+        if page and tags['page'] != page:
+            continue
+        if shape and tags['shape'] != shape:
+            continue
+        paths.append(path)
+    return paths
+
+
+def summarize_cpu(paths, top):
+    """
+    Merge pstats files and format the top functions by cumulative time
+    
+    Returns:
+        str: Report text
+    """
+    if not paths:
+        return "No .pstats files found.\n"
+    out = io.StringIO()
+    stats = pstats.Stats(paths[0], stream=out)
+    for path in paths[1:]:
+        stats.add(path)
+    stats.strip_dirs().sort_stats('cumulative').print_stats(top)
+    return out.getvalue()
+
+
+def summarize_allocations(paths, top):
+    """
+    Sum allocation sites across snapshots
+    
+    Returns:
+        list: (site, total size in bytes, allocation count) tuples, largest first
+    """
+    sizes = defaultdict(int)
+    counts = defaultdict(int)
+    for path in paths:
+        snapshot = tracemalloc.Snapshot.load(path)
+        for stat in snapshot.statistics('lineno'):
+            frame = stat.traceback[0]
+            site = f"{frame.filename}:{frame.lineno}"
+            sizes[site] += stat.size
+            counts[site] += stat.count
+    ranked = sorted(sizes.items(), key=lambda item: item[1], reverse=True)[:top]
+    return [(site, size, counts[site]) for site, size in ranked]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aggregate VisaVerse profiling dumps")
+    parser.add_argument('directory', nargs='?', default=os.environ.get(PROFILE_DIR_ENV_VAR),
+                        help=f"Dump directory (defaults to ${PROFILE_DIR_ENV_VAR})")
+    parser.add_argument('--page', help="Only include dumps for this page slug, e.g. visa-assistant")
+    parser.add_argument('--shape', help="Only include dumps for this profile shape")
+    parser.add_argument('--top', type=int, default=25, help="Rows to show in each report")
+    args = parser.parse_args(argv)
+    
+    if not args.directory or not os.path.isdir(args.directory):
+        parser.error("a dump directory is required")
+    
+    pstats_paths = find_dumps(args.directory, '.pstats', args.page, args.shape)
+    alloc_paths = find_dumps(args.directory, '.alloc', args.page, args.shape)
+    
+    pages = defaultdict(int)
+    for path in pstats_paths:
+        tags = parse_dump_name(path)
+        pages[(tags['page'], tags['shape'])] += 1
+    
+    print(f"{len(pstats_paths)} profiled requests")
+    for (page, shape), n in sorted(pages.items(), key=lambda item: -item[1]):
+        print(f"  {n:5d}  {page}  [{shape}]")
+    
+    print(f"\n== Top {args.top} functions by cumulative time ==")
+    print(summarize_cpu(pstats_paths, args.top))
+    
+    print(f"== Top {args.top} allocation sites across {len(alloc_paths)} snapshots ==")
+    for site, size, count in summarize_allocations(alloc_paths, args.top):
+        print(f"  {size / 1024:10.1f} KiB  {count:8d} blocks  {site}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+Rule Versions - Records, lists and compares dated versions of the visa rules
+
+`publish` replaces data/visa_rules.json with new rules and keeps the
+outgoing ones as a version in data/rule_versions.json, stored as the patch
+that turns the new rules back into them (see services/rule_versions.py).
+Rebuild the SQLite database or compiled artifact afterwards if you use one.
+
+Usage:
+    python -m tools.rule_versions publish new_rules.json --effective-from 2026-10-01 --previous-from 2026-07-01
+    python -m tools.rule_versions list
+    python -m tools.rule_versions diff 2026-04-01              # against the current rules
+    python -m tools.rule_versions diff 2026-01-01 2026-05-15
+"""
+
+import argparse
+import datetime
+import json
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from services.rule_versions import (  # noqa: E402
+    CURRENT, RULE_VERSIONS_PATH, VERSIONED_SECTIONS, load_rule_versions, make_patch, write_rule_versions
+)
+from services.stores import VISA_DATA_PATH, load_json_file  # noqa: E402
+from services.visa_service import VisaService  # noqa: E402
+
+
+def publish(new_rules_path, effective_from, previous_from, visa_path, versions_path):
+    """
+    Make new rules current, keeping the outgoing rules as a dated version
+    
+    Args:
+        new_rules_path (str): visa_rules.json with the new rules
+        effective_from (str): Date the new rules take effect
+        previous_from (str): Date the outgoing rules took effect, if the
+            history does not record it yet
+        visa_path (str): Current visa_rules.json, replaced by the new rules
+        versions_path (str): Rule version history
+    
+    Returns:
+        dict: The patch stored for the outgoing version
+    
+    Raises:
+        FileNotFoundError: If a rules file is missing
+        ValueError: If a file or date is invalid
+    """
+    for date in (effective_from, previous_from):
+        if date is not None:
+            try:
+                datetime.date.fromisoformat(date)
+            except ValueError:
+                raise ValueError(f"Invalid date {date!r}; use YYYY-MM-DD")
+    history = load_rule_versions(versions_path)
+    previous_from = history['current_from'] or previous_from
+    if previous_from is None:
+        raise ValueError("The history has no date for the current rules; pass --previous-from")
+    if effective_from <= previous_from:
+        raise ValueError(f"--effective-from {effective_from} must be after {previous_from}, "
+                         "when the current rules took effect")
+    current, _ = load_json_file(visa_path, 'visa_rules', 'Visa')
+    new, _ = load_json_file(new_rules_path, 'visa_rules', 'New visa')
+    patch = {section: make_patch(new.get(section, {}), current.get(section, {})) for section in VERSIONED_SECTIONS}
+    patch = {section: value for section, value in patch.items() if value}
+    history['versions'] = [(previous_from, patch)] + history['versions']
+    history['current_from'] = effective_from
+    write_rule_versions(history, versions_path)
+    temp_path = f"{visa_path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(new, f, indent=2, ensure_ascii=False)
+    os.replace(temp_path, visa_path)
+    return patch
+
+
+def print_diff(diff):
+    """Print a diff_versions result, one line per changed record"""
+    print(f"Changes from {diff['from']} to {diff['to']}:")
+    total = 0
+    for section in VERSIONED_SECTIONS:
+        changes = diff[section]
+        for key in changes['added']:
+            print(f"  + {section}.{key}")
+        for key in changes['removed']:
+            print(f"  - {section}.{key}")
+        for change in changes['changed']:
+            print(f"  ~ {section}.{change['key']}: {', '.join(change['fields'])}")
+        total += len(changes['added']) + len(changes['removed']) + len(changes['changed'])
+    if not total:
+        print("  (none)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage dated versions of the VisaVerse visa rules")
+    parser.add_argument('--visa', default=VISA_DATA_PATH, help="Current visa_rules.json")
+    parser.add_argument('--versions', default=RULE_VERSIONS_PATH, help="Rule version history")
+    commands = parser.add_subparsers(dest='command', required=True)
+    publish_parser = commands.add_parser('publish', help="Make new rules current and keep the old ones as a version")
+    publish_parser.add_argument('rules', help="visa_rules.json with the new rules")
+    publish_parser.add_argument('--effective-from', required=True, help="Date the new rules take effect")
+    publish_parser.add_argument('--previous-from', help="Date the current rules took effect, for the first publish")
+    commands.add_parser('list', help="List the versions")
+    diff_parser = commands.add_parser('diff', help="List the records that changed between two versions")
+    diff_parser.add_argument('old', help="Version or date to compare from")
+    diff_parser.add_argument('new', nargs='?', default=CURRENT, help="Version or date to compare to")
+    args = parser.parse_args(argv)
+    
+    try:
+        if args.command == 'publish':
+            patch = publish(args.rules, args.effective_from, args.previous_from, args.visa, args.versions)
+            changed = sum(len(records) for records in patch.values())
+            print(f"{args.rules} is current from {args.effective_from}; "
+                  f"the previous rules are kept as a patch of {changed} records")
+            return 0
+        service = VisaService(data_path=args.visa, versions_path=args.versions)
+        if args.command == 'list':
+            for version in service.rule_versions():
+                until = version['effective_until'] or 'now'
+                print(f"{version['version']:>10s}  {version['effective_from'] or '?'} to {until}  "
+                      f"(data version {version['data_version']})")
+        else:
+            print_diff(service.diff_versions(args.old, args.new))
+    except (FileNotFoundError, ValueError) as e:
+        print(e)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
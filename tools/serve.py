@@ -0,0 +1,53 @@
+"""
+Serve - Runs the app with the warm-up and probes started at process start
+
+`streamlit run app.py` only imports the app when the first session opens,
+so that session would wait for the data to load. This launcher starts the
+warm-up thread and the probe/metrics endpoint first, then runs Streamlit in
+the same process, so the first session finds the services ready and an
+orchestrator can hold traffic back until /readyz answers 200.
+
+Usage:
+    python -m tools.serve
+    python -m tools.serve --probe-host 0.0.0.0 --probe-port 9100 -- --server.port 8501
+"""
+
+import argparse
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT_DIR, 'app.py')
+sys.path.insert(0, ROOT_DIR)
+
+from api.server import start_in_background  # noqa: E402
+from services.warmup import WARMUP  # noqa: E402
+from utils.constants import METRICS_HOST, METRICS_PORT_ENV_VAR  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run VisaVerse with a warm-up and readiness probes")
+    parser.add_argument('--probe-host', default=METRICS_HOST, help="Interface for /healthz, /readyz and /metrics")
+    parser.add_argument('--probe-port', type=int, default=int(os.environ.get(METRICS_PORT_ENV_VAR) or 9100),
+                        help="Port for /healthz, /readyz and /metrics (default: VISAVERSE_METRICS_PORT or 9100)")
+    parser.add_argument('streamlit_args', nargs=argparse.REMAINDER,
+                        help="Options passed on to 'streamlit run', after --")
+    args = parser.parse_args(argv)
+    streamlit_args = args.streamlit_args[1:] if args.streamlit_args[:1] == ['--'] else args.streamlit_args
+    
+    WARMUP.start()
+    try:
+        start_in_background(args.probe_host, args.probe_port)
+    except OSError as e:
+        print(f"Probe endpoint not started: {e}")
+        return 1
+    # The app's own start_metrics_endpoint() then reuses this server
+    os.environ[METRICS_PORT_ENV_VAR] = str(args.probe_port)
+    print(f"Probes on http://{args.probe_host}:{args.probe_port}/readyz")
+    
+    from streamlit.web import cli
+    return cli.main.main(args=['run', APP_PATH, *streamlit_args], prog_name='streamlit', standalone_mode=False)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
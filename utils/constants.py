@@ -15,6 +15,14 @@ PAGE_CULTURE = "Cultural Guide"
 
 PAGES = [PAGE_HOME, PAGE_VISA, PAGE_DOCUMENTS, PAGE_CULTURE]
 
+# Page modules, imported lazily on first visit
+PAGE_MODULES = {
+    PAGE_HOME: "views.home",
+    PAGE_VISA: "views.visa",
+    PAGE_DOCUMENTS: "views.documents",
+    PAGE_CULTURE: "views.culture"
+}
+
 # Countries
 COUNTRIES = [
     "Select...",
@@ -62,6 +70,52 @@ VISA_TYPES = [
     "Other"
 ]
 
+# Visa types considered for each travel purpose, in recommendation order
+PURPOSE_VISA_TYPES = {
+    "Work/Employment": ["skilled_worker", "intra_company_transfer"],
+    "Study": ["student"],
+    "Business": ["business"]
+}
+DEFAULT_PURPOSE_VISA_TYPES = ["tourist"]  # Tourism, Family, Other
+
+# Document checklist used for each travel purpose in applicant packets
+PURPOSE_DOCUMENT_TYPES = {
+    "Work/Employment": "Skilled Worker",
+    "Study": "Student",
+    "Business": "Business",
+    "Tourism": "Tourist",
+    "Family": "Family"
+}
+DEFAULT_DOCUMENT_TYPE = "Other"
+
+# Work experience buckets used by eligibility_criteria.experience_points,
+# as (upper bound in years, bucket); None is open-ended
+EXPERIENCE_BUCKETS = [(2, "0-2"), (5, "3-5"), (10, "6-10"), (15, "11-15"), (None, "16+")]
+
+# Age buckets used by eligibility_criteria.age_points; younger applicants
+# are in none of them and earn no age points
+MIN_BUCKETED_AGE = 18
+AGE_BUCKETS = [(25, "18-25"), (30, "26-30"), (35, "31-35"), (40, "36-40"), (45, "41-45"), (None, "46+")]
+
+# Profile feature each visa success factor is scored from; other factors
+# are not asked for and score UNKNOWN_FACTOR_SCORE
+FACTOR_FEATURES = {
+    "education_level": "education",
+    "academic_record": "education",
+    "years_experience": "experience",
+    "role_seniority": "experience",
+    "age": "age",
+    "high_demand_occupation": "occupation_demand"
+}
+UNKNOWN_FACTOR_SCORE = 0.75
+
+# Occupation matching: weakest job-title similarity accepted, and the
+# occupation_demand feature for matched occupations on or off the
+# destination's shortage list
+MIN_OCCUPATION_SIMILARITY = 0.6
+SHORTAGE_OCCUPATION_DEMAND = 1.0
+OTHER_OCCUPATION_DEMAND = 0.4
+
 # Colors
 COLOR_PRIMARY = "#0066ff"
 COLOR_SUCCESS = "#00cc66"
@@ -88,11 +142,72 @@ MIN_RESUME_LENGTH = 100
 MIN_OFFER_LENGTH = 100
 MIN_PASSPORT_VALIDITY_MONTHS = 6
 
+# Observability
+METRICS_ENV_VAR = "VISAVERSE_METRICS"
+METRICS_PORT_ENV_VAR = "VISAVERSE_METRICS_PORT"
+METRICS_HOST = "127.0.0.1"
+PROFILE_DIR_ENV_VAR = "VISAVERSE_PROFILE_DIR"
+PROFILE_SAMPLE_RATE_ENV_VAR = "VISAVERSE_PROFILE_SAMPLE_RATE"
+PROFILE_FRAMES_ENV_VAR = "VISAVERSE_PROFILE_FRAMES"
+TRAFFIC_DIR_ENV_VAR = "VISAVERSE_TRAFFIC_DIR"
+TRAFFIC_SEGMENT_MB_ENV_VAR = "VISAVERSE_TRAFFIC_SEGMENT_MB"
+TRAFFIC_SEGMENTS_ENV_VAR = "VISAVERSE_TRAFFIC_SEGMENTS"
+
+# Storage
+STORAGE_ENV_VAR = "VISAVERSE_STORAGE"
+SQLITE_PATH_ENV_VAR = "VISAVERSE_SQLITE_PATH"
+COMPILED_PATH_ENV_VAR = "VISAVERSE_COMPILED_PATH"
+
+# Cases: ?case=<id> restores a saved profile and checklist progress; changes
+# are written in batches at most CASE_FLUSH_INTERVAL seconds after they happen
+CASES_PATH_ENV_VAR = "VISAVERSE_CASES_PATH"
+CASE_QUERY_PARAM = "case"
+CASE_FLUSH_INTERVAL = 0.5
+
+# Warm-up: the processing-time limit the duration index is first queried with
+WARMUP_MAX_PROCESSING_DAYS = 365
+
+# Render cache: most markdown fragments RenderService keeps, least recently
+# used first out; the data's own fragments are rendered at warm-up
+RENDER_CACHE_SIZE = 4096
+
+# Sharding: VISAVERSE_SHARDS=N serves visa and culture lookups from N worker
+# processes, each owning the destinations the hash ring assigns to it
+SHARDS_ENV_VAR = "VISAVERSE_SHARDS"
+SHARD_CACHE_SIZE = 1024
+SHARD_VIRTUAL_NODES = 64
+
+# Calibration: approval probabilities fitted by tools/calibrate.py. A
+# (destination, visa type) needs CALIBRATION_MIN_SAMPLES outcomes for its own
+# curve; the fit reads the outcomes CSV CALIBRATION_CHUNK_ROWS rows at a time
+CALIBRATION_PATH_ENV_VAR = "VISAVERSE_CALIBRATION_PATH"
+CALIBRATION_MIN_SAMPLES = 50
+CALIBRATION_RIDGE = 1.0
+CALIBRATION_CHUNK_ROWS = 50000
+
+# Tenants: ?tenant=<id> selects the patch in data/tenants/<id>.json
+TENANT_QUERY_PARAM = "tenant"
+
+# Locales: culture content in other languages is read on first use from
+# data/locales/<locale>/<country>.json; only the LOCALE_CACHE_SIZE most
+# recently used (locale, country) packs stay in memory
+LOCALES_DIR_ENV_VAR = "VISAVERSE_LOCALES_DIR"
+DEFAULT_LOCALE = "en"
+LOCALE_CACHE_SIZE = 512
+
+# Async services: document analyses running at once per AsyncDocumentService
+ANALYSIS_MAX_CONCURRENCY = 2
+
 # Success rate thresholds
 VERY_HIGH_THRESHOLD = 85
 HIGH_THRESHOLD = 70
 MODERATE_THRESHOLD = 55
 
+# Success rate thresholds on calibrated approval probabilities
+VERY_HIGH_PROBABILITY = 0.85
+HIGH_PROBABILITY = 0.7
+MODERATE_PROBABILITY = 0.5
+
 # Document readiness thresholds
 EXCELLENT_READINESS = 90
 GOOD_READINESS = 70
@@ -0,0 +1,78 @@
+"""
+Static page chrome - styles, sidebar navigation and footer
+
+The chrome lives outside every fragment, so it is only re-emitted on full
+reruns (navigation). Its markup is built once per process.
+"""
+
+import os
+from functools import lru_cache
+
+import streamlit as st
+from utils.constants import PAGES, DISCLAIMER_TEXT, FOOTER_TEXT
+
+STYLESHEET_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'assets', 'style.css')
+
+
+@lru_cache(maxsize=None)
+def _style_markup():
+    """Read the stylesheet from disk once and wrap it in a style tag"""
+    with open(STYLESHEET_PATH, 'r', encoding='utf-8') as f:
+        return f"<style>\n{f.read()}</style>"
+
+
+@lru_cache(maxsize=None)
+def _footer_markup():
+    """Build the disclaimer and footer markup once"""
+    disclaimer = f"""
+    <div class="disclaimer">
+        <strong>{DISCLAIMER_TEXT}</strong>
+    </div>
+"""
+    footer = f"<div style='text-align: center; color: #999; font-size: 0.9rem;'>{FOOTER_TEXT}</div>"
+    return disclaimer, footer
+
+
+def render_styles():
+    """Inject the custom CSS for clean, professional styling"""
+    st.markdown(_style_markup(), unsafe_allow_html=True)
+
+
+def render_sidebar():
+    """
+    Render the sidebar navigation
+    
+    Returns:
+        str: The selected page name
+    """
+    with st.sidebar:
+        st.markdown("## 🧭 Navigation")
+        page = st.radio(
+            "Navigation",
+            PAGES,
+            index=PAGES.index(st.session_state.page),
+            label_visibility="collapsed"
+        )
+        # Update session state when radio button changes
+        st.session_state.page = page
+        
+        st.markdown("---")
+        st.markdown("### About")
+        st.markdown("VisaVerse Copilot helps you navigate global mobility with confidence.")
+        
+        st.markdown("---")
+        st.markdown("### Resources")
+        st.markdown("- [Documentation](#)")
+        st.markdown("- [Support](#)")
+        st.markdown("- [Contact](#)")
+    return page
+
+
+def render_footer():
+    """Render the disclaimer and footer"""
+    disclaimer, footer = _footer_markup()
+    st.markdown("---")
+    st.markdown(disclaimer, unsafe_allow_html=True)
+    
+    st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown(footer, unsafe_allow_html=True)
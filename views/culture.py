@@ -0,0 +1,79 @@
+"""
+Cultural & Communication Guide page
+"""
+
+import streamlit as st
+from services.profiling import profiled_rerun
+from utils.constants import PAGE_CULTURE
+from views.shared import get_culture_service, get_render_service
+
+
+def render():
+    """Render the cultural guide page"""
+    st.markdown("# 🤝 Cultural & Communication Guide")
+    st.markdown("Navigate cultural differences and communicate effectively in your destination country.")
+    
+    st.markdown("---")
+    
+    _country_guide()
+
+
+@st.fragment
+@profiled_rerun(PAGE_CULTURE)
+def _country_guide():
+    """Country picker and culture tabs - changing country reruns only this fragment"""
+    culture_service = get_culture_service()
+    render_service = get_render_service()
+    
+    # Get available countries from service
+    available_countries = culture_service.get_available_countries()
+    country_options = ["Select..."] + available_countries
+    
+    destination_country = st.selectbox(
+        "Select Your Destination Country",
+        country_options
+    )
+    
+    if destination_country != "Select...":
+        st.markdown(f"### 🌏 {destination_country} - Cultural Insights")
+        
+        tab1, tab2, tab3, tab4 = st.tabs(["Workplace", "Communication", "Etiquette", "Tips"])
+        
+        # Pre-rendered sections from the render cache
+        sections = render_service.get_culture_sections(destination_country)
+        
+        with tab1:
+            st.markdown("#### Workplace Culture")
+            if sections['workplace']:
+                st.markdown(sections['workplace'])
+            else:
+                st.info("Workplace culture information not available for this country.")
+        
+        with tab2:
+            st.markdown("#### Communication Style")
+            if sections['communication']:
+                st.markdown(sections['communication'])
+            else:
+                st.info("Communication style information not available for this country.")
+        
+        with tab3:
+            st.markdown("#### Business Etiquette")
+            if sections['etiquette']:
+                st.markdown(sections['etiquette'])
+            else:
+                st.info("Business etiquette information not available for this country.")
+        
+        with tab4:
+            st.markdown("#### Quick Tips")
+            
+            if sections['tips']:
+                st.markdown(sections['tips'])
+            else:
+                st.info("Cultural tips not available for this country.")
+            
+            # Show general adaptation tips
+            st.markdown("---")
+            st.markdown("#### General Adaptation Tips")
+            st.markdown(render_service.get_adaptation_tips())
+            
+            st.info("💡 **Remember:** Cultural adaptation takes time. Be patient with yourself and others.")
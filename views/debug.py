@@ -0,0 +1,39 @@
+"""
+Metrics debug panel - shows the in-process service metrics in the sidebar
+"""
+
+import streamlit as st
+from services import metrics
+
+
+def render_metrics_panel():
+    """Render service call and cache metrics, if metrics are enabled"""
+    if not metrics.ENABLED:
+        return
+    
+    with st.sidebar:
+        st.markdown("---")
+        with st.expander("📊 Metrics"):
+            rows = [
+                {
+                    'metric': row['labels'].get('method') or row['labels'].get('dataset') or row['name'],
+                    'calls': row['count'],
+                    'mean (ms)': round(row['mean'] * 1000, 3),
+                    'p95 (ms)': round(row['p95'] * 1000, 3),
+                    'max (ms)': round(row['max'] * 1000, 3)
+                }
+                for row in metrics.REGISTRY.histogram_summary()
+            ]
+            if rows:
+                st.dataframe(rows, hide_index=True, use_container_width=True)
+            else:
+                st.caption("No calls recorded yet.")
+            
+            counters = metrics.REGISTRY.snapshot()['counters']
+            cache = {
+                labels[1][1]: value
+                for (name, labels), value in counters.items()
+                if name == 'visaverse_cache_requests_total'
+            }
+            if cache:
+                st.caption("Render cache: " + ", ".join(f"{result} {value}" for result, value in sorted(cache.items())))
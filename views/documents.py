@@ -0,0 +1,89 @@
+"""
+Document Readiness Checker page
+"""
+
+import streamlit as st
+from services.profiling import profiled_rerun
+from utils.constants import PAGE_DOCUMENTS, VISA_TYPES
+from utils.helpers import format_requirements_list, get_readiness_message
+from views.shared import get_document_service, get_case_store, current_case_id, for_current_tenant
+
+
+def render():
+    """Render the document checker page"""
+    st.markdown("# 📄 Document Readiness Checker")
+    st.markdown("Ensure you have all required documents before submitting your application.")
+    
+    st.markdown("---")
+    
+    _checklist()
+
+
+def _save_toggle(visa_type, doc, key):
+    """Checkbox callback: queue the new state for the case store, which writes it in the background"""
+    case_store = get_case_store()
+    if case_store:
+        case_store.set_checked(current_case_id(create=True), visa_type, doc, st.session_state[key])
+
+
+@st.fragment
+@profiled_rerun(PAGE_DOCUMENTS)
+def _checklist():
+    """Visa type picker and checklist - checkbox toggles rerun only this fragment"""
+    document_service = for_current_tenant(get_document_service())
+    
+    visa_type = st.selectbox(
+        "Select Visa Type",
+        VISA_TYPES
+    )
+    
+    if visa_type != "Select...":
+        # Get requirements from service
+        requirements = document_service.get_required_documents(visa_type)
+        
+        # Progress saved for this case ticks the boxes on a return visit
+        case_store = get_case_store()
+        case_id = current_case_id()
+        saved = case_store.get_checklist(case_id, visa_type) if case_store and case_id else {}
+        
+        st.markdown("### 📋 Required Documents Checklist")
+        
+        # Track checked documents
+        checked_docs = {}
+        
+        # Essential documents
+        st.markdown("#### Essential Documents")
+        for doc in requirements.get('essential', []):
+            key = f"essential_{doc}"
+            checked_docs[doc] = st.checkbox(doc, value=saved.get(doc, False), key=key,
+                                            on_change=_save_toggle, args=(visa_type, doc, key))
+        
+        # Specific documents
+        st.markdown(f"#### {visa_type} Visa Specific Documents")
+        for doc in requirements.get('specific', []):
+            key = f"specific_{doc}"
+            checked_docs[doc] = st.checkbox(doc, value=saved.get(doc, False), key=key,
+                                            on_change=_save_toggle, args=(visa_type, doc, key))
+        
+        st.markdown("---")
+        
+        if st.button("Check Readiness", use_container_width=True):
+            # Calculate readiness using service
+            readiness = document_service.calculate_readiness_score(visa_type, checked_docs)
+            
+            st.markdown("### 📊 Readiness Score")
+            st.progress(readiness['percentage'] / 100)
+            st.markdown(f"**{readiness['score']}%** complete ({readiness['completed']}/{readiness['total']} documents)")
+            
+            message = get_readiness_message(readiness['percentage'])
+            
+            if readiness['percentage'] == 100:
+                st.success(message)
+            elif readiness['percentage'] >= 70:
+                st.info(message)
+            else:
+                st.warning(message)
+            
+            if readiness['missing']:
+                with st.expander("Missing Documents"):
+                    st.markdown(format_requirements_list(readiness['missing']))
@@ -0,0 +1,63 @@
+"""
+Home page - hero section, feature cards and key benefits
+"""
+
+import streamlit as st
+from utils.constants import PAGE_VISA, PAGE_DOCUMENTS, PAGE_CULTURE
+
+HERO_MARKUP = """
+    <div class="hero">
+        <h1>✈️ VisaVerse Copilot</h1>
+        <p>Your trusted assistant for global mobility, visa applications, and cross-cultural success</p>
+    </div>
+"""
+
+
+def render():
+    """Render the home page"""
+    st.markdown(HERO_MARKUP, unsafe_allow_html=True)
+    
+    # Feature cards
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.markdown("### 🌍 Visa Assistant")
+        st.markdown("Get personalized visa and work eligibility guidance based on your profile.")
+        if st.button("Get Started →", key="visa"):
+            st.session_state.page = PAGE_VISA
+            st.rerun()
+    
+    with col2:
+        st.markdown("### 📄 Document Checker")
+        st.markdown("Verify your documents are complete and ready for submission.")
+        if st.button("Check Now →", key="docs"):
+            st.session_state.page = PAGE_DOCUMENTS
+            st.rerun()
+    
+    with col3:
+        st.markdown("### 🤝 Cultural Guide")
+        st.markdown("Navigate cultural differences and communication styles with confidence.")
+        if st.button("Learn More →", key="culture"):
+            st.session_state.page = PAGE_CULTURE
+            st.rerun()
+    
+    st.markdown("---")
+    
+    # Key benefits
+    st.markdown("## Why VisaVerse?")
+    
+    benefit1, benefit2 = st.columns(2)
+    
+    with benefit1:
+        st.markdown("### ⚡ Fast & Accurate")
+        st.markdown("Get instant answers to your visa questions with AI-powered insights.")
+        
+        st.markdown("### 🔒 Secure & Private")
+        st.markdown("Your personal information is protected and never shared.")
+    
+    with benefit2:
+        st.markdown("### 🎯 Personalized")
+        st.markdown("Tailored recommendations based on your unique situation.")
+        
+        st.markdown("### 🌐 Global Coverage")
+        st.markdown("Support for visa applications across 150+ countries.")
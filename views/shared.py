@@ -0,0 +1,124 @@
+"""
+Shared service accessors for the page modules
+
+The services come from the process-wide warm-up (services/warmup.py). Each
+getter waits only for the warm-up step it needs and is cached for the
+lifetime of the process.
+"""
+
+import os
+import sqlite3
+
+import streamlit as st
+from api.server import start_in_background
+from services.case_store import CaseStore, new_case_id, validate_case_id
+from services.warmup import WARMUP
+from utils.constants import METRICS_HOST, METRICS_PORT_ENV_VAR, TENANT_QUERY_PARAM, CASE_QUERY_PARAM
+
+
+def start_warmup():
+    # Does nothing when tools/serve.py already started it at process start
+    WARMUP.start()
+
+
+@st.cache_resource
+def get_visa_service():
+    try:
+        return WARMUP.services()['visa']
+    except (FileNotFoundError, ValueError, RuntimeError) as e:
+        st.error(f"Error loading visa service: {e}")
+        st.stop()
+
+
+@st.cache_resource
+def get_document_service():
+    try:
+        return WARMUP.services()['document']
+    except Exception as e:
+        st.error(f"Error loading document service: {e}")
+        st.stop()
+
+
+@st.cache_resource
+def get_culture_service():
+    try:
+        return WARMUP.services()['culture']
+    except (FileNotFoundError, ValueError, RuntimeError) as e:
+        st.error(f"Error loading culture service: {e}")
+        st.stop()
+
+
+def for_current_tenant(service):
+    """
+    The tenant view of a cached service for the ?tenant= query parameter
+    
+    Args:
+        service (VisaService or DocumentService): Shared service
+    
+    Returns:
+        The tenant's view, or the shared service when no tenant is given
+    """
+    tenant = st.query_params.get(TENANT_QUERY_PARAM)
+    if not tenant:
+        return service
+    try:
+        return service.for_tenant(tenant)
+    except (FileNotFoundError, ValueError) as e:
+        st.warning(f"Tenant settings not applied: {e}")
+        return service
+
+
+@st.cache_resource
+def get_case_store():
+    # Saving cases is optional; the app works without it if the database cannot be opened
+    try:
+        return CaseStore()
+    except (sqlite3.Error, OSError) as e:
+        st.warning(f"Progress will not be saved: {e}")
+        return None
+
+
+def current_case_id(create=False):
+    """
+    The case id in the ?case= query parameter
+    
+    Args:
+        create (bool): Start a new case, and put its id in the URL, if there is none
+    
+    Returns:
+        str: Case id, or None if there is no valid one and create is False
+    """
+    case_id = st.query_params.get(CASE_QUERY_PARAM)
+    if case_id:
+        try:
+            return validate_case_id(case_id)
+        except ValueError as e:
+            st.warning(f"Saved progress not loaded: {e}")
+    if not create:
+        return None
+    case_id = new_case_id()
+    st.query_params[CASE_QUERY_PARAM] = case_id
+    return case_id
+
+
+@st.cache_resource
+def get_render_service():
+    # Rendered by the warm-up right after the data loads
+    try:
+        return WARMUP.render_service()
+    except (FileNotFoundError, ValueError, RuntimeError) as e:
+        st.error(f"Error rendering the guides: {e}")
+        st.stop()
+
+
+@st.cache_resource
+def start_metrics_endpoint():
+    # One Prometheus endpoint per process, only when a port is configured
+    port = os.environ.get(METRICS_PORT_ENV_VAR)
+    if not port:
+        return None
+    try:
+        return start_in_background(METRICS_HOST, int(port))
+    except (OSError, ValueError) as e:
+        st.warning(f"Metrics endpoint not started: {e}")
+        return None
@@ -0,0 +1,211 @@
+"""
+Visa & Work Eligibility Assistant page
+"""
+
+import json
+
+import streamlit as st
+from services.profiling import profiled_rerun, profile_shape, set_shape
+from utils.constants import (
+    PAGE_VISA, COUNTRIES, TRAVEL_PURPOSES, EDUCATION_LEVELS, PURPOSE_DOCUMENT_TYPES, DEFAULT_DOCUMENT_TYPE
+)
+from utils.helpers import get_success_rate_emoji
+from services.reports import ReportBuilder
+from views.shared import (
+    get_visa_service, get_document_service, get_render_service, get_case_store, current_case_id, for_current_tenant
+)
+
+
+def render():
+    """Render the visa assistant page"""
+    st.markdown("# 🌍 Visa & Work Eligibility Assistant")
+    st.markdown("Answer a few questions to get personalized visa recommendations.")
+    
+    st.markdown("---")
+    
+    _visa_form()
+
+
+def _option_index(options, value):
+    """Position of a saved value in a selectbox's options, or the first option"""
+    return options.index(value) if value in options else 0
+
+
+@st.fragment
+@profiled_rerun(PAGE_VISA)
+def _visa_form():
+    """Profile form and recommendations - submitting reruns only this fragment"""
+    visa_service = for_current_tenant(get_visa_service())
+    render_service = get_render_service()
+    case_store = get_case_store()
+    case_id = current_case_id()
+    
+    # A returning user's last profile fills in the form
+    saved = (case_store.get_profile(case_id) if case_store and case_id else None) or {}
+    
+    with st.form("visa_form"):
+        st.markdown("### Your Profile")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            current_country = st.selectbox(
+                "Current Country of Residence",
+                COUNTRIES,
+                index=_option_index(COUNTRIES, saved.get('current_country'))
+            )
+            
+            citizenship = st.selectbox(
+                "Citizenship",
+                COUNTRIES,
+                index=_option_index(COUNTRIES, saved.get('citizenship'))
+            )
+        
+        with col2:
+            destination = st.selectbox(
+                "Destination Country",
+                COUNTRIES,
+                index=_option_index(COUNTRIES, saved.get('destination'))
+            )
+            
+            purpose = st.selectbox(
+                "Purpose of Travel",
+                TRAVEL_PURPOSES,
+                index=_option_index(TRAVEL_PURPOSES, saved.get('purpose'))
+            )
+        
+        education = st.selectbox(
+            "Highest Education Level",
+            EDUCATION_LEVELS,
+            index=_option_index(EDUCATION_LEVELS, saved.get('education'))
+        )
+        
+        work_experience = st.slider("Years of Work Experience", 0, 30, saved.get('work_experience', 5))
+        
+        age = st.number_input("Age (optional)", min_value=16, max_value=100, value=saved.get('age'), step=1)
+        
+        job_title = st.text_input("Current or Intended Job Title (optional)", value=saved.get('job_title') or "")
+        
+        submitted = st.form_submit_button("Get Visa Recommendations", use_container_width=True)
+        
+        if submitted:
+            if current_country == "Select..." or destination == "Select..." or citizenship == "Select..." or purpose == "Select...":
+                st.error("Please fill in all required fields.")
+            else:
+                with st.spinner("Analyzing your profile..."):
+                    # Create profile for service
+                    profile = {
+                        'citizenship': citizenship,
+                        'destination': destination,
+                        'purpose': purpose,
+                        'education': education,
+                        'work_experience': work_experience,
+                        'age': age,
+                        'job_title': job_title
+                    }
+                    set_shape(profile_shape(profile))
+                    st.session_state['packet_profile'] = profile
+                    
+                    # Reuse the case's recommendations if neither the profile nor the data they
+                    # are computed from (rules, occupations, calibration) changed
+                    if case_store:
+                        case_id = current_case_id(create=True)
+                        case_store.save_profile(case_id, dict(profile, current_country=current_country))
+                        version = visa_service.recommendations_version
+                        recommendations = case_store.get_recommendations(case_id, profile, version)
+                        if recommendations is None:
+                            recommendations = visa_service.get_visa_recommendations(profile)
+                            case_store.save_recommendations(case_id, profile, version, recommendations)
+                    else:
+                        recommendations = visa_service.get_visa_recommendations(profile)
+                    
+                    st.success("✓ Profile analyzed successfully!")
+                    
+                    occupation = visa_service.match_occupation(job_title) if job_title else None
+                    if occupation:
+                        status = "on" if destination in occupation['shortage'] else "not on"
+                        st.caption(
+                            f"Matched occupation: {occupation['title']} (ISCO {occupation['code']}), "
+                            f"{status} the {destination} shortage list"
+                        )
+                    
+                    st.markdown("---")
+                    st.markdown("### 📋 Recommended Visa Options")
+                    
+                    if recommendations:
+                        for i, rec in enumerate(recommendations, 1):
+                            st.markdown(f"#### {i}. {rec['name']}")
+                            st.markdown(f"""
+                            - **Processing Time:** {rec['processing_time']}
+                            - **Validity:** {rec['validity']}
+                            - **Eligibility Score:** {rec['eligibility_score']}/100
+                            - **Success Rate:** {get_success_rate_emoji(rec['success_rate'])} {rec['success_rate']}
+                            """)
+                            if rec['approval_probability'] is not None:
+                                st.caption(f"Applications like this were approved {rec['approval_probability']:.0%} of the time")
+                            
+                            with st.expander("View Requirements"):
+                                st.markdown(render_service.get_requirements(rec['visa_key'], visa_service))
+                    else:
+                        st.info("No specific visa recommendations available for this profile. Please consult with immigration professionals.")
+                    
+                    # Rank every other destination for the same profile in one call
+                    ranking = [r for r in visa_service.rank_destinations(profile, top_k=6) if r['destination'] != destination][:5]
+                    if ranking:
+                        with st.expander("🌐 Compare Other Destinations"):
+                            for r in ranking:
+                                best = r['visas'][0]
+                                st.markdown(
+                                    f"- **{r['destination']}** — {best['name']} "
+                                    f"({best['eligibility_score']}/100, approval rate {r['approval_rate']:.0%})"
+                                )
+                    
+                    # Show country-specific info
+                    country_info = render_service.get_country_info(destination, visa_service)
+                    if country_info:
+                        st.markdown("---")
+                        st.markdown(f"### 🌍 {destination} - Key Information")
+                        st.markdown(country_info)
+                    
+                    st.info("💡 **Next Steps:** Review the document requirements and start preparing your application.")
+    
+    # Download buttons cannot live inside a form, so the packet is offered below it
+    profile = st.session_state.get('packet_profile')
+    if profile:
+        document_service = for_current_tenant(get_document_service())
+        visa_type = PURPOSE_DOCUMENT_TYPES.get(profile['purpose'], DEFAULT_DOCUMENT_TYPE)
+        checked = case_store.get_checklist(case_id, visa_type) if case_store and case_id else {}
+        st.download_button(
+            "📥 Download Applicant Packet",
+            _packet(profile, visa_type, checked, visa_service, document_service, render_service),
+            file_name=f"visaverse-packet-{profile['destination'].lower().replace(' ', '-')}.md",
+            mime="text/markdown",
+            on_click="ignore",
+            use_container_width=True
+        )
+
+
+def _packet(profile, visa_type, checked, visa_service, document_service, render_service):
+    """
+    The applicant packet, rendered again only when its inputs change
+    
+    The fragment reruns on every interaction, so the rendered packet is kept
+    in the session until the profile, the ticked documents, the data behind
+    the recommendations or the tenant's document requirements change.
+    
+    Returns:
+        str: Markdown packet
+    """
+    key = (json.dumps(profile, sort_keys=True), visa_type, sorted(checked.items()), visa_service.recommendations_version)
+    cached = st.session_state.get('packet')
+    if cached is not None and cached[0] == key and cached[1] is document_service:
+        return cached[2]
+    applicant = {
+        'name': f"{profile['citizenship']} to {profile['destination']}",
+        'profile': profile,
+        'visa_type': visa_type,
+        'checked_documents': checked
+    }
+    packet = ReportBuilder(visa_service, document_service, render_service).render_packet(applicant)
+    st.session_state['packet'] = (key, document_service, packet)
+    return packet